@@ -7,6 +7,7 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.config import settings
 from app.database import Base
 from app.models import *  # noqa
 
@@ -14,8 +15,19 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# La URL se toma de la configuración de la aplicación (.env / variables de entorno)
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+
 target_metadata = Base.metadata
 
+# SQLite no soporta ALTER TABLE completo: usar modo batch
+es_sqlite = settings.DATABASE_URL.startswith("sqlite")
+
+
+def incluir_nombre(nombre, tipo, padres) -> bool:
+    """Las tablas FTS5 de búsqueda (y sus tablas internas) no están en los modelos: las crea la migración 0006"""
+    return not (tipo == "table" and nombre and nombre.startswith("busqueda_"))
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
@@ -24,6 +36,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=es_sqlite,
+        include_name=incluir_nombre,
     )
 
     with context.begin_transaction():
@@ -39,7 +53,10 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=es_sqlite,
+            include_name=incluir_nombre,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,444 @@
+"""esquema base
+
+Tablas tal como las creaba Base.metadata.create_all antes de introducir
+migraciones. Una base existente creada con create_all se marca con
+`alembic stamp 0001_esquema_base` y luego se aplica `alembic upgrade head`.
+
+Revision ID: 0001_esquema_base
+Revises: 
+Create Date: 2026-10-18 08:25:52.843942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_esquema_base'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('areas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nombre', sa.String(length=100), nullable=False),
+    sa.Column('codigo', sa.String(length=20), nullable=False),
+    sa.Column('descripcion', sa.String(length=500), nullable=True),
+    sa.Column('activa', sa.Boolean(), nullable=True),
+    sa.Column('responsable_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('codigo')
+    )
+    op.create_index(op.f('ix_areas_id'), 'areas', ['id'], unique=False)
+
+    op.create_table('usuarios',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('nombre', sa.String(length=100), nullable=False),
+    sa.Column('apellido', sa.String(length=100), nullable=False),
+    sa.Column('rol', sa.Enum('DEMANDANTE', 'ANALISTA_TD', 'JEFE_TD', 'COMITE_EXPERTOS', 'CGEDX', 'ADMINISTRADOR', name='rolusuario'), nullable=False),
+    sa.Column('area_id', sa.Integer(), nullable=True),
+    sa.Column('telefono', sa.String(length=20), nullable=True),
+    sa.Column('cargo', sa.String(length=100), nullable=True),
+    sa.Column('activo', sa.Boolean(), nullable=True),
+    sa.Column('ultimo_acceso', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['area_id'], ['areas.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_usuarios_email'), 'usuarios', ['email'], unique=True)
+    op.create_index(op.f('ix_usuarios_id'), 'usuarios', ['id'], unique=False)
+    # areas <-> usuarios se referencian mutuamente: la FK se agrega una vez creada usuarios
+    with op.batch_alter_table('areas') as batch_op:
+        batch_op.create_foreign_key(
+            'fk_areas_responsable_id_usuarios', 'usuarios', ['responsable_id'], ['id']
+        )
+
+    op.create_table('iniciativas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('codigo', sa.String(length=20), nullable=True),
+    sa.Column('titulo', sa.String(length=200), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=False),
+    sa.Column('justificacion', sa.Text(), nullable=True),
+    sa.Column('beneficios_esperados', sa.Text(), nullable=True),
+    sa.Column('area_demandante_id', sa.Integer(), nullable=False),
+    sa.Column('monto_estimado', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('porcentaje_transformacion', sa.Integer(), nullable=True),
+    sa.Column('clasificacion_inversion', sa.Enum('ESTANDAR_A', 'ESTANDAR_B', 'ALTA_A', 'ALTA_B', 'ALTA_C', 'ESTRATEGICA', name='clasificacioninversion'), nullable=True),
+    sa.Column('tipo_informe', sa.Enum('V1', 'V2', 'V3', name='tipoinforme'), nullable=True),
+    sa.Column('prioridad', sa.Enum('P1', 'P2', 'P3', 'P4', 'P5', name='prioridad'), nullable=True),
+    sa.Column('puntaje_total', sa.Integer(), nullable=True),
+    sa.Column('estado', sa.Enum('BORRADOR', 'ENVIADA', 'EN_REVISION', 'EN_EVALUACION', 'APROBADA', 'RECHAZADA', 'EN_BANCO_RESERVA', 'EN_PLAN_ANUAL', 'ACTIVADA', name='estadoiniciativa'), nullable=True),
+    sa.Column('fecha_solicitud', sa.DateTime(), nullable=True),
+    sa.Column('fecha_aprobacion', sa.DateTime(), nullable=True),
+    sa.Column('urgencia', sa.String(length=20), nullable=True),
+    sa.Column('fecha_limite', sa.DateTime(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['area_demandante_id'], ['areas.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_iniciativas_codigo'), 'iniciativas', ['codigo'], unique=True)
+    op.create_index(op.f('ix_iniciativas_id'), 'iniciativas', ['id'], unique=False)
+
+    op.create_table('plan_anual',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('año', sa.Integer(), nullable=False),
+    sa.Column('nombre', sa.String(length=100), nullable=True),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('presupuesto_total', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('presupuesto_comprometido', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('presupuesto_ejecutado', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('estado', sa.Enum('BORRADOR', 'EN_REVISION', 'APROBADO', 'EN_EJECUCION', 'CERRADO', name='estadoplan'), nullable=True),
+    sa.Column('aprobado_por', sa.Integer(), nullable=True),
+    sa.Column('fecha_aprobacion', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['aprobado_por'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('año')
+    )
+    op.create_index(op.f('ix_plan_anual_id'), 'plan_anual', ['id'], unique=False)
+
+    op.create_table('evaluaciones_comite',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('iniciativa_id', sa.Integer(), nullable=False),
+    sa.Column('evaluador_id', sa.Integer(), nullable=False),
+    sa.Column('dim1_claridad_problema', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('dim1_beneficios_cuantificados', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('dim1_alineacion_estrategica', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('dim1_subtotal', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('dim2_arquitectura', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('dim2_integracion', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('dim2_seguridad', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('dim2_escalabilidad', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('dim2_subtotal', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('dim3_presupuesto_detallado', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('dim3_roi_tco', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('dim3_riesgos_financieros', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('dim3_subtotal', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('puntaje_total', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('aprobado', sa.Boolean(), nullable=True),
+    sa.Column('veto', sa.Boolean(), nullable=True),
+    sa.Column('motivo_veto', sa.Text(), nullable=True),
+    sa.Column('observaciones', sa.Text(), nullable=True),
+    sa.Column('recomendaciones', sa.Text(), nullable=True),
+    sa.Column('fecha_evaluacion', sa.DateTime(), nullable=True),
+    sa.Column('fecha_revision', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['evaluador_id'], ['usuarios.id'], ),
+    sa.ForeignKeyConstraint(['iniciativa_id'], ['iniciativas.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_evaluaciones_comite_id'), 'evaluaciones_comite', ['id'], unique=False)
+
+    op.create_table('historial_estado_iniciativas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('iniciativa_id', sa.Integer(), nullable=False),
+    sa.Column('estado_anterior', sa.Enum('BORRADOR', 'ENVIADA', 'EN_REVISION', 'EN_EVALUACION', 'APROBADA', 'RECHAZADA', 'EN_BANCO_RESERVA', 'EN_PLAN_ANUAL', 'ACTIVADA', name='estadoiniciativa'), nullable=True),
+    sa.Column('estado_nuevo', sa.Enum('BORRADOR', 'ENVIADA', 'EN_REVISION', 'EN_EVALUACION', 'APROBADA', 'RECHAZADA', 'EN_BANCO_RESERVA', 'EN_PLAN_ANUAL', 'ACTIVADA', name='estadoiniciativa'), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('comentario', sa.Text(), nullable=True),
+    sa.Column('fecha', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['iniciativa_id'], ['iniciativas.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_historial_estado_iniciativas_id'), 'historial_estado_iniciativas', ['id'], unique=False)
+
+    op.create_table('proyectos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('iniciativa_id', sa.Integer(), nullable=False),
+    sa.Column('codigo_proyecto', sa.String(length=30), nullable=True),
+    sa.Column('nombre', sa.String(length=200), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('estado', sa.Enum('BANCO_RESERVA', 'PLAN_ANUAL', 'EN_EJECUCION', 'PAUSADO', 'CANCELADO', 'COMPLETADO', name='estadoproyecto'), nullable=True),
+    sa.Column('año_plan', sa.Integer(), nullable=True),
+    sa.Column('semaforo_salud', sa.Enum('VERDE', 'AMARILLO', 'ROJO', name='semaforosalud'), nullable=True),
+    sa.Column('presupuesto_asignado', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('fecha_activacion', sa.DateTime(), nullable=True),
+    sa.Column('fecha_inicio_planificada', sa.DateTime(), nullable=True),
+    sa.Column('fecha_fin_planificada', sa.DateTime(), nullable=True),
+    sa.Column('fecha_inicio_real', sa.DateTime(), nullable=True),
+    sa.Column('fecha_fin_real', sa.DateTime(), nullable=True),
+    sa.Column('fecha_cierre', sa.DateTime(), nullable=True),
+    sa.Column('avance_porcentaje', sa.Integer(), nullable=True),
+    sa.Column('responsable_id', sa.Integer(), nullable=True),
+    sa.Column('lecciones_aprendidas', sa.Text(), nullable=True),
+    sa.Column('metricas_exito', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['iniciativa_id'], ['iniciativas.id'], ),
+    sa.ForeignKeyConstraint(['responsable_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('iniciativa_id')
+    )
+    op.create_index(op.f('ix_proyectos_codigo_proyecto'), 'proyectos', ['codigo_proyecto'], unique=True)
+    op.create_index(op.f('ix_proyectos_id'), 'proyectos', ['id'], unique=False)
+
+    op.create_table('scoring_iniciativas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('iniciativa_id', sa.Integer(), nullable=False),
+    sa.Column('dim_a_focos', sa.Integer(), nullable=True),
+    sa.Column('dim_a_profundidad', sa.Integer(), nullable=True),
+    sa.Column('dim_b_beneficio', sa.Integer(), nullable=True),
+    sa.Column('dim_b_alcance', sa.Integer(), nullable=True),
+    sa.Column('dim_c_urgencia', sa.Integer(), nullable=True),
+    sa.Column('dim_c_viabilidad', sa.Integer(), nullable=True),
+    sa.Column('puntaje_total', sa.Integer(), nullable=True),
+    sa.Column('prioridad_calculada', sa.Enum('P1', 'P2', 'P3', 'P4', 'P5', name='prioridad'), nullable=True),
+    sa.Column('calculado_por', sa.Integer(), nullable=True),
+    sa.Column('fecha_calculo', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['calculado_por'], ['usuarios.id'], ),
+    sa.ForeignKeyConstraint(['iniciativa_id'], ['iniciativas.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('iniciativa_id')
+    )
+    op.create_index(op.f('ix_scoring_iniciativas_id'), 'scoring_iniciativas', ['id'], unique=False)
+
+    op.create_table('bitacora_proyecto',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('proyecto_id', sa.Integer(), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.Enum('DECISION', 'CAMBIO', 'NOTA', 'ESCALAMIENTO', name='tipobitacora'), nullable=True),
+    sa.Column('descripcion', sa.Text(), nullable=False),
+    sa.Column('fecha', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['proyecto_id'], ['proyectos.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_bitacora_proyecto_id'), 'bitacora_proyecto', ['id'], unique=False)
+
+    op.create_table('cambios_presupuesto',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('proyecto_id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.Enum('AUMENTO', 'REDUCCION', 'REASIGNACION', name='tipocambiopresupuesto'), nullable=False),
+    sa.Column('monto_solicitado', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('monto_aprobado', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('justificacion', sa.Text(), nullable=False),
+    sa.Column('estado', sa.Enum('PENDIENTE', 'APROBADO', 'RECHAZADO', name='estadocambio'), nullable=True),
+    sa.Column('solicitado_por', sa.Integer(), nullable=False),
+    sa.Column('aprobado_por', sa.Integer(), nullable=True),
+    sa.Column('fecha_solicitud', sa.DateTime(), nullable=True),
+    sa.Column('fecha_resolucion', sa.DateTime(), nullable=True),
+    sa.Column('observaciones', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['aprobado_por'], ['usuarios.id'], ),
+    sa.ForeignKeyConstraint(['proyecto_id'], ['proyectos.id'], ),
+    sa.ForeignKeyConstraint(['solicitado_por'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_cambios_presupuesto_id'), 'cambios_presupuesto', ['id'], unique=False)
+
+    op.create_table('clasificacion_financiera',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('proyecto_id', sa.Integer(), nullable=False),
+    sa.Column('tipo_gasto', sa.String(length=100), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('clasificacion_niif', sa.Enum('CAPEX_INTANGIBLE', 'CAPEX_TANGIBLE', 'DERECHO_USO', 'OPEX', name='clasificacionniif'), nullable=False),
+    sa.Column('monto', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('justificacion', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['proyecto_id'], ['proyectos.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_clasificacion_financiera_id'), 'clasificacion_financiera', ['id'], unique=False)
+
+    op.create_table('ejecucion_mensual',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('proyecto_id', sa.Integer(), nullable=False),
+    sa.Column('año', sa.Integer(), nullable=False),
+    sa.Column('mes', sa.Integer(), nullable=False),
+    sa.Column('capex_planificado', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('capex_ejecutado', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('avance_planificado', sa.Integer(), nullable=True),
+    sa.Column('avance_real', sa.Integer(), nullable=True),
+    sa.Column('comentarios', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['proyecto_id'], ['proyectos.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ejecucion_mensual_id'), 'ejecucion_mensual', ['id'], unique=False)
+
+    op.create_table('fases_proyecto',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('proyecto_id', sa.Integer(), nullable=False),
+    sa.Column('nombre', sa.String(length=100), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('orden', sa.Integer(), nullable=True),
+    sa.Column('fecha_inicio_planificada', sa.DateTime(), nullable=True),
+    sa.Column('fecha_fin_planificada', sa.DateTime(), nullable=True),
+    sa.Column('fecha_inicio_real', sa.DateTime(), nullable=True),
+    sa.Column('fecha_fin_real', sa.DateTime(), nullable=True),
+    sa.Column('avance_porcentaje', sa.Integer(), nullable=True),
+    sa.Column('estado', sa.Enum('PENDIENTE', 'EN_PROGRESO', 'COMPLETADA', 'RETRASADA', name='estadofase'), nullable=True),
+    sa.Column('responsable_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['proyecto_id'], ['proyectos.id'], ),
+    sa.ForeignKeyConstraint(['responsable_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_fases_proyecto_id'), 'fases_proyecto', ['id'], unique=False)
+
+    op.create_table('issues_proyecto',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('proyecto_id', sa.Integer(), nullable=False),
+    sa.Column('titulo', sa.String(length=200), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=False),
+    sa.Column('severidad', sa.Enum('BAJA', 'MEDIA', 'ALTA', 'CRITICA', name='severidadissue'), nullable=True),
+    sa.Column('estado', sa.String(length=20), nullable=True),
+    sa.Column('responsable_id', sa.Integer(), nullable=True),
+    sa.Column('resolucion', sa.Text(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.Column('fecha_resolucion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['proyecto_id'], ['proyectos.id'], ),
+    sa.ForeignKeyConstraint(['responsable_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_issues_proyecto_id'), 'issues_proyecto', ['id'], unique=False)
+
+    op.create_table('plan_anual_proyectos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('plan_id', sa.Integer(), nullable=False),
+    sa.Column('proyecto_id', sa.Integer(), nullable=False),
+    sa.Column('monto_asignado', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('orden_prioridad', sa.Integer(), nullable=True),
+    sa.Column('notas', sa.Text(), nullable=True),
+    sa.Column('fecha_inclusion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['plan_id'], ['plan_anual.id'], ),
+    sa.ForeignKeyConstraint(['proyecto_id'], ['proyectos.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_plan_anual_proyectos_id'), 'plan_anual_proyectos', ['id'], unique=False)
+
+    op.create_table('presupuesto_proyecto',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('proyecto_id', sa.Integer(), nullable=False),
+    sa.Column('capex_aprobado', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('capex_comprometido', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('capex_ejecutado', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('opex_proyectado_anual', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('opex_tipo', sa.Enum('LICENCIAS', 'SOPORTE', 'MANTENIMIENTO', 'OTRO', name='tipoopex'), nullable=True),
+    sa.Column('opex_descripcion', sa.Text(), nullable=True),
+    sa.Column('fecha_aprobacion', sa.DateTime(), nullable=True),
+    sa.Column('aprobado_por', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['aprobado_por'], ['usuarios.id'], ),
+    sa.ForeignKeyConstraint(['proyecto_id'], ['proyectos.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('proyecto_id')
+    )
+    op.create_index(op.f('ix_presupuesto_proyecto_id'), 'presupuesto_proyecto', ['id'], unique=False)
+
+    op.create_table('riesgos_proyecto',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('proyecto_id', sa.Integer(), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=False),
+    sa.Column('probabilidad', sa.Enum('BAJO', 'MEDIO', 'ALTO', name='nivelriesgo'), nullable=True),
+    sa.Column('impacto', sa.Enum('BAJO', 'MEDIO', 'ALTO', name='nivelriesgo'), nullable=True),
+    sa.Column('mitigacion', sa.Text(), nullable=True),
+    sa.Column('plan_contingencia', sa.Text(), nullable=True),
+    sa.Column('estado', sa.String(length=20), nullable=True),
+    sa.Column('responsable_id', sa.Integer(), nullable=True),
+    sa.Column('fecha_identificacion', sa.DateTime(), nullable=True),
+    sa.Column('fecha_cierre', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['proyecto_id'], ['proyectos.id'], ),
+    sa.ForeignKeyConstraint(['responsable_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_riesgos_proyecto_id'), 'riesgos_proyecto', ['id'], unique=False)
+
+    op.create_table('hitos_proyecto',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('proyecto_id', sa.Integer(), nullable=False),
+    sa.Column('fase_id', sa.Integer(), nullable=True),
+    sa.Column('nombre', sa.String(length=100), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('fecha_planificada', sa.DateTime(), nullable=False),
+    sa.Column('fecha_real', sa.DateTime(), nullable=True),
+    sa.Column('completado', sa.Boolean(), nullable=True),
+    sa.Column('evidencia_url', sa.String(length=500), nullable=True),
+    sa.ForeignKeyConstraint(['fase_id'], ['fases_proyecto.id'], ),
+    sa.ForeignKeyConstraint(['proyecto_id'], ['proyectos.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_hitos_proyecto_id'), 'hitos_proyecto', ['id'], unique=False)
+
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_hitos_proyecto_id'), table_name='hitos_proyecto')
+    op.drop_table('hitos_proyecto')
+
+    op.drop_index(op.f('ix_riesgos_proyecto_id'), table_name='riesgos_proyecto')
+    op.drop_table('riesgos_proyecto')
+
+    op.drop_index(op.f('ix_presupuesto_proyecto_id'), table_name='presupuesto_proyecto')
+    op.drop_table('presupuesto_proyecto')
+
+    op.drop_index(op.f('ix_plan_anual_proyectos_id'), table_name='plan_anual_proyectos')
+    op.drop_table('plan_anual_proyectos')
+
+    op.drop_index(op.f('ix_issues_proyecto_id'), table_name='issues_proyecto')
+    op.drop_table('issues_proyecto')
+
+    op.drop_index(op.f('ix_fases_proyecto_id'), table_name='fases_proyecto')
+    op.drop_table('fases_proyecto')
+
+    op.drop_index(op.f('ix_ejecucion_mensual_id'), table_name='ejecucion_mensual')
+    op.drop_table('ejecucion_mensual')
+
+    op.drop_index(op.f('ix_clasificacion_financiera_id'), table_name='clasificacion_financiera')
+    op.drop_table('clasificacion_financiera')
+
+    op.drop_index(op.f('ix_cambios_presupuesto_id'), table_name='cambios_presupuesto')
+    op.drop_table('cambios_presupuesto')
+
+    op.drop_index(op.f('ix_bitacora_proyecto_id'), table_name='bitacora_proyecto')
+    op.drop_table('bitacora_proyecto')
+
+    op.drop_index(op.f('ix_scoring_iniciativas_id'), table_name='scoring_iniciativas')
+    op.drop_table('scoring_iniciativas')
+
+    op.drop_index(op.f('ix_proyectos_id'), table_name='proyectos')
+    op.drop_index(op.f('ix_proyectos_codigo_proyecto'), table_name='proyectos')
+    op.drop_table('proyectos')
+
+    op.drop_index(op.f('ix_historial_estado_iniciativas_id'), table_name='historial_estado_iniciativas')
+    op.drop_table('historial_estado_iniciativas')
+
+    op.drop_index(op.f('ix_evaluaciones_comite_id'), table_name='evaluaciones_comite')
+    op.drop_table('evaluaciones_comite')
+
+    op.drop_index(op.f('ix_plan_anual_id'), table_name='plan_anual')
+    op.drop_table('plan_anual')
+
+    op.drop_index(op.f('ix_iniciativas_id'), table_name='iniciativas')
+    op.drop_index(op.f('ix_iniciativas_codigo'), table_name='iniciativas')
+    op.drop_table('iniciativas')
+
+    op.drop_index(op.f('ix_usuarios_id'), table_name='usuarios')
+    op.drop_index(op.f('ix_usuarios_email'), table_name='usuarios')
+    with op.batch_alter_table('areas') as batch_op:
+        batch_op.drop_constraint('fk_areas_responsable_id_usuarios', type_='foreignkey')
+    op.drop_table('usuarios')
+
+    op.drop_index(op.f('ix_areas_id'), table_name='areas')
+    op.drop_table('areas')
+
+    # En PostgreSQL drop_table no elimina los tipos ENUM asociados
+    bind = op.get_bind()
+    for nombre in (
+        'rolusuario', 'clasificacioninversion', 'tipoinforme', 'prioridad',
+        'estadoiniciativa', 'estadoplan', 'estadoproyecto', 'semaforosalud',
+        'tipobitacora', 'tipocambiopresupuesto', 'estadocambio', 'clasificacionniif',
+        'estadofase', 'severidadissue', 'tipoopex', 'nivelriesgo',
+    ):
+        sa.Enum(name=nombre).drop(bind, checkfirst=True)
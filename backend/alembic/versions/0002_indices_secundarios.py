@@ -0,0 +1,124 @@
+"""indices secundarios
+
+Índices sobre las claves foráneas y filtros más consultados, y restricciones
+únicas que el código ya asumía (una evaluación por evaluador e iniciativa,
+un registro de ejecución por proyecto y período, un proyecto por plan).
+Si una base existente tiene duplicados, la creación de las restricciones
+únicas falla y deben depurarse antes de actualizar.
+
+Revision ID: 0002_indices_secundarios
+Revises: 0001_esquema_base
+Create Date: 2026-10-18 08:26:34.670905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_indices_secundarios'
+down_revision: Union[str, None] = '0001_esquema_base'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('bitacora_proyecto', schema=None) as batch_op:
+        batch_op.create_index('ix_bitacora_proyecto_proyecto_fecha', ['proyecto_id', 'fecha'], unique=False)
+
+    with op.batch_alter_table('cambios_presupuesto', schema=None) as batch_op:
+        batch_op.create_index('ix_cambios_presupuesto_proyecto_estado', ['proyecto_id', 'estado'], unique=False)
+
+    with op.batch_alter_table('clasificacion_financiera', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_clasificacion_financiera_proyecto_id'), ['proyecto_id'], unique=False)
+
+    with op.batch_alter_table('ejecucion_mensual', schema=None) as batch_op:
+        batch_op.create_index('ix_ejecucion_mensual_año_mes', ['año', 'mes'], unique=False)
+        batch_op.create_unique_constraint('uq_ejecucion_mensual_proyecto_periodo', ['proyecto_id', 'año', 'mes'])
+
+    with op.batch_alter_table('evaluaciones_comite', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_evaluaciones_comite_evaluador_id'), ['evaluador_id'], unique=False)
+        batch_op.create_unique_constraint('uq_evaluaciones_comite_iniciativa_evaluador', ['iniciativa_id', 'evaluador_id'])
+
+    with op.batch_alter_table('fases_proyecto', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_fases_proyecto_proyecto_id'), ['proyecto_id'], unique=False)
+
+    with op.batch_alter_table('historial_estado_iniciativas', schema=None) as batch_op:
+        batch_op.create_index('ix_historial_estado_iniciativas_iniciativa_fecha', ['iniciativa_id', 'fecha'], unique=False)
+
+    with op.batch_alter_table('hitos_proyecto', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_hitos_proyecto_proyecto_id'), ['proyecto_id'], unique=False)
+
+    with op.batch_alter_table('iniciativas', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_iniciativas_area_demandante_id'), ['area_demandante_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_iniciativas_created_by'), ['created_by'], unique=False)
+        batch_op.create_index('ix_iniciativas_estado_fecha_solicitud', ['estado', 'fecha_solicitud'], unique=False)
+
+    with op.batch_alter_table('issues_proyecto', schema=None) as batch_op:
+        batch_op.create_index('ix_issues_proyecto_proyecto_estado', ['proyecto_id', 'estado'], unique=False)
+
+    with op.batch_alter_table('plan_anual_proyectos', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_plan_anual_proyectos_proyecto_id'), ['proyecto_id'], unique=False)
+        batch_op.create_unique_constraint('uq_plan_anual_proyectos_plan_proyecto', ['plan_id', 'proyecto_id'])
+
+    with op.batch_alter_table('proyectos', schema=None) as batch_op:
+        batch_op.create_index('ix_proyectos_estado_año_semaforo', ['estado', 'año_plan', 'semaforo_salud'], unique=False)
+        batch_op.create_index(batch_op.f('ix_proyectos_responsable_id'), ['responsable_id'], unique=False)
+
+    with op.batch_alter_table('riesgos_proyecto', schema=None) as batch_op:
+        batch_op.create_index('ix_riesgos_proyecto_proyecto_estado', ['proyecto_id', 'estado'], unique=False)
+
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_usuarios_area_id'), ['area_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_usuarios_area_id'))
+
+    with op.batch_alter_table('riesgos_proyecto', schema=None) as batch_op:
+        batch_op.drop_index('ix_riesgos_proyecto_proyecto_estado')
+
+    with op.batch_alter_table('proyectos', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_proyectos_responsable_id'))
+        batch_op.drop_index('ix_proyectos_estado_año_semaforo')
+
+    with op.batch_alter_table('plan_anual_proyectos', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_plan_anual_proyectos_plan_proyecto', type_='unique')
+        batch_op.drop_index(batch_op.f('ix_plan_anual_proyectos_proyecto_id'))
+
+    with op.batch_alter_table('issues_proyecto', schema=None) as batch_op:
+        batch_op.drop_index('ix_issues_proyecto_proyecto_estado')
+
+    with op.batch_alter_table('iniciativas', schema=None) as batch_op:
+        batch_op.drop_index('ix_iniciativas_estado_fecha_solicitud')
+        batch_op.drop_index(batch_op.f('ix_iniciativas_created_by'))
+        batch_op.drop_index(batch_op.f('ix_iniciativas_area_demandante_id'))
+
+    with op.batch_alter_table('hitos_proyecto', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_hitos_proyecto_proyecto_id'))
+
+    with op.batch_alter_table('historial_estado_iniciativas', schema=None) as batch_op:
+        batch_op.drop_index('ix_historial_estado_iniciativas_iniciativa_fecha')
+
+    with op.batch_alter_table('fases_proyecto', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_fases_proyecto_proyecto_id'))
+
+    with op.batch_alter_table('evaluaciones_comite', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_evaluaciones_comite_iniciativa_evaluador', type_='unique')
+        batch_op.drop_index(batch_op.f('ix_evaluaciones_comite_evaluador_id'))
+
+    with op.batch_alter_table('ejecucion_mensual', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_ejecucion_mensual_proyecto_periodo', type_='unique')
+        batch_op.drop_index('ix_ejecucion_mensual_año_mes')
+
+    with op.batch_alter_table('clasificacion_financiera', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_clasificacion_financiera_proyecto_id'))
+
+    with op.batch_alter_table('cambios_presupuesto', schema=None) as batch_op:
+        batch_op.drop_index('ix_cambios_presupuesto_proyecto_estado')
+
+    with op.batch_alter_table('bitacora_proyecto', schema=None) as batch_op:
+        batch_op.drop_index('ix_bitacora_proyecto_proyecto_fecha')
@@ -0,0 +1,31 @@
+"""token_version en usuarios
+
+Versión de los tokens de cada usuario: se incrementa al cambiar el rol o
+desactivarlo, y los tokens que llevan una versión anterior dejan de valer.
+
+Revision ID: 0003_token_version_usuarios
+Revises: 0002_indices_secundarios
+Create Date: 2026-10-18 09:20:11.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_token_version_usuarios'
+down_revision: Union[str, None] = '0002_indices_secundarios'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
@@ -0,0 +1,66 @@
+"""fecha_ultimo_cambio_estado en iniciativas
+
+Copia desnormalizada de la fecha del último registro del historial de
+estados, para calcular los días en el estado actual sin consultar el
+historial por iniciativa. Las filas existentes se completan con
+ROW_NUMBER() sobre el historial (la fila más reciente por iniciativa) y,
+sin historial, con la fecha de creación.
+
+Revision ID: 0004_fecha_ultimo_cambio_estado
+Revises: 0003_token_version_usuarios
+Create Date: 2026-10-18 09:41:52.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_fecha_ultimo_cambio_estado'
+down_revision: Union[str, None] = '0003_token_version_usuarios'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+iniciativas = sa.table(
+    'iniciativas',
+    sa.column('id', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+    sa.column('fecha_ultimo_cambio_estado', sa.DateTime),
+)
+historial = sa.table(
+    'historial_estado_iniciativas',
+    sa.column('iniciativa_id', sa.Integer),
+    sa.column('fecha', sa.DateTime),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('iniciativas', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fecha_ultimo_cambio_estado', sa.DateTime(), nullable=True))
+
+    # UPDATE ... FROM (PostgreSQL y SQLite >= 3.33) con la última fila por iniciativa
+    ultimos = sa.select(
+        historial.c.iniciativa_id,
+        historial.c.fecha,
+        sa.func.row_number().over(
+            partition_by=historial.c.iniciativa_id, order_by=historial.c.fecha.desc()
+        ).label('posicion')
+    ).where(historial.c.fecha.is_not(None)).subquery('ultimos')
+    op.execute(
+        iniciativas.update()
+        .where(iniciativas.c.id == ultimos.c.iniciativa_id, ultimos.c.posicion == 1)
+        .values(fecha_ultimo_cambio_estado=ultimos.c.fecha)
+    )
+    op.execute(
+        iniciativas.update()
+        .where(iniciativas.c.fecha_ultimo_cambio_estado.is_(None))
+        .values(fecha_ultimo_cambio_estado=iniciativas.c.created_at)
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('iniciativas', schema=None) as batch_op:
+        batch_op.drop_column('fecha_ultimo_cambio_estado')
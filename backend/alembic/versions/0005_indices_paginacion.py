@@ -0,0 +1,63 @@
+"""indices de paginacion
+
+Índices (fecha, id) para el orden de los listados paginados por cursor
+(WHERE (fecha, id) < (:fecha, :id) ORDER BY fecha DESC, id DESC). Los
+índices de estado + fecha de iniciativas y de bitácora se reemplazan por
+versiones que incluyen el id como desempate.
+
+Revision ID: 0005_indices_paginacion
+Revises: 0004_fecha_ultimo_cambio_estado
+Create Date: 2026-10-18 10:12:37.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_indices_paginacion'
+down_revision: Union[str, None] = '0004_fecha_ultimo_cambio_estado'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('bitacora_proyecto', schema=None) as batch_op:
+        batch_op.drop_index('ix_bitacora_proyecto_proyecto_fecha')
+        batch_op.create_index('ix_bitacora_proyecto_proyecto_fecha_id', ['proyecto_id', 'fecha', 'id'], unique=False)
+
+    with op.batch_alter_table('iniciativas', schema=None) as batch_op:
+        batch_op.drop_index('ix_iniciativas_estado_fecha_solicitud')
+        batch_op.create_index('ix_iniciativas_estado_fecha_solicitud_id', ['estado', 'fecha_solicitud', 'id'], unique=False)
+        batch_op.create_index('ix_iniciativas_fecha_solicitud_id', ['fecha_solicitud', 'id'], unique=False)
+
+    with op.batch_alter_table('issues_proyecto', schema=None) as batch_op:
+        batch_op.create_index('ix_issues_proyecto_proyecto_fecha_creacion_id', ['proyecto_id', 'fecha_creacion', 'id'], unique=False)
+
+    with op.batch_alter_table('proyectos', schema=None) as batch_op:
+        batch_op.create_index('ix_proyectos_created_at_id', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.create_index('ix_usuarios_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.drop_index('ix_usuarios_created_at_id')
+
+    with op.batch_alter_table('proyectos', schema=None) as batch_op:
+        batch_op.drop_index('ix_proyectos_created_at_id')
+
+    with op.batch_alter_table('issues_proyecto', schema=None) as batch_op:
+        batch_op.drop_index('ix_issues_proyecto_proyecto_fecha_creacion_id')
+
+    with op.batch_alter_table('iniciativas', schema=None) as batch_op:
+        batch_op.drop_index('ix_iniciativas_fecha_solicitud_id')
+        batch_op.drop_index('ix_iniciativas_estado_fecha_solicitud_id')
+        batch_op.create_index('ix_iniciativas_estado_fecha_solicitud', ['estado', 'fecha_solicitud'], unique=False)
+
+    with op.batch_alter_table('bitacora_proyecto', schema=None) as batch_op:
+        batch_op.drop_index('ix_bitacora_proyecto_proyecto_fecha_id')
+        batch_op.create_index('ix_bitacora_proyecto_proyecto_fecha', ['proyecto_id', 'fecha'], unique=False)
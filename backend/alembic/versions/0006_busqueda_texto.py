@@ -0,0 +1,102 @@
+"""busqueda de texto completo
+
+Índices de texto completo sobre iniciativas (titulo, descripcion,
+justificacion, beneficios_esperados) y proyectos (nombre, descripcion,
+lecciones_aprendidas), usados por app/services/busqueda.py.
+
+- SQLite: tablas FTS5 de contenido externo (busqueda_iniciativas,
+  busqueda_proyectos; rowid = id de la fila) con tokenizador unicode61 sin
+  tildes, sincronizadas por triggers de INSERT/UPDATE/DELETE.
+- PostgreSQL: índices GIN de expresión sobre un tsvector 'spanish'
+  ponderado (A título, B descripción, C el resto) sin tildes (extensión
+  unaccent y la función inmutable sgip_unaccent). El índice se mantiene solo;
+  la expresión debe coincidir con la de app/services/busqueda.py.
+
+Revision ID: 0006_busqueda_texto
+Revises: 0005_indices_paginacion
+Create Date: 2026-10-18 10:47:05.216733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_busqueda_texto'
+down_revision: Union[str, None] = '0005_indices_paginacion'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# índice FTS5 / GIN -> (tabla, columnas con su peso en PostgreSQL)
+INDICES = {
+    'busqueda_iniciativas': ('iniciativas', [
+        ('titulo', 'A'), ('descripcion', 'B'), ('justificacion', 'C'), ('beneficios_esperados', 'C'),
+    ]),
+    'busqueda_proyectos': ('proyectos', [
+        ('nombre', 'A'), ('descripcion', 'B'), ('lecciones_aprendidas', 'C'),
+    ]),
+}
+
+
+def _upgrade_sqlite() -> None:
+    for indice, (tabla, columnas) in INDICES.items():
+        nombres = [columna for columna, _ in columnas]
+        lista = ', '.join(nombres)
+        nuevos = ', '.join(f'new.{columna}' for columna in nombres)
+        viejos = ', '.join(f'old.{columna}' for columna in nombres)
+        op.execute(
+            f"CREATE VIRTUAL TABLE {indice} USING fts5({lista}, content='{tabla}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            f"CREATE TRIGGER {indice}_ai AFTER INSERT ON {tabla} BEGIN "
+            f"INSERT INTO {indice}(rowid, {lista}) VALUES (new.id, {nuevos}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {indice}_ad AFTER DELETE ON {tabla} BEGIN "
+            f"INSERT INTO {indice}({indice}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {indice}_au AFTER UPDATE OF {lista} ON {tabla} BEGIN "
+            f"INSERT INTO {indice}({indice}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); "
+            f"INSERT INTO {indice}(rowid, {lista}) VALUES (new.id, {nuevos}); END"
+        )
+        op.execute(f"INSERT INTO {indice}({indice}) VALUES ('rebuild')")
+
+
+def _upgrade_postgresql() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute(
+        "CREATE OR REPLACE FUNCTION sgip_unaccent(text) RETURNS text AS "
+        "$$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$ "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT"
+    )
+    for indice, (tabla, columnas) in INDICES.items():
+        documento = ' || '.join(
+            f"setweight(to_tsvector('spanish'::regconfig, sgip_unaccent(coalesce({columna}, ''))), '{peso}')"
+            for columna, peso in columnas
+        )
+        op.execute(f"CREATE INDEX ix_{indice} ON {tabla} USING gin (({documento}))")
+
+
+def upgrade() -> None:
+    dialecto = op.get_bind().dialect.name
+    if dialecto == 'sqlite':
+        _upgrade_sqlite()
+    elif dialecto == 'postgresql':
+        _upgrade_postgresql()
+
+
+def downgrade() -> None:
+    dialecto = op.get_bind().dialect.name
+    for indice, (tabla, _) in INDICES.items():
+        if dialecto == 'sqlite':
+            for sufijo in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {indice}_{sufijo}")
+            op.execute(f"DROP TABLE IF EXISTS {indice}")
+        elif dialecto == 'postgresql':
+            op.execute(f"DROP INDEX IF EXISTS ix_{indice}")
+    if dialecto == 'postgresql':
+        op.execute("DROP FUNCTION IF EXISTS sgip_unaccent(text)")
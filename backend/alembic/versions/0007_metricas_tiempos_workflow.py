@@ -0,0 +1,133 @@
+"""metricas de tiempos del workflow
+
+Histograma de duraciones por año de solicitud, tramo y cubeta, que
+app/services/workflow.py acumula en cada cambio de estado. Se reconstruye a
+partir del historial existente con LEAD() por iniciativa: cada registro
+cierra la estadía en su estado_anterior, que empezó en el registro previo
+(lo mismo que mide el servicio con fecha_ultimo_cambio_estado), y el tiempo
+de aprobación desde el primer envío hasta la primera aprobación. Las
+cubetas deben coincidir con las de app/services/workflow.py.
+
+Revision ID: 0007_metricas_tiempos_workflow
+Revises: 0006_busqueda_texto
+Create Date: 2026-10-18 11:38:21.604117
+
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_metricas_tiempos_workflow'
+down_revision: Union[str, None] = '0006_busqueda_texto'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CUBETAS_HORAS = (
+    1, 4, 8, 24, 48, 72, 120, 168, 240, 336, 504, 720,
+    1080, 1440, 2160, 2880, 4320, 8760
+)
+# Valores del enum EstadoIniciativa: la columna guarda el nombre
+VALORES_ESTADO = {
+    'BORRADOR': 'borrador', 'ENVIADA': 'enviada', 'EN_REVISION': 'en_revision',
+    'EN_EVALUACION': 'en_evaluacion', 'APROBADA': 'aprobada', 'RECHAZADA': 'rechazada',
+    'EN_BANCO_RESERVA': 'en_banco_reserva', 'EN_PLAN_ANUAL': 'en_plan_anual', 'ACTIVADA': 'activada',
+}
+
+iniciativas = sa.table(
+    'iniciativas',
+    sa.column('id', sa.Integer),
+    sa.column('fecha_solicitud', sa.DateTime),
+    sa.column('created_at', sa.DateTime),
+)
+historial = sa.table(
+    'historial_estado_iniciativas',
+    sa.column('id', sa.Integer),
+    sa.column('iniciativa_id', sa.Integer),
+    sa.column('estado_anterior', sa.String),
+    sa.column('estado_nuevo', sa.String),
+    sa.column('fecha', sa.DateTime),
+)
+
+
+def _horas(desde, hasta) -> float:
+    return max((hasta - desde).total_seconds() / 3600, 0.0)
+
+
+def upgrade() -> None:
+    metricas = op.create_table('metricas_tiempos_workflow',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('año', sa.Integer(), nullable=False),
+    sa.Column('tramo', sa.String(length=30), nullable=False),
+    sa.Column('cubeta', sa.Integer(), nullable=False),
+    sa.Column('cantidad', sa.Integer(), nullable=False),
+    sa.Column('suma_horas', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('año', 'tramo', 'cubeta', name='uq_metricas_tiempos_workflow_clave')
+    )
+    with op.batch_alter_table('metricas_tiempos_workflow', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_metricas_tiempos_workflow_id'), ['id'], unique=False)
+
+    conexion = op.get_bind()
+    año = sa.func.coalesce(iniciativas.c.fecha_solicitud, iniciativas.c.created_at)
+    agrupadas = defaultdict(lambda: [0, 0.0])
+
+    def acumular(fecha_año, tramo, horas):
+        acumulado = agrupadas[(fecha_año.year, tramo, bisect_right(CUBETAS_HORAS, horas))]
+        acumulado[0] += 1
+        acumulado[1] += horas
+
+    # Estadías: desde cada registro hasta el siguiente, en el estado que este deja.
+    # Copia de workflow._duraciones_historial: deben mantenerse iguales
+    orden = {'partition_by': historial.c.iniciativa_id, 'order_by': (historial.c.fecha, historial.c.id)}
+    estadias = sa.select(
+        historial.c.iniciativa_id,
+        historial.c.fecha,
+        sa.func.lead(historial.c.estado_anterior, type_=sa.String).over(**orden).label('estado'),
+        sa.func.lead(historial.c.fecha, type_=sa.DateTime).over(**orden).label('fin')
+    ).where(
+        historial.c.fecha.is_not(None),
+        # Registros sin cambio de estado (reclasificaciones) no cortan la estadía
+        sa.or_(historial.c.estado_anterior.is_(None), historial.c.estado_anterior != historial.c.estado_nuevo)
+    ).subquery('estadias')
+    filas = conexion.execute(
+        sa.select(año, estadias.c.estado, estadias.c.fecha, estadias.c.fin)
+        .join_from(estadias, iniciativas, iniciativas.c.id == estadias.c.iniciativa_id)
+        .where(estadias.c.fin.is_not(None))
+    )
+    for fecha_año, estado, inicio, fin in filas:
+        if fecha_año is not None and estado in VALORES_ESTADO:
+            acumular(fecha_año, VALORES_ESTADO[estado], _horas(inicio, fin))
+
+    # Aprobación: primer envío -> primera aprobación posterior
+    envios = sa.select(
+        historial.c.iniciativa_id, sa.func.min(historial.c.fecha).label('envio')
+    ).where(historial.c.estado_nuevo == 'ENVIADA').group_by(historial.c.iniciativa_id).subquery('envios')
+    filas = conexion.execute(
+        sa.select(año, envios.c.envio, sa.func.min(historial.c.fecha))
+        .join_from(envios, historial, historial.c.iniciativa_id == envios.c.iniciativa_id)
+        .join(iniciativas, iniciativas.c.id == envios.c.iniciativa_id)
+        .where(historial.c.estado_nuevo == 'APROBADA', historial.c.fecha >= envios.c.envio)
+        .group_by(envios.c.iniciativa_id, año, envios.c.envio)
+    )
+    for fecha_año, envio, aprobacion in filas:
+        if fecha_año is not None:
+            acumular(fecha_año, 'aprobacion', _horas(envio, aprobacion))
+
+    if agrupadas:
+        op.bulk_insert(metricas, [
+            {'año': fecha_año, 'tramo': tramo, 'cubeta': cubeta, 'cantidad': cantidad, 'suma_horas': suma}
+            for (fecha_año, tramo, cubeta), (cantidad, suma) in agrupadas.items()
+        ])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('metricas_tiempos_workflow', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_metricas_tiempos_workflow_id'))
+
+    op.drop_table('metricas_tiempos_workflow')
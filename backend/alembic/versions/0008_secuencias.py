@@ -0,0 +1,63 @@
+"""secuencias de codigos
+
+Contadores por prefijo y año (INI-2026, PRY-2026) que app/services/secuencias.py
+incrementa con un upsert atómico al generar códigos de iniciativas y
+proyectos. Se inicializan con el mayor número de los códigos existentes con
+formato PREFIJO-AAAA-NNNN; el patrón debe coincidir con el del servicio.
+
+Revision ID: 0008_secuencias
+Revises: 0007_metricas_tiempos_workflow
+Create Date: 2026-10-18 12:24:09.371540
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_secuencias'
+down_revision: Union[str, None] = '0007_metricas_tiempos_workflow'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PATRON_CODIGO = re.compile(r'^(INI|PRY)-(\d{4})-(\d+)$')
+
+iniciativas = sa.table(
+    'iniciativas',
+    sa.column('codigo', sa.String),
+)
+proyectos = sa.table(
+    'proyectos',
+    sa.column('codigo_proyecto', sa.String),
+)
+
+
+def upgrade() -> None:
+    secuencias = op.create_table('secuencias',
+    sa.Column('nombre', sa.String(length=40), nullable=False),
+    sa.Column('valor', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('nombre')
+    )
+
+    conexion = op.get_bind()
+    maximos = {}
+    for columna in (iniciativas.c.codigo, proyectos.c.codigo_proyecto):
+        for codigo in conexion.scalars(sa.select(columna).where(columna.is_not(None))):
+            coincidencia = PATRON_CODIGO.match(codigo)
+            if coincidencia:
+                prefijo, año, numero = coincidencia.groups()
+                nombre = f'{prefijo}-{año}'
+                maximos[nombre] = max(maximos.get(nombre, 0), int(numero))
+
+    if maximos:
+        op.bulk_insert(secuencias, [
+            {'nombre': nombre, 'valor': valor} for nombre, valor in maximos.items()
+        ])
+
+
+def downgrade() -> None:
+    op.drop_table('secuencias')
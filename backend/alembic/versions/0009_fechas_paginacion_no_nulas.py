@@ -0,0 +1,72 @@
+"""fechas de paginacion no nulas
+
+Las columnas de orden de los listados paginados por cursor (0005) pasan a
+NOT NULL: con una fecha NULL en la última fila de una página el cursor no
+se podía decodificar y (NULL, id) < (fecha, id) nunca es verdadero, así que
+esas filas no aparecían después de la primera página. Así el orden sigue
+usando los índices (fecha, id), sin coalesce en el ORDER BY.
+
+Las filas existentes sin fecha toman la de creación si la tabla la tiene y,
+si no, FECHA_MINIMA: quedan al final de los listados, donde ya aparecían en
+SQLite. En SQLite el batch recrea la tabla y con ella se pierden sus
+triggers (los de búsqueda de 0006); se guardan antes y se vuelven a crear.
+
+Revision ID: 0009_fechas_paginacion_no_nulas
+Revises: 0008_secuencias
+Create Date: 2026-10-18 16:05:43.812907
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009_fechas_paginacion_no_nulas'
+down_revision: Union[str, None] = '0008_secuencias'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FECHA_MINIMA = datetime(1970, 1, 1)
+
+# tabla -> (columna de orden, columna con la que completarla antes de FECHA_MINIMA)
+COLUMNAS = {
+    'iniciativas': ('fecha_solicitud', 'created_at'),
+    'proyectos': ('created_at', None),
+    'usuarios': ('created_at', None),
+    'issues_proyecto': ('fecha_creacion', None),
+    'bitacora_proyecto': ('fecha', None),
+}
+
+
+def _alterar(nullable: bool) -> None:
+    conexion = op.get_bind()
+    es_sqlite = conexion.dialect.name == 'sqlite'
+    for nombre, (columna, _) in COLUMNAS.items():
+        triggers = list(conexion.scalars(
+            sa.text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :tabla"),
+            {'tabla': nombre}
+        )) if es_sqlite else []
+        with op.batch_alter_table(nombre, schema=None) as batch_op:
+            batch_op.alter_column(columna, existing_type=sa.DateTime(), nullable=nullable)
+        for sql in triggers:
+            op.execute(sql)
+
+
+def upgrade() -> None:
+    for nombre, (columna, respaldo) in COLUMNAS.items():
+        tabla = sa.table(nombre, sa.column(columna, sa.DateTime), *(
+            [sa.column(respaldo, sa.DateTime)] if respaldo else []
+        ))
+        valor = sa.literal(FECHA_MINIMA, sa.DateTime)
+        if respaldo:
+            valor = sa.func.coalesce(tabla.c[respaldo], valor)
+        op.execute(tabla.update().where(tabla.c[columna].is_(None)).values({columna: valor}))
+    _alterar(nullable=False)
+
+
+def downgrade() -> None:
+    _alterar(nullable=True)
@@ -1,30 +1,449 @@
-from sqlalchemy import create_engine
+import logging
+import os
+import time
+from typing import Optional
+
+from fastapi import Depends, Request
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
 from .config import settings
 
+
+def es_sqlite_en_archivo(url: str) -> bool:
+    """True si la URL apunta a un archivo SQLite (no a una base en memoria)"""
+    url = make_url(url)
+    if not url.get_backend_name() == "sqlite":
+        return False
+    base = url.database or ""
+    return base not in ("", ":memory:") and "mode=memory" not in base \
+        and url.query.get("mode") != "memory"
+
+
+# El perfil de producción solo aplica a SQLite en archivo
+SQLITE_PRODUCCION = settings.SQLITE_PRODUCCION and es_sqlite_en_archivo(settings.DATABASE_URL)
+
+
+def url_sqlite_solo_lectura(url: str) -> str:
+    """Convierte una URL SQLite en una URI `file:` abierta en modo solo lectura"""
+    url = make_url(url)
+    return url.set(
+        database=f"file:{url.database}",
+        query={**url.query, "mode": "ro", "uri": "true"}
+    ).render_as_string(hide_password=False)
+
+
+def registrar_pragmas_sqlite(motor, escritura: bool) -> None:
+    """Aplica los pragmas del perfil de producción a cada conexión nueva"""
+
+    @event.listens_for(getattr(motor, "sync_engine", motor), "connect")
+    def _aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if escritura:
+            # journal_mode es persistente en el archivo; una conexión de solo
+            # lectura no puede cambiarlo
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+def crear_motores_sqlite(url: str, crear_motor):
+    """
+    Crea el par (escritura, lectura) del perfil SQLite de producción.
+    El escritor tiene una sola conexión: las escrituras del proceso se
+    serializan en el pool en lugar de competir por el lock del archivo.
+    """
+    connect_args = {"check_same_thread": False}
+    escritura = crear_motor(
+        url,
+        connect_args=connect_args,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+    )
+    lectura = crear_motor(
+        url_sqlite_solo_lectura(url),
+        connect_args=connect_args,
+        pool_size=settings.SQLITE_POOL_LECTURA,
+        max_overflow=0
+    )
+    registrar_pragmas_sqlite(escritura, escritura=True)
+    registrar_pragmas_sqlite(lectura, escritura=False)
+    return escritura, lectura
+
+
+class SesionEnrutada(Session):
+    """
+    Session que envía las lecturas al engine de lectura y las escrituras
+    (flush, INSERT/UPDATE/DELETE) al de escritura. Tras la primera
+    escritura, el resto de la transacción sigue en el escritor para
+    leer sus propios cambios aún no confirmados.
+    """
+
+    def __init__(self, *args, escritura=None, lectura=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.escritura = escritura
+        self.lectura = lectura
+        self.usa_escritura = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.usa_escritura or self._flushing or self.es_escritura(clause):
+            self.usa_escritura = True
+            return self.escritura
+        return self.lectura
+
+    @staticmethod
+    def es_escritura(clause) -> bool:
+        if isinstance(clause, UpdateBase):
+            return True
+        if isinstance(clause, TextClause):
+            return not clause.text.lstrip().upper().startswith(("SELECT", "WITH", "PRAGMA"))
+        return False
+
+
+@event.listens_for(SesionEnrutada, "after_transaction_end")
+def _liberar_escritor(session, transaction):
+    # Al terminar la transacción raíz las lecturas vuelven al pool de lectura
+    if transaction.parent is None:
+        session.usa_escritura = False
+
+
+def opciones_motor(url: str) -> dict:
+    """Opciones de conexión y pool según el tipo de base de datos"""
+    if url.startswith("sqlite"):
+        opciones = {"connect_args": {"check_same_thread": False}}
+        if es_sqlite_en_archivo(url):
+            # Cada petición en curso retiene su conexión hasta responder: el
+            # pool acota las peticiones simultáneas por worker
+            opciones.update(pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW)
+        return opciones
+    return {
+        "pool_pre_ping": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW
+    }
+
+
+def obtener_url_async(url: str) -> str:
+    """Deriva la URL del driver async equivalente (aiosqlite / psycopg async)"""
+    esquema, resto = url.split("://", 1)
+    if esquema.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{resto}"
+    if esquema.startswith("postgresql"):
+        return f"postgresql+psycopg_async://{resto}"
+    return url
+
+
 # Configuración del engine según el tipo de base de datos
-if settings.DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False}
+engine_lectura = None
+
+if SQLITE_PRODUCCION:
+    engine, engine_lectura = crear_motores_sqlite(settings.DATABASE_URL, create_engine)
+else:
+    engine = create_engine(settings.DATABASE_URL, **opciones_motor(settings.DATABASE_URL))
+
+if engine_lectura is not None:
+    SessionLocal = sessionmaker(
+        class_=SesionEnrutada, autocommit=False, autoflush=False,
+        escritura=engine, lectura=engine_lectura
     )
 else:
-    engine = create_engine(
-        settings.DATABASE_URL,
-        pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Réplica de lectura para endpoints GET (DATABASE_READ_URL); con el perfil
+# SQLite de producción se usa el pool de solo lectura
+engine_replica = None
+if settings.DATABASE_READ_URL:
+    engine_replica = create_engine(
+        settings.DATABASE_READ_URL, **opciones_motor(settings.DATABASE_READ_URL)
     )
+elif engine_lectura is not None:
+    engine_replica = engine_lectura
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SesionLecturaLocal = None
+if engine_replica is not None:
+    SesionLecturaLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine_replica)
 
 Base = declarative_base()
 
 
+# Engine async (solo se crea si está habilitado, para no exigir aiosqlite en desarrollo)
+async_engine = None
+async_engine_lectura = None
+async_engine_replica = None
+AsyncSessionLocal = None
+AsyncSesionLecturaLocal = None
+
+if settings.DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    url_async = settings.DATABASE_ASYNC_URL or obtener_url_async(settings.DATABASE_URL)
+    if SQLITE_PRODUCCION:
+        async_engine, async_engine_lectura = crear_motores_sqlite(url_async, create_async_engine)
+    else:
+        async_engine = create_async_engine(url_async, **opciones_motor(url_async))
+
+    # expire_on_commit=False: en async no se pueden recargar atributos de forma implícita
+    if async_engine_lectura is not None:
+        AsyncSessionLocal = async_sessionmaker(
+            sync_session_class=SesionEnrutada, autoflush=False, expire_on_commit=False,
+            escritura=async_engine.sync_engine, lectura=async_engine_lectura.sync_engine
+        )
+    else:
+        AsyncSessionLocal = async_sessionmaker(
+            async_engine, autoflush=False, expire_on_commit=False
+        )
+
+    if settings.DATABASE_READ_URL:
+        url_replica = obtener_url_async(settings.DATABASE_READ_URL)
+        async_engine_replica = create_async_engine(url_replica, **opciones_motor(url_replica))
+    elif async_engine_lectura is not None:
+        async_engine_replica = async_engine_lectura
+
+    if async_engine_replica is not None:
+        AsyncSesionLecturaLocal = async_sessionmaker(
+            async_engine_replica, autoflush=False, expire_on_commit=False
+        )
+
+
+def motores_activos() -> dict:
+    """Engines creados en el proceso, por nombre (sin repetir el mismo pool)"""
+    motores = {
+        "principal": engine,
+        "lectura": engine_lectura,
+        "replica": engine_replica,
+        "async_principal": async_engine,
+        "async_lectura": async_engine_lectura,
+        "async_replica": async_engine_replica,
+    }
+    resultado = {}
+    vistos = set()
+    for nombre, motor in motores.items():
+        if motor is None or id(motor) in vistos:
+            continue
+        vistos.add(id(motor))
+        resultado[nombre] = getattr(motor, "sync_engine", motor)
+    return resultado
+
+
+# ============== LEER LAS PROPIAS ESCRITURAS ==============
+# Tras un commit con cambios, las lecturas del mismo cliente (identificado por
+# su token) van a la base principal durante VENTANA_LECTURA_PROPIA_SEG, para no
+# ver la réplica desfasada. El registro es por proceso.
+
+_escrituras_recientes: dict = {}
+
+
+def clave_lectura(request: Request) -> Optional[str]:
+    """Identifica al cliente por su cabecera Authorization"""
+    return request.headers.get("authorization")
+
+
+def registrar_escritura(clave: Optional[str]) -> None:
+    """Abre la ventana de lectura desde la base principal para el cliente"""
+    if not clave or settings.VENTANA_LECTURA_PROPIA_SEG <= 0:
+        return
+    ahora = time.monotonic()
+    if len(_escrituras_recientes) > 10000:
+        for k in [k for k, hasta in _escrituras_recientes.items() if hasta < ahora]:
+            del _escrituras_recientes[k]
+    _escrituras_recientes[clave] = ahora + settings.VENTANA_LECTURA_PROPIA_SEG
+
+
+def en_ventana_escritura(clave: Optional[str]) -> bool:
+    hasta = _escrituras_recientes.get(clave) if clave else None
+    return hasta is not None and hasta > time.monotonic()
+
+
+# ============== WORKERS (fork) ==============
+# Con gunicorn --preload los workers nacen de un fork del proceso maestro, que
+# ya importó la app y creó los engines. El hijo reemplaza los pools sin cerrar
+# las conexiones del padre y parte con registros en memoria vacíos.
+
+def reiniciar_tras_fork() -> None:
+    """Descarta en el proceso hijo los pools y registros heredados del padre"""
+    for motor in motores_activos().values():
+        motor.dispose(close=False)
+    _escrituras_recientes.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reiniciar_tras_fork)
+
+
+async def liberar_motores() -> None:
+    """Cierra las conexiones de todos los engines (shutdown del worker)"""
+    for motor in (async_engine, async_engine_lectura, async_engine_replica):
+        if motor is not None:
+            await motor.dispose()
+    for motor in (engine, engine_lectura, engine_replica):
+        if motor is not None:
+            motor.dispose()
+
+
+@event.listens_for(Session, "after_flush")
+def _marcar_flush(session, flush_context):
+    session.info["escribio"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _marcar_dml(orm_execute_state):
+    if SesionEnrutada.es_escritura(orm_execute_state.statement):
+        orm_execute_state.session.info["escribio"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _registrar_commit(session):
+    if session.info.pop("escribio", False):
+        registrar_escritura(session.info.get("clave_lectura"))
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_escritura(session):
+    session.info.pop("escribio", None)
+
+
+class SesionAsyncAdapter:
+    """
+    Expone una Session síncrona con la interfaz awaitable de AsyncSession.
+
+    Permite que routers y servicios tengan un único código
+    (`await db.execute(...)`) y que el modo se elija con DATABASE_ASYNC,
+    para comparar ambos modos con la misma carga.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    @property
+    def info(self) -> dict:
+        return self.sync_session.info
+
+    def add(self, instance) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances) -> None:
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, *args, **kwargs):
+        return self.sync_session.execute(statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return self.sync_session.scalar(statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        return self.sync_session.scalars(statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return self.sync_session.get(entity, ident, **kwargs)
+
+    async def delete(self, instance) -> None:
+        self.sync_session.delete(instance)
+
+    async def flush(self, objects=None) -> None:
+        self.sync_session.flush(objects)
+
+    async def refresh(self, instance, attribute_names=None) -> None:
+        self.sync_session.refresh(instance, attribute_names)
+
+    async def commit(self) -> None:
+        self.sync_session.commit()
+
+    async def rollback(self) -> None:
+        self.sync_session.rollback()
+
+    async def close(self) -> None:
+        self.sync_session.close()
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(self.sync_session, *args, **kwargs)
+
+
+def verificar_version_esquema() -> None:
+    """
+    Compara la revisión aplicada en la base con la cabeza de alembic/versions.
+    El esquema se crea y actualiza con `alembic upgrade head`, no al iniciar.
+    En DEBUG solo advierte; en producción impide el arranque.
+    """
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    directorio = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = Config(os.path.join(directorio, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(directorio, "alembic"))
+    cabezas = set(ScriptDirectory.from_config(config).get_heads())
+
+    with engine.connect() as conexion:
+        actuales = set(MigrationContext.configure(conexion).get_current_heads())
+
+    if actuales == cabezas:
+        return
+
+    mensaje = (
+        f"Esquema de base de datos desactualizado (actual: {sorted(actuales) or 'sin versión'}, "
+        f"esperado: {sorted(cabezas)}). Ejecute `alembic upgrade head` en backend/"
+    )
+    if not settings.DEBUG:
+        raise RuntimeError(mensaje)
+    logging.getLogger(__name__).warning(mensaje)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db(request: Request):
+    """
+    Sesión con interfaz async para los routers.
+    Con DATABASE_ASYNC=True usa AsyncSession sobre el AsyncEngine;
+    en caso contrario envuelve la Session síncrona.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            db.info["clave_lectura"] = clave_lectura(request)
+            yield db
+    else:
+        db = SessionLocal()
+        db.info["clave_lectura"] = clave_lectura(request)
+        try:
+            yield SesionAsyncAdapter(db)
+        finally:
+            db.close()
+
+
+async def get_read_db(request: Request, principal=Depends(get_async_db)):
+    """
+    Sesión de solo lectura para endpoints GET: usa la réplica si está
+    configurada y el cliente no escribió dentro de la ventana reciente;
+    en otro caso, la sesión principal de la petición (la misma que usa la
+    autenticación), para no retener dos conexiones por petición.
+    """
+    if en_ventana_escritura(clave_lectura(request)):
+        lectura_async, lectura_sync = None, None
+    else:
+        lectura_async, lectura_sync = AsyncSesionLecturaLocal, SesionLecturaLocal
+
+    if settings.DATABASE_ASYNC and lectura_async is not None:
+        async with lectura_async() as db:
+            yield db
+    elif not settings.DATABASE_ASYNC and lectura_sync is not None:
+        db = lectura_sync()
+        try:
+            yield SesionAsyncAdapter(db)
+        finally:
+            db.close()
+    else:
+        yield principal
@@ -1,22 +1,113 @@
-from fastapi import FastAPI
+import asyncio
+import importlib
+import json
+import logging
+import os
+import time
+
+# Referencia para medir la importación de la app (fastapi, modelos, routers)
+_inicio_importacion = time.perf_counter()
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from typing import Optional
 
 from .config import settings
-from .database import engine, Base
-from .routers import (
-    auth_router, usuarios_router, iniciativas_router,
-    proyectos_router, evaluaciones_router, planificacion_router,
-    presupuesto_router, seguimiento_router, dashboard_router
+from .database import liberar_motores, verificar_version_esquema
+from .utils.revocacion import refrescar_revocaciones, refrescar_periodicamente
+from .utils.instrumentacion import iniciar_medicion, cabecera_server_timing, registrar_peticion
+from .utils.metricas import (
+    PETICIONES, DURACION_PETICION, PETICIONES_EN_CURSO, ARRANQUE, exportar as exportar_metricas
 )
 
+# Logs de la aplicación (sgip.*) a la salida estándar
+logger_app = logging.getLogger("sgip")
+logger_app.setLevel(settings.LOG_LEVEL)
+if not logger_app.handlers:
+    manejador = logging.StreamHandler()
+    manejador.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger_app.addHandler(manejador)
+
+# Rutas que no esperan la carga diferida de los routers (ARRANQUE_RAPIDO)
+RUTAS_INMEDIATAS = {"/", "/health", "/metrics"}
+
+_carga_routers: Optional[asyncio.Future] = None
+
+
+def registrar_fase(fase: str, segundos: float) -> None:
+    """Publica la duración de una fase de arranque en el log, /metrics y app.state"""
+    ARRANQUE.set(round(segundos, 4), fase=fase)
+    app.state.arranque[fase] = round(segundos * 1000, 1)
+    logger_app.info("Arranque: %s en %.0f ms", fase, segundos * 1000)
+
+
+def incluir_routers(routers) -> None:
+    """Incluye los routers de la API (módulo app.routers)"""
+    app.include_router(routers.auth_router)
+    app.include_router(routers.usuarios_router)
+    app.include_router(routers.iniciativas_router)
+    app.include_router(routers.proyectos_router)
+    app.include_router(routers.evaluaciones_router)
+    app.include_router(routers.planificacion_router)
+    app.include_router(routers.presupuesto_router)
+    app.include_router(routers.seguimiento_router)
+    app.include_router(routers.dashboard_router)
+    app.include_router(routers.busqueda_router)
+
+
+async def cargar_routers() -> None:
+    """Importa los routers en un hilo (el event loop sigue atendiendo /health) y los incluye"""
+    inicio = time.perf_counter()
+    routers = await asyncio.get_running_loop().run_in_executor(
+        None, importlib.import_module, f"{__package__}.routers"
+    )
+    incluir_routers(routers)
+    registrar_fase("routers", time.perf_counter() - inicio)
+
+
+def iniciar_carga_routers() -> asyncio.Future:
+    """Lanza la carga diferida de los routers una sola vez por proceso"""
+    global _carga_routers
+    if _carga_routers is None:
+        _carga_routers = asyncio.ensure_future(cargar_routers())
+    return _carga_routers
+
+
+def openapi_precalculado() -> dict:
+    """Documento OpenAPI generado en el build (OPENAPI_ARCHIVO)"""
+    if app.openapi_schema is None:
+        with open(settings.OPENAPI_ARCHIVO, encoding="utf-8") as archivo:
+            esquema = json.load(archivo)
+        version = esquema.get("info", {}).get("version")
+        if version != settings.APP_VERSION:
+            logger_app.warning(
+                "OPENAPI_ARCHIVO corresponde a la versión %s y la app es %s: regenerar el documento",
+                version, settings.APP_VERSION
+            )
+        app.openapi_schema = esquema
+    return app.openapi_schema
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: crear tablas si no existen
-    Base.metadata.create_all(bind=engine)
+    inicio = time.perf_counter()
+    # Startup: verificar que las migraciones estén aplicadas
+    verificar_version_esquema()
+    if settings.ARRANQUE_RAPIDO:
+        iniciar_carga_routers()
+    refresco = None
+    if settings.AUTORIZACION_POR_CLAIMS:
+        revocados = refrescar_revocaciones()
+        logger_app.info("Autorización por claims: %s usuarios con tokens revocados o inactivos", revocados)
+        refresco = asyncio.create_task(refrescar_periodicamente(settings.REVOCACION_REFRESCO_SEG))
+    registrar_fase("inicio", time.perf_counter() - inicio)
     yield
-    # Shutdown
+    if refresco is not None:
+        refresco.cancel()
+    # Shutdown (tras drenar las peticiones en curso): cerrar las conexiones
+    await liberar_motores()
 
 
 app = FastAPI(
@@ -40,6 +131,26 @@ app = FastAPI(
     """,
     lifespan=lifespan
 )
+app.state.arranque = {}
+
+if settings.OPENAPI_ARCHIVO:
+    if os.path.isfile(settings.OPENAPI_ARCHIVO):
+        app.openapi = openapi_precalculado
+        RUTAS_INMEDIATAS.update({app.openapi_url, app.docs_url, app.redoc_url, app.swagger_ui_oauth2_redirect_url})
+    else:
+        logger_app.warning("OPENAPI_ARCHIVO=%s no existe: el esquema se generará al primer acceso",
+                           settings.OPENAPI_ARCHIVO)
+
+if settings.ARRANQUE_RAPIDO:
+    @app.middleware("http")
+    async def esperar_routers(request: Request, call_next):
+        """Las rutas de la API esperan a que termine la carga diferida de los routers"""
+        if request.url.path not in RUTAS_INMEDIATAS:
+            carga = iniciar_carga_routers()
+            if not carga.done():
+                await asyncio.shield(carga)
+            carga.result()
+        return await call_next(request)
 
 # Configurar CORS
 app.add_middleware(
@@ -48,18 +159,46 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paginación por cursor (app/utils/paginacion.py)
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Exact"],
 )
 
-# Incluir routers
-app.include_router(auth_router)
-app.include_router(usuarios_router)
-app.include_router(iniciativas_router)
-app.include_router(proyectos_router)
-app.include_router(evaluaciones_router)
-app.include_router(planificacion_router)
-app.include_router(presupuesto_router)
-app.include_router(seguimiento_router)
-app.include_router(dashboard_router)
+if settings.INSTRUMENTACION_SQL:
+    @app.middleware("http")
+    async def instrumentar_sql(request: Request, call_next):
+        """Cuenta consultas y tiempo de base de datos de cada petición"""
+        estadisticas = iniciar_medicion()
+        inicio = time.perf_counter()
+        response = await call_next(request)
+        duracion = time.perf_counter() - inicio
+
+        response.headers["Server-Timing"] = cabecera_server_timing(estadisticas, duracion)
+        ruta = getattr(request.scope.get("route"), "path", request.url.path)
+        registrar_peticion(request.method, ruta, response.status_code, estadisticas, duracion)
+        return response
+
+if settings.METRICAS_HABILITADAS:
+    @app.middleware("http")
+    async def medir_peticion(request: Request, call_next):
+        """Latencia, conteo y peticiones en curso por plantilla de ruta"""
+        PETICIONES_EN_CURSO.inc()
+        inicio = time.perf_counter()
+        estado = 500
+        try:
+            response = await call_next(request)
+            estado = response.status_code
+            return response
+        finally:
+            # Plantilla (/api/proyectos/{proyecto_id}) para acotar la cardinalidad
+            ruta = getattr(request.scope.get("route"), "path", "sin_ruta")
+            DURACION_PETICION.observar(time.perf_counter() - inicio, metodo=request.method, ruta=ruta)
+            PETICIONES.inc(metodo=request.method, ruta=ruta, estado=estado)
+            PETICIONES_EN_CURSO.dec()
+
+# Incluir routers (con ARRANQUE_RAPIDO se cargan en segundo plano tras el startup)
+if not settings.ARRANQUE_RAPIDO:
+    from . import routers
+    incluir_routers(routers)
 
 
 @app.get("/")
@@ -76,3 +215,12 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+if settings.METRICAS_HABILITADAS:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(exportar_metricas(), media_type="text/plain; version=0.0.4")
+
+
+registrar_fase("importacion", time.perf_counter() - _inicio_importacion)
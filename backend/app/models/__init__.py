@@ -2,7 +2,7 @@ from .usuario import Usuario, Area, RolUsuario
 from .iniciativa import (
     Iniciativa, ScoringIniciativa, EstadoIniciativa,
     ClasificacionInversion, TipoInforme, Prioridad,
-    HistorialEstadoIniciativa
+    HistorialEstadoIniciativa, MetricaTiempoWorkflow
 )
 from .evaluacion import EvaluacionComite
 from .proyecto import (
@@ -14,16 +14,18 @@ from .presupuesto import (
     PresupuestoProyecto, CambioPresupuesto, ClasificacionFinanciera,
     ClasificacionNIIF, TipoCambioPresupuesto, EstadoCambio, TipoOpex
 )
+from .secuencia import Secuencia
 
 __all__ = [
     "Usuario", "Area", "RolUsuario",
     "Iniciativa", "ScoringIniciativa", "EstadoIniciativa",
     "ClasificacionInversion", "TipoInforme", "Prioridad",
-    "HistorialEstadoIniciativa",
+    "HistorialEstadoIniciativa", "MetricaTiempoWorkflow",
     "EvaluacionComite",
     "Proyecto", "EstadoProyecto", "FaseProyecto", "HitoProyecto",
     "RiesgoProyecto", "IssueProyecto", "BitacoraProyecto", "EjecucionMensual",
     "PlanAnual", "PlanAnualProyecto", "EstadoPlan",
     "PresupuestoProyecto", "CambioPresupuesto", "ClasificacionFinanciera",
-    "ClasificacionNIIF", "TipoCambioPresupuesto", "EstadoCambio", "TipoOpex"
+    "ClasificacionNIIF", "TipoCambioPresupuesto", "EstadoCambio", "TipoOpex",
+    "Secuencia"
 ]
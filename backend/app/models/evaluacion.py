@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Numeric
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Numeric, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -7,10 +7,14 @@ from ..database import Base
 
 class EvaluacionComite(Base):
     __tablename__ = "evaluaciones_comite"
+    __table_args__ = (
+        # Cada miembro del comité evalúa una sola vez cada iniciativa
+        UniqueConstraint("iniciativa_id", "evaluador_id", name="uq_evaluaciones_comite_iniciativa_evaluador"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     iniciativa_id = Column(Integer, ForeignKey("iniciativas.id"), nullable=False)
-    evaluador_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    evaluador_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False, index=True)
 
     # Dimensión 1: Justificación y Beneficios (35%)
     dim1_claridad_problema = Column(Numeric(5, 2), default=0)  # 0-10
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Enum, Numeric
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Enum, Numeric, Index, Float, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -43,6 +43,12 @@ class Prioridad(str, enum.Enum):
 
 class Iniciativa(Base):
     __tablename__ = "iniciativas"
+    __table_args__ = (
+        # Listados y pipeline filtran por estado y ordenan por fecha de solicitud;
+        # el id desempata el orden de la paginación por cursor
+        Index("ix_iniciativas_estado_fecha_solicitud_id", "estado", "fecha_solicitud", "id"),
+        Index("ix_iniciativas_fecha_solicitud_id", "fecha_solicitud", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     codigo = Column(String(20), unique=True, index=True)
@@ -50,7 +56,7 @@ class Iniciativa(Base):
     descripcion = Column(Text, nullable=False)
     justificacion = Column(Text)
     beneficios_esperados = Column(Text)
-    area_demandante_id = Column(Integer, ForeignKey("areas.id"), nullable=False)
+    area_demandante_id = Column(Integer, ForeignKey("areas.id"), nullable=False, index=True)
 
     # Estimaciones
     monto_estimado = Column(Numeric(15, 2), default=0)
@@ -64,15 +70,17 @@ class Iniciativa(Base):
 
     # Estado y workflow
     estado = Column(Enum(EstadoIniciativa), default=EstadoIniciativa.BORRADOR)
-    fecha_solicitud = Column(DateTime, default=datetime.utcnow)
+    fecha_solicitud = Column(DateTime, default=datetime.utcnow, nullable=False)
     fecha_aprobacion = Column(DateTime)
+    # Último registro del historial de estados (lo mantiene registrar_cambio_estado)
+    fecha_ultimo_cambio_estado = Column(DateTime, default=datetime.utcnow)
 
     # Urgencia
     urgencia = Column(String(20), default="normal")  # baja, normal, alta, critica
     fecha_limite = Column(DateTime)
 
     # Auditoría
-    created_by = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    created_by = Column(Integer, ForeignKey("usuarios.id"), nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -88,6 +96,9 @@ class Iniciativa(Base):
 class HistorialEstadoIniciativa(Base):
     """Registro de todos los cambios de estado de una iniciativa para trazabilidad"""
     __tablename__ = "historial_estado_iniciativas"
+    __table_args__ = (
+        Index("ix_historial_estado_iniciativas_iniciativa_fecha", "iniciativa_id", "fecha"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     iniciativa_id = Column(Integer, ForeignKey("iniciativas.id"), nullable=False)
@@ -105,6 +116,24 @@ class HistorialEstadoIniciativa(Base):
     usuario = relationship("Usuario", back_populates="cambios_estado_realizados")
 
 
+class MetricaTiempoWorkflow(Base):
+    """
+    Histograma de duraciones del workflow por año de solicitud y tramo (un
+    estado o 'aprobacion'), acumulado al registrar cada cambio de estado
+    """
+    __tablename__ = "metricas_tiempos_workflow"
+    __table_args__ = (
+        UniqueConstraint("año", "tramo", "cubeta", name="uq_metricas_tiempos_workflow_clave"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    año = Column(Integer, nullable=False)
+    tramo = Column(String(30), nullable=False)
+    cubeta = Column(Integer, nullable=False)
+    cantidad = Column(Integer, nullable=False, default=0)
+    suma_horas = Column(Float, nullable=False, default=0)
+
+
 class ScoringIniciativa(Base):
     __tablename__ = "scoring_iniciativas"
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, Numeric
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, Numeric, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -44,10 +44,14 @@ class PlanAnual(Base):
 
 class PlanAnualProyecto(Base):
     __tablename__ = "plan_anual_proyectos"
+    __table_args__ = (
+        # Un proyecto aparece una sola vez en cada plan
+        UniqueConstraint("plan_id", "proyecto_id", name="uq_plan_anual_proyectos_plan_proyecto"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     plan_id = Column(Integer, ForeignKey("plan_anual.id"), nullable=False)
-    proyecto_id = Column(Integer, ForeignKey("proyectos.id"), nullable=False)
+    proyecto_id = Column(Integer, ForeignKey("proyectos.id"), nullable=False, index=True)
 
     # Asignación
     monto_asignado = Column(Numeric(15, 2), default=0)
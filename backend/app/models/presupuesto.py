@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, Numeric
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, Numeric, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -62,6 +62,9 @@ class PresupuestoProyecto(Base):
 
 class CambioPresupuesto(Base):
     __tablename__ = "cambios_presupuesto"
+    __table_args__ = (
+        Index("ix_cambios_presupuesto_proyecto_estado", "proyecto_id", "estado"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     proyecto_id = Column(Integer, ForeignKey("proyectos.id"), nullable=False)
@@ -98,7 +101,7 @@ class ClasificacionFinanciera(Base):
     __tablename__ = "clasificacion_financiera"
 
     id = Column(Integer, primary_key=True, index=True)
-    proyecto_id = Column(Integer, ForeignKey("proyectos.id"), nullable=False)
+    proyecto_id = Column(Integer, ForeignKey("proyectos.id"), nullable=False, index=True)
 
     # Tipo de gasto
     tipo_gasto = Column(String(100), nullable=False)
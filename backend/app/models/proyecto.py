@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Enum, Numeric
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Enum, Numeric, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -50,6 +50,12 @@ class TipoBitacora(str, enum.Enum):
 
 class Proyecto(Base):
     __tablename__ = "proyectos"
+    __table_args__ = (
+        # Filtros de listados, dashboard y seguimiento del portfolio
+        Index("ix_proyectos_estado_año_semaforo", "estado", "año_plan", "semaforo_salud"),
+        # Orden del listado (paginación por cursor)
+        Index("ix_proyectos_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     iniciativa_id = Column(Integer, ForeignKey("iniciativas.id"), unique=True, nullable=False)
@@ -77,14 +83,14 @@ class Proyecto(Base):
     avance_porcentaje = Column(Integer, default=0)
 
     # Responsable
-    responsable_id = Column(Integer, ForeignKey("usuarios.id"))
+    responsable_id = Column(Integer, ForeignKey("usuarios.id"), index=True)
 
     # Cierre
     lecciones_aprendidas = Column(Text)
     metricas_exito = Column(Text)
 
     # Auditoría
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
@@ -105,7 +111,7 @@ class FaseProyecto(Base):
     __tablename__ = "fases_proyecto"
 
     id = Column(Integer, primary_key=True, index=True)
-    proyecto_id = Column(Integer, ForeignKey("proyectos.id"), nullable=False)
+    proyecto_id = Column(Integer, ForeignKey("proyectos.id"), nullable=False, index=True)
     nombre = Column(String(100), nullable=False)
     descripcion = Column(Text)
     orden = Column(Integer, default=1)
@@ -134,7 +140,7 @@ class HitoProyecto(Base):
     __tablename__ = "hitos_proyecto"
 
     id = Column(Integer, primary_key=True, index=True)
-    proyecto_id = Column(Integer, ForeignKey("proyectos.id"), nullable=False)
+    proyecto_id = Column(Integer, ForeignKey("proyectos.id"), nullable=False, index=True)
     fase_id = Column(Integer, ForeignKey("fases_proyecto.id"))
     nombre = Column(String(100), nullable=False)
     descripcion = Column(Text)
@@ -154,6 +160,9 @@ class HitoProyecto(Base):
 
 class RiesgoProyecto(Base):
     __tablename__ = "riesgos_proyecto"
+    __table_args__ = (
+        Index("ix_riesgos_proyecto_proyecto_estado", "proyecto_id", "estado"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     proyecto_id = Column(Integer, ForeignKey("proyectos.id"), nullable=False)
@@ -181,6 +190,10 @@ class RiesgoProyecto(Base):
 
 class IssueProyecto(Base):
     __tablename__ = "issues_proyecto"
+    __table_args__ = (
+        Index("ix_issues_proyecto_proyecto_estado", "proyecto_id", "estado"),
+        Index("ix_issues_proyecto_proyecto_fecha_creacion_id", "proyecto_id", "fecha_creacion", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     proyecto_id = Column(Integer, ForeignKey("proyectos.id"), nullable=False)
@@ -198,7 +211,7 @@ class IssueProyecto(Base):
     resolucion = Column(Text)
 
     # Fechas
-    fecha_creacion = Column(DateTime, default=datetime.utcnow)
+    fecha_creacion = Column(DateTime, default=datetime.utcnow, nullable=False)
     fecha_resolucion = Column(DateTime)
 
     # Relationships
@@ -207,6 +220,9 @@ class IssueProyecto(Base):
 
 class BitacoraProyecto(Base):
     __tablename__ = "bitacora_proyecto"
+    __table_args__ = (
+        Index("ix_bitacora_proyecto_proyecto_fecha_id", "proyecto_id", "fecha", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     proyecto_id = Column(Integer, ForeignKey("proyectos.id"), nullable=False)
@@ -215,7 +231,7 @@ class BitacoraProyecto(Base):
     tipo = Column(Enum(TipoBitacora), default=TipoBitacora.NOTA)
     descripcion = Column(Text, nullable=False)
 
-    fecha = Column(DateTime, default=datetime.utcnow)
+    fecha = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
     proyecto = relationship("Proyecto", back_populates="bitacora")
@@ -224,6 +240,11 @@ class BitacoraProyecto(Base):
 
 class EjecucionMensual(Base):
     __tablename__ = "ejecucion_mensual"
+    __table_args__ = (
+        # Un único registro por proyecto y período (registrar_ejecucion actualiza si existe)
+        UniqueConstraint("proyecto_id", "año", "mes", name="uq_ejecucion_mensual_proyecto_periodo"),
+        Index("ix_ejecucion_mensual_año_mes", "año", "mes"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     proyecto_id = Column(Integer, ForeignKey("proyectos.id"), nullable=False)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String
+
+from ..database import Base
+
+
+class Secuencia(Base):
+    """
+    Contadores con nombre para códigos correlativos (INI-2026, PRY-2026...):
+    valor es el último número entregado
+    """
+    __tablename__ = "secuencias"
+
+    nombre = Column(String(40), primary_key=True)
+    valor = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -23,7 +23,12 @@ class Area(Base):
     codigo = Column(String(20), unique=True, nullable=False)
     descripcion = Column(String(500))
     activa = Column(Boolean, default=True)
-    responsable_id = Column(Integer, ForeignKey("usuarios.id"), nullable=True)
+    # use_alter: areas y usuarios se referencian mutuamente
+    responsable_id = Column(
+        Integer,
+        ForeignKey("usuarios.id", use_alter=True, name="fk_areas_responsable_id_usuarios"),
+        nullable=True
+    )
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -35,6 +40,10 @@ class Area(Base):
 
 class Usuario(Base):
     __tablename__ = "usuarios"
+    __table_args__ = (
+        # Orden del listado (paginación por cursor)
+        Index("ix_usuarios_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(100), unique=True, index=True, nullable=False)
@@ -42,12 +51,14 @@ class Usuario(Base):
     nombre = Column(String(100), nullable=False)
     apellido = Column(String(100), nullable=False)
     rol = Column(Enum(RolUsuario), nullable=False, default=RolUsuario.DEMANDANTE)
-    area_id = Column(Integer, ForeignKey("areas.id"), nullable=True)
+    area_id = Column(Integer, ForeignKey("areas.id"), nullable=True, index=True)
     telefono = Column(String(20))
     cargo = Column(String(100))
     activo = Column(Boolean, default=True)
+    # Se incrementa al cambiar el rol o desactivar: invalida los tokens emitidos antes
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     ultimo_acceso = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
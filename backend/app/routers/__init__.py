@@ -7,6 +7,7 @@ from .planificacion import router as planificacion_router
 from .presupuesto import router as presupuesto_router
 from .seguimiento import router as seguimiento_router
 from .dashboard import router as dashboard_router
+from .busqueda import router as busqueda_router
 
 __all__ = [
     "auth_router",
@@ -17,5 +18,6 @@ __all__ = [
     "planificacion_router",
     "presupuesto_router",
     "seguimiento_router",
-    "dashboard_router"
+    "dashboard_router",
+    "busqueda_router"
 ]
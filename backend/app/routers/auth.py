@@ -1,15 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models.usuario import Usuario
 from ..schemas.usuario import Token, Usuario as UsuarioSchema, UsuarioCreate
 from ..utils.security import (
-    verify_password, get_password_hash, create_access_token,
-    get_current_user
+    verificar_password, generar_hash_password, necesita_rehash, create_access_token,
+    get_current_usuario, claims_usuario
 )
+from ..utils.limitador import comprobar_login, registrar_resultado_login, comprobar_registro
 from ..config import settings
 
 router = APIRouter(prefix="/api/auth", tags=["Autenticación"])
@@ -17,13 +19,17 @@ router = APIRouter(prefix="/api/auth", tags=["Autenticación"])
 
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Iniciar sesión y obtener token JWT"""
-    user = db.query(Usuario).filter(Usuario.email == form_data.username).first()
+    await comprobar_login(request, form_data.username)
+    user = await db.scalar(select(Usuario).where(Usuario.email == form_data.username))
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valido = user is not None and await verificar_password(form_data.password, user.hashed_password)
+    await registrar_resultado_login(request, form_data.username, valido)
+    if not valido:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales incorrectas",
@@ -36,13 +42,15 @@ async def login(
             detail="Usuario inactivo"
         )
 
-    # Actualizar último acceso
+    # Actualizar último acceso y, si cambió BCRYPT_ROUNDS, el hash de la contraseña
     user.ultimo_acceso = datetime.utcnow()
-    db.commit()
+    if necesita_rehash(user.hashed_password):
+        user.hashed_password = await generar_hash_password(form_data.password)
+    await db.commit()
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id), "email": user.email, "rol": user.rol.value},
+        data=claims_usuario(user),
         expires_delta=access_token_expires
     )
 
@@ -51,12 +59,14 @@ async def login(
 
 @router.post("/registro", response_model=UsuarioSchema)
 async def registro(
+    request: Request,
     usuario: UsuarioCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Registrar un nuevo usuario"""
+    await comprobar_registro(request)
     # Verificar si el email ya existe
-    if db.query(Usuario).filter(Usuario.email == usuario.email).first():
+    if await db.scalar(select(Usuario.id).where(Usuario.email == usuario.email)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El email ya está registrado"
@@ -65,7 +75,7 @@ async def registro(
     # Crear usuario
     db_user = Usuario(
         email=usuario.email,
-        hashed_password=get_password_hash(usuario.password),
+        hashed_password=await generar_hash_password(usuario.password),
         nombre=usuario.nombre,
         apellido=usuario.apellido,
         rol=usuario.rol,
@@ -74,14 +84,14 @@ async def registro(
         cargo=usuario.cargo
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user, attribute_names=["area"])
 
     return db_user
 
 
 @router.get("/me", response_model=UsuarioSchema)
-async def get_me(current_user: Usuario = Depends(get_current_user)):
+async def get_me(current_user: Usuario = Depends(get_current_usuario)):
     """Obtener información del usuario actual"""
     return current_user
 
@@ -95,17 +105,17 @@ class ChangePasswordRequest(BaseModel):
 @router.put("/cambiar-password")
 async def cambiar_password(
     data: ChangePasswordRequest,
-    current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Usuario = Depends(get_current_usuario),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Cambiar contraseña del usuario actual"""
-    if not verify_password(data.current_password, current_user.hashed_password):
+    if not await verificar_password(data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Contraseña actual incorrecta"
         )
 
-    current_user.hashed_password = get_password_hash(data.new_password)
-    db.commit()
+    current_user.hashed_password = await generar_hash_password(data.new_password)
+    await db.commit()
 
     return {"mensaje": "Contraseña actualizada correctamente"}
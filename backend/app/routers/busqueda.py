@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from ..database import get_read_db
+from ..models.usuario import RolUsuario
+from ..schemas.busqueda import RespuestaBusqueda
+from ..services.busqueda import BusquedaService
+from ..utils.security import Principal, get_current_user
+
+router = APIRouter(prefix="/api/busqueda", tags=["Búsqueda"])
+
+TIPOS = ("iniciativa", "proyecto", "usuario", "area")
+# Los mismos roles que pueden listar usuarios
+ROLES_USUARIOS = (RolUsuario.ADMINISTRADOR, RolUsuario.JEFE_TD)
+
+
+@router.get("/", response_model=RespuestaBusqueda)
+async def buscar(
+    q: str = Query(..., min_length=1, max_length=200),
+    limite: int = Query(5, ge=1, le=50),
+    tipos: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Búsqueda global para el buscador: hasta `limite` resultados por tipo"""
+    solicitados = tipos or list(TIPOS)
+    invalidos = [tipo for tipo in solicitados if tipo not in TIPOS]
+    if invalidos:
+        raise HTTPException(status_code=400, detail=f"Tipo de búsqueda inválido: {', '.join(invalidos)}")
+
+    # Los demandantes solo ven sus iniciativas; los usuarios, quien puede listarlos
+    permitidos = [
+        tipo for tipo in TIPOS
+        if tipo in solicitados and (tipo != "usuario" or current_user.rol in ROLES_USUARIOS)
+    ]
+    creador = current_user.id if current_user.rol == RolUsuario.DEMANDANTE else None
+
+    resultados = await BusquedaService.sugerencias(db, q, permitidos, limite, creador)
+    return {"consulta": q, "resultados": resultados}
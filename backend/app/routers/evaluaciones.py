@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from typing import List, Optional
 from datetime import datetime
 
-from ..database import get_db
-from ..models.usuario import Usuario, RolUsuario
+from ..database import get_async_db, get_read_db
+from ..models.usuario import RolUsuario
 from ..models.iniciativa import Iniciativa, EstadoIniciativa
 from ..models.evaluacion import EvaluacionComite
 from ..models.proyecto import Proyecto, EstadoProyecto
@@ -12,8 +14,10 @@ from ..schemas.evaluacion import (
     EvaluacionComite as EvaluacionSchema,
     EvaluacionComiteCreate, EvaluacionComiteUpdate
 )
-from ..utils.security import get_current_user, check_role
+from ..utils.security import Principal, get_current_user, check_role
 from ..services.scoring import ScoringService
+from ..services.workflow import WorkflowService, transicion_permitida
+from ..services.secuencias import SecuenciasService
 from ..config import settings
 
 router = APIRouter(prefix="/api/evaluaciones", tags=["Evaluaciones"])
@@ -21,18 +25,20 @@ router = APIRouter(prefix="/api/evaluaciones", tags=["Evaluaciones"])
 
 @router.get("/pendientes", response_model=List[dict])
 async def listar_evaluaciones_pendientes(
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(check_role([
         RolUsuario.COMITE_EXPERTOS, RolUsuario.JEFE_TD, RolUsuario.ADMINISTRADOR
     ]))
 ):
     """Listar iniciativas pendientes de evaluación"""
-    iniciativas = db.query(Iniciativa).options(
-        joinedload(Iniciativa.area_demandante),
-        joinedload(Iniciativa.evaluaciones)
-    ).filter(
-        Iniciativa.estado == EstadoIniciativa.EN_EVALUACION
-    ).all()
+    iniciativas = (await db.scalars(
+        select(Iniciativa).options(
+            joinedload(Iniciativa.area_demandante),
+            selectinload(Iniciativa.evaluaciones)
+        ).where(
+            Iniciativa.estado == EstadoIniciativa.EN_EVALUACION
+        )
+    )).all()
 
     resultado = []
     for ini in iniciativas:
@@ -59,15 +65,17 @@ async def listar_evaluaciones_pendientes(
 @router.get("/iniciativa/{iniciativa_id}", response_model=List[EvaluacionSchema])
 async def listar_evaluaciones_iniciativa(
     iniciativa_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Listar evaluaciones de una iniciativa"""
-    evaluaciones = db.query(EvaluacionComite).options(
-        joinedload(EvaluacionComite.evaluador)
-    ).filter(
-        EvaluacionComite.iniciativa_id == iniciativa_id
-    ).all()
+    evaluaciones = (await db.scalars(
+        select(EvaluacionComite).options(
+            joinedload(EvaluacionComite.evaluador)
+        ).where(
+            EvaluacionComite.iniciativa_id == iniciativa_id
+        )
+    )).all()
 
     resultado = []
     for ev in evaluaciones:
@@ -81,16 +89,14 @@ async def listar_evaluaciones_iniciativa(
 @router.post("/", response_model=EvaluacionSchema)
 async def crear_evaluacion(
     evaluacion: EvaluacionComiteCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([
         RolUsuario.COMITE_EXPERTOS, RolUsuario.JEFE_TD, RolUsuario.ADMINISTRADOR
     ]))
 ):
     """Crear una evaluación del comité"""
     # Verificar que la iniciativa existe y está en evaluación
-    iniciativa = db.query(Iniciativa).filter(
-        Iniciativa.id == evaluacion.iniciativa_id
-    ).first()
+    iniciativa = await db.get(Iniciativa, evaluacion.iniciativa_id)
 
     if not iniciativa:
         raise HTTPException(status_code=404, detail="Iniciativa no encontrada")
@@ -99,10 +105,12 @@ async def crear_evaluacion(
         raise HTTPException(status_code=400, detail="La iniciativa no está en fase de evaluación")
 
     # Verificar que el usuario no haya evaluado ya
-    existente = db.query(EvaluacionComite).filter(
-        EvaluacionComite.iniciativa_id == evaluacion.iniciativa_id,
-        EvaluacionComite.evaluador_id == current_user.id
-    ).first()
+    existente = await db.scalar(
+        select(EvaluacionComite.id).where(
+            EvaluacionComite.iniciativa_id == evaluacion.iniciativa_id,
+            EvaluacionComite.evaluador_id == current_user.id
+        )
+    )
 
     if existente:
         raise HTTPException(status_code=400, detail="Ya ha evaluado esta iniciativa")
@@ -143,8 +151,8 @@ async def crear_evaluacion(
 
     db_evaluacion = EvaluacionComite(**ev_data)
     db.add(db_evaluacion)
-    db.commit()
-    db.refresh(db_evaluacion)
+    await db.commit()
+    await db.refresh(db_evaluacion)
 
     return db_evaluacion
 
@@ -153,15 +161,13 @@ async def crear_evaluacion(
 async def actualizar_evaluacion(
     evaluacion_id: int,
     evaluacion: EvaluacionComiteUpdate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([
         RolUsuario.COMITE_EXPERTOS, RolUsuario.JEFE_TD, RolUsuario.ADMINISTRADOR
     ]))
 ):
     """Actualizar una evaluación"""
-    db_evaluacion = db.query(EvaluacionComite).filter(
-        EvaluacionComite.id == evaluacion_id
-    ).first()
+    db_evaluacion = await db.get(EvaluacionComite, evaluacion_id)
 
     if not db_evaluacion:
         raise HTTPException(status_code=404, detail="Evaluación no encontrada")
@@ -207,8 +213,8 @@ async def actualizar_evaluacion(
 
     db_evaluacion.fecha_revision = datetime.utcnow()
 
-    db.commit()
-    db.refresh(db_evaluacion)
+    await db.commit()
+    await db.refresh(db_evaluacion)
 
     return db_evaluacion
 
@@ -216,22 +222,26 @@ async def actualizar_evaluacion(
 @router.post("/iniciativa/{iniciativa_id}/cerrar-evaluacion")
 async def cerrar_evaluacion(
     iniciativa_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
 ):
     """Cerrar evaluación y determinar resultado final"""
-    iniciativa = db.query(Iniciativa).filter(Iniciativa.id == iniciativa_id).first()
+    iniciativa = await db.get(Iniciativa, iniciativa_id)
 
     if not iniciativa:
         raise HTTPException(status_code=404, detail="Iniciativa no encontrada")
 
-    if iniciativa.estado != EstadoIniciativa.EN_EVALUACION:
+    # El cierre termina en APROBADA o RECHAZADA: ambas deben estar permitidas
+    if not all(
+        transicion_permitida(iniciativa.estado, estado)
+        for estado in (EstadoIniciativa.APROBADA, EstadoIniciativa.RECHAZADA)
+    ):
         raise HTTPException(status_code=400, detail="La iniciativa no está en evaluación")
 
     # Obtener evaluaciones
-    evaluaciones = db.query(EvaluacionComite).filter(
-        EvaluacionComite.iniciativa_id == iniciativa_id
-    ).all()
+    evaluaciones = (await db.scalars(
+        select(EvaluacionComite).where(EvaluacionComite.iniciativa_id == iniciativa_id)
+    )).all()
 
     if not evaluaciones:
         raise HTTPException(status_code=400, detail="No hay evaluaciones para cerrar")
@@ -253,7 +263,7 @@ async def cerrar_evaluacion(
             # Crear proyecto en banco de reserva
             proyecto = Proyecto(
                 iniciativa_id=iniciativa.id,
-                codigo_proyecto=f"PRY-{iniciativa.codigo.replace('INI-', '')}",
+                codigo_proyecto=await SecuenciasService.codigo_proyecto(db),
                 nombre=iniciativa.titulo,
                 descripcion=iniciativa.descripcion,
                 estado=EstadoProyecto.BANCO_RESERVA,
@@ -266,6 +276,11 @@ async def cerrar_evaluacion(
             iniciativa.estado = EstadoIniciativa.RECHAZADA
             mensaje = f"Iniciativa rechazada. Puntaje promedio: {promedio:.1f} (mínimo requerido: {settings.UMBRAL_APROBACION_COMITE})"
 
-    db.commit()
+    await WorkflowService.registrar_cambio_estado(
+        db, iniciativa, EstadoIniciativa.EN_EVALUACION, iniciativa.estado,
+        current_user.id, mensaje
+    )
+
+    await db.commit()
 
     return {"mensaje": mensaje, "estado": iniciativa.estado.value}
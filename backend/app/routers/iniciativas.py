@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy import func, select
 from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 
-from ..database import get_db
-from ..models.usuario import Usuario, RolUsuario
+from ..config import settings
+from ..database import get_async_db, get_read_db
+from ..models.usuario import Usuario, Area, RolUsuario
 from ..models.iniciativa import (
     Iniciativa, ScoringIniciativa, EstadoIniciativa,
     ClasificacionInversion, Prioridad, HistorialEstadoIniciativa
@@ -15,84 +17,67 @@ from ..schemas.iniciativa import (
     Iniciativa as IniciativaSchema, IniciativaCreate, IniciativaUpdate,
     IniciativaResumen, IniciativaConDetalles,
     ScoringIniciativa as ScoringSchema, ScoringIniciativaCreate,
-    HistorialEstado, IniciativaPipeline, PipelineStats, WorkflowMetrics
+    HistorialEstado, IniciativaPipeline, PipelineStats, WorkflowMetrics,
+    ResultadoReclasificacion, ParametrosSimulacionScoring, ResultadoSimulacionScoring,
+    ScoringLote, ResultadoScoringLote, CambioEstadoLote, ResultadoCambioEstadoLote
 )
-from ..utils.security import get_current_user, check_role
+from ..utils.security import Principal, get_current_user, check_role
+from ..utils.paginacion import paginar, siguiente_pagina, escribir_cabeceras
 from ..services.scoring import ScoringService
+from ..services.busqueda import BusquedaService
+from ..services.workflow import (
+    WorkflowService, TRAMO_APROBACION, transicion_permitida, error_cambio_estado
+)
+from ..services.secuencias import SecuenciasService
+from ..services.reclasificacion import ReclasificacionService
+from ..services.simulacion_scoring import SimulacionScoringService
+from ..services.scoring_lote import ScoringLoteService, COMENTARIO_EN_REVISION
+from ..services.cambio_estado_lote import CambioEstadoLoteService
 
 router = APIRouter(prefix="/api/iniciativas", tags=["Iniciativas"])
 
 
-def registrar_cambio_estado(
-    db: Session,
-    iniciativa: Iniciativa,
-    estado_anterior: EstadoIniciativa,
-    estado_nuevo: EstadoIniciativa,
-    usuario_id: int,
-    comentario: str = None
-):
-    """Registra un cambio de estado en el historial"""
-    historial = HistorialEstadoIniciativa(
-        iniciativa_id=iniciativa.id,
-        estado_anterior=estado_anterior,
-        estado_nuevo=estado_nuevo,
-        usuario_id=usuario_id,
-        comentario=comentario
-    )
-    db.add(historial)
-    return historial
-
-
-def generar_codigo_iniciativa(db: Session) -> str:
-    """Genera un código único para la iniciativa"""
-    año = datetime.now().year
-    ultimo = db.query(Iniciativa).filter(
-        Iniciativa.codigo.like(f"INI-{año}-%")
-    ).order_by(Iniciativa.id.desc()).first()
-
-    if ultimo:
-        num = int(ultimo.codigo.split("-")[-1]) + 1
-    else:
-        num = 1
-
-    return f"INI-{año}-{num:04d}"
-
-
 @router.get("/", response_model=List[IniciativaResumen])
 async def listar_iniciativas(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    contar: bool = False,
     estado: Optional[EstadoIniciativa] = None,
     prioridad: Optional[Prioridad] = None,
     clasificacion: Optional[ClasificacionInversion] = None,
     area_id: Optional[int] = None,
     busqueda: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Listar iniciativas con filtros"""
-    query = db.query(Iniciativa).options(joinedload(Iniciativa.area_demandante))
+    """Listar iniciativas con filtros (paginación por cursor: ver app/utils/paginacion.py)"""
+    query = select(Iniciativa).options(joinedload(Iniciativa.area_demandante))
 
     # Filtrar por rol
     if current_user.rol == RolUsuario.DEMANDANTE:
-        query = query.filter(Iniciativa.created_by == current_user.id)
+        query = query.where(Iniciativa.created_by == current_user.id)
 
     # Aplicar filtros
     if estado:
-        query = query.filter(Iniciativa.estado == estado)
+        query = query.where(Iniciativa.estado == estado)
     if prioridad:
-        query = query.filter(Iniciativa.prioridad == prioridad)
+        query = query.where(Iniciativa.prioridad == prioridad)
     if clasificacion:
-        query = query.filter(Iniciativa.clasificacion_inversion == clasificacion)
+        query = query.where(Iniciativa.clasificacion_inversion == clasificacion)
     if area_id:
-        query = query.filter(Iniciativa.area_demandante_id == area_id)
+        query = query.where(Iniciativa.area_demandante_id == area_id)
     if busqueda:
-        query = query.filter(
-            Iniciativa.titulo.ilike(f"%{busqueda}%") |
-            Iniciativa.descripcion.ilike(f"%{busqueda}%")
-        )
+        query = query.where(await BusquedaService.filtro(db, busqueda, "iniciativa"))
 
-    iniciativas = query.order_by(Iniciativa.fecha_solicitud.desc()).offset(skip).limit(limit).all()
+    iniciativas, siguiente = siguiente_pagina(
+        (await db.scalars(
+            paginar(query, (Iniciativa.fecha_solicitud, Iniciativa.id), limit, cursor, skip)
+        )).all(),
+        limit, lambda ini: (ini.fecha_solicitud, ini.id)
+    )
+    await escribir_cabeceras(response, siguiente, db, query if contar else None)
 
     # Formatear respuesta
     resultado = []
@@ -118,84 +103,108 @@ async def listar_iniciativas(
 async def obtener_pipeline(
     area_id: Optional[int] = None,
     prioridad: Optional[Prioridad] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    estado: Optional[EstadoIniciativa] = None,
+    limite_por_estado: int = Query(50, ge=1, le=500, description="Tarjetas por columna"),
+    offset_por_estado: int = Query(0, ge=0, description="Tarjetas a saltar en cada columna"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Obtener todas las iniciativas organizadas para vista pipeline/kanban"""
-    query = db.query(Iniciativa).options(
-        joinedload(Iniciativa.area_demandante),
-        joinedload(Iniciativa.creador)
-    )
-
-    # Filtros
+    """
+    Obtener las iniciativas organizadas para vista pipeline/kanban, paginadas
+    por columna (estado) en una sola consulta. total_en_estado indica cuántas
+    tiene la columna; `estado` + `offset_por_estado` cargan más de una columna.
+    """
+    filtros = []
     if area_id:
-        query = query.filter(Iniciativa.area_demandante_id == area_id)
+        filtros.append(Iniciativa.area_demandante_id == area_id)
     if prioridad:
-        query = query.filter(Iniciativa.prioridad == prioridad)
+        filtros.append(Iniciativa.prioridad == prioridad)
+    if estado:
+        filtros.append(Iniciativa.estado == estado)
 
     # Filtrar por rol si es demandante
     if current_user.rol == RolUsuario.DEMANDANTE:
-        query = query.filter(Iniciativa.created_by == current_user.id)
+        filtros.append(Iniciativa.created_by == current_user.id)
+
+    # Posición dentro de su columna y total de la columna (ROW_NUMBER / COUNT OVER)
+    columnas = select(
+        Iniciativa.id,
+        Iniciativa.codigo,
+        Iniciativa.titulo,
+        Iniciativa.estado,
+        Iniciativa.prioridad,
+        Iniciativa.monto_estimado,
+        Iniciativa.fecha_solicitud,
+        Iniciativa.urgencia,
+        Iniciativa.area_demandante_id,
+        Iniciativa.created_by,
+        func.coalesce(Iniciativa.fecha_ultimo_cambio_estado, Iniciativa.created_at).label("fecha_estado"),
+        func.row_number().over(
+            partition_by=Iniciativa.estado,
+            order_by=(Iniciativa.fecha_solicitud.desc(), Iniciativa.id.desc())
+        ).label("posicion"),
+        func.count().over(partition_by=Iniciativa.estado).label("total_en_estado")
+    ).where(*filtros).subquery()
+
+    query = select(
+        columnas,
+        Area.nombre.label("area_demandante_nombre"),
+        Usuario.nombre.label("creador_nombre"),
+        Usuario.apellido.label("creador_apellido")
+    ).outerjoin(Area, Area.id == columnas.c.area_demandante_id).outerjoin(
+        Usuario, Usuario.id == columnas.c.created_by
+    ).where(
+        columnas.c.posicion > offset_por_estado,
+        columnas.c.posicion <= offset_por_estado + limite_por_estado
+    ).order_by(columnas.c.fecha_solicitud.desc(), columnas.c.id.desc())
 
-    iniciativas = query.order_by(Iniciativa.fecha_solicitud.desc()).all()
-
-    resultado = []
     ahora = datetime.utcnow()
-
-    for ini in iniciativas:
-        # Calcular días en estado actual
-        ultimo_cambio = db.query(HistorialEstadoIniciativa).filter(
-            HistorialEstadoIniciativa.iniciativa_id == ini.id
-        ).order_by(HistorialEstadoIniciativa.fecha.desc()).first()
-
-        if ultimo_cambio:
-            dias_en_estado = (ahora - ultimo_cambio.fecha).days
-        else:
-            dias_en_estado = (ahora - ini.created_at).days
-
-        resultado.append(IniciativaPipeline(
-            id=ini.id,
-            codigo=ini.codigo,
-            titulo=ini.titulo,
-            estado=ini.estado,
-            prioridad=ini.prioridad,
-            monto_estimado=ini.monto_estimado,
-            area_demandante_nombre=ini.area_demandante.nombre if ini.area_demandante else None,
-            creador_nombre=ini.creador.nombre_completo if ini.creador else None,
-            fecha_solicitud=ini.fecha_solicitud,
-            dias_en_estado=dias_en_estado,
-            urgencia=ini.urgencia
-        ))
-
-    return resultado
+    return [
+        IniciativaPipeline(
+            id=fila.id,
+            codigo=fila.codigo,
+            titulo=fila.titulo,
+            estado=fila.estado,
+            prioridad=fila.prioridad,
+            monto_estimado=fila.monto_estimado,
+            area_demandante_nombre=fila.area_demandante_nombre,
+            creador_nombre=f"{fila.creador_nombre} {fila.creador_apellido}" if fila.creador_nombre else None,
+            fecha_solicitud=fila.fecha_solicitud,
+            dias_en_estado=(ahora - fila.fecha_estado).days if fila.fecha_estado else 0,
+            urgencia=fila.urgencia,
+            total_en_estado=fila.total_en_estado
+        )
+        for fila in (await db.execute(query)).all()
+    ]
 
 
 @router.get("/workflow/metrics", response_model=WorkflowMetrics)
 async def obtener_metricas_workflow(
     año: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obtener métricas del workflow (funnel, tiempos, tasas)"""
-    query = db.query(Iniciativa)
-
+    consulta = select(
+        Iniciativa.estado,
+        func.count(Iniciativa.id),
+        func.coalesce(func.sum(Iniciativa.monto_estimado), 0)
+    ).group_by(Iniciativa.estado)
     if año:
-        query = query.filter(func.extract('year', Iniciativa.fecha_solicitud) == año)
+        # Rango sobre la columna (usa el índice) en lugar de extract(year)
+        consulta = consulta.where(
+            Iniciativa.fecha_solicitud >= datetime(año, 1, 1),
+            Iniciativa.fecha_solicitud < datetime(año + 1, 1, 1)
+        )
 
-    # Contar por estado
-    total = query.count()
+    # Conteo y monto por estado en una sola consulta agrupada
     estados_count = {}
     montos_por_estado = {}
+    for estado, cantidad, monto in (await db.execute(consulta)).all():
+        estados_count[estado.value] = cantidad
+        montos_por_estado[estado.value] = monto
+    total = sum(estados_count.values())
 
-    for estado in EstadoIniciativa:
-        count = query.filter(Iniciativa.estado == estado).count()
-        monto = db.query(func.sum(Iniciativa.monto_estimado)).filter(
-            Iniciativa.estado == estado
-        ).scalar() or 0
-        estados_count[estado.value] = count
-        montos_por_estado[estado.value] = float(monto)
-
-    # Calcular estadísticas
     por_estado = []
     for estado in EstadoIniciativa:
         cantidad = estados_count.get(estado.value, 0)
@@ -208,6 +217,10 @@ async def obtener_metricas_workflow(
             porcentaje=round(porcentaje, 1)
         ))
 
+    # Tiempos precalculados (histograma por año y tramo)
+    tiempos = await WorkflowService.obtener_tiempos(db, año)
+    tiempo_aprobacion = tiempos.get(TRAMO_APROBACION)
+
     # Tasas
     aprobadas = estados_count.get(EstadoIniciativa.APROBADA.value, 0) + \
                 estados_count.get(EstadoIniciativa.EN_BANCO_RESERVA.value, 0) + \
@@ -222,28 +235,159 @@ async def obtener_metricas_workflow(
     return WorkflowMetrics(
         total_iniciativas=total,
         por_estado=por_estado,
-        tiempo_promedio_aprobacion=None,
+        tiempo_promedio_aprobacion=tiempo_aprobacion["promedio_dias"] if tiempo_aprobacion else None,
+        tiempo_aprobacion=tiempo_aprobacion,
+        tiempos_por_estado=[tiempos[estado.value] for estado in EstadoIniciativa if estado.value in tiempos],
         tasa_aprobacion=round(tasa_aprobacion, 1),
         tasa_rechazo=round(tasa_rechazo, 1)
     )
 
 
+@router.post("/reclasificar", response_model=ResultadoReclasificacion)
+async def reclasificar_iniciativas(
+    aplicar: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.ADMINISTRADOR]))
+):
+    """
+    Recalcula la clasificación de inversión y el tipo de informe de todas las
+    iniciativas con los umbrales vigentes. Sin aplicar=true solo informa los
+    movimientos; con aplicar=true los escribe y los registra en el historial.
+    """
+    resultado = await ReclasificacionService.reclasificar(db, current_user.id, aplicar)
+    if resultado["aplicado"]:
+        await db.commit()
+    return resultado
+
+
+@router.post("/scoring/simulacion", response_model=ResultadoSimulacionScoring)
+async def simular_scoring(
+    parametros: ParametrosSimulacionScoring,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(check_role([
+        RolUsuario.JEFE_TD, RolUsuario.COMITE_EXPERTOS, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR
+    ]))
+):
+    """
+    Simula topes, pesos y cortes de prioridad sobre todos los scorings sin
+    guardar nada: distribución de prioridades, iniciativas que cambian y
+    efecto en el ranking del banco de reserva
+    """
+    desconocidas = (set(parametros.topes) | set(parametros.pesos)) - set(ScoringService.TOPES_DIMENSIONES)
+    if desconocidas:
+        raise HTTPException(status_code=400, detail=f"Dimensiones desconocidas: {', '.join(sorted(desconocidas))}")
+    if any(valor < 0 for valor in [*parametros.topes.values(), *parametros.pesos.values()]):
+        raise HTTPException(status_code=400, detail="Los topes y pesos no pueden ser negativos")
+    cortes = parametros.cortes
+    if cortes is not None and (
+        len(cortes) != len(ScoringService.CORTES_PRIORIDAD)
+        or any(mayor <= menor for mayor, menor in zip(cortes, cortes[1:]))
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="Los cortes deben ser los puntajes mínimos de P1 a P4, en orden descendente"
+        )
+    if not 0 <= parametros.limite <= 500:
+        raise HTTPException(status_code=400, detail="El límite debe estar entre 0 y 500")
+
+    return await SimulacionScoringService.simular(
+        db, parametros.topes, parametros.pesos, cortes, parametros.limite
+    )
+
+
+@router.post("/scoring/batch", response_model=ResultadoScoringLote)
+async def calcular_scoring_lote(
+    lote: ScoringLote,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([
+        RolUsuario.ANALISTA_TD, RolUsuario.JEFE_TD, RolUsuario.ADMINISTRADOR
+    ]))
+):
+    """
+    Calcular y guardar el scoring de varias iniciativas en una transacción:
+    las ENVIADA pasan a EN_REVISION. Las iniciativas inexistentes o repetidas
+    se informan en su resultado sin impedir el resto.
+    """
+    if not lote.scorings:
+        raise HTTPException(status_code=400, detail="El lote no contiene scorings")
+    if len(lote.scorings) > settings.SCORING_LOTE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo {settings.SCORING_LOTE_MAX_ITEMS} scorings por petición"
+        )
+
+    resultados = await ScoringLoteService.procesar(db, lote.scorings, current_user.id)
+    await db.commit()
+    return ResultadoScoringLote(
+        recibidos=len(resultados),
+        procesados=sum(resultado.procesado for resultado in resultados),
+        en_revision=sum(resultado.en_revision for resultado in resultados),
+        resultados=resultados
+    )
+
+
+@router.post("/cambiar-estado/bulk", response_model=ResultadoCambioEstadoLote)
+async def cambiar_estado_lote(
+    lote: CambioEstadoLote,
+    parcial: bool = Query(False, description="Aplicar los cambios válidos aunque otros tengan errores"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([
+        RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR
+    ]))
+):
+    """
+    Cambiar el estado de varias iniciativas en una transacción, con las
+    mismas reglas que el cambio individual (admin puede hacer cualquier
+    transición). Por defecto, si algún cambio es inválido no se aplica ninguno.
+    """
+    if not lote.cambios:
+        raise HTTPException(status_code=400, detail="El lote no contiene cambios")
+    if len(lote.cambios) > settings.CAMBIO_ESTADO_LOTE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo {settings.CAMBIO_ESTADO_LOTE_MAX_ITEMS} cambios por petición"
+        )
+
+    resultados = await CambioEstadoLoteService.procesar(
+        db, lote.cambios, current_user.id, lote.comentario,
+        libre=current_user.rol == RolUsuario.ADMINISTRADOR, parcial=parcial
+    )
+    resultado = ResultadoCambioEstadoLote(
+        recibidos=len(resultados),
+        aplicados=sum(item.aplicado for item in resultados),
+        resultados=resultados
+    )
+    if resultado.aplicados < resultado.recibidos and not parcial:
+        # Inválidos (nada se escribió) o movidos por otro proceso: todo o nada
+        await db.rollback()
+        for item in resultado.resultados:
+            item.aplicado = False
+        resultado.aplicados = 0
+        raise HTTPException(
+            status_code=422,
+            detail={"mensaje": "Hay cambios que no se pueden aplicar; no se aplicó ninguno",
+                    **resultado.model_dump(mode="json")}
+        )
+    await db.commit()
+    return resultado
+
+
 # ============ RUTAS DINÁMICAS ============
 
 @router.get("/{iniciativa_id}", response_model=IniciativaConDetalles)
 async def obtener_iniciativa(
     iniciativa_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obtener detalle de una iniciativa"""
-    iniciativa = db.query(Iniciativa).options(
+    iniciativa = await db.get(Iniciativa, iniciativa_id, options=[
         joinedload(Iniciativa.area_demandante),
         joinedload(Iniciativa.creador),
         joinedload(Iniciativa.scoring),
-        joinedload(Iniciativa.evaluaciones),
+        selectinload(Iniciativa.evaluaciones),
         joinedload(Iniciativa.proyecto)
-    ).filter(Iniciativa.id == iniciativa_id).first()
+    ])
 
     if not iniciativa:
         raise HTTPException(status_code=404, detail="Iniciativa no encontrada")
@@ -260,30 +404,31 @@ async def obtener_iniciativa(
 @router.post("/", response_model=IniciativaSchema)
 async def crear_iniciativa(
     iniciativa: IniciativaCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Crear una nueva iniciativa"""
     db_iniciativa = Iniciativa(
-        codigo=generar_codigo_iniciativa(db),
+        codigo=await SecuenciasService.codigo_iniciativa(db),
         created_by=current_user.id,
         **iniciativa.model_dump()
     )
 
     db.add(db_iniciativa)
-    db.commit()
-    db.refresh(db_iniciativa)
+    await db.commit()
+    await db.refresh(db_iniciativa)
 
     # Registrar estado inicial en historial
-    registrar_cambio_estado(
+    await WorkflowService.registrar_cambio_estado(
         db, db_iniciativa, None, EstadoIniciativa.BORRADOR,
         current_user.id, "Iniciativa creada"
     )
 
     # Calcular clasificación automáticamente
-    ScoringService.procesar_iniciativa(db, db_iniciativa)
+    await ScoringService.procesar_iniciativa(db, db_iniciativa)
 
-    db.commit()
+    await db.commit()
+    await db.refresh(db_iniciativa, attribute_names=["scoring"])
     return db_iniciativa
 
 
@@ -291,11 +436,11 @@ async def crear_iniciativa(
 async def actualizar_iniciativa(
     iniciativa_id: int,
     iniciativa: IniciativaUpdate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Actualizar una iniciativa"""
-    db_iniciativa = db.query(Iniciativa).filter(Iniciativa.id == iniciativa_id).first()
+    db_iniciativa = await db.get(Iniciativa, iniciativa_id)
 
     if not db_iniciativa:
         raise HTTPException(status_code=404, detail="Iniciativa no encontrada")
@@ -313,29 +458,30 @@ async def actualizar_iniciativa(
     for key, value in update_data.items():
         setattr(db_iniciativa, key, value)
 
-    db.commit()
+    await db.commit()
 
     # Recalcular clasificación si cambió el monto
     if "monto_estimado" in update_data or "porcentaje_transformacion" in update_data:
-        ScoringService.procesar_iniciativa(db, db_iniciativa)
+        await ScoringService.procesar_iniciativa(db, db_iniciativa)
 
-    db.refresh(db_iniciativa)
+    # Solo la relación que pide la respuesta; las columnas ya están al día
+    await db.refresh(db_iniciativa, attribute_names=["scoring"])
     return db_iniciativa
 
 
 @router.post("/{iniciativa_id}/enviar")
 async def enviar_iniciativa(
     iniciativa_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Enviar iniciativa para revisión"""
-    iniciativa = db.query(Iniciativa).filter(Iniciativa.id == iniciativa_id).first()
+    iniciativa = await db.get(Iniciativa, iniciativa_id)
 
     if not iniciativa:
         raise HTTPException(status_code=404, detail="Iniciativa no encontrada")
 
-    if iniciativa.estado != EstadoIniciativa.BORRADOR:
+    if not transicion_permitida(iniciativa.estado, EstadoIniciativa.ENVIADA):
         raise HTTPException(status_code=400, detail="Solo se pueden enviar iniciativas en borrador")
 
     estado_anterior = iniciativa.estado
@@ -343,12 +489,12 @@ async def enviar_iniciativa(
     iniciativa.fecha_solicitud = datetime.utcnow()
 
     # Registrar en historial
-    registrar_cambio_estado(
+    await WorkflowService.registrar_cambio_estado(
         db, iniciativa, estado_anterior, EstadoIniciativa.ENVIADA,
         current_user.id, "Enviada para revisión"
     )
 
-    db.commit()
+    await db.commit()
 
     return {"mensaje": "Iniciativa enviada correctamente"}
 
@@ -357,27 +503,31 @@ async def enviar_iniciativa(
 async def calcular_scoring(
     iniciativa_id: int,
     scoring_data: ScoringIniciativaCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([
         RolUsuario.ANALISTA_TD, RolUsuario.JEFE_TD, RolUsuario.ADMINISTRADOR
     ]))
 ):
     """Calcular y guardar scoring de una iniciativa"""
-    iniciativa = db.query(Iniciativa).filter(Iniciativa.id == iniciativa_id).first()
+    iniciativa = await db.get(Iniciativa, iniciativa_id)
 
     if not iniciativa:
         raise HTTPException(status_code=404, detail="Iniciativa no encontrada")
 
     # Procesar scoring
     scoring_dict = scoring_data.model_dump(exclude={'iniciativa_id'})
-    ScoringService.procesar_iniciativa(db, iniciativa, scoring_dict)
+    await ScoringService.procesar_iniciativa(db, iniciativa, scoring_dict)
 
     # Actualizar estado
     if iniciativa.estado == EstadoIniciativa.ENVIADA:
+        await WorkflowService.registrar_cambio_estado(
+            db, iniciativa, EstadoIniciativa.ENVIADA, EstadoIniciativa.EN_REVISION,
+            current_user.id, COMENTARIO_EN_REVISION
+        )
         iniciativa.estado = EstadoIniciativa.EN_REVISION
 
-    db.commit()
-    db.refresh(iniciativa)
+    await db.commit()
+    await db.refresh(iniciativa, attribute_names=["scoring"])
 
     return iniciativa.scoring
 
@@ -385,16 +535,16 @@ async def calcular_scoring(
 @router.post("/{iniciativa_id}/aprobar-revision")
 async def aprobar_revision(
     iniciativa_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.ADMINISTRADOR]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.ADMINISTRADOR]))
 ):
     """Aprobar revisión y enviar a evaluación del comité"""
-    iniciativa = db.query(Iniciativa).filter(Iniciativa.id == iniciativa_id).first()
+    iniciativa = await db.get(Iniciativa, iniciativa_id, options=[selectinload(Iniciativa.scoring)])
 
     if not iniciativa:
         raise HTTPException(status_code=404, detail="Iniciativa no encontrada")
 
-    if iniciativa.estado != EstadoIniciativa.EN_REVISION:
+    if not transicion_permitida(iniciativa.estado, EstadoIniciativa.EN_EVALUACION):
         raise HTTPException(status_code=400, detail="La iniciativa no está en revisión")
 
     if not iniciativa.scoring:
@@ -404,12 +554,12 @@ async def aprobar_revision(
     iniciativa.estado = EstadoIniciativa.EN_EVALUACION
 
     # Registrar en historial
-    registrar_cambio_estado(
+    await WorkflowService.registrar_cambio_estado(
         db, iniciativa, estado_anterior, EstadoIniciativa.EN_EVALUACION,
         current_user.id, "Revisión aprobada, enviada a evaluación del comité"
     )
 
-    db.commit()
+    await db.commit()
 
     return {"mensaje": "Iniciativa enviada a evaluación del comité"}
 
@@ -417,11 +567,11 @@ async def aprobar_revision(
 @router.delete("/{iniciativa_id}")
 async def eliminar_iniciativa(
     iniciativa_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.ADMINISTRADOR]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.ADMINISTRADOR]))
 ):
     """Eliminar una iniciativa (solo borradores)"""
-    iniciativa = db.query(Iniciativa).filter(Iniciativa.id == iniciativa_id).first()
+    iniciativa = await db.get(Iniciativa, iniciativa_id)
 
     if not iniciativa:
         raise HTTPException(status_code=404, detail="Iniciativa no encontrada")
@@ -429,8 +579,8 @@ async def eliminar_iniciativa(
     if iniciativa.estado != EstadoIniciativa.BORRADOR:
         raise HTTPException(status_code=400, detail="Solo se pueden eliminar iniciativas en borrador")
 
-    db.delete(iniciativa)
-    db.commit()
+    await db.delete(iniciativa)
+    await db.commit()
 
     return {"mensaje": "Iniciativa eliminada correctamente"}
 
@@ -438,19 +588,21 @@ async def eliminar_iniciativa(
 @router.get("/{iniciativa_id}/historial", response_model=List[HistorialEstado])
 async def obtener_historial_estados(
     iniciativa_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obtener historial de cambios de estado de una iniciativa"""
-    iniciativa = db.query(Iniciativa).filter(Iniciativa.id == iniciativa_id).first()
+    iniciativa = await db.get(Iniciativa, iniciativa_id)
     if not iniciativa:
         raise HTTPException(status_code=404, detail="Iniciativa no encontrada")
 
-    historial = db.query(HistorialEstadoIniciativa).options(
-        joinedload(HistorialEstadoIniciativa.usuario)
-    ).filter(
-        HistorialEstadoIniciativa.iniciativa_id == iniciativa_id
-    ).order_by(HistorialEstadoIniciativa.fecha.asc()).all()
+    historial = (await db.scalars(
+        select(HistorialEstadoIniciativa).options(
+            joinedload(HistorialEstadoIniciativa.usuario)
+        ).where(
+            HistorialEstadoIniciativa.iniciativa_id == iniciativa_id
+        ).order_by(HistorialEstadoIniciativa.fecha.asc())
+    )).all()
 
     resultado = []
     for h in historial:
@@ -473,42 +625,29 @@ async def cambiar_estado_iniciativa(
     iniciativa_id: int,
     nuevo_estado: EstadoIniciativa,
     comentario: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([
         RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR
     ]))
 ):
     """Cambiar estado de una iniciativa manualmente (para admin/jefe)"""
-    iniciativa = db.query(Iniciativa).filter(Iniciativa.id == iniciativa_id).first()
+    iniciativa = await db.get(Iniciativa, iniciativa_id)
 
     if not iniciativa:
         raise HTTPException(status_code=404, detail="Iniciativa no encontrada")
 
     estado_anterior = iniciativa.estado
 
-    # Validar transiciones permitidas
-    transiciones_validas = {
-        EstadoIniciativa.BORRADOR: [EstadoIniciativa.ENVIADA],
-        EstadoIniciativa.ENVIADA: [EstadoIniciativa.EN_REVISION, EstadoIniciativa.RECHAZADA],
-        EstadoIniciativa.EN_REVISION: [EstadoIniciativa.EN_EVALUACION, EstadoIniciativa.RECHAZADA],
-        EstadoIniciativa.EN_EVALUACION: [EstadoIniciativa.APROBADA, EstadoIniciativa.RECHAZADA],
-        EstadoIniciativa.APROBADA: [EstadoIniciativa.EN_BANCO_RESERVA],
-        EstadoIniciativa.EN_BANCO_RESERVA: [EstadoIniciativa.EN_PLAN_ANUAL],
-        EstadoIniciativa.EN_PLAN_ANUAL: [EstadoIniciativa.ACTIVADA],
-        EstadoIniciativa.ACTIVADA: [],
-        EstadoIniciativa.RECHAZADA: [EstadoIniciativa.BORRADOR]  # Permitir reabrir
-    }
-
-    # Admin puede hacer cualquier transición
-    if current_user.rol != RolUsuario.ADMINISTRADOR:
-        if nuevo_estado not in transiciones_validas.get(estado_anterior, []):
-            raise HTTPException(
-                status_code=400,
-                detail=f"No se puede cambiar de {estado_anterior.value} a {nuevo_estado.value}"
-            )
+    # Validar contra el grafo del workflow; admin puede hacer cualquier transición
+    # salvo al mismo estado (las mismas reglas que el cambio por lotes)
+    error = error_cambio_estado(
+        estado_anterior, nuevo_estado, libre=current_user.rol == RolUsuario.ADMINISTRADOR
+    )
+    if error:
+        raise HTTPException(status_code=400, detail=error)
 
     # Registrar historial
-    registrar_cambio_estado(
+    await WorkflowService.registrar_cambio_estado(
         db, iniciativa, estado_anterior, nuevo_estado,
         current_user.id, comentario
     )
@@ -520,7 +659,7 @@ async def cambiar_estado_iniciativa(
     if nuevo_estado == EstadoIniciativa.APROBADA:
         iniciativa.fecha_aprobacion = datetime.utcnow()
 
-    db.commit()
+    await db.commit()
 
     return {
         "mensaje": f"Estado cambiado de {estado_anterior.value} a {nuevo_estado.value}",
@@ -1,34 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, status
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import Annotated, List, Optional
 from datetime import datetime
 from decimal import Decimal
 
-from ..database import get_db
-from ..models.usuario import Usuario, RolUsuario
+from ..database import get_async_db, get_read_db
+from ..models.usuario import RolUsuario
 from ..models.proyecto import Proyecto, EstadoProyecto
 from ..models.planificacion import PlanAnual, PlanAnualProyecto, EstadoPlan
 from ..models.iniciativa import Iniciativa
-from ..utils.security import get_current_user, check_role
+from ..utils.security import Principal, get_current_user, check_role
 
 router = APIRouter(prefix="/api/planificacion", tags=["Planificación Anual"])
 
+# Starlette solo reconoce nombres de parámetro de ruta ASCII: con {año} la
+# ruta no coincidía nunca (404). Las rutas usan {anio}; el argumento sigue siendo año.
+AñoRuta = Annotated[int, Path(alias="anio")]
+
 
 # ============== PLAN ANUAL ==============
 
 @router.get("/planes", response_model=List[dict])
 async def listar_planes_anuales(
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Listar todos los planes anuales"""
-    planes = db.query(PlanAnual).order_by(PlanAnual.año.desc()).all()
+    planes = (await db.scalars(select(PlanAnual).order_by(PlanAnual.año.desc()))).all()
 
     resultado = []
     for plan in planes:
-        proyectos_count = db.query(PlanAnualProyecto).filter(
-            PlanAnualProyecto.plan_id == plan.id
-        ).count()
+        proyectos_count = await db.scalar(
+            select(func.count(PlanAnualProyecto.id)).where(
+                PlanAnualProyecto.plan_id == plan.id
+            )
+        )
 
         resultado.append({
             "id": plan.id,
@@ -45,24 +53,28 @@ async def listar_planes_anuales(
     return resultado
 
 
-@router.get("/planes/{año}")
+@router.get("/planes/{anio}")
 async def obtener_plan_anual(
-    año: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    año: AñoRuta,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obtener plan anual con sus proyectos"""
-    plan = db.query(PlanAnual).filter(PlanAnual.año == año).first()
+    plan = await db.scalar(select(PlanAnual).where(PlanAnual.año == año))
 
     if not plan:
         raise HTTPException(status_code=404, detail="Plan anual no encontrado")
 
     # Obtener proyectos del plan
-    plan_proyectos = db.query(PlanAnualProyecto).options(
-        joinedload(PlanAnualProyecto.proyecto).joinedload(Proyecto.iniciativa)
-    ).filter(
-        PlanAnualProyecto.plan_id == plan.id
-    ).order_by(PlanAnualProyecto.orden_prioridad).all()
+    plan_proyectos = (await db.scalars(
+        select(PlanAnualProyecto).options(
+            joinedload(PlanAnualProyecto.proyecto)
+            .joinedload(Proyecto.iniciativa)
+            .joinedload(Iniciativa.area_demandante)
+        ).where(
+            PlanAnualProyecto.plan_id == plan.id
+        ).order_by(PlanAnualProyecto.orden_prioridad)
+    )).all()
 
     proyectos = []
     for pp in plan_proyectos:
@@ -101,12 +113,12 @@ async def crear_plan_anual(
     nombre: str,
     presupuesto_total: float,
     descripcion: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
 ):
     """Crear un nuevo plan anual"""
     # Verificar que no exista
-    if db.query(PlanAnual).filter(PlanAnual.año == año).first():
+    if await db.scalar(select(PlanAnual.id).where(PlanAnual.año == año)):
         raise HTTPException(status_code=400, detail=f"Ya existe un plan para el año {año}")
 
     plan = PlanAnual(
@@ -116,23 +128,23 @@ async def crear_plan_anual(
         presupuesto_total=Decimal(str(presupuesto_total))
     )
     db.add(plan)
-    db.commit()
-    db.refresh(plan)
+    await db.commit()
+    await db.refresh(plan)
 
     return {"mensaje": f"Plan anual {año} creado correctamente", "id": plan.id}
 
 
-@router.put("/planes/{año}")
+@router.put("/planes/{anio}")
 async def actualizar_plan_anual(
-    año: int,
+    año: AñoRuta,
     nombre: Optional[str] = None,
     presupuesto_total: Optional[float] = None,
     descripcion: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
 ):
     """Actualizar un plan anual"""
-    plan = db.query(PlanAnual).filter(PlanAnual.año == año).first()
+    plan = await db.scalar(select(PlanAnual).where(PlanAnual.año == año))
 
     if not plan:
         raise HTTPException(status_code=404, detail="Plan anual no encontrado")
@@ -147,28 +159,28 @@ async def actualizar_plan_anual(
     if descripcion:
         plan.descripcion = descripcion
 
-    db.commit()
+    await db.commit()
     return {"mensaje": "Plan actualizado correctamente"}
 
 
-@router.post("/planes/{año}/agregar-proyecto")
+@router.post("/planes/{anio}/agregar-proyecto")
 async def agregar_proyecto_plan(
-    año: int,
+    año: AñoRuta,
     proyecto_id: int,
     monto_asignado: float,
     orden_prioridad: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
 ):
     """Agregar un proyecto al plan anual"""
-    plan = db.query(PlanAnual).filter(PlanAnual.año == año).first()
+    plan = await db.scalar(select(PlanAnual).where(PlanAnual.año == año))
     if not plan:
         raise HTTPException(status_code=404, detail="Plan anual no encontrado")
 
     if plan.estado == EstadoPlan.APROBADO:
         raise HTTPException(status_code=400, detail="No se puede modificar un plan ya aprobado")
 
-    proyecto = db.query(Proyecto).filter(Proyecto.id == proyecto_id).first()
+    proyecto = await db.get(Proyecto, proyecto_id)
     if not proyecto:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
 
@@ -182,10 +194,12 @@ async def agregar_proyecto_plan(
 
     # Determinar orden si no se especifica
     if not orden_prioridad:
-        ultimo = db.query(PlanAnualProyecto).filter(
-            PlanAnualProyecto.plan_id == plan.id
-        ).order_by(PlanAnualProyecto.orden_prioridad.desc()).first()
-        orden_prioridad = (ultimo.orden_prioridad + 1) if ultimo else 1
+        ultimo = await db.scalar(
+            select(PlanAnualProyecto.orden_prioridad).where(
+                PlanAnualProyecto.plan_id == plan.id
+            ).order_by(PlanAnualProyecto.orden_prioridad.desc()).limit(1)
+        )
+        orden_prioridad = (ultimo + 1) if ultimo else 1
 
     # Agregar al plan
     plan_proyecto = PlanAnualProyecto(
@@ -203,30 +217,32 @@ async def agregar_proyecto_plan(
 
     plan.presupuesto_comprometido += monto
 
-    db.commit()
+    await db.commit()
 
     return {"mensaje": "Proyecto agregado al plan anual"}
 
 
-@router.delete("/planes/{año}/quitar-proyecto/{proyecto_id}")
+@router.delete("/planes/{anio}/quitar-proyecto/{proyecto_id}")
 async def quitar_proyecto_plan(
-    año: int,
+    año: AñoRuta,
     proyecto_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
 ):
     """Quitar un proyecto del plan anual"""
-    plan = db.query(PlanAnual).filter(PlanAnual.año == año).first()
+    plan = await db.scalar(select(PlanAnual).where(PlanAnual.año == año))
     if not plan:
         raise HTTPException(status_code=404, detail="Plan anual no encontrado")
 
     if plan.estado == EstadoPlan.APROBADO:
         raise HTTPException(status_code=400, detail="No se puede modificar un plan ya aprobado")
 
-    plan_proyecto = db.query(PlanAnualProyecto).filter(
-        PlanAnualProyecto.plan_id == plan.id,
-        PlanAnualProyecto.proyecto_id == proyecto_id
-    ).first()
+    plan_proyecto = await db.scalar(
+        select(PlanAnualProyecto).where(
+            PlanAnualProyecto.plan_id == plan.id,
+            PlanAnualProyecto.proyecto_id == proyecto_id
+        )
+    )
 
     if not plan_proyecto:
         raise HTTPException(status_code=404, detail="El proyecto no está en este plan")
@@ -235,25 +251,25 @@ async def quitar_proyecto_plan(
     plan.presupuesto_comprometido -= plan_proyecto.monto_asignado
 
     # Regresar proyecto al banco
-    proyecto = db.query(Proyecto).filter(Proyecto.id == proyecto_id).first()
+    proyecto = await db.get(Proyecto, proyecto_id)
     if proyecto:
         proyecto.estado = EstadoProyecto.BANCO_RESERVA
         proyecto.año_plan = None
 
-    db.delete(plan_proyecto)
-    db.commit()
+    await db.delete(plan_proyecto)
+    await db.commit()
 
     return {"mensaje": "Proyecto removido del plan anual"}
 
 
-@router.post("/planes/{año}/aprobar")
+@router.post("/planes/{anio}/aprobar")
 async def aprobar_plan_anual(
-    año: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
+    año: AñoRuta,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
 ):
     """Aprobar el plan anual (CGEDx)"""
-    plan = db.query(PlanAnual).filter(PlanAnual.año == año).first()
+    plan = await db.scalar(select(PlanAnual).where(PlanAnual.año == año))
 
     if not plan:
         raise HTTPException(status_code=404, detail="Plan anual no encontrado")
@@ -262,9 +278,11 @@ async def aprobar_plan_anual(
         raise HTTPException(status_code=400, detail="El plan no está en estado para aprobar")
 
     # Verificar que tenga proyectos
-    proyectos_count = db.query(PlanAnualProyecto).filter(
-        PlanAnualProyecto.plan_id == plan.id
-    ).count()
+    proyectos_count = await db.scalar(
+        select(func.count(PlanAnualProyecto.id)).where(
+            PlanAnualProyecto.plan_id == plan.id
+        )
+    )
 
     if proyectos_count == 0:
         raise HTTPException(status_code=400, detail="El plan debe tener al menos un proyecto")
@@ -273,29 +291,31 @@ async def aprobar_plan_anual(
     plan.aprobado_por = current_user.id
     plan.fecha_aprobacion = datetime.utcnow()
 
-    db.commit()
+    await db.commit()
 
     return {"mensaje": f"Plan anual {año} aprobado correctamente"}
 
 
-@router.get("/simulacion/{año}")
+@router.get("/simulacion/{anio}")
 async def simular_plan(
-    año: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
+    año: AñoRuta,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
 ):
     """Simular escenarios para el plan anual"""
-    plan = db.query(PlanAnual).filter(PlanAnual.año == año).first()
+    plan = await db.scalar(select(PlanAnual).where(PlanAnual.año == año))
 
     if not plan:
         raise HTTPException(status_code=404, detail="Plan anual no encontrado")
 
     # Obtener proyectos en banco de reserva
-    proyectos_disponibles = db.query(Proyecto).options(
-        joinedload(Proyecto.iniciativa)
-    ).filter(
-        Proyecto.estado == EstadoProyecto.BANCO_RESERVA
-    ).all()
+    proyectos_disponibles = (await db.scalars(
+        select(Proyecto).options(
+            joinedload(Proyecto.iniciativa)
+        ).where(
+            Proyecto.estado == EstadoProyecto.BANCO_RESERVA
+        )
+    )).all()
 
     disponible = float(plan.presupuesto_total - plan.presupuesto_comprometido)
 
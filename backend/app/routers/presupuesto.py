@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from decimal import Decimal
 
-from ..database import get_db
-from ..models.usuario import Usuario, RolUsuario
+from ..database import get_async_db, get_read_db
+from ..models.usuario import RolUsuario
 from ..models.presupuesto import (
     PresupuestoProyecto, CambioPresupuesto, ClasificacionFinanciera,
     TipoCambioPresupuesto, EstadoCambio
@@ -14,7 +15,7 @@ from ..schemas.proyecto import (
     CambioPresupuesto as CambioSchema, CambioPresupuestoCreate,
     ClasificacionFinanciera as ClasificacionSchema, ClasificacionFinancieraCreate
 )
-from ..utils.security import get_current_user, check_role
+from ..utils.security import Principal, get_current_user, check_role
 from ..services.presupuesto import PresupuestoService
 from ..services.clasificacion import ClasificacionService
 
@@ -26,13 +27,13 @@ router = APIRouter(prefix="/api/presupuesto", tags=["Presupuesto"])
 @router.get("/proyecto/{proyecto_id}", response_model=PresupuestoSchema)
 async def obtener_presupuesto_proyecto(
     proyecto_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obtener presupuesto de un proyecto"""
-    presupuesto = db.query(PresupuestoProyecto).filter(
-        PresupuestoProyecto.proyecto_id == proyecto_id
-    ).first()
+    presupuesto = await db.scalar(
+        select(PresupuestoProyecto).where(PresupuestoProyecto.proyecto_id == proyecto_id)
+    )
 
     if not presupuesto:
         raise HTTPException(status_code=404, detail="Presupuesto no encontrado")
@@ -43,26 +44,25 @@ async def obtener_presupuesto_proyecto(
 @router.get("/proyecto/{proyecto_id}/detalle")
 async def obtener_presupuesto_detalle(
     proyecto_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obtener presupuesto detallado con indicadores CPI/SPI calculados"""
     from ..models.proyecto import Proyecto, EjecucionMensual
-    from sqlalchemy import func
 
-    presupuesto = db.query(PresupuestoProyecto).filter(
-        PresupuestoProyecto.proyecto_id == proyecto_id
-    ).first()
+    presupuesto = await db.scalar(
+        select(PresupuestoProyecto).where(PresupuestoProyecto.proyecto_id == proyecto_id)
+    )
 
-    proyecto = db.query(Proyecto).filter(Proyecto.id == proyecto_id).first()
+    proyecto = await db.get(Proyecto, proyecto_id)
 
     if not proyecto:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
 
     # Obtener ejecuciones mensuales
-    ejecuciones = db.query(EjecucionMensual).filter(
-        EjecucionMensual.proyecto_id == proyecto_id
-    ).all()
+    ejecuciones = (await db.scalars(
+        select(EjecucionMensual).where(EjecucionMensual.proyecto_id == proyecto_id)
+    )).all()
 
     # Calcular totales de ejecución
     total_planificado = sum(float(e.capex_planificado or 0) for e in ejecuciones)
@@ -128,26 +128,26 @@ async def obtener_presupuesto_detalle(
 async def crear_presupuesto_proyecto(
     proyecto_id: int,
     presupuesto: PresupuestoProyectoCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([
         RolUsuario.ANALISTA_TD, RolUsuario.JEFE_TD, RolUsuario.ADMINISTRADOR
     ]))
 ):
     """Crear o actualizar presupuesto de un proyecto"""
-    existente = db.query(PresupuestoProyecto).filter(
-        PresupuestoProyecto.proyecto_id == proyecto_id
-    ).first()
+    existente = await db.scalar(
+        select(PresupuestoProyecto).where(PresupuestoProyecto.proyecto_id == proyecto_id)
+    )
 
     if existente:
         # Actualizar
         for key, value in presupuesto.model_dump(exclude={'proyecto_id'}).items():
             setattr(existente, key, value)
-        db.commit()
-        db.refresh(existente)
+        await db.commit()
+        await db.refresh(existente)
         return existente
     else:
         # Crear nuevo
-        return PresupuestoService.crear_presupuesto_proyecto(
+        return await PresupuestoService.crear_presupuesto_proyecto(
             db=db,
             proyecto_id=proyecto_id,
             capex_aprobado=presupuesto.capex_aprobado,
@@ -160,21 +160,21 @@ async def crear_presupuesto_proyecto(
 
 @router.get("/cambios/pendientes", response_model=List[dict])
 async def listar_cambios_pendientes(
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(check_role([
         RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR
     ]))
 ):
     """Listar solicitudes de cambio de presupuesto pendientes"""
     from ..models.proyecto import Proyecto
 
-    cambios = db.query(CambioPresupuesto).filter(
-        CambioPresupuesto.estado == EstadoCambio.PENDIENTE
-    ).all()
+    cambios = (await db.scalars(
+        select(CambioPresupuesto).where(CambioPresupuesto.estado == EstadoCambio.PENDIENTE)
+    )).all()
 
     resultado = []
     for c in cambios:
-        proyecto = db.query(Proyecto).filter(Proyecto.id == c.proyecto_id).first()
+        proyecto = await db.get(Proyecto, c.proyecto_id)
         resultado.append({
             "id": c.id,
             "proyecto_id": c.proyecto_id,
@@ -192,23 +192,25 @@ async def listar_cambios_pendientes(
 @router.get("/cambios/proyecto/{proyecto_id}", response_model=List[CambioSchema])
 async def listar_cambios_proyecto(
     proyecto_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Listar historial de cambios de presupuesto de un proyecto"""
-    return db.query(CambioPresupuesto).filter(
-        CambioPresupuesto.proyecto_id == proyecto_id
-    ).order_by(CambioPresupuesto.fecha_solicitud.desc()).all()
+    return (await db.scalars(
+        select(CambioPresupuesto).where(
+            CambioPresupuesto.proyecto_id == proyecto_id
+        ).order_by(CambioPresupuesto.fecha_solicitud.desc())
+    )).all()
 
 
 @router.post("/cambios", response_model=CambioSchema)
 async def solicitar_cambio_presupuesto(
     cambio: CambioPresupuestoCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Solicitar un cambio de presupuesto"""
-    return PresupuestoService.solicitar_cambio_presupuesto(
+    return await PresupuestoService.solicitar_cambio_presupuesto(
         db=db,
         proyecto_id=cambio.proyecto_id,
         tipo=cambio.tipo,
@@ -223,13 +225,13 @@ async def aprobar_cambio(
     cambio_id: int,
     monto_aprobado: float,
     observaciones: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([
         RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR
     ]))
 ):
     """Aprobar una solicitud de cambio de presupuesto"""
-    cambio = PresupuestoService.aprobar_cambio_presupuesto(
+    cambio = await PresupuestoService.aprobar_cambio_presupuesto(
         db=db,
         cambio_id=cambio_id,
         monto_aprobado=Decimal(str(monto_aprobado)),
@@ -243,13 +245,13 @@ async def aprobar_cambio(
 async def rechazar_cambio(
     cambio_id: int,
     observaciones: str,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([
         RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR
     ]))
 ):
     """Rechazar una solicitud de cambio de presupuesto"""
-    cambio = PresupuestoService.rechazar_cambio_presupuesto(
+    cambio = await PresupuestoService.rechazar_cambio_presupuesto(
         db=db,
         cambio_id=cambio_id,
         aprobado_por=current_user.id,
@@ -263,26 +265,28 @@ async def rechazar_cambio(
 @router.get("/clasificacion/proyecto/{proyecto_id}", response_model=List[ClasificacionSchema])
 async def obtener_clasificacion_proyecto(
     proyecto_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obtener clasificaciones financieras de un proyecto"""
-    return db.query(ClasificacionFinanciera).filter(
-        ClasificacionFinanciera.proyecto_id == proyecto_id
-    ).all()
+    return (await db.scalars(
+        select(ClasificacionFinanciera).where(
+            ClasificacionFinanciera.proyecto_id == proyecto_id
+        )
+    )).all()
 
 
 @router.post("/clasificacion/proyecto/{proyecto_id}")
 async def clasificar_gastos_proyecto(
     proyecto_id: int,
     gastos: List[dict],
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([
         RolUsuario.ANALISTA_TD, RolUsuario.JEFE_TD, RolUsuario.ADMINISTRADOR
     ]))
 ):
     """Clasificar gastos de un proyecto según NIIF"""
-    resultado = ClasificacionService.clasificar_proyecto(
+    resultado = await ClasificacionService.clasificar_proyecto(
         db=db,
         proyecto_id=proyecto_id,
         gastos=gastos
@@ -303,11 +307,11 @@ async def clasificar_gastos_proyecto(
 async def obtener_alertas_presupuesto(
     proyecto_id: int,
     umbral: float = 10.0,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obtener alertas de sobrecosto de un proyecto"""
-    return PresupuestoService.verificar_alertas_sobrecosto(
+    return await PresupuestoService.verificar_alertas_sobrecosto(
         db=db,
         proyecto_id=proyecto_id,
         umbral_alerta=umbral
@@ -319,8 +323,8 @@ async def obtener_alertas_presupuesto(
 @router.get("/curva-s/proyecto/{proyecto_id}")
 async def obtener_curva_s(
     proyecto_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obtener datos de la curva S de un proyecto"""
-    return PresupuestoService.obtener_curva_s(db=db, proyecto_id=proyecto_id)
+    return await PresupuestoService.obtener_curva_s(db=db, proyecto_id=proyecto_id)
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from typing import List, Optional
 from datetime import datetime
 
-from ..database import get_db
-from ..models.usuario import Usuario, RolUsuario
+from ..database import get_async_db, get_read_db
+from ..models.usuario import RolUsuario
 from ..models.proyecto import (
     Proyecto, EstadoProyecto, FaseProyecto, HitoProyecto,
     RiesgoProyecto, IssueProyecto, BitacoraProyecto, SemaforoSalud
@@ -21,51 +23,68 @@ from ..schemas.proyecto import (
     BitacoraProyecto as BitacoraSchema, BitacoraProyectoCreate,
     PresupuestoProyecto as PresupuestoSchema
 )
-from ..utils.security import get_current_user, check_role
+from ..utils.security import Principal, get_current_user, check_role
+from ..utils.paginacion import paginar, siguiente_pagina, escribir_cabeceras
+from ..services.busqueda import BusquedaService
+from ..services.workflow import WorkflowService
 
 router = APIRouter(prefix="/api/proyectos", tags=["Proyectos"])
 
 
 @router.get("/", response_model=List[ProyectoConDetalles])
 async def listar_proyectos(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    contar: bool = False,
     estado: Optional[EstadoProyecto] = None,
     año: Optional[int] = None,
     semaforo: Optional[SemaforoSalud] = None,
     area_id: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    busqueda: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Listar proyectos con filtros"""
-    query = db.query(Proyecto).options(
+    """Listar proyectos con filtros (paginación por cursor: ver app/utils/paginacion.py)"""
+    query = select(Proyecto).options(
         joinedload(Proyecto.iniciativa).joinedload(Iniciativa.area_demandante),
-        joinedload(Proyecto.fases),
+        selectinload(Proyecto.fases),
         joinedload(Proyecto.presupuesto)
     )
 
     if estado:
-        query = query.filter(Proyecto.estado == estado)
+        query = query.where(Proyecto.estado == estado)
     if año:
-        query = query.filter(Proyecto.año_plan == año)
+        query = query.where(Proyecto.año_plan == año)
     if semaforo:
-        query = query.filter(Proyecto.semaforo_salud == semaforo)
+        query = query.where(Proyecto.semaforo_salud == semaforo)
     if area_id:
-        query = query.join(Iniciativa).filter(Iniciativa.area_demandante_id == area_id)
+        query = query.join(Iniciativa).where(Iniciativa.area_demandante_id == area_id)
+    if busqueda:
+        query = query.where(await BusquedaService.filtro(db, busqueda, "proyecto"))
 
-    proyectos = query.order_by(Proyecto.created_at.desc()).offset(skip).limit(limit).all()
+    proyectos, siguiente = siguiente_pagina(
+        (await db.scalars(paginar(query, (Proyecto.created_at, Proyecto.id), limit, cursor, skip))).all(),
+        limit, lambda p: (p.created_at, p.id)
+    )
+    await escribir_cabeceras(response, siguiente, db, query if contar else None)
 
     resultado = []
     for p in proyectos:
-        riesgos_abiertos = db.query(RiesgoProyecto).filter(
-            RiesgoProyecto.proyecto_id == p.id,
-            RiesgoProyecto.estado == "abierto"
-        ).count()
+        riesgos_abiertos = await db.scalar(
+            select(func.count(RiesgoProyecto.id)).where(
+                RiesgoProyecto.proyecto_id == p.id,
+                RiesgoProyecto.estado == "abierto"
+            )
+        )
 
-        issues_abiertos = db.query(IssueProyecto).filter(
-            IssueProyecto.proyecto_id == p.id,
-            IssueProyecto.estado.in_(["abierto", "en_progreso"])
-        ).count()
+        issues_abiertos = await db.scalar(
+            select(func.count(IssueProyecto.id)).where(
+                IssueProyecto.proyecto_id == p.id,
+                IssueProyecto.estado.in_(["abierto", "en_progreso"])
+            )
+        )
 
         # Construir datos base del proyecto (excluyendo relaciones)
         proyecto_dict = {k: v for k, v in p.__dict__.items()
@@ -95,11 +114,17 @@ async def listar_proyectos(
 
 @router.get("/banco-reserva", response_model=List[ProyectoConDetalles])
 async def listar_banco_reserva(
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Listar proyectos en el banco de reserva"""
     return await listar_proyectos(
+        response=response,
+        limit=limit,
+        cursor=cursor,
         estado=EstadoProyecto.BANCO_RESERVA,
         db=db,
         current_user=current_user
@@ -109,18 +134,18 @@ async def listar_banco_reserva(
 @router.get("/{proyecto_id}", response_model=ProyectoConDetalles)
 async def obtener_proyecto(
     proyecto_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obtener detalle de un proyecto"""
-    proyecto = db.query(Proyecto).options(
+    proyecto = await db.get(Proyecto, proyecto_id, options=[
         joinedload(Proyecto.iniciativa).joinedload(Iniciativa.area_demandante),
-        joinedload(Proyecto.fases),
-        joinedload(Proyecto.hitos),
+        selectinload(Proyecto.fases),
+        selectinload(Proyecto.hitos),
         joinedload(Proyecto.presupuesto),
-        joinedload(Proyecto.riesgos),
-        joinedload(Proyecto.issues)
-    ).filter(Proyecto.id == proyecto_id).first()
+        selectinload(Proyecto.riesgos),
+        selectinload(Proyecto.issues)
+    ])
 
     if not proyecto:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
@@ -129,7 +154,8 @@ async def obtener_proyecto(
     issues_abiertos = sum(1 for i in proyecto.issues if i.estado in ["abierto", "en_progreso"])
 
     return ProyectoConDetalles(
-        **{k: v for k, v in proyecto.__dict__.items() if not k.startswith('_')},
+        # Con la carga anticipada, fases ya está en __dict__: se pasa convertida abajo
+        **{k: v for k, v in proyecto.__dict__.items() if not k.startswith('_') and k != "fases"},
         iniciativa_titulo=proyecto.iniciativa.titulo if proyecto.iniciativa else None,
         area_demandante_nombre=proyecto.iniciativa.area_demandante.nombre if proyecto.iniciativa and proyecto.iniciativa.area_demandante else None,
         fases=[FaseSchema(**{k: v for k, v in f.__dict__.items() if not k.startswith('_')}) for f in proyecto.fases],
@@ -142,13 +168,13 @@ async def obtener_proyecto(
 async def actualizar_proyecto(
     proyecto_id: int,
     proyecto: ProyectoUpdate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([
         RolUsuario.ANALISTA_TD, RolUsuario.JEFE_TD, RolUsuario.ADMINISTRADOR
     ]))
 ):
     """Actualizar un proyecto"""
-    db_proyecto = db.query(Proyecto).filter(Proyecto.id == proyecto_id).first()
+    db_proyecto = await db.get(Proyecto, proyecto_id)
 
     if not db_proyecto:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
@@ -157,19 +183,19 @@ async def actualizar_proyecto(
     for key, value in update_data.items():
         setattr(db_proyecto, key, value)
 
-    db.commit()
-    db.refresh(db_proyecto)
+    await db.commit()
+    await db.refresh(db_proyecto)
     return db_proyecto
 
 
 @router.post("/{proyecto_id}/activar")
 async def activar_proyecto(
     proyecto_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.CGEDX, RolUsuario.ADMINISTRADOR]))
 ):
     """Activar un proyecto (ponerlo en ejecución)"""
-    proyecto = db.query(Proyecto).filter(Proyecto.id == proyecto_id).first()
+    proyecto = await db.get(Proyecto, proyecto_id, options=[selectinload(Proyecto.iniciativa)])
 
     if not proyecto:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
@@ -182,13 +208,17 @@ async def activar_proyecto(
     proyecto.fecha_inicio_real = datetime.utcnow()
 
     # Actualizar estado de la iniciativa
-    if proyecto.iniciativa:
+    if proyecto.iniciativa and proyecto.iniciativa.estado != EstadoIniciativa.ACTIVADA:
+        await WorkflowService.registrar_cambio_estado(
+            db, proyecto.iniciativa, proyecto.iniciativa.estado, EstadoIniciativa.ACTIVADA,
+            current_user.id, f"Proyecto {proyecto.codigo_proyecto} activado"
+        )
         proyecto.iniciativa.estado = EstadoIniciativa.ACTIVADA
 
     # Crear PresupuestoProyecto automáticamente si no existe
-    presupuesto_existente = db.query(PresupuestoProyecto).filter(
-        PresupuestoProyecto.proyecto_id == proyecto_id
-    ).first()
+    presupuesto_existente = await db.scalar(
+        select(PresupuestoProyecto.id).where(PresupuestoProyecto.proyecto_id == proyecto_id)
+    )
 
     if not presupuesto_existente:
         # Calcular CAPEX y OPEX basado en el presupuesto asignado
@@ -208,7 +238,7 @@ async def activar_proyecto(
         )
         db.add(nuevo_presupuesto)
 
-    db.commit()
+    await db.commit()
 
     return {
         "mensaje": "Proyecto activado correctamente",
@@ -222,11 +252,11 @@ async def cerrar_proyecto(
     proyecto_id: int,
     lecciones_aprendidas: Optional[str] = None,
     metricas_exito: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.ADMINISTRADOR]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.JEFE_TD, RolUsuario.ADMINISTRADOR]))
 ):
     """Cerrar un proyecto completado"""
-    proyecto = db.query(Proyecto).filter(Proyecto.id == proyecto_id).first()
+    proyecto = await db.get(Proyecto, proyecto_id)
 
     if not proyecto:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
@@ -244,7 +274,7 @@ async def cerrar_proyecto(
     if metricas_exito:
         proyecto.metricas_exito = metricas_exito
 
-    db.commit()
+    await db.commit()
 
     return {"mensaje": "Proyecto cerrado correctamente"}
 
@@ -254,33 +284,35 @@ async def cerrar_proyecto(
 @router.get("/{proyecto_id}/fases", response_model=List[FaseSchema])
 async def listar_fases(
     proyecto_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Listar fases de un proyecto"""
-    return db.query(FaseProyecto).filter(
-        FaseProyecto.proyecto_id == proyecto_id
-    ).order_by(FaseProyecto.orden).all()
+    return (await db.scalars(
+        select(FaseProyecto).where(
+            FaseProyecto.proyecto_id == proyecto_id
+        ).order_by(FaseProyecto.orden)
+    )).all()
 
 
 @router.post("/{proyecto_id}/fases", response_model=FaseSchema)
 async def crear_fase(
     proyecto_id: int,
     fase: FaseProyectoCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([
         RolUsuario.ANALISTA_TD, RolUsuario.JEFE_TD, RolUsuario.ADMINISTRADOR
     ]))
 ):
     """Crear una fase del proyecto"""
-    proyecto = db.query(Proyecto).filter(Proyecto.id == proyecto_id).first()
+    proyecto = await db.get(Proyecto, proyecto_id)
     if not proyecto:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
 
     db_fase = FaseProyecto(**fase.model_dump())
     db.add(db_fase)
-    db.commit()
-    db.refresh(db_fase)
+    await db.commit()
+    await db.refresh(db_fase)
     return db_fase
 
 
@@ -288,11 +320,11 @@ async def crear_fase(
 async def actualizar_fase(
     fase_id: int,
     fase: FaseProyectoUpdate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Actualizar una fase"""
-    db_fase = db.query(FaseProyecto).filter(FaseProyecto.id == fase_id).first()
+    db_fase = await db.get(FaseProyecto, fase_id)
     if not db_fase:
         raise HTTPException(status_code=404, detail="Fase no encontrada")
 
@@ -300,8 +332,8 @@ async def actualizar_fase(
     for key, value in update_data.items():
         setattr(db_fase, key, value)
 
-    db.commit()
-    db.refresh(db_fase)
+    await db.commit()
+    await db.refresh(db_fase)
     return db_fase
 
 
@@ -311,14 +343,14 @@ async def actualizar_fase(
 async def crear_hito(
     proyecto_id: int,
     hito: HitoProyectoCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Crear un hito del proyecto"""
     db_hito = HitoProyecto(**hito.model_dump())
     db.add(db_hito)
-    db.commit()
-    db.refresh(db_hito)
+    await db.commit()
+    await db.refresh(db_hito)
     return db_hito
 
 
@@ -326,11 +358,11 @@ async def crear_hito(
 async def completar_hito(
     hito_id: int,
     evidencia_url: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Marcar un hito como completado"""
-    hito = db.query(HitoProyecto).filter(HitoProyecto.id == hito_id).first()
+    hito = await db.get(HitoProyecto, hito_id)
     if not hito:
         raise HTTPException(status_code=404, detail="Hito no encontrado")
 
@@ -339,7 +371,7 @@ async def completar_hito(
     if evidencia_url:
         hito.evidencia_url = evidencia_url
 
-    db.commit()
+    await db.commit()
     return {"mensaje": "Hito completado"}
 
 
@@ -349,28 +381,28 @@ async def completar_hito(
 async def listar_riesgos(
     proyecto_id: int,
     estado: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Listar riesgos de un proyecto"""
-    query = db.query(RiesgoProyecto).filter(RiesgoProyecto.proyecto_id == proyecto_id)
+    query = select(RiesgoProyecto).where(RiesgoProyecto.proyecto_id == proyecto_id)
     if estado:
-        query = query.filter(RiesgoProyecto.estado == estado)
-    return query.all()
+        query = query.where(RiesgoProyecto.estado == estado)
+    return (await db.scalars(query)).all()
 
 
 @router.post("/{proyecto_id}/riesgos", response_model=RiesgoSchema)
 async def crear_riesgo(
     proyecto_id: int,
     riesgo: RiesgoProyectoCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Registrar un riesgo del proyecto"""
     db_riesgo = RiesgoProyecto(**riesgo.model_dump())
     db.add(db_riesgo)
-    db.commit()
-    db.refresh(db_riesgo)
+    await db.commit()
+    await db.refresh(db_riesgo)
     return db_riesgo
 
 
@@ -379,29 +411,37 @@ async def crear_riesgo(
 @router.get("/{proyecto_id}/issues", response_model=List[IssueSchema])
 async def listar_issues(
     proyecto_id: int,
+    response: Response,
     estado: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Sin límite si se omite"),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Listar issues de un proyecto"""
-    query = db.query(IssueProyecto).filter(IssueProyecto.proyecto_id == proyecto_id)
+    query = select(IssueProyecto).where(IssueProyecto.proyecto_id == proyecto_id)
     if estado:
-        query = query.filter(IssueProyecto.estado == estado)
-    return query.order_by(IssueProyecto.fecha_creacion.desc()).all()
+        query = query.where(IssueProyecto.estado == estado)
+    issues, siguiente = siguiente_pagina(
+        (await db.scalars(paginar(query, (IssueProyecto.fecha_creacion, IssueProyecto.id), limit, cursor))).all(),
+        limit, lambda issue: (issue.fecha_creacion, issue.id)
+    )
+    await escribir_cabeceras(response, siguiente)
+    return issues
 
 
 @router.post("/{proyecto_id}/issues", response_model=IssueSchema)
 async def crear_issue(
     proyecto_id: int,
     issue: IssueProyectoCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Registrar un issue del proyecto"""
     db_issue = IssueProyecto(**issue.model_dump())
     db.add(db_issue)
-    db.commit()
-    db.refresh(db_issue)
+    await db.commit()
+    await db.refresh(db_issue)
     return db_issue
 
 
@@ -410,15 +450,23 @@ async def crear_issue(
 @router.get("/{proyecto_id}/bitacora", response_model=List[BitacoraSchema])
 async def listar_bitacora(
     proyecto_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Sin límite si se omite"),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Listar entradas de la bitácora de un proyecto"""
-    entradas = db.query(BitacoraProyecto).options(
+    query = select(BitacoraProyecto).options(
         joinedload(BitacoraProyecto.usuario)
-    ).filter(
+    ).where(
         BitacoraProyecto.proyecto_id == proyecto_id
-    ).order_by(BitacoraProyecto.fecha.desc()).all()
+    )
+    entradas, siguiente = siguiente_pagina(
+        (await db.scalars(paginar(query, (BitacoraProyecto.fecha, BitacoraProyecto.id), limit, cursor))).all(),
+        limit, lambda entrada: (entrada.fecha, entrada.id)
+    )
+    await escribir_cabeceras(response, siguiente)
 
     resultado = []
     for e in entradas:
@@ -434,8 +482,8 @@ async def listar_bitacora(
 async def crear_entrada_bitacora(
     proyecto_id: int,
     entrada: BitacoraProyectoCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Crear una entrada en la bitácora del proyecto"""
     db_entrada = BitacoraProyecto(
@@ -443,8 +491,8 @@ async def crear_entrada_bitacora(
         usuario_id=current_user.id
     )
     db.add(db_entrada)
-    db.commit()
-    db.refresh(db_entrada)
+    await db.commit()
+    await db.refresh(db_entrada)
 
     return BitacoraSchema(
         **{k: v for k, v in db_entrada.__dict__.items() if not k.startswith('_')},
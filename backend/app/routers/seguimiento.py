@@ -1,14 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from decimal import Decimal
 from datetime import datetime
 
-from ..database import get_db
-from ..models.usuario import Usuario, RolUsuario
+from ..database import get_async_db, get_read_db
+from ..models.usuario import RolUsuario
 from ..models.proyecto import Proyecto, EjecucionMensual, SemaforoSalud, EstadoProyecto
 from ..schemas.proyecto import EjecucionMensual as EjecucionSchema, EjecucionMensualCreate
-from ..utils.security import get_current_user, check_role
+from ..utils.security import Principal, get_current_user, check_role
 from ..services.presupuesto import PresupuestoService
 
 router = APIRouter(prefix="/api/seguimiento", tags=["Seguimiento"])
@@ -17,12 +18,12 @@ router = APIRouter(prefix="/api/seguimiento", tags=["Seguimiento"])
 @router.post("/ejecucion", response_model=EjecucionSchema)
 async def registrar_ejecucion_mensual(
     ejecucion: EjecucionMensualCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Registrar ejecución mensual de un proyecto (plan y consumo)"""
     try:
-        return PresupuestoService.registrar_ejecucion(
+        return await PresupuestoService.registrar_ejecucion(
             db=db,
             proyecto_id=ejecucion.proyecto_id,
             año=ejecucion.año,
@@ -41,18 +42,20 @@ async def registrar_ejecucion_mensual(
 async def obtener_ejecucion_proyecto(
     proyecto_id: int,
     año: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obtener historial de ejecución mensual de un proyecto"""
-    query = db.query(EjecucionMensual).filter(
+    query = select(EjecucionMensual).where(
         EjecucionMensual.proyecto_id == proyecto_id
     )
 
     if año:
-        query = query.filter(EjecucionMensual.año == año)
+        query = query.where(EjecucionMensual.año == año)
 
-    ejecuciones = query.order_by(EjecucionMensual.año, EjecucionMensual.mes).all()
+    ejecuciones = (await db.scalars(
+        query.order_by(EjecucionMensual.año, EjecucionMensual.mes)
+    )).all()
 
     return [
         {
@@ -75,11 +78,11 @@ async def actualizar_avance_proyecto(
     proyecto_id: int,
     avance_porcentaje: int,
     comentario: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Actualizar el avance porcentual de un proyecto"""
-    proyecto = db.query(Proyecto).filter(Proyecto.id == proyecto_id).first()
+    proyecto = await db.get(Proyecto, proyecto_id)
 
     if not proyecto:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
@@ -102,7 +105,7 @@ async def actualizar_avance_proyecto(
     )
     db.add(bitacora)
 
-    db.commit()
+    await db.commit()
 
     return {"mensaje": "Avance actualizado correctamente", "avance": avance_porcentaje}
 
@@ -112,13 +115,13 @@ async def actualizar_semaforo_proyecto(
     proyecto_id: int,
     semaforo: SemaforoSalud,
     justificacion: str,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([
         RolUsuario.ANALISTA_TD, RolUsuario.JEFE_TD, RolUsuario.ADMINISTRADOR
     ]))
 ):
     """Actualizar el semáforo de salud de un proyecto"""
-    proyecto = db.query(Proyecto).filter(Proyecto.id == proyecto_id).first()
+    proyecto = await db.get(Proyecto, proyecto_id)
 
     if not proyecto:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
@@ -136,7 +139,7 @@ async def actualizar_semaforo_proyecto(
     )
     db.add(bitacora)
 
-    db.commit()
+    await db.commit()
 
     return {
         "mensaje": "Semáforo actualizado correctamente",
@@ -148,17 +151,19 @@ async def actualizar_semaforo_proyecto(
 @router.get("/resumen-portfolio")
 async def obtener_resumen_portfolio(
     año: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obtener resumen de seguimiento del portfolio"""
     año_filtro = año or datetime.now().year
 
     # Proyectos en ejecución
-    proyectos = db.query(Proyecto).filter(
-        Proyecto.estado == EstadoProyecto.EN_EJECUCION,
-        Proyecto.año_plan == año_filtro
-    ).all()
+    proyectos = (await db.scalars(
+        select(Proyecto).where(
+            Proyecto.estado == EstadoProyecto.EN_EJECUCION,
+            Proyecto.año_plan == año_filtro
+        )
+    )).all()
 
     # Estadísticas
     total_proyectos = len(proyectos)
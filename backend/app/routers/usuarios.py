@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 
-from ..database import get_db
+from ..config import settings
+from ..database import get_async_db, get_read_db
 from ..models.usuario import Usuario, Area, RolUsuario
 from ..schemas.usuario import (
     Usuario as UsuarioSchema, UsuarioCreate, UsuarioUpdate,
-    Area as AreaSchema, AreaCreate, AreaUpdate
+    Area as AreaSchema, AreaCreate, AreaUpdate, ResultadoAltaMasiva
+)
+from ..services.alta_usuarios import AltaUsuariosService
+from ..utils.paginacion import paginar, siguiente_pagina, escribir_cabeceras
+from ..utils.security import (
+    Principal, get_current_user, generar_hash_password, check_role, invalidar_usuario, revocar_tokens,
+    claims_usuario
 )
-from ..utils.security import get_current_user, get_password_hash, check_role
 
 router = APIRouter(prefix="/api/usuarios", tags=["Usuarios"])
 
@@ -17,35 +26,43 @@ router = APIRouter(prefix="/api/usuarios", tags=["Usuarios"])
 
 @router.get("/", response_model=List[UsuarioSchema])
 async def listar_usuarios(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    contar: bool = False,
     rol: Optional[RolUsuario] = None,
     area_id: Optional[int] = None,
     activo: Optional[bool] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.ADMINISTRADOR, RolUsuario.JEFE_TD]))
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(check_role([RolUsuario.ADMINISTRADOR, RolUsuario.JEFE_TD]))
 ):
     """Listar usuarios con filtros"""
-    query = db.query(Usuario)
+    query = select(Usuario).options(selectinload(Usuario.area))
 
     if rol:
-        query = query.filter(Usuario.rol == rol)
+        query = query.where(Usuario.rol == rol)
     if area_id:
-        query = query.filter(Usuario.area_id == area_id)
+        query = query.where(Usuario.area_id == area_id)
     if activo is not None:
-        query = query.filter(Usuario.activo == activo)
+        query = query.where(Usuario.activo == activo)
 
-    return query.offset(skip).limit(limit).all()
+    usuarios, siguiente = siguiente_pagina(
+        (await db.scalars(paginar(query, (Usuario.created_at, Usuario.id), limit, cursor, skip))).all(),
+        limit, lambda usuario: (usuario.created_at, usuario.id)
+    )
+    await escribir_cabeceras(response, siguiente, db, query if contar else None)
+    return usuarios
 
 
 @router.get("/{usuario_id}", response_model=UsuarioSchema)
 async def obtener_usuario(
     usuario_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obtener un usuario por ID"""
-    usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
+    usuario = await db.get(Usuario, usuario_id, options=[selectinload(Usuario.area)])
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     return usuario
@@ -54,11 +71,11 @@ async def obtener_usuario(
 @router.post("/", response_model=UsuarioSchema)
 async def crear_usuario(
     usuario: UsuarioCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.ADMINISTRADOR]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.ADMINISTRADOR]))
 ):
     """Crear un nuevo usuario"""
-    if db.query(Usuario).filter(Usuario.email == usuario.email).first():
+    if await db.scalar(select(Usuario.id).where(Usuario.email == usuario.email)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El email ya está registrado"
@@ -66,7 +83,7 @@ async def crear_usuario(
 
     db_user = Usuario(
         email=usuario.email,
-        hashed_password=get_password_hash(usuario.password),
+        hashed_password=await generar_hash_password(usuario.password),
         nombre=usuario.nombre,
         apellido=usuario.apellido,
         rol=usuario.rol,
@@ -75,49 +92,131 @@ async def crear_usuario(
         cargo=usuario.cargo
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user, attribute_names=["area"])
     return db_user
 
 
+@router.post(
+    "/bulk",
+    response_model=ResultadoAltaMasiva,
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "application/json": {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/UsuarioCreate"}}},
+        "text/csv": {"schema": {"type": "string"}},
+        "multipart/form-data": {"schema": {
+            "type": "object", "properties": {"archivo": {"type": "string", "format": "binary"}}
+        }},
+    }}}
+)
+async def crear_usuarios_masivo(
+    request: Request,
+    parcial: bool = Query(False, description="Crear las filas válidas aunque otras tengan errores"),
+    simular: bool = Query(False, description="Solo validar, sin crear usuarios"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.ADMINISTRADOR]))
+):
+    """
+    Alta masiva de usuarios desde JSON (lista de UsuarioCreate), CSV con
+    cabecera o un archivo subido en el campo "archivo". Las filas con errores
+    se informan una a una; sin `parcial`, cualquier error cancela el alta
+    completa. Todas las filas se crean en una sola transacción.
+    """
+    tipo = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if tipo == "multipart/form-data":
+        archivo = (await request.form()).get("archivo")
+        if archivo is None or isinstance(archivo, str):
+            raise HTTPException(status_code=400, detail="Falta el archivo (campo 'archivo')")
+        contenido = await archivo.read()
+        es_json = (archivo.filename or "").lower().endswith(".json") or archivo.content_type == "application/json"
+    else:
+        contenido = await request.body()
+        es_json = tipo == "application/json"
+
+    try:
+        filas, primera = AltaUsuariosService.leer_filas(contenido, "json" if es_json else "csv")
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=f"Archivo inválido: {error}")
+    if not filas:
+        raise HTTPException(status_code=400, detail="El archivo no contiene usuarios")
+    if len(filas) > settings.ALTA_MASIVA_MAX_FILAS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo {settings.ALTA_MASIVA_MAX_FILAS} usuarios por petición"
+        )
+
+    validos, errores = await AltaUsuariosService.validar(db, filas, primera)
+    resultado = ResultadoAltaMasiva(recibidos=len(filas), validos=len(validos), creados=0, errores=errores)
+    if errores and not parcial:
+        raise HTTPException(
+            status_code=422,
+            detail={"mensaje": "Hay filas con errores; no se creó ningún usuario", **resultado.model_dump()}
+        )
+    if simular or not validos:
+        return resultado
+
+    try:
+        resultado.creados = await AltaUsuariosService.crear(db, [usuario for _, usuario in validos])
+        await db.commit()
+    except IntegrityError:
+        # Un alta concurrente con el mismo email: nada queda a medias
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Otro proceso registró alguno de los emails durante el alta; no se creó ningún usuario"
+        )
+    return resultado
+
+
 @router.put("/{usuario_id}", response_model=UsuarioSchema)
 async def actualizar_usuario(
     usuario_id: int,
     usuario: UsuarioUpdate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.ADMINISTRADOR]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.ADMINISTRADOR]))
 ):
     """Actualizar un usuario"""
-    db_user = db.query(Usuario).filter(Usuario.id == usuario_id).first()
+    db_user = await db.get(Usuario, usuario_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
     update_data = usuario.model_dump(exclude_unset=True)
 
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await generar_hash_password(update_data.pop("password"))
+
+    claims_anteriores = claims_usuario(db_user)
+    desactivado = update_data.get("activo") is False and db_user.activo
 
     for key, value in update_data.items():
         setattr(db_user, key, value)
 
-    db.commit()
-    db.refresh(db_user)
+    # Un cambio en lo que el token firma (rol, email, área, nombre) o una
+    # desactivación invalida los tokens emitidos
+    if desactivado or claims_usuario(db_user) != claims_anteriores:
+        revocar_tokens(db_user)
+
+    await db.commit()
+    await db.refresh(db_user, attribute_names=["area"])
+    invalidar_usuario(db_user)
     return db_user
 
 
 @router.delete("/{usuario_id}")
 async def desactivar_usuario(
     usuario_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.ADMINISTRADOR]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.ADMINISTRADOR]))
 ):
     """Desactivar un usuario (soft delete)"""
-    db_user = db.query(Usuario).filter(Usuario.id == usuario_id).first()
+    db_user = await db.get(Usuario, usuario_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
     db_user.activo = False
-    db.commit()
+    revocar_tokens(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    invalidar_usuario(db_user)
     return {"mensaje": "Usuario desactivado correctamente"}
 
 
@@ -128,24 +227,24 @@ async def listar_areas(
     skip: int = 0,
     limit: int = 100,
     activa: Optional[bool] = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Listar áreas"""
-    query = db.query(Area)
+    query = select(Area)
     if activa is not None:
-        query = query.filter(Area.activa == activa)
-    return query.offset(skip).limit(limit).all()
+        query = query.where(Area.activa == activa)
+    return (await db.scalars(query.offset(skip).limit(limit))).all()
 
 
 @router.get("/areas/{area_id}", response_model=AreaSchema)
 async def obtener_area(
     area_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obtener un área por ID"""
-    area = db.query(Area).filter(Area.id == area_id).first()
+    area = await db.get(Area, area_id)
     if not area:
         raise HTTPException(status_code=404, detail="Área no encontrada")
     return area
@@ -154,11 +253,11 @@ async def obtener_area(
 @router.post("/areas/", response_model=AreaSchema)
 async def crear_area(
     area: AreaCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.ADMINISTRADOR]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.ADMINISTRADOR]))
 ):
     """Crear una nueva área"""
-    if db.query(Area).filter(Area.codigo == area.codigo).first():
+    if await db.scalar(select(Area.id).where(Area.codigo == area.codigo)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El código de área ya existe"
@@ -166,8 +265,8 @@ async def crear_area(
 
     db_area = Area(**area.model_dump())
     db.add(db_area)
-    db.commit()
-    db.refresh(db_area)
+    await db.commit()
+    await db.refresh(db_area)
     return db_area
 
 
@@ -175,11 +274,11 @@ async def crear_area(
 async def actualizar_area(
     area_id: int,
     area: AreaUpdate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(check_role([RolUsuario.ADMINISTRADOR]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(check_role([RolUsuario.ADMINISTRADOR]))
 ):
     """Actualizar un área"""
-    db_area = db.query(Area).filter(Area.id == area_id).first()
+    db_area = await db.get(Area, area_id)
     if not db_area:
         raise HTTPException(status_code=404, detail="Área no encontrada")
 
@@ -187,6 +286,6 @@ async def actualizar_area(
     for key, value in update_data.items():
         setattr(db_area, key, value)
 
-    db.commit()
-    db.refresh(db_area)
+    await db.commit()
+    await db.refresh(db_area)
     return db_area
@@ -1,6 +1,7 @@
 from .usuario import (
     UsuarioBase, UsuarioCreate, UsuarioUpdate, Usuario, UsuarioInDB,
-    AreaBase, AreaCreate, AreaUpdate, Area, Token, TokenData
+    AreaBase, AreaCreate, AreaUpdate, Area, Token, TokenData,
+    ErrorFilaUsuario, ResultadoAltaMasiva
 )
 from .iniciativa import (
     IniciativaBase, IniciativaCreate, IniciativaUpdate, Iniciativa,
@@ -18,10 +19,12 @@ from .proyecto import (
     BitacoraProyectoBase, BitacoraProyectoCreate, BitacoraProyecto,
     EjecucionMensualBase, EjecucionMensualCreate, EjecucionMensual
 )
+from .busqueda import ResultadoBusqueda, RespuestaBusqueda
 
 __all__ = [
     "UsuarioBase", "UsuarioCreate", "UsuarioUpdate", "Usuario", "UsuarioInDB",
     "AreaBase", "AreaCreate", "AreaUpdate", "Area", "Token", "TokenData",
+    "ErrorFilaUsuario", "ResultadoAltaMasiva",
     "IniciativaBase", "IniciativaCreate", "IniciativaUpdate", "Iniciativa",
     "ScoringIniciativaBase", "ScoringIniciativaCreate", "ScoringIniciativa",
     "EvaluacionComiteBase", "EvaluacionComiteCreate", "EvaluacionComiteUpdate", "EvaluacionComite",
@@ -31,5 +34,6 @@ __all__ = [
     "RiesgoProyectoBase", "RiesgoProyectoCreate", "RiesgoProyecto",
     "IssueProyectoBase", "IssueProyectoCreate", "IssueProyecto",
     "BitacoraProyectoBase", "BitacoraProyectoCreate", "BitacoraProyecto",
-    "EjecucionMensualBase", "EjecucionMensualCreate", "EjecucionMensual"
+    "EjecucionMensualBase", "EjecucionMensualCreate", "EjecucionMensual",
+    "ResultadoBusqueda", "RespuestaBusqueda"
 ]
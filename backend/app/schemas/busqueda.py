@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class ResultadoBusqueda(BaseModel):
+    tipo: str
+    id: int
+    titulo: str
+    subtitulo: Optional[str] = None
+    puntaje: float = 0.0
+
+
+class RespuestaBusqueda(BaseModel):
+    consulta: str
+    resultados: List[ResultadoBusqueda] = []
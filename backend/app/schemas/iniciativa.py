@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from decimal import Decimal
 from ..models.iniciativa import (
@@ -139,6 +139,7 @@ class IniciativaPipeline(BaseModel):
     fecha_solicitud: datetime
     dias_en_estado: int = 0
     urgencia: str = "normal"
+    total_en_estado: int = 0
 
     class Config:
         from_attributes = True
@@ -151,9 +152,140 @@ class PipelineStats(BaseModel):
     porcentaje: float
 
 
+class TiempoTramo(BaseModel):
+    """Duración de un tramo del workflow (un estado o 'aprobacion'), en días"""
+    tramo: str
+    cantidad: int
+    promedio_dias: float
+    p50_dias: float
+    p90_dias: float
+
+
 class WorkflowMetrics(BaseModel):
     total_iniciativas: int
     por_estado: List[PipelineStats]
     tiempo_promedio_aprobacion: Optional[float] = None
+    tiempo_aprobacion: Optional[TiempoTramo] = None
+    tiempos_por_estado: List[TiempoTramo] = []
     tasa_aprobacion: float = 0.0
     tasa_rechazo: float = 0.0
+
+
+class MovimientoClasificacion(BaseModel):
+    """Iniciativas que pasan de una clasificación (y tipo de informe) a otra"""
+    desde: Optional[ClasificacionInversion] = None
+    hacia: ClasificacionInversion
+    tipo_informe_desde: Optional[TipoInforme] = None
+    tipo_informe_hacia: TipoInforme
+    cantidad: int
+
+
+class ResultadoReclasificacion(BaseModel):
+    aplicado: bool
+    umbral_estandar: int
+    umbral_alta: int
+    total_iniciativas: int
+    reclasificadas: int
+    antes: Dict[str, int]
+    despues: Dict[str, int]
+    movimientos: List[MovimientoClasificacion]
+
+
+class ParametrosSimulacionScoring(BaseModel):
+    """Topes y pesos por dimensión (las omitidas quedan como hoy) y mínimos de P1..P4"""
+    topes: Dict[str, float] = {}
+    pesos: Dict[str, float] = {}
+    cortes: Optional[List[float]] = None
+    limite: int = 50
+
+
+class CambioPrioridad(BaseModel):
+    iniciativa_id: int
+    codigo: Optional[str] = None
+    titulo: Optional[str] = None
+    puntaje_actual: float
+    puntaje_simulado: float
+    prioridad_actual: Prioridad
+    prioridad_simulada: Prioridad
+
+
+class CambioRankingBanco(CambioPrioridad):
+    proyecto_id: int
+    codigo_proyecto: Optional[str] = None
+    posicion_actual: int
+    posicion_simulada: int
+
+
+class TransicionPrioridad(BaseModel):
+    desde: Prioridad
+    hacia: Prioridad
+    cantidad: int
+
+
+class SimulacionBancoReserva(BaseModel):
+    total: int
+    cambian_prioridad: int
+    suben: int
+    bajan: int
+    distribucion_actual: Dict[str, int]
+    distribucion_simulada: Dict[str, int]
+    proyectos: List[CambioRankingBanco]
+
+
+class ResultadoSimulacionScoring(BaseModel):
+    parametros: ParametrosSimulacionScoring
+    total_iniciativas: int
+    distribucion_actual: Dict[str, int]
+    distribucion_simulada: Dict[str, int]
+    cambian_prioridad: int
+    transiciones: List[TransicionPrioridad]
+    iniciativas: List[CambioPrioridad]
+    banco_reserva: SimulacionBancoReserva
+
+
+class ScoringLote(BaseModel):
+    """Scorings de varias iniciativas, procesados y confirmados juntos"""
+    scorings: List[ScoringIniciativaCreate]
+
+
+class ResultadoScoringItem(BaseModel):
+    iniciativa_id: int
+    procesado: bool
+    puntaje_total: Optional[int] = None
+    prioridad_calculada: Optional[Prioridad] = None
+    estado: Optional[EstadoIniciativa] = None
+    en_revision: bool = False
+    error: Optional[str] = None
+
+
+class ResultadoScoringLote(BaseModel):
+    recibidos: int
+    procesados: int
+    en_revision: int
+    resultados: List[ResultadoScoringItem]
+
+
+class CambioEstadoItem(BaseModel):
+    iniciativa_id: int
+    nuevo_estado: EstadoIniciativa
+    comentario: Optional[str] = None
+
+
+class CambioEstadoLote(BaseModel):
+    """Cambios de estado validados juntos y aplicados en una transacción"""
+    cambios: List[CambioEstadoItem]
+    comentario: Optional[str] = None  # Para los cambios sin comentario propio
+
+
+class ResultadoCambioEstadoItem(BaseModel):
+    iniciativa_id: int
+    aplicado: bool
+    estado_anterior: Optional[EstadoIniciativa] = None
+    estado_nuevo: Optional[EstadoIniciativa] = None
+    error: Optional[str] = None
+
+
+class ResultadoCambioEstadoLote(BaseModel):
+    recibidos: int
+    aplicados: int
+    resultados: List[ResultadoCambioEstadoItem]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from ..models.usuario import RolUsuario
 
@@ -84,3 +84,17 @@ class Usuario(UsuarioBase):
 
 class UsuarioInDB(Usuario):
     hashed_password: str
+
+
+# Alta masiva
+class ErrorFilaUsuario(BaseModel):
+    fila: int
+    email: Optional[str] = None
+    error: str
+
+
+class ResultadoAltaMasiva(BaseModel):
+    recibidos: int
+    validos: int
+    creados: int
+    errores: List[ErrorFilaUsuario] = []
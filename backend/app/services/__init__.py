@@ -2,10 +2,26 @@ from .scoring import ScoringService
 from .clasificacion import ClasificacionService
 from .presupuesto import PresupuestoService
 from .reportes import ReportesService
+from .alta_usuarios import AltaUsuariosService
+from .busqueda import BusquedaService
+from .workflow import WorkflowService
+from .secuencias import SecuenciasService
+from .reclasificacion import ReclasificacionService
+from .simulacion_scoring import SimulacionScoringService
+from .scoring_lote import ScoringLoteService
+from .cambio_estado_lote import CambioEstadoLoteService
 
 __all__ = [
     "ScoringService",
     "ClasificacionService",
     "PresupuestoService",
-    "ReportesService"
+    "ReportesService",
+    "AltaUsuariosService",
+    "BusquedaService",
+    "WorkflowService",
+    "SecuenciasService",
+    "ReclasificacionService",
+    "SimulacionScoringService",
+    "ScoringLoteService",
+    "CambioEstadoLoteService"
 ]
@@ -0,0 +1,148 @@
+import csv
+import io
+import json
+from typing import Dict, Iterable, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.usuario import Usuario, Area
+from ..schemas.usuario import UsuarioCreate, ErrorFilaUsuario
+from ..utils.security import generar_hashes_password
+
+
+def _en_lotes(valores: List, tamano: int) -> Iterable[List]:
+    for inicio in range(0, len(valores), tamano):
+        yield valores[inicio:inicio + tamano]
+
+
+def _mensaje_validacion(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(parte) for parte in detalle['loc']) or 'fila'}: {detalle['msg']}"
+        for detalle in error.errors()
+    )
+
+
+class AltaUsuariosService:
+    """Alta masiva de usuarios: validación por conjuntos, hashes en paralelo e inserción por lotes"""
+
+    @staticmethod
+    def leer_filas(contenido: bytes, formato: str) -> Tuple[List[dict], int]:
+        """
+        Filas del archivo (CSV con cabecera, o JSON: lista de objetos o
+        {"usuarios": [...]}) y el número de la primera, para los errores.
+        """
+        texto = contenido.decode("utf-8-sig")
+        if formato == "json":
+            datos = json.loads(texto)
+            if isinstance(datos, dict):
+                datos = datos.get("usuarios")
+            if not isinstance(datos, list) or not all(isinstance(fila, dict) for fila in datos):
+                raise ValueError("Se esperaba una lista de usuarios")
+            return datos, 1
+        try:
+            filas = [
+                # Celdas vacías del CSV = campo ausente
+                {clave: valor for clave, valor in fila.items() if clave and valor not in (None, "")}
+                for fila in csv.DictReader(io.StringIO(texto))
+            ]
+        except csv.Error as error:
+            raise ValueError(str(error)) from error
+        return filas, 2
+
+    @staticmethod
+    async def validar(
+        db: AsyncSession,
+        filas: List[dict],
+        primera: int = 1
+    ) -> Tuple[List[Tuple[int, UsuarioCreate]], List[ErrorFilaUsuario]]:
+        """
+        Valida cada fila con UsuarioCreate y después, con una consulta por
+        conjunto (IN por lotes), emails ya registrados y áreas inexistentes.
+        area_codigo se admite en lugar de area_id.
+        """
+        errores: List[ErrorFilaUsuario] = []
+        candidatos: List[Tuple[int, dict]] = list(enumerate(filas, start=primera))
+
+        # Áreas por código, resueltas en una consulta
+        codigos = {str(fila["area_codigo"]) for _, fila in candidatos if fila.get("area_codigo")}
+        areas_por_codigo: Dict[str, int] = {}
+        for lote in _en_lotes(sorted(codigos), settings.ALTA_MASIVA_LOTE):
+            areas_por_codigo.update((await db.execute(
+                select(Area.codigo, Area.id).where(Area.codigo.in_(lote))
+            )).all())
+
+        validos: List[Tuple[int, UsuarioCreate]] = []
+        filas_por_email: Dict[str, int] = {}
+        for numero, fila in candidatos:
+            fila = dict(fila)
+            codigo = fila.pop("area_codigo", None)
+            if codigo and not fila.get("area_id"):
+                if str(codigo) not in areas_por_codigo:
+                    errores.append(ErrorFilaUsuario(
+                        fila=numero, email=fila.get("email"), error=f"El área '{codigo}' no existe"
+                    ))
+                    continue
+                fila["area_id"] = areas_por_codigo[str(codigo)]
+            try:
+                usuario = UsuarioCreate.model_validate(fila)
+            except ValidationError as error:
+                errores.append(ErrorFilaUsuario(
+                    fila=numero, email=fila.get("email"), error=_mensaje_validacion(error)
+                ))
+                continue
+            if usuario.email in filas_por_email:
+                errores.append(ErrorFilaUsuario(
+                    fila=numero, email=usuario.email,
+                    error=f"Email duplicado en el archivo (fila {filas_por_email[usuario.email]})"
+                ))
+                continue
+            filas_por_email[usuario.email] = numero
+            validos.append((numero, usuario))
+
+        registrados, areas_existentes = set(), set()
+        for lote in _en_lotes(list(filas_por_email), settings.ALTA_MASIVA_LOTE):
+            registrados.update(await db.scalars(select(Usuario.email).where(Usuario.email.in_(lote))))
+        ids_area = sorted({usuario.area_id for _, usuario in validos if usuario.area_id is not None})
+        for lote in _en_lotes(ids_area, settings.ALTA_MASIVA_LOTE):
+            areas_existentes.update(await db.scalars(select(Area.id).where(Area.id.in_(lote))))
+
+        aceptados = []
+        for numero, usuario in validos:
+            if usuario.email in registrados:
+                errores.append(ErrorFilaUsuario(fila=numero, email=usuario.email, error="El email ya está registrado"))
+            elif usuario.area_id is not None and usuario.area_id not in areas_existentes:
+                errores.append(ErrorFilaUsuario(
+                    fila=numero, email=usuario.email, error=f"El área {usuario.area_id} no existe"
+                ))
+            else:
+                aceptados.append((numero, usuario))
+
+        errores.sort(key=lambda error: error.fila)
+        return aceptados, errores
+
+    @staticmethod
+    async def crear(db: AsyncSession, usuarios: List[UsuarioCreate]) -> int:
+        """
+        Hashea las contraseñas en paralelo e inserta por lotes en la transacción
+        de la sesión: el llamador confirma una vez (todo o nada).
+        """
+        hashes = await generar_hashes_password([usuario.password for usuario in usuarios], settings.ALTA_MASIVA_HILOS)
+        filas = [
+            {
+                "email": usuario.email,
+                "hashed_password": hash_,
+                "nombre": usuario.nombre,
+                "apellido": usuario.apellido,
+                "rol": usuario.rol,
+                "area_id": usuario.area_id,
+                "telefono": usuario.telefono,
+                "cargo": usuario.cargo,
+            }
+            for usuario, hash_ in zip(usuarios, hashes)
+        ]
+        for lote in _en_lotes(filas, settings.ALTA_MASIVA_LOTE):
+            await db.execute(insert(Usuario), lote)
+        return len(filas)
@@ -0,0 +1,392 @@
+"""
+Búsqueda de texto completo sobre iniciativas y proyectos.
+
+Índices (migración 0006):
+- SQLite: tablas FTS5 de contenido externo busqueda_iniciativas y
+  busqueda_proyectos (rowid = id), sin tildes, sincronizadas por triggers.
+  FTS5 no trae un stemmer en español: cada palabra de la consulta se reduce
+  a su raíz (raiz()) y se busca como prefijo, así "proyectos" encuentra
+  proyecto, proyectos y proyectar. Orden por bm25() con pesos por columna.
+- PostgreSQL: índice GIN de expresión sobre un tsvector 'spanish' ponderado
+  y sin tildes; orden por ts_rank_cd (PostgreSQL no implementa BM25).
+
+Si la base no tiene los índices (esquema anterior a 0006) se usa ILIKE.
+
+sugerencias() sirve la búsqueda global (typeahead): códigos por prefijo,
+texto completo, usuarios y áreas, con caché por alcance y consulta.
+"""
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, false, literal_column, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import engine
+from ..models.iniciativa import Iniciativa
+from ..models.proyecto import Proyecto
+from ..models.usuario import Usuario, Area
+from ..utils.cache import CacheTTL
+
+MARCA_INICIO, MARCA_FIN = "<mark>", "</mark>"
+# Las coincidencias de código van antes que cualquier puntaje de texto
+PUNTAJE_CODIGO = 1000.0
+
+
+@dataclass(frozen=True)
+class FuenteBusqueda:
+    tipo: str
+    modelo: type
+    indice: str
+    titulo: str
+    codigo: str
+    # (columna, peso bm25 en SQLite, peso tsvector en PostgreSQL)
+    columnas: Tuple[Tuple[str, float, str], ...]
+
+
+FUENTES: Dict[str, FuenteBusqueda] = {
+    "iniciativa": FuenteBusqueda(
+        "iniciativa", Iniciativa, "busqueda_iniciativas", "titulo", "codigo",
+        (("titulo", 10.0, "A"), ("descripcion", 4.0, "B"),
+         ("justificacion", 2.0, "C"), ("beneficios_esperados", 2.0, "C"))
+    ),
+    "proyecto": FuenteBusqueda(
+        "proyecto", Proyecto, "busqueda_proyectos", "nombre", "codigo_proyecto",
+        (("nombre", 10.0, "A"), ("descripcion", 4.0, "B"), ("lecciones_aprendidas", 2.0, "C"))
+    ),
+}
+
+# Sufijos flexivos y derivativos frecuentes, del más largo al más corto
+_SUFIJOS = sorted((
+    "aciones", "iciones", "amientos", "imientos", "amiento", "imiento", "acion", "icion",
+    "ciones", "cion", "idades", "idad", "mente", "anzas", "anza", "ables", "ibles", "able", "ible",
+    "istas", "ista", "ivos", "ivas", "ivo", "iva", "osos", "osas", "oso", "osa", "ando", "iendo",
+    "ados", "adas", "idos", "idas", "ado", "ada", "ido", "ida", "ar", "er", "ir",
+    "es", "os", "as", "s", "o", "a", "e",
+), key=len, reverse=True)
+_MIN_RAIZ = 4
+_TOKEN = re.compile(r"\w+")
+
+_disponible: Optional[bool] = None
+
+# Sugerencias por (alcance, tipos, límite, consulta en minúsculas); el TTL acota
+# cuánto tarda en verse un alta o un cambio de título
+cache_sugerencias = CacheTTL(settings.BUSQUEDA_CACHE_MAX, settings.BUSQUEDA_CACHE_TTL_SEG)
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin tildes (como remove_diacritics / unaccent)"""
+    descompuesto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(caracter for caracter in descompuesto if not unicodedata.combining(caracter))
+
+
+def raiz(palabra: str) -> str:
+    """Raíz aproximada en español para buscar como prefijo (sin tocar números ni palabras cortas)"""
+    if palabra.isdigit():
+        return palabra
+    for sufijo in _SUFIJOS:
+        if palabra.endswith(sufijo) and len(palabra) - len(sufijo) >= _MIN_RAIZ:
+            return palabra[:-len(sufijo)]
+    return palabra
+
+
+def terminos(texto: str) -> List[List[str]]:
+    """Palabras de la consulta separadas por espacios, cada una en sus tokens (INI-2026-00 -> ini, 2026, 00)"""
+    return [tokens for tokens in (_TOKEN.findall(normalizar(palabra)) for palabra in texto.split()) if tokens]
+
+
+def consulta_fts5(texto: str) -> Optional[str]:
+    """
+    Expresión MATCH segura: cada palabra es una frase entre comillas con el
+    último token como prefijo; las palabras se combinan con AND.
+    """
+    frases = []
+    for tokens in terminos(texto):
+        if len(tokens) == 1:
+            tokens = [raiz(tokens[0])]
+        frases.append('"' + " ".join(tokens) + '"*')
+    return " ".join(frases) or None
+
+
+def consulta_tsquery(texto: str) -> Optional[str]:
+    """to_tsquery: tokens de una palabra seguidos (<->), el último como prefijo; palabras con &"""
+    frases = [" <-> ".join(tokens[:-1] + [tokens[-1] + ":*"]) for tokens in terminos(texto)]
+    return " & ".join(f"({frase})" for frase in frases) or None
+
+
+def documento_pg(fuente: FuenteBusqueda, alias: str = "") -> str:
+    """tsvector ponderado; debe coincidir con la expresión del índice de la migración 0006"""
+    prefijo = f"{alias}." if alias else ""
+    return " || ".join(
+        f"setweight(to_tsvector('spanish'::regconfig, sgip_unaccent(coalesce({prefijo}{columna}, ''))), '{peso}')"
+        for columna, _, peso in fuente.columnas
+    )
+
+
+def _es_postgresql() -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def _con_prefijo(columna, prefijo: str):
+    """
+    columna LIKE 'prefijo%'. En SQLite LIKE no usa el índice de una columna
+    BINARY, así que se expresa como rango [prefijo, prefijo siguiente).
+    """
+    if engine.dialect.name == "sqlite":
+        return and_(columna >= prefijo, columna < prefijo[:-1] + chr(ord(prefijo[-1]) + 1))
+    return columna.startswith(prefijo, autoescape=True)
+
+
+class BusquedaService:
+    """Búsqueda de texto completo con ranking y fragmentos resaltados"""
+
+    @staticmethod
+    async def disponible(db: AsyncSession) -> bool:
+        """True si la base tiene los índices de búsqueda (se comprueba una vez por proceso)"""
+        global _disponible
+        if _disponible is None:
+            if _es_postgresql():
+                consulta = "SELECT 1 FROM pg_indexes WHERE indexname = 'ix_busqueda_iniciativas'"
+            elif engine.dialect.name == "sqlite":
+                consulta = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'busqueda_iniciativas'"
+            else:
+                consulta = None
+            _disponible = bool(consulta and await db.scalar(text(consulta)))
+        return _disponible
+
+    @staticmethod
+    async def filtro(db: AsyncSession, texto: str, tipo: str):
+        """
+        Condición WHERE para los listados (Iniciativa/Proyecto que coinciden
+        con el texto); un texto sin palabras buscables no coincide con nada.
+        """
+        fuente = FUENTES[tipo]
+        modelo = fuente.modelo
+        if not await BusquedaService.disponible(db):
+            patron = f"%{texto.strip()}%"
+            return or_(*(getattr(modelo, columna).ilike(patron) for columna, _, _ in fuente.columnas))
+
+        if _es_postgresql():
+            consulta = consulta_tsquery(texto)
+            if consulta is None:
+                return false()
+            return literal_column(f"({documento_pg(fuente, modelo.__tablename__)})").op("@@")(
+                text("to_tsquery('spanish'::regconfig, sgip_unaccent(:consulta_busqueda))")
+                .bindparams(consulta_busqueda=consulta)
+            )
+
+        consulta = consulta_fts5(texto)
+        if consulta is None:
+            return false()
+        return modelo.id.in_(
+            text(f"SELECT rowid FROM {fuente.indice} WHERE {fuente.indice} MATCH :consulta_busqueda")
+            .bindparams(consulta_busqueda=consulta)
+            .columns(rowid=modelo.id.type)
+        )
+
+    @staticmethod
+    async def buscar(
+        db: AsyncSession,
+        texto: str,
+        tipos: Sequence[str] = ("iniciativa", "proyecto"),
+        limite: int = 20,
+        creador_iniciativas: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Resultados ordenados por relevancia: {tipo, id, titulo, fragmento,
+        puntaje}. titulo y fragmento marcan las coincidencias con <mark>.
+        creador_iniciativas limita las iniciativas a las de ese usuario.
+        """
+        if not await BusquedaService.disponible(db):
+            return []
+        postgresql = _es_postgresql()
+        consulta = consulta_tsquery(texto) if postgresql else consulta_fts5(texto)
+        if consulta is None:
+            return []
+
+        resultados = []
+        for tipo in tipos:
+            fuente = FUENTES[tipo]
+            filtro_creador = creador_iniciativas is not None and tipo == "iniciativa"
+            sql = (BusquedaService._sql_postgresql if postgresql else BusquedaService._sql_sqlite)(fuente, filtro_creador)
+            parametros = {"consulta": consulta, "limite": limite}
+            if filtro_creador:
+                parametros["creador"] = creador_iniciativas
+            for fila in (await db.execute(text(sql), parametros)).mappings():
+                resultados.append({"tipo": tipo, **fila})
+
+        resultados.sort(key=lambda resultado: resultado["puntaje"], reverse=True)
+        return resultados[:limite]
+
+    @staticmethod
+    def _sql_sqlite(fuente: FuenteBusqueda, filtro_creador: bool) -> str:
+        pesos = ", ".join(str(peso) for _, peso, _ in fuente.columnas)
+        tabla = fuente.modelo.__tablename__
+        return (
+            f"SELECT {fuente.indice}.rowid AS id, -bm25({fuente.indice}, {pesos}) AS puntaje, "
+            f"highlight({fuente.indice}, 0, '{MARCA_INICIO}', '{MARCA_FIN}') AS titulo, "
+            f"snippet({fuente.indice}, -1, '{MARCA_INICIO}', '{MARCA_FIN}', '…', 16) AS fragmento "
+            f"FROM {fuente.indice} "
+            + (f"JOIN {tabla} ON {tabla}.id = {fuente.indice}.rowid " if filtro_creador else "")
+            + f"WHERE {fuente.indice} MATCH :consulta "
+            + (f"AND {tabla}.created_by = :creador " if filtro_creador else "")
+            + f"ORDER BY bm25({fuente.indice}, {pesos}) LIMIT :limite"
+        )
+
+    @staticmethod
+    def _sql_postgresql(fuente: FuenteBusqueda, filtro_creador: bool) -> str:
+        tabla = fuente.modelo.__tablename__
+        resto = " || ' ' || ".join(f"coalesce(t.{columna}, '')" for columna, _, _ in fuente.columnas[1:])
+        opciones = f"StartSel={MARCA_INICIO}, StopSel={MARCA_FIN}"
+        return (
+            f"SELECT t.id, ts_rank_cd({documento_pg(fuente, 't')}, q) AS puntaje, "
+            f"ts_headline('spanish', t.{fuente.titulo}, q, '{opciones}, HighlightAll=true') AS titulo, "
+            f"ts_headline('spanish', {resto}, q, '{opciones}, MaxWords=30, MinWords=10') AS fragmento "
+            f"FROM {tabla} t, to_tsquery('spanish'::regconfig, sgip_unaccent(:consulta)) q "
+            f"WHERE ({documento_pg(fuente, 't')}) @@ q "
+            + ("AND t.created_by = :creador " if filtro_creador else "")
+            + "ORDER BY puntaje DESC LIMIT :limite"
+        )
+
+    @staticmethod
+    async def sugerencias(
+        db: AsyncSession,
+        texto: str,
+        tipos: Sequence[str] = ("iniciativa", "proyecto", "usuario", "area"),
+        limite: int = 5,
+        creador_iniciativas: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Búsqueda global: hasta `limite` resultados por tipo {tipo, id, titulo,
+        subtitulo, puntaje}, en el orden de `tipos`. Una consulta de una sola
+        palabra también se busca como prefijo de código (INI-2026-00), y esas
+        coincidencias van primero. Iniciativas y proyectos salen del índice de
+        texto completo; usuarios y áreas, por prefijo de nombre, email o código.
+        """
+        consulta = " ".join(texto.split())
+        if not consulta:
+            return []
+        clave = (creador_iniciativas, tuple(tipos), limite, consulta.lower())
+        resultados = cache_sugerencias.obtener(clave)
+        if resultados is not None:
+            return resultados
+
+        resultados = []
+        for tipo in tipos:
+            if tipo in FUENTES:
+                resultados.extend(await BusquedaService._sugerir_fuente(
+                    db, FUENTES[tipo], consulta, limite, creador_iniciativas if tipo == "iniciativa" else None
+                ))
+            elif tipo == "usuario":
+                resultados.extend(await BusquedaService._sugerir_usuarios(db, consulta, limite))
+            elif tipo == "area":
+                resultados.extend(await BusquedaService._sugerir_areas(db, consulta, limite))
+
+        cache_sugerencias.guardar(clave, resultados)
+        return resultados
+
+    @staticmethod
+    async def _sugerir_fuente(
+        db: AsyncSession,
+        fuente: FuenteBusqueda,
+        consulta: str,
+        limite: int,
+        creador: Optional[int]
+    ) -> List[dict]:
+        modelo = fuente.modelo
+        columna_codigo = getattr(modelo, fuente.codigo)
+        columnas = (modelo.id, getattr(modelo, fuente.titulo), columna_codigo, modelo.estado)
+        filtro_creador = [modelo.created_by == creador] if creador is not None else []
+
+        puntajes: Dict[int, float] = {}
+        filas: Dict[int, tuple] = {}
+        if " " not in consulta:
+            # Prefijo de código por el índice único
+            for fila in (await db.execute(
+                select(*columnas)
+                .where(_con_prefijo(columna_codigo, consulta.upper()), *filtro_creador)
+                .order_by(columna_codigo).limit(limite)
+            )).all():
+                puntajes[fila.id] = PUNTAJE_CODIGO
+                filas[fila.id] = fila
+
+        if len(puntajes) < limite:
+            if await BusquedaService.disponible(db):
+                for resultado in await BusquedaService.buscar(db, consulta, (fuente.tipo,), limite, creador):
+                    puntajes.setdefault(resultado["id"], resultado["puntaje"])
+            else:
+                ids = await db.scalars(
+                    select(modelo.id).where(await BusquedaService.filtro(db, consulta, fuente.tipo), *filtro_creador)
+                    .order_by(modelo.id.desc()).limit(limite)
+                )
+                for id_ in ids:
+                    puntajes.setdefault(id_, 0.0)
+
+        faltantes = [id_ for id_ in puntajes if id_ not in filas]
+        if faltantes:
+            for fila in (await db.execute(select(*columnas).where(modelo.id.in_(faltantes)))).all():
+                filas[fila.id] = fila
+
+        ordenados = sorted((id_ for id_ in puntajes if id_ in filas), key=lambda id_: puntajes[id_], reverse=True)
+        return [
+            {
+                "tipo": fuente.tipo,
+                "id": id_,
+                "titulo": filas[id_][1],
+                "subtitulo": " · ".join(filter(None, (filas[id_][2], filas[id_][3] and filas[id_][3].value))),
+                "puntaje": puntajes[id_],
+            }
+            for id_ in ordenados[:limite]
+        ]
+
+    @staticmethod
+    async def _sugerir_usuarios(db: AsyncSession, consulta: str, limite: int) -> List[dict]:
+        """Cada palabra es prefijo del nombre, el apellido o el email"""
+        palabras = consulta.split()
+        if not palabras:
+            return []
+        usuarios = (await db.execute(
+            select(Usuario.id, Usuario.nombre, Usuario.apellido, Usuario.email, Usuario.rol)
+            .where(Usuario.activo.is_not(False), *(
+                or_(
+                    Usuario.nombre.istartswith(palabra, autoescape=True),
+                    Usuario.apellido.istartswith(palabra, autoescape=True),
+                    Usuario.email.istartswith(palabra, autoescape=True),
+                )
+                for palabra in palabras
+            ))
+            .order_by(Usuario.nombre, Usuario.apellido, Usuario.id).limit(limite)
+        )).all()
+        return [
+            {
+                "tipo": "usuario",
+                "id": usuario.id,
+                "titulo": f"{usuario.nombre} {usuario.apellido}",
+                "subtitulo": f"{usuario.email} · {usuario.rol.value}",
+                "puntaje": 0.0,
+            }
+            for usuario in usuarios
+        ]
+
+    @staticmethod
+    async def _sugerir_areas(db: AsyncSession, consulta: str, limite: int) -> List[dict]:
+        """
+        Cada palabra es prefijo de una palabra del nombre o del código. Las
+        áreas son pocas: se filtran en memoria, sin tildes (LIKE de SQLite no
+        pliega mayúsculas fuera de ASCII: "área" no encontraría "Área").
+        """
+        palabras = terminos(consulta)
+        if not palabras:
+            return []
+        resultados = []
+        for area in (await db.execute(select(Area.id, Area.nombre, Area.codigo).order_by(Area.nombre))).all():
+            tokens = _TOKEN.findall(normalizar(f"{area.nombre} {area.codigo}"))
+            if all(any(token.startswith(parte) for token in tokens) for palabra in palabras for parte in palabra):
+                resultados.append(
+                    {"tipo": "area", "id": area.id, "titulo": area.nombre, "subtitulo": area.codigo, "puntaje": 0.0}
+                )
+                if len(resultados) == limite:
+                    break
+        return resultados
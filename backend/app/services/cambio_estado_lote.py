@@ -0,0 +1,125 @@
+"""
+Cambio de estado por lotes (triage de fin de año).
+
+Todas las transiciones se validan en memoria contra el grafo del workflow
+(TRANSICIONES) con una sola consulta de los estados actuales. Después, en la
+transacción del llamador:
+- un UPDATE por conjunto: estado = CASE por destino, acotado con WHERE al
+  estado leído de cada iniciativa y con RETURNING, de modo que las que otro
+  proceso movió en el intermedio quedan fuera;
+- los tiempos de todas las transiciones con WorkflowService.duraciones_transiciones
+  y un solo acumular;
+- el historial en un executemany.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, insert, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.iniciativa import Iniciativa, EstadoIniciativa, HistorialEstadoIniciativa
+from ..schemas.iniciativa import CambioEstadoItem, ResultadoCambioEstadoItem
+from .workflow import WorkflowService, error_cambio_estado
+
+
+class CambioEstadoLoteService:
+    """Validación en memoria y aplicación por conjunto de muchos cambios de estado"""
+
+    @staticmethod
+    async def procesar(
+        db: AsyncSession,
+        cambios: List[CambioEstadoItem],
+        usuario_id: int,
+        comentario: Optional[str] = None,
+        libre: bool = False,
+        parcial: bool = False
+    ) -> List[ResultadoCambioEstadoItem]:
+        """
+        Un resultado por cambio, en el orden recibido, validado como el cambio
+        individual (error_cambio_estado; libre=True para el administrador).
+        Si algún cambio es inválido y no es parcial, no se escribe nada. No
+        confirma: el commit (o el rollback, si otro proceso movió alguna
+        iniciativa) queda a cargo del llamador.
+        """
+        ids = list(dict.fromkeys(cambio.iniciativa_id for cambio in cambios))
+        iniciativas = {
+            fila.id: fila for fila in (await db.execute(
+                select(
+                    Iniciativa.id, Iniciativa.estado,
+                    # Para los tiempos de la estadía que termina (WorkflowService)
+                    Iniciativa.fecha_solicitud, Iniciativa.fecha_ultimo_cambio_estado
+                ).where(Iniciativa.id.in_(ids))
+            )).all()
+        } if ids else {}
+
+        resultados: List[ResultadoCambioEstadoItem] = []
+        validos: Dict[int, Tuple[CambioEstadoItem, ResultadoCambioEstadoItem]] = {}
+        for cambio in cambios:
+            iniciativa = iniciativas.get(cambio.iniciativa_id)
+            resultado = ResultadoCambioEstadoItem(
+                iniciativa_id=cambio.iniciativa_id, aplicado=False,
+                estado_anterior=iniciativa.estado if iniciativa else None, estado_nuevo=cambio.nuevo_estado
+            )
+            if iniciativa is None:
+                resultado.error = "Iniciativa no encontrada"
+            elif cambio.iniciativa_id in validos:
+                resultado.error = "Iniciativa repetida en el lote"
+            else:
+                resultado.error = error_cambio_estado(iniciativa.estado, cambio.nuevo_estado, libre)
+                if resultado.error is None:
+                    validos[cambio.iniciativa_id] = (cambio, resultado)
+            resultados.append(resultado)
+
+        if not validos or (len(validos) < len(cambios) and not parcial):
+            return resultados
+
+        ahora = datetime.utcnow()
+        tabla = Iniciativa.__table__
+        por_origen: Dict[EstadoIniciativa, List[int]] = defaultdict(list)
+        por_destino: Dict[EstadoIniciativa, List[int]] = defaultdict(list)
+        for iniciativa_id, (cambio, _) in validos.items():
+            por_origen[iniciativas[iniciativa_id].estado].append(iniciativa_id)
+            por_destino[cambio.nuevo_estado].append(iniciativa_id)
+
+        valores = {
+            "estado": case(*[
+                (tabla.c.id.in_(destinos), literal(destino, tabla.c.estado.type))
+                for destino, destinos in por_destino.items()
+            ]),
+            # Copia desnormalizada para el pipeline (días en el estado actual)
+            "fecha_ultimo_cambio_estado": ahora,
+        }
+        if EstadoIniciativa.APROBADA in por_destino:
+            valores["fecha_aprobacion"] = case(
+                (tabla.c.id.in_(por_destino[EstadoIniciativa.APROBADA]), ahora), else_=tabla.c.fecha_aprobacion
+            )
+        aplicados = set((await db.execute(
+            update(tabla).where(or_(*[
+                and_(tabla.c.id.in_(origenes), tabla.c.estado == origen)
+                for origen, origenes in por_origen.items()
+            ])).values(**valores).returning(tabla.c.id)
+        )).scalars())
+
+        # Tiempos antes del historial: estas transiciones no cuentan como aprobación previa
+        transiciones = []
+        historial = []
+        for iniciativa_id, (cambio, resultado) in validos.items():
+            if iniciativa_id not in aplicados:
+                resultado.error = "La iniciativa cambió de estado durante la operación"
+                continue
+            resultado.aplicado = True
+            iniciativa = iniciativas[iniciativa_id]
+            transiciones.append((iniciativa, iniciativa.estado, cambio.nuevo_estado))
+            historial.append({
+                "iniciativa_id": iniciativa_id,
+                "estado_anterior": iniciativa.estado,
+                "estado_nuevo": cambio.nuevo_estado,
+                "usuario_id": usuario_id,
+                "comentario": cambio.comentario or comentario,
+                "fecha": ahora,
+            })
+        if historial:
+            await WorkflowService.acumular(db, await WorkflowService.duraciones_transiciones(db, transiciones, ahora))
+            await db.execute(insert(HistorialEstadoIniciativa), historial)
+        return resultados
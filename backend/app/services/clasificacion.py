@@ -1,6 +1,6 @@
 from decimal import Decimal
 from typing import List, Dict
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.presupuesto import ClasificacionFinanciera, ClasificacionNIIF
 from ..config import settings
@@ -70,9 +70,9 @@ class ClasificacionService:
         return clasificacion_base
 
     @classmethod
-    def clasificar_proyecto(
+    async def clasificar_proyecto(
         cls,
-        db: Session,
+        db: AsyncSession,
         proyecto_id: int,
         gastos: List[Dict]
     ) -> Dict:
@@ -111,7 +111,7 @@ class ClasificacionService:
             # Actualizar resumen
             resumen[clasificacion] += Decimal(str(gasto["monto"]))
 
-        db.commit()
+        await db.commit()
 
         return {
             "clasificaciones": clasificaciones,
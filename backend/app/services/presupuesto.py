@@ -1,8 +1,8 @@
 from decimal import Decimal
 from typing import Dict, List, Optional
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 
 from ..models.proyecto import Proyecto, EjecucionMensual
 from ..models.presupuesto import (
@@ -15,8 +15,8 @@ class PresupuestoService:
     """Servicio para gestión de presupuesto CAPEX/OPEX"""
 
     @staticmethod
-    def crear_presupuesto_proyecto(
-        db: Session,
+    async def crear_presupuesto_proyecto(
+        db: AsyncSession,
         proyecto_id: int,
         capex_aprobado: Decimal,
         opex_proyectado: Decimal = Decimal(0),
@@ -31,13 +31,13 @@ class PresupuestoService:
             aprobado_por=aprobado_por
         )
         db.add(presupuesto)
-        db.commit()
-        db.refresh(presupuesto)
+        await db.commit()
+        await db.refresh(presupuesto)
         return presupuesto
 
     @staticmethod
-    def solicitar_cambio_presupuesto(
-        db: Session,
+    async def solicitar_cambio_presupuesto(
+        db: AsyncSession,
         proyecto_id: int,
         tipo: TipoCambioPresupuesto,
         monto_solicitado: Decimal,
@@ -53,22 +53,20 @@ class PresupuestoService:
             solicitado_por=solicitado_por
         )
         db.add(cambio)
-        db.commit()
-        db.refresh(cambio)
+        await db.commit()
+        await db.refresh(cambio)
         return cambio
 
     @staticmethod
-    def aprobar_cambio_presupuesto(
-        db: Session,
+    async def aprobar_cambio_presupuesto(
+        db: AsyncSession,
         cambio_id: int,
         monto_aprobado: Decimal,
         aprobado_por: int,
         observaciones: Optional[str] = None
     ) -> CambioPresupuesto:
         """Aprueba un cambio de presupuesto y actualiza el presupuesto del proyecto"""
-        cambio = db.query(CambioPresupuesto).filter(
-            CambioPresupuesto.id == cambio_id
-        ).first()
+        cambio = await db.get(CambioPresupuesto, cambio_id)
 
         if not cambio:
             raise ValueError("Cambio de presupuesto no encontrado")
@@ -80,9 +78,11 @@ class PresupuestoService:
         cambio.observaciones = observaciones
 
         # Actualizar presupuesto del proyecto
-        presupuesto = db.query(PresupuestoProyecto).filter(
-            PresupuestoProyecto.proyecto_id == cambio.proyecto_id
-        ).first()
+        presupuesto = await db.scalar(
+            select(PresupuestoProyecto).where(
+                PresupuestoProyecto.proyecto_id == cambio.proyecto_id
+            )
+        )
 
         if presupuesto:
             if cambio.tipo == TipoCambioPresupuesto.AUMENTO:
@@ -90,21 +90,19 @@ class PresupuestoService:
             elif cambio.tipo == TipoCambioPresupuesto.REDUCCION:
                 presupuesto.capex_aprobado -= monto_aprobado
 
-        db.commit()
-        db.refresh(cambio)
+        await db.commit()
+        await db.refresh(cambio)
         return cambio
 
     @staticmethod
-    def rechazar_cambio_presupuesto(
-        db: Session,
+    async def rechazar_cambio_presupuesto(
+        db: AsyncSession,
         cambio_id: int,
         aprobado_por: int,
         observaciones: str
     ) -> CambioPresupuesto:
         """Rechaza un cambio de presupuesto"""
-        cambio = db.query(CambioPresupuesto).filter(
-            CambioPresupuesto.id == cambio_id
-        ).first()
+        cambio = await db.get(CambioPresupuesto, cambio_id)
 
         if not cambio:
             raise ValueError("Cambio de presupuesto no encontrado")
@@ -114,13 +112,13 @@ class PresupuestoService:
         cambio.fecha_resolucion = datetime.utcnow()
         cambio.observaciones = observaciones
 
-        db.commit()
-        db.refresh(cambio)
+        await db.commit()
+        await db.refresh(cambio)
         return cambio
 
     @staticmethod
-    def registrar_ejecucion(
-        db: Session,
+    async def registrar_ejecucion(
+        db: AsyncSession,
         proyecto_id: int,
         año: int,
         mes: int,
@@ -134,16 +132,18 @@ class PresupuestoService:
         from ..models.proyecto import Proyecto
 
         # Validar que el proyecto existe
-        proyecto = db.query(Proyecto).filter(Proyecto.id == proyecto_id).first()
+        proyecto = await db.get(Proyecto, proyecto_id)
         if not proyecto:
             raise ValueError(f"Proyecto con ID {proyecto_id} no encontrado")
 
         # Buscar si ya existe registro para el mes
-        ejecucion = db.query(EjecucionMensual).filter(
-            EjecucionMensual.proyecto_id == proyecto_id,
-            EjecucionMensual.año == año,
-            EjecucionMensual.mes == mes
-        ).first()
+        ejecucion = await db.scalar(
+            select(EjecucionMensual).where(
+                EjecucionMensual.proyecto_id == proyecto_id,
+                EjecucionMensual.año == año,
+                EjecucionMensual.mes == mes
+            )
+        )
 
         if ejecucion:
             ejecucion.capex_planificado = capex_planificado
@@ -165,33 +165,37 @@ class PresupuestoService:
             db.add(ejecucion)
 
         # Actualizar presupuesto total ejecutado
-        presupuesto = db.query(PresupuestoProyecto).filter(
-            PresupuestoProyecto.proyecto_id == proyecto_id
-        ).first()
+        presupuesto = await db.scalar(
+            select(PresupuestoProyecto).where(PresupuestoProyecto.proyecto_id == proyecto_id)
+        )
 
         if presupuesto:
-            total_ejecutado = db.query(func.sum(EjecucionMensual.capex_ejecutado)).filter(
-                EjecucionMensual.proyecto_id == proyecto_id
-            ).scalar() or Decimal(0)
+            total_ejecutado = await db.scalar(
+                select(func.sum(EjecucionMensual.capex_ejecutado)).where(
+                    EjecucionMensual.proyecto_id == proyecto_id
+                )
+            ) or Decimal(0)
             presupuesto.capex_ejecutado = total_ejecutado
 
-        db.commit()
-        db.refresh(ejecucion)
+        await db.commit()
+        await db.refresh(ejecucion)
         return ejecucion
 
     @staticmethod
-    def obtener_curva_s(
-        db: Session,
+    async def obtener_curva_s(
+        db: AsyncSession,
         proyecto_id: int
     ) -> Dict:
         """Genera datos para la curva S de ejecución"""
-        ejecuciones = db.query(EjecucionMensual).filter(
-            EjecucionMensual.proyecto_id == proyecto_id
-        ).order_by(EjecucionMensual.año, EjecucionMensual.mes).all()
+        ejecuciones = (await db.scalars(
+            select(EjecucionMensual).where(
+                EjecucionMensual.proyecto_id == proyecto_id
+            ).order_by(EjecucionMensual.año, EjecucionMensual.mes)
+        )).all()
 
-        presupuesto = db.query(PresupuestoProyecto).filter(
-            PresupuestoProyecto.proyecto_id == proyecto_id
-        ).first()
+        presupuesto = await db.scalar(
+            select(PresupuestoProyecto).where(PresupuestoProyecto.proyecto_id == proyecto_id)
+        )
 
         capex_aprobado = float(presupuesto.capex_aprobado) if presupuesto else 0
 
@@ -231,15 +235,15 @@ class PresupuestoService:
         }
 
     @staticmethod
-    def verificar_alertas_sobrecosto(
-        db: Session,
+    async def verificar_alertas_sobrecosto(
+        db: AsyncSession,
         proyecto_id: int,
         umbral_alerta: float = 10.0
     ) -> Dict:
         """Verifica si el proyecto tiene alertas de sobrecosto"""
-        presupuesto = db.query(PresupuestoProyecto).filter(
-            PresupuestoProyecto.proyecto_id == proyecto_id
-        ).first()
+        presupuesto = await db.scalar(
+            select(PresupuestoProyecto).where(PresupuestoProyecto.proyecto_id == proyecto_id)
+        )
 
         if not presupuesto or presupuesto.capex_aprobado == 0:
             return {"tiene_alerta": False, "mensaje": "Sin presupuesto definido"}
@@ -249,7 +253,7 @@ class PresupuestoService:
         )
 
         # Comparar con avance del proyecto
-        proyecto = db.query(Proyecto).filter(Proyecto.id == proyecto_id).first()
+        proyecto = await db.get(Proyecto, proyecto_id)
         avance = proyecto.avance_porcentaje if proyecto else 0
 
         # Si se ha gastado más proporcionalmente que el avance
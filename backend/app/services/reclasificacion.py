@@ -0,0 +1,152 @@
+"""
+Reclasificación masiva de la inversión de las iniciativas.
+
+La clasificación (ESTANDAR_A..ESTRATEGICA) y el tipo de informe se guardan al
+crear o editar cada iniciativa, con los umbrales vigentes en ese momento
+(UMBRAL_ESTANDAR, UMBRAL_ALTA). Cuando los umbrales cambian, este servicio
+recalcula todas las iniciativas en la base con las reglas de
+ScoringService.reglas_clasificacion() expresadas como CASE:
+
+- agrupar(): una consulta agrupada por (antes, después) que sirve de
+  simulación (cuántas iniciativas pasan de cada clasificación a cada otra);
+- reclasificar(aplicar=True): además, un INSERT ... SELECT al historial (un
+  registro por iniciativa reclasificada, sin cambio de estado) y un
+  UPDATE ... CASE, en la misma transacción.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import and_, case, func, insert, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.iniciativa import (
+    Iniciativa, HistorialEstadoIniciativa, ClasificacionInversion, TipoInforme
+)
+from .scoring import ScoringService
+
+# (clasificación antes, después, tipo de informe antes, después)
+Movimiento = Tuple[Optional[ClasificacionInversion], ClasificacionInversion, Optional[TipoInforme], TipoInforme]
+
+
+def _valor(miembro) -> Optional[str]:
+    return miembro.value if miembro is not None else None
+
+
+def _comentario(movimiento: Movimiento) -> str:
+    desde, hacia, informe_desde, informe_hacia = movimiento
+    texto = f"Reclasificación de inversión: {_valor(desde) or 'sin clasificación'} → {hacia.value}"
+    if informe_desde != informe_hacia:
+        texto += f" (informe {_valor(informe_desde) or '-'} → {informe_hacia.value})"
+    return texto
+
+
+def _condicion_movimiento(movimiento: Movimiento, clasificacion, informe):
+    desde, hacia, informe_desde, informe_hacia = movimiento
+    return and_(
+        Iniciativa.clasificacion_inversion.is_not_distinct_from(desde),
+        clasificacion == hacia,
+        Iniciativa.tipo_informe.is_not_distinct_from(informe_desde),
+        informe == informe_hacia
+    )
+
+
+def _orden_valor(valor: str) -> int:
+    valores = [miembro.value for miembro in ClasificacionInversion]
+    return valores.index(valor) if valor in valores else -1
+
+
+def _informe(antes: Dict[str, int], despues: Dict[str, int], movimientos: Dict[Movimiento, int],
+             aplicado: bool) -> dict:
+    orden = {miembro: indice for indice, miembro in enumerate(ClasificacionInversion)}
+    return {
+        "aplicado": aplicado,
+        "umbral_estandar": settings.UMBRAL_ESTANDAR,
+        "umbral_alta": settings.UMBRAL_ALTA,
+        "total_iniciativas": sum(antes.values()),
+        "reclasificadas": sum(movimientos.values()),
+        "antes": {clave: antes[clave] for clave in sorted(antes, key=_orden_valor)},
+        "despues": {clave: despues[clave] for clave in sorted(despues, key=_orden_valor)},
+        "movimientos": [
+            {
+                "desde": desde, "hacia": hacia,
+                "tipo_informe_desde": informe_desde, "tipo_informe_hacia": informe_hacia,
+                "cantidad": cantidad
+            }
+            for (desde, hacia, informe_desde, informe_hacia), cantidad in sorted(
+                movimientos.items(), key=lambda item: (orden.get(item[0][0], -1), orden[item[0][1]])
+            )
+        ],
+    }
+
+
+class ReclasificacionService:
+    """Recalcula clasificación de inversión y tipo de informe de todas las iniciativas"""
+
+    @staticmethod
+    async def agrupar(db: AsyncSession) -> Tuple[Dict[str, int], Dict[str, int], Dict[Movimiento, int]]:
+        """
+        Una consulta agrupada por valores actuales y recalculados: conteos por
+        clasificación antes y después, y cantidad por movimiento (solo los que cambian)
+        """
+        clasificacion, informe = ScoringService.expresiones_clasificacion()
+        filas = (await db.execute(
+            select(
+                Iniciativa.clasificacion_inversion, clasificacion,
+                Iniciativa.tipo_informe, informe,
+                func.count(Iniciativa.id)
+            ).group_by(Iniciativa.clasificacion_inversion, clasificacion, Iniciativa.tipo_informe, informe)
+        )).all()
+
+        antes: Dict[str, int] = defaultdict(int)
+        despues: Dict[str, int] = defaultdict(int)
+        movimientos: Dict[Movimiento, int] = {}
+        for desde, hacia, informe_desde, informe_hacia, cantidad in filas:
+            antes[_valor(desde) or "sin_clasificacion"] += cantidad
+            despues[hacia.value] += cantidad
+            if desde != hacia or informe_desde != informe_hacia:
+                movimientos[(desde, hacia, informe_desde, informe_hacia)] = cantidad
+        return dict(antes), dict(despues), movimientos
+
+    @staticmethod
+    async def reclasificar(db: AsyncSession, usuario_id: int, aplicar: bool = False) -> dict:
+        """
+        Simulación de la reclasificación (aplicar=False) o su escritura:
+        historial y UPDATE ... CASE, sin confirmar (el commit queda a cargo
+        del llamador). Devuelve el informe de movimientos en ambos casos.
+        """
+        antes, despues, movimientos = await ReclasificacionService.agrupar(db)
+        if not aplicar or not movimientos:
+            return _informe(antes, despues, movimientos, aplicado=False)
+
+        clasificacion, informe = ScoringService.expresiones_clasificacion()
+        cambia = or_(
+            Iniciativa.clasificacion_inversion.is_distinct_from(clasificacion),
+            Iniciativa.tipo_informe.is_distinct_from(informe)
+        )
+
+        # Historial antes del UPDATE (necesita los valores anteriores), sin
+        # cambio de estado; el comentario sale del movimiento de cada fila
+        comentario = case(
+            *[
+                (_condicion_movimiento(movimiento, clasificacion, informe), literal(_comentario(movimiento)))
+                for movimiento in movimientos
+            ],
+            else_=literal("Reclasificación de inversión")
+        )
+        await db.execute(
+            insert(HistorialEstadoIniciativa).from_select(
+                ["iniciativa_id", "estado_anterior", "estado_nuevo", "usuario_id", "comentario", "fecha"],
+                select(
+                    Iniciativa.id, Iniciativa.estado, Iniciativa.estado, literal(usuario_id), comentario,
+                    literal(datetime.utcnow(), HistorialEstadoIniciativa.fecha.type)
+                ).where(cambia)
+            )
+        )
+        await db.execute(
+            update(Iniciativa).where(cambia).values(
+                clasificacion_inversion=clasificacion, tipo_informe=informe
+            ).execution_options(synchronize_session=False)
+        )
+        return _informe(antes, despues, movimientos, aplicado=True)
@@ -1,8 +1,8 @@
 from decimal import Decimal
 from typing import Dict, List, Optional
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, select
 
 from ..models.proyecto import Proyecto, EstadoProyecto, SemaforoSalud
 from ..models.iniciativa import Iniciativa, EstadoIniciativa, Prioridad, ClasificacionInversion
@@ -14,33 +14,33 @@ class ReportesService:
     """Servicio para generación de reportes y dashboards"""
 
     @staticmethod
-    def obtener_kpis_portfolio(db: Session, año: Optional[int] = None) -> Dict:
+    async def obtener_kpis_portfolio(db: AsyncSession, año: Optional[int] = None) -> Dict:
         """Obtiene KPIs principales del portfolio"""
         filtro_año = Proyecto.año_plan == año if año else True
 
         # Total de proyectos por estado
-        proyectos_por_estado = dict(
-            db.query(Proyecto.estado, func.count(Proyecto.id))
-            .filter(filtro_año)
+        proyectos_por_estado = dict((await db.execute(
+            select(Proyecto.estado, func.count(Proyecto.id))
+            .where(filtro_año)
             .group_by(Proyecto.estado)
-            .all()
-        )
+        )).all())
 
         # Presupuesto total
-        presupuesto_stats = db.query(
-            func.sum(PresupuestoProyecto.capex_aprobado),
-            func.sum(PresupuestoProyecto.capex_comprometido),
-            func.sum(PresupuestoProyecto.capex_ejecutado),
-            func.sum(PresupuestoProyecto.opex_proyectado_anual)
-        ).join(Proyecto).filter(filtro_año).first()
+        presupuesto_stats = (await db.execute(
+            select(
+                func.sum(PresupuestoProyecto.capex_aprobado),
+                func.sum(PresupuestoProyecto.capex_comprometido),
+                func.sum(PresupuestoProyecto.capex_ejecutado),
+                func.sum(PresupuestoProyecto.opex_proyectado_anual)
+            ).join(Proyecto).where(filtro_año)
+        )).first()
 
         # Semáforo consolidado
-        semaforo_stats = dict(
-            db.query(Proyecto.semaforo_salud, func.count(Proyecto.id))
-            .filter(filtro_año, Proyecto.estado == EstadoProyecto.EN_EJECUCION)
+        semaforo_stats = dict((await db.execute(
+            select(Proyecto.semaforo_salud, func.count(Proyecto.id))
+            .where(filtro_año, Proyecto.estado == EstadoProyecto.EN_EJECUCION)
             .group_by(Proyecto.semaforo_salud)
-            .all()
-        )
+        )).all())
 
         return {
             "total_proyectos": sum(proyectos_por_estado.values()),
@@ -59,7 +59,7 @@ class ReportesService:
         }
 
     @staticmethod
-    def obtener_funnel_iniciativas(db: Session) -> Dict:
+    async def obtener_funnel_iniciativas(db: AsyncSession) -> Dict:
         """Obtiene el funnel de iniciativas para el pipeline"""
         estados_funnel = [
             EstadoIniciativa.ENVIADA,
@@ -73,9 +73,9 @@ class ReportesService:
 
         funnel = {}
         for estado in estados_funnel:
-            count = db.query(func.count(Iniciativa.id)).filter(
-                Iniciativa.estado == estado
-            ).scalar()
+            count = await db.scalar(
+                select(func.count(Iniciativa.id)).where(Iniciativa.estado == estado)
+            )
             funnel[estado.value] = count
 
         return {
@@ -84,33 +84,32 @@ class ReportesService:
         }
 
     @staticmethod
-    def obtener_distribucion_clasificacion(db: Session) -> Dict:
+    async def obtener_distribucion_clasificacion(db: AsyncSession) -> Dict:
         """Obtiene distribución por clasificación de inversión"""
-        distribucion = dict(
-            db.query(Iniciativa.clasificacion_inversion, func.count(Iniciativa.id))
-            .filter(Iniciativa.clasificacion_inversion.isnot(None))
+        distribucion = dict((await db.execute(
+            select(Iniciativa.clasificacion_inversion, func.count(Iniciativa.id))
+            .where(Iniciativa.clasificacion_inversion.isnot(None))
             .group_by(Iniciativa.clasificacion_inversion)
-            .all()
-        )
+        )).all())
 
         return {k.value: v for k, v in distribucion.items()}
 
     @staticmethod
-    def obtener_proyectos_criticos(db: Session, limite: int = 5) -> List[Dict]:
+    async def obtener_proyectos_criticos(db: AsyncSession, limite: int = 5) -> List[Dict]:
         """Obtiene los proyectos más críticos (en riesgo)"""
-        proyectos = db.query(Proyecto).filter(
-            Proyecto.estado == EstadoProyecto.EN_EJECUCION,
-            Proyecto.semaforo_salud.in_([SemaforoSalud.AMARILLO, SemaforoSalud.ROJO])
-        ).order_by(
-            Proyecto.semaforo_salud.desc()
-        ).limit(limite).all()
+        filas = (await db.execute(
+            select(Proyecto, PresupuestoProyecto)
+            .outerjoin(PresupuestoProyecto, PresupuestoProyecto.proyecto_id == Proyecto.id)
+            .where(
+                Proyecto.estado == EstadoProyecto.EN_EJECUCION,
+                Proyecto.semaforo_salud.in_([SemaforoSalud.AMARILLO, SemaforoSalud.ROJO])
+            ).order_by(
+                Proyecto.semaforo_salud.desc()
+            ).limit(limite)
+        )).all()
 
         resultado = []
-        for p in proyectos:
-            presupuesto = db.query(PresupuestoProyecto).filter(
-                PresupuestoProyecto.proyecto_id == p.id
-            ).first()
-
+        for p, presupuesto in filas:
             desviacion = 0
             if presupuesto and presupuesto.capex_aprobado > 0:
                 desviacion = float(
@@ -130,49 +129,53 @@ class ReportesService:
         return resultado
 
     @staticmethod
-    def obtener_banco_reserva_stats(db: Session) -> Dict:
+    async def obtener_banco_reserva_stats(db: AsyncSession) -> Dict:
         """Obtiene estadísticas del banco de reserva"""
-        proyectos = db.query(Proyecto).join(Iniciativa).filter(
-            Proyecto.estado == EstadoProyecto.BANCO_RESERVA
-        ).all()
+        filas = (await db.execute(
+            select(Iniciativa.prioridad, Proyecto.presupuesto_asignado)
+            .select_from(Proyecto).join(Iniciativa)
+            .where(Proyecto.estado == EstadoProyecto.BANCO_RESERVA)
+        )).all()
 
         por_prioridad = {}
         monto_total = Decimal(0)
 
-        for p in proyectos:
-            prioridad = p.iniciativa.prioridad.value if p.iniciativa.prioridad else "sin_prioridad"
+        for prioridad_ini, presupuesto_asignado in filas:
+            prioridad = prioridad_ini.value if prioridad_ini else "sin_prioridad"
             if prioridad not in por_prioridad:
                 por_prioridad[prioridad] = {"cantidad": 0, "monto": 0}
             por_prioridad[prioridad]["cantidad"] += 1
-            por_prioridad[prioridad]["monto"] += float(p.presupuesto_asignado or 0)
-            monto_total += p.presupuesto_asignado or Decimal(0)
+            por_prioridad[prioridad]["monto"] += float(presupuesto_asignado or 0)
+            monto_total += presupuesto_asignado or Decimal(0)
 
         return {
-            "total_proyectos": len(proyectos),
+            "total_proyectos": len(filas),
             "monto_total": float(monto_total),
             "por_prioridad": por_prioridad
         }
 
     @staticmethod
-    def obtener_ejecucion_presupuestaria(
-        db: Session,
+    async def obtener_ejecucion_presupuestaria(
+        db: AsyncSession,
         año: int,
         agrupacion: str = "mensual"
     ) -> Dict:
         """Obtiene la ejecución presupuestaria por período"""
         from ..models.proyecto import EjecucionMensual
 
-        query = db.query(
-            EjecucionMensual.mes,
-            func.sum(EjecucionMensual.capex_planificado),
-            func.sum(EjecucionMensual.capex_ejecutado)
-        ).filter(
-            EjecucionMensual.año == año
-        ).group_by(
-            EjecucionMensual.mes
-        ).order_by(
-            EjecucionMensual.mes
-        ).all()
+        query = (await db.execute(
+            select(
+                EjecucionMensual.mes,
+                func.sum(EjecucionMensual.capex_planificado),
+                func.sum(EjecucionMensual.capex_ejecutado)
+            ).where(
+                EjecucionMensual.año == año
+            ).group_by(
+                EjecucionMensual.mes
+            ).order_by(
+                EjecucionMensual.mes
+            )
+        )).all()
 
         datos = []
         acum_plan = 0
@@ -193,7 +196,7 @@ class ReportesService:
             })
 
         # Plan anual
-        plan_anual = db.query(PlanAnual).filter(PlanAnual.año == año).first()
+        plan_anual = await db.scalar(select(PlanAnual).where(PlanAnual.año == año))
 
         return {
             "año": año,
@@ -205,16 +208,16 @@ class ReportesService:
         }
 
     @staticmethod
-    def obtener_dashboard_ejecutivo(db: Session, año: Optional[int] = None) -> Dict:
+    async def obtener_dashboard_ejecutivo(db: AsyncSession, año: Optional[int] = None) -> Dict:
         """Genera el dashboard ejecutivo completo"""
         año_actual = año or datetime.now().year
 
         return {
-            "kpis": ReportesService.obtener_kpis_portfolio(db, año_actual),
-            "funnel": ReportesService.obtener_funnel_iniciativas(db),
-            "distribucion_clasificacion": ReportesService.obtener_distribucion_clasificacion(db),
-            "proyectos_criticos": ReportesService.obtener_proyectos_criticos(db),
-            "banco_reserva": ReportesService.obtener_banco_reserva_stats(db),
-            "ejecucion": ReportesService.obtener_ejecucion_presupuestaria(db, año_actual),
+            "kpis": await ReportesService.obtener_kpis_portfolio(db, año_actual),
+            "funnel": await ReportesService.obtener_funnel_iniciativas(db),
+            "distribucion_clasificacion": await ReportesService.obtener_distribucion_clasificacion(db),
+            "proyectos_criticos": await ReportesService.obtener_proyectos_criticos(db),
+            "banco_reserva": await ReportesService.obtener_banco_reserva_stats(db),
+            "ejecucion": await ReportesService.obtener_ejecucion_presupuestaria(db, año_actual),
             "fecha_generacion": datetime.utcnow().isoformat()
         }
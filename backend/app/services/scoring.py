@@ -1,6 +1,7 @@
 from decimal import Decimal
-from typing import Optional, Tuple
-from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, case, func, literal, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.iniciativa import (
     Iniciativa, ScoringIniciativa, Prioridad,
@@ -8,10 +9,24 @@ from ..models.iniciativa import (
 )
 from ..config import settings
 
+PRIORIDADES = list(Prioridad)
+
+# (monto mayor que, transformación menor que, clasificación, tipo de informe)
+ReglaClasificacion = Tuple[Optional[float], Optional[int], ClasificacionInversion, TipoInforme]
+
 
 class ScoringService:
     """Servicio para calcular el scoring automático de iniciativas"""
 
+    # Puntaje máximo de cada dimensión (38 en total)
+    TOPES_DIMENSIONES = {
+        "dim_a_focos": 4, "dim_a_profundidad": 8,
+        "dim_b_beneficio": 6, "dim_b_alcance": 4,
+        "dim_c_urgencia": 8, "dim_c_viabilidad": 8,
+    }
+    # Puntaje mínimo de P1..P4 (bajo el último, P5)
+    CORTES_PRIORIDAD = (32, 25, 18, 11)
+
     @staticmethod
     def calcular_prioridad(puntaje_total: int) -> Prioridad:
         """
@@ -22,46 +37,76 @@ class ScoringService:
         P4: 11-17 puntos (Baja)
         P5: 0-10 puntos (Muy Baja)
         """
-        if puntaje_total >= 32:
-            return Prioridad.P1
-        elif puntaje_total >= 25:
-            return Prioridad.P2
-        elif puntaje_total >= 18:
-            return Prioridad.P3
-        elif puntaje_total >= 11:
-            return Prioridad.P4
-        else:
-            return Prioridad.P5
+        for minimo, prioridad in zip(ScoringService.CORTES_PRIORIDAD, PRIORIDADES):
+            if puntaje_total >= minimo:
+                return prioridad
+        return Prioridad.P5
 
     @staticmethod
+    def reglas_clasificacion() -> List[ReglaClasificacion]:
+        """
+        Reglas de clasificación de inversión en orden (gana la primera que se
+        cumple): (monto mayor que, transformación menor que, clasificación,
+        tipo de informe); None = sin condición. Son la única definición: la
+        usan el cálculo por iniciativa y la reclasificación masiva (CASE).
+        """
+        umbral_estandar = settings.UMBRAL_ESTANDAR
+        umbral_alta = settings.UMBRAL_ALTA
+        return [
+            # Estratégica (> 1500M)
+            (umbral_alta, None, ClasificacionInversion.ESTRATEGICA, TipoInforme.V3),
+            # Alta inversión (300M - 1500M): < 25%, 25-75%, > 75% de transformación
+            (umbral_estandar, 25, ClasificacionInversion.ALTA_A, TipoInforme.V2),
+            (umbral_estandar, 76, ClasificacionInversion.ALTA_B, TipoInforme.V2),
+            (umbral_estandar, None, ClasificacionInversion.ALTA_C, TipoInforme.V2),
+            # Estándar (< 300M)
+            (None, 50, ClasificacionInversion.ESTANDAR_A, TipoInforme.V1),
+            (None, None, ClasificacionInversion.ESTANDAR_B, TipoInforme.V1),
+        ]
+
+    @classmethod
     def calcular_clasificacion_inversion(
+        cls,
         monto: Decimal,
         porcentaje_transformacion: int
     ) -> Tuple[ClasificacionInversion, TipoInforme]:
         """
         Clasifica la inversión según monto y porcentaje de transformación
         """
-        monto_float = float(monto)
-        umbral_estandar = settings.UMBRAL_ESTANDAR
-        umbral_alta = settings.UMBRAL_ALTA
+        monto_float = float(monto or 0)
+        transformacion = porcentaje_transformacion or 0
 
-        if monto_float > umbral_alta:
-            # Estratégica (> 1500M)
-            return ClasificacionInversion.ESTRATEGICA, TipoInforme.V3
-        elif monto_float > umbral_estandar:
-            # Alta inversión (300M - 1500M)
-            if porcentaje_transformacion < 25:
-                return ClasificacionInversion.ALTA_A, TipoInforme.V2
-            elif porcentaje_transformacion <= 75:
-                return ClasificacionInversion.ALTA_B, TipoInforme.V2
-            else:
-                return ClasificacionInversion.ALTA_C, TipoInforme.V2
-        else:
-            # Estándar (< 300M)
-            if porcentaje_transformacion < 50:
-                return ClasificacionInversion.ESTANDAR_A, TipoInforme.V1
-            else:
-                return ClasificacionInversion.ESTANDAR_B, TipoInforme.V1
+        for monto_minimo, transformacion_maxima, clasificacion, tipo_informe in cls.reglas_clasificacion():
+            if (monto_minimo is None or monto_float > monto_minimo) and \
+                    (transformacion_maxima is None or transformacion < transformacion_maxima):
+                return clasificacion, tipo_informe
+
+    @classmethod
+    def expresiones_clasificacion(cls):
+        """Las mismas reglas como CASE SQL sobre las columnas de Iniciativa: (clasificación, tipo de informe)"""
+        monto = func.coalesce(Iniciativa.monto_estimado, 0)
+        transformacion = func.coalesce(Iniciativa.porcentaje_transformacion, 0)
+        tipo_clasificacion = Iniciativa.clasificacion_inversion.type
+        tipo_informe = Iniciativa.tipo_informe.type
+
+        *reglas, (_, _, clasificacion_final, informe_final) = cls.reglas_clasificacion()
+        condiciones = [
+            and_(
+                true(),
+                *([monto > monto_minimo] if monto_minimo is not None else []),
+                *([transformacion < transformacion_maxima] if transformacion_maxima is not None else [])
+            )
+            for monto_minimo, transformacion_maxima, _, _ in reglas
+        ]
+        clasificacion = case(
+            *[(condicion, literal(regla[2], tipo_clasificacion)) for condicion, regla in zip(condiciones, reglas)],
+            else_=literal(clasificacion_final, tipo_clasificacion)
+        )
+        informe = case(
+            *[(condicion, literal(regla[3], tipo_informe)) for condicion, regla in zip(condiciones, reglas)],
+            else_=literal(informe_final, tipo_informe)
+        )
+        return clasificacion, informe
 
     @staticmethod
     def calcular_scoring(scoring: ScoringIniciativa) -> int:
@@ -72,16 +117,15 @@ class ScoringService:
         - Dimensión B (Impacto Operacional): 0-10 pts
         - Dimensión C (Urgencia y Viabilidad): 0-16 pts
         """
-        dim_a_total = min(scoring.dim_a_focos, 4) + min(scoring.dim_a_profundidad, 8)
-        dim_b_total = min(scoring.dim_b_beneficio, 6) + min(scoring.dim_b_alcance, 4)
-        dim_c_total = min(scoring.dim_c_urgencia, 8) + min(scoring.dim_c_viabilidad, 8)
-
-        return dim_a_total + dim_b_total + dim_c_total
+        return sum(
+            min(getattr(scoring, dimension) or 0, tope)
+            for dimension, tope in ScoringService.TOPES_DIMENSIONES.items()
+        )
 
     @classmethod
-    def procesar_iniciativa(
+    async def procesar_iniciativa(
         cls,
-        db: Session,
+        db: AsyncSession,
         iniciativa: Iniciativa,
         scoring_data: Optional[dict] = None
     ) -> Iniciativa:
@@ -98,7 +142,9 @@ class ScoringService:
 
         # Si hay datos de scoring, calcular
         if scoring_data:
-            scoring = iniciativa.scoring
+            scoring = await db.scalar(
+                select(ScoringIniciativa).where(ScoringIniciativa.iniciativa_id == iniciativa.id)
+            )
             if not scoring:
                 scoring = ScoringIniciativa(iniciativa_id=iniciativa.id)
                 db.add(scoring)
@@ -117,8 +163,8 @@ class ScoringService:
             iniciativa.puntaje_total = puntaje
             iniciativa.prioridad = scoring.prioridad_calculada
 
-        db.commit()
-        db.refresh(iniciativa)
+        await db.commit()
+        await db.refresh(iniciativa)
 
         return iniciativa
 
@@ -0,0 +1,161 @@
+"""
+Scoring por lotes para las sesiones de revisión de los analistas.
+
+POST /api/iniciativas/{id}/scoring procesa una iniciativa por petición, con
+dos commits y dos refresh. Aquí un lote completo usa un número fijo de
+sentencias, sin importar su tamaño:
+- una consulta con los datos de todas las iniciativas del lote;
+- puntaje, prioridad y clasificación calculados en Python con las reglas de
+  ScoringService;
+- un upsert (executemany) de ScoringIniciativa por iniciativa_id y un UPDATE
+  por clave (executemany) de los totales de cada iniciativa;
+- un UPDATE ... RETURNING que pasa a EN_REVISION las que siguen ENVIADA, su
+  historial en un executemany y sus tiempos en un solo WorkflowService.acumular.
+El llamador confirma una vez. Las iniciativas inexistentes o repetidas en el
+lote se informan como error sin afectar al resto.
+"""
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import engine
+from ..models.iniciativa import (
+    Iniciativa, EstadoIniciativa, HistorialEstadoIniciativa, ScoringIniciativa
+)
+from ..schemas.iniciativa import ScoringIniciativaCreate, ResultadoScoringItem
+from .scoring import ScoringService
+from .workflow import WorkflowService
+
+COMENTARIO_EN_REVISION = "Scoring registrado, en revisión"
+
+
+def _sentencia_upsert():
+    tabla = ScoringIniciativa.__table__
+    insertar = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+    sentencia = insertar(tabla)
+    return sentencia.on_conflict_do_update(
+        index_elements=[tabla.c.iniciativa_id],
+        set_={
+            columna: sentencia.excluded[columna]
+            for columna in (
+                *ScoringService.TOPES_DIMENSIONES, "puntaje_total", "prioridad_calculada",
+                "calculado_por", "fecha_calculo"
+            )
+        }
+    )
+
+
+class ScoringLoteService:
+    """Scoring de muchas iniciativas con sentencias por conjunto y un solo commit"""
+
+    @staticmethod
+    async def procesar(
+        db: AsyncSession,
+        scorings: List[ScoringIniciativaCreate],
+        usuario_id: int
+    ) -> List[ResultadoScoringItem]:
+        """
+        Guarda los scorings del lote y mueve a EN_REVISION las iniciativas
+        ENVIADA, sin confirmar (el commit queda a cargo del llamador).
+        Devuelve un resultado por ítem, en el orden recibido.
+        """
+        ahora = datetime.utcnow()
+        ids = list(dict.fromkeys(scoring.iniciativa_id for scoring in scorings))
+        iniciativas = {
+            fila.id: fila for fila in (await db.execute(
+                select(
+                    Iniciativa.id, Iniciativa.estado, Iniciativa.monto_estimado,
+                    Iniciativa.porcentaje_transformacion,
+                    # Para los tiempos de la estadía en ENVIADA (WorkflowService)
+                    Iniciativa.fecha_solicitud, Iniciativa.fecha_ultimo_cambio_estado
+                ).where(Iniciativa.id.in_(ids))
+            )).all()
+        } if ids else {}
+
+        resultados: List[ResultadoScoringItem] = []
+        aceptados: Dict[int, ResultadoScoringItem] = {}
+        filas_scoring, filas_iniciativa = [], []
+        for scoring in scorings:
+            iniciativa = iniciativas.get(scoring.iniciativa_id)
+            if iniciativa is None or scoring.iniciativa_id in aceptados:
+                resultados.append(ResultadoScoringItem(
+                    iniciativa_id=scoring.iniciativa_id, procesado=False,
+                    error="Iniciativa no encontrada" if iniciativa is None else "Iniciativa repetida en el lote"
+                ))
+                continue
+
+            puntaje = ScoringService.calcular_scoring(scoring)
+            prioridad = ScoringService.calcular_prioridad(puntaje)
+            clasificacion, tipo_informe = ScoringService.calcular_clasificacion_inversion(
+                iniciativa.monto_estimado, iniciativa.porcentaje_transformacion
+            )
+            filas_scoring.append({
+                **scoring.model_dump(exclude={"iniciativa_id"}),
+                "iniciativa_id": iniciativa.id,
+                "puntaje_total": puntaje,
+                "prioridad_calculada": prioridad,
+                "calculado_por": usuario_id,
+                "fecha_calculo": ahora,
+            })
+            filas_iniciativa.append({
+                "b_id": iniciativa.id, "b_puntaje": puntaje, "b_prioridad": prioridad,
+                "b_clasificacion": clasificacion, "b_tipo_informe": tipo_informe,
+            })
+            resultado = ResultadoScoringItem(
+                iniciativa_id=iniciativa.id, procesado=True,
+                puntaje_total=puntaje, prioridad_calculada=prioridad, estado=iniciativa.estado
+            )
+            aceptados[iniciativa.id] = resultado
+            resultados.append(resultado)
+
+        if not aceptados:
+            return resultados
+
+        await db.execute(_sentencia_upsert(), filas_scoring)
+        tabla = Iniciativa.__table__
+        await db.execute(
+            update(tabla).where(tabla.c.id == bindparam("b_id")).values(
+                puntaje_total=bindparam("b_puntaje"), prioridad=bindparam("b_prioridad"),
+                clasificacion_inversion=bindparam("b_clasificacion"), tipo_informe=bindparam("b_tipo_informe")
+            ),
+            filas_iniciativa
+        )
+
+        # ENVIADA -> EN_REVISION; RETURNING deja fuera a las que otro proceso
+        # movió entre la lectura y este UPDATE
+        enviadas = [
+            iniciativa_id for iniciativa_id in aceptados
+            if iniciativas[iniciativa_id].estado == EstadoIniciativa.ENVIADA
+        ]
+        if not enviadas:
+            return resultados
+        movidas = list((await db.execute(
+            update(tabla).where(tabla.c.id.in_(enviadas), tabla.c.estado == EstadoIniciativa.ENVIADA)
+            .values(estado=EstadoIniciativa.EN_REVISION, fecha_ultimo_cambio_estado=ahora)
+            .returning(tabla.c.id)
+        )).scalars())
+        if not movidas:
+            return resultados
+
+        for iniciativa_id in movidas:
+            aceptados[iniciativa_id].estado = EstadoIniciativa.EN_REVISION
+            aceptados[iniciativa_id].en_revision = True
+        await WorkflowService.acumular(db, await WorkflowService.duraciones_transiciones(db, [
+            (iniciativas[iniciativa_id], EstadoIniciativa.ENVIADA, EstadoIniciativa.EN_REVISION)
+            for iniciativa_id in movidas
+        ], ahora))
+        await db.execute(insert(HistorialEstadoIniciativa), [
+            {
+                "iniciativa_id": iniciativa_id,
+                "estado_anterior": EstadoIniciativa.ENVIADA,
+                "estado_nuevo": EstadoIniciativa.EN_REVISION,
+                "usuario_id": usuario_id,
+                "comentario": COMENTARIO_EN_REVISION,
+                "fecha": ahora,
+            }
+            for iniciativa_id in movidas
+        ])
+        return resultados
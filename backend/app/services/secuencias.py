@@ -0,0 +1,121 @@
+"""
+Códigos correlativos por año (INI-2026-0042, PRY-2026-0007).
+
+Cada prefijo y año tiene una fila en la tabla secuencias que se incrementa
+con un upsert atómico (INSERT ... ON CONFLICT DO UPDATE valor = valor + n
+RETURNING valor): dos altas simultáneas nunca reciben el mismo número, y el
+costo no depende de cuántos códigos tenga el año (antes: LIKE 'INI-2026-%' y
+el máximo en Python). La fila queda bloqueada hasta el commit de quien
+reserva, así que las altas del mismo año se serializan solo en ese punto; si
+la transacción se revierte, el número vuelve a quedar libre.
+
+Las cargas que escriben códigos explícitos (carga masiva, portfolio de
+benchmarks) llaman a sincronizar() para que las secuencias continúen desde
+el mayor código existente. La migración 0008 hace lo mismo al crear la tabla.
+"""
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import case, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import engine
+from ..models.iniciativa import Iniciativa
+from ..models.proyecto import Proyecto
+from ..models.secuencia import Secuencia
+
+PREFIJO_INICIATIVA = "INI"
+PREFIJO_PROYECTO = "PRY"
+# Debe coincidir con el de la migración 0008
+PATRON_CODIGO = re.compile(r"^(INI|PRY)-(\d{4})-(\d+)$")
+
+
+def nombre_secuencia(prefijo: str, año: int) -> str:
+    return f"{prefijo}-{año}"
+
+
+def formatear_codigo(prefijo: str, año: int, numero: int) -> str:
+    return f"{prefijo}-{año}-{numero:04d}"
+
+
+def _insertar(dialecto: str):
+    tabla = Secuencia.__table__
+    return (postgresql.insert if dialecto == "postgresql" else sqlite.insert)(tabla), tabla
+
+
+def sentencia_reserva(dialecto: str, nombre: str, cantidad: int = 1):
+    """Suma cantidad a la secuencia (creándola si no existe) y devuelve el nuevo valor"""
+    sentencia, tabla = _insertar(dialecto)
+    sentencia = sentencia.values(nombre=nombre, valor=cantidad)
+    return sentencia.on_conflict_do_update(
+        index_elements=[tabla.c.nombre],
+        set_={"valor": tabla.c.valor + sentencia.excluded.valor}
+    ).returning(tabla.c.valor)
+
+
+def sentencia_ajuste(dialecto: str):
+    """Lleva cada secuencia (executemany de {nombre, valor}) al menos hasta el valor dado"""
+    sentencia, tabla = _insertar(dialecto)
+    return sentencia.on_conflict_do_update(
+        index_elements=[tabla.c.nombre],
+        set_={"valor": case(
+            (tabla.c.valor < sentencia.excluded.valor, sentencia.excluded.valor), else_=tabla.c.valor
+        )}
+    )
+
+
+def reservar_rango(conexion, prefijo: str, año: int, cantidad: int) -> range:
+    """Reserva cantidad números seguidos con una conexión síncrona (cargas por lotes)"""
+    ultimo = conexion.execute(
+        sentencia_reserva(conexion.dialect.name, nombre_secuencia(prefijo, año), cantidad)
+    ).scalar_one()
+    return range(ultimo - cantidad + 1, ultimo + 1)
+
+
+def sincronizar(conexion) -> int:
+    """
+    Avanza las secuencias hasta el mayor código INI-/PRY- existente de cada
+    año (nunca las retrocede). Devuelve cuántas secuencias se revisaron.
+    """
+    maximos: Dict[Tuple[str, int], int] = defaultdict(int)
+    for columna in (Iniciativa.codigo, Proyecto.codigo_proyecto):
+        for codigo in conexion.scalars(select(columna).where(columna.is_not(None))):
+            coincidencia = PATRON_CODIGO.match(codigo)
+            if coincidencia:
+                prefijo, año, numero = coincidencia.groups()
+                clave = (prefijo, int(año))
+                maximos[clave] = max(maximos[clave], int(numero))
+    if maximos:
+        conexion.execute(sentencia_ajuste(conexion.dialect.name), [
+            {"nombre": nombre_secuencia(prefijo, año), "valor": valor}
+            for (prefijo, año), valor in maximos.items()
+        ])
+    return len(maximos)
+
+
+class SecuenciasService:
+    """Reserva de números correlativos para los códigos de iniciativas y proyectos"""
+
+    @staticmethod
+    async def reservar(db: AsyncSession, nombre: str, cantidad: int = 1) -> int:
+        """Reserva cantidad números de la secuencia y devuelve el último"""
+        return (await db.execute(sentencia_reserva(engine.dialect.name, nombre, cantidad))).scalar_one()
+
+    @staticmethod
+    async def siguiente_codigo(db: AsyncSession, prefijo: str, año: Optional[int] = None) -> str:
+        año = año or datetime.now().year
+        numero = await SecuenciasService.reservar(db, nombre_secuencia(prefijo, año))
+        return formatear_codigo(prefijo, año, numero)
+
+    @staticmethod
+    async def codigo_iniciativa(db: AsyncSession, año: Optional[int] = None) -> str:
+        """INI-AAAA-NNNN"""
+        return await SecuenciasService.siguiente_codigo(db, PREFIJO_INICIATIVA, año)
+
+    @staticmethod
+    async def codigo_proyecto(db: AsyncSession, año: Optional[int] = None) -> str:
+        """PRY-AAAA-NNNN"""
+        return await SecuenciasService.siguiente_codigo(db, PREFIJO_PROYECTO, año)
@@ -0,0 +1,184 @@
+"""
+Simulación del scoring sobre toda la base ("¿qué pasa si la Dimensión A pesa
+más?").
+
+Carga las dimensiones de todos los ScoringIniciativa en arreglos NumPy (una
+consulta por columnas de tabla, sin la carga del ORM) y aplica topes, pesos y
+cortes de prioridad dados por el llamador de forma vectorizada: puntaje =
+Σ peso · min(dimensión, tope) y la prioridad por searchsorted sobre los
+cortes. Compara contra las reglas vigentes de ScoringService
+(TOPES_DIMENSIONES, CORTES_PRIORIDAD) calculadas igual, de modo que la
+diferencia refleja solo los parámetros simulados. No escribe en la base.
+
+El ranking del banco de reserva ordena por prioridad (como la simulación del
+plan anual) y desempata por puntaje e id; los proyectos sin scoring no se
+incluyen.
+"""
+from itertools import chain
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.iniciativa import Iniciativa, ScoringIniciativa
+from ..models.proyecto import Proyecto, EstadoProyecto
+from .scoring import ScoringService, PRIORIDADES
+
+DIMENSIONES = tuple(ScoringService.TOPES_DIMENSIONES)
+
+
+def _prioridades(np, puntajes, cortes: Sequence[float]):
+    """Índice 0..4 (P1..P5) de cada puntaje; cortes = mínimos de P1..P4, descendentes"""
+    ascendentes = np.asarray(sorted(cortes), dtype=np.float64)
+    return len(cortes) - np.searchsorted(ascendentes, puntajes, side="right")
+
+
+def _puntajes(np, dimensiones, topes: Dict[str, float], pesos: Dict[str, float]):
+    vector_topes = np.array([topes[d] for d in DIMENSIONES], dtype=np.float64)
+    vector_pesos = np.array([pesos[d] for d in DIMENSIONES], dtype=np.float64)
+    return np.minimum(dimensiones, vector_topes) @ vector_pesos
+
+
+def _ranking(np, prioridades, puntajes, ids):
+    """Posición (1..n) de cada fila ordenando por prioridad, puntaje descendente e id"""
+    orden = np.lexsort((ids, -puntajes, prioridades))
+    posiciones = np.empty(len(orden), dtype=np.int64)
+    posiciones[orden] = np.arange(1, len(orden) + 1)
+    return posiciones
+
+
+def _distribucion(np, prioridades) -> Dict[str, int]:
+    conteos = np.bincount(prioridades, minlength=len(PRIORIDADES))
+    return {prioridad.value: int(conteos[indice]) for indice, prioridad in enumerate(PRIORIDADES)}
+
+
+class SimulacionScoringService:
+    """Escenarios de pesos, topes y cortes de prioridad sobre todos los scorings"""
+
+    @staticmethod
+    async def simular(
+        db: AsyncSession,
+        topes: Optional[Dict[str, float]] = None,
+        pesos: Optional[Dict[str, float]] = None,
+        cortes: Optional[Sequence[float]] = None,
+        limite: int = 50
+    ) -> dict:
+        # NumPy solo se importa al simular (no suma al arranque de la app)
+        import numpy as np
+
+        topes = {**ScoringService.TOPES_DIMENSIONES, **(topes or {})}
+        pesos = {**{d: 1.0 for d in DIMENSIONES}, **(pesos or {})}
+        cortes = list(cortes or ScoringService.CORTES_PRIORIDAD)
+
+        # Columnas de la tabla (no de la entidad): la consulta no pasa por la
+        # carga del ORM y las filas van directo a un arreglo con fromiter.
+        # NULL -> 0, el valor por defecto de las dimensiones
+        tabla = ScoringIniciativa.__table__
+        filas = (await db.execute(
+            select(tabla.c.iniciativa_id, *(func.coalesce(tabla.c[d], 0) for d in DIMENSIONES))
+            .order_by(tabla.c.iniciativa_id)
+        )).all()
+        columnas = len(DIMENSIONES) + 1
+        datos = np.fromiter(
+            chain.from_iterable(filas), dtype=np.float64, count=len(filas) * columnas
+        ).reshape(len(filas), columnas)
+        ids = datos[:, 0].astype(np.int64)
+        dimensiones = datos[:, 1:]
+
+        # Proyectos en banco de reserva, ubicados por id de iniciativa (ids ordenados)
+        proyectos = np.full(len(ids), -1, dtype=np.int64)
+        tabla_proyectos = Proyecto.__table__
+        banco = (await db.execute(
+            select(tabla_proyectos.c.iniciativa_id, tabla_proyectos.c.id)
+            .where(tabla_proyectos.c.estado == EstadoProyecto.BANCO_RESERVA)
+        )).all()
+        # Sin scorings (p. ej. proyectos cargados sin scoring) no hay a quién ubicar
+        if banco and len(ids):
+            iniciativas_banco, ids_proyectos = np.array(banco, dtype=np.int64).T
+            posiciones = np.searchsorted(ids, iniciativas_banco)
+            encontradas = (posiciones < len(ids)) & (ids[np.minimum(posiciones, len(ids) - 1)] == iniciativas_banco)
+            proyectos[posiciones[encontradas]] = ids_proyectos[encontradas]
+
+        puntaje_actual = _puntajes(np, dimensiones, ScoringService.TOPES_DIMENSIONES, {d: 1.0 for d in DIMENSIONES})
+        puntaje_simulado = _puntajes(np, dimensiones, topes, pesos)
+        prioridad_actual = _prioridades(np, puntaje_actual, ScoringService.CORTES_PRIORIDAD)
+        prioridad_simulada = _prioridades(np, puntaje_simulado, cortes)
+
+        cambian = np.flatnonzero(prioridad_actual != prioridad_simulada)
+        transiciones = np.bincount(
+            prioridad_actual[cambian] * len(PRIORIDADES) + prioridad_simulada[cambian],
+            minlength=len(PRIORIDADES) ** 2
+        ).reshape(len(PRIORIDADES), len(PRIORIDADES))
+
+        # Los cambios más grandes primero (saltos de prioridad, luego diferencia de puntaje)
+        salto = np.abs(prioridad_actual[cambian] - prioridad_simulada[cambian])
+        diferencia = np.abs(puntaje_simulado[cambian] - puntaje_actual[cambian])
+        destacados = cambian[np.lexsort((ids[cambian], -diferencia, -salto))[:limite]]
+
+        # Banco de reserva: posición con las prioridades actuales y simuladas
+        en_banco = np.flatnonzero(proyectos >= 0)
+        posicion_actual = _ranking(np, prioridad_actual[en_banco], puntaje_actual[en_banco], ids[en_banco])
+        posicion_simulada = _ranking(np, prioridad_simulada[en_banco], puntaje_simulado[en_banco], ids[en_banco])
+        movimiento = posicion_actual - posicion_simulada
+        movidos = np.flatnonzero(movimiento)
+        movidos = movidos[np.lexsort((posicion_actual[movidos], -np.abs(movimiento[movidos])))[:limite]]
+
+        # Datos descriptivos solo de las filas que se devuelven
+        ids_iniciativas = {int(ids[i]) for i in destacados} | {int(ids[en_banco[i]]) for i in movidos}
+        descripciones = {}
+        if ids_iniciativas:
+            descripciones = {
+                fila.id: fila for fila in (await db.execute(
+                    select(Iniciativa.id, Iniciativa.codigo, Iniciativa.titulo, Proyecto.codigo_proyecto)
+                    .outerjoin(Proyecto, Proyecto.iniciativa_id == Iniciativa.id)
+                    .where(Iniciativa.id.in_(ids_iniciativas))
+                )).all()
+            }
+
+        def iniciativa(indice: int) -> dict:
+            fila = descripciones.get(int(ids[indice]))
+            return {
+                "iniciativa_id": int(ids[indice]),
+                "codigo": fila.codigo if fila else None,
+                "titulo": fila.titulo if fila else None,
+                "puntaje_actual": round(float(puntaje_actual[indice]), 2),
+                "puntaje_simulado": round(float(puntaje_simulado[indice]), 2),
+                "prioridad_actual": PRIORIDADES[prioridad_actual[indice]].value,
+                "prioridad_simulada": PRIORIDADES[prioridad_simulada[indice]].value,
+            }
+
+        proyectos_movidos: List[dict] = []
+        for i in movidos:
+            indice = en_banco[i]
+            fila = descripciones.get(int(ids[indice]))
+            proyectos_movidos.append({
+                **iniciativa(indice),
+                "proyecto_id": int(proyectos[indice]),
+                "codigo_proyecto": fila.codigo_proyecto if fila else None,
+                "posicion_actual": int(posicion_actual[i]),
+                "posicion_simulada": int(posicion_simulada[i]),
+            })
+
+        return {
+            "parametros": {"topes": topes, "pesos": pesos, "cortes": cortes, "limite": limite},
+            "total_iniciativas": len(ids),
+            "distribucion_actual": _distribucion(np, prioridad_actual),
+            "distribucion_simulada": _distribucion(np, prioridad_simulada),
+            "cambian_prioridad": len(cambian),
+            "transiciones": [
+                {"desde": PRIORIDADES[desde].value, "hacia": PRIORIDADES[hacia].value, "cantidad": int(cantidad)}
+                for (desde, hacia), cantidad in np.ndenumerate(transiciones) if cantidad
+            ],
+            "iniciativas": [iniciativa(indice) for indice in destacados],
+            "banco_reserva": {
+                "total": len(en_banco),
+                "cambian_prioridad": int(np.count_nonzero(
+                    prioridad_actual[en_banco] != prioridad_simulada[en_banco]
+                )),
+                "suben": int(np.count_nonzero(movimiento > 0)),
+                "bajan": int(np.count_nonzero(movimiento < 0)),
+                "distribucion_actual": _distribucion(np, prioridad_actual[en_banco]),
+                "distribucion_simulada": _distribucion(np, prioridad_simulada[en_banco]),
+                "proyectos": proyectos_movidos,
+            },
+        }
@@ -0,0 +1,310 @@
+"""
+Cambios de estado de iniciativas y tiempos del workflow (lead times).
+
+Cada cambio de estado queda en el historial y, a la vez, acumula en
+metricas_tiempos_workflow la duración de lo que termina con él:
+- la estadía en el estado anterior (desde fecha_ultimo_cambio_estado), y
+- al pasar a APROBADA, el tiempo desde el primer envío (ENVIADA).
+La acumulación es por año de solicitud, tramo y cubeta de duración (cantidad
+y suma de horas), con un upsert que suma en la base. Las métricas leen esas
+pocas filas en vez de recorrer el historial: el costo no crece con él. Los
+percentiles se estiman dentro de la cubeta (error acotado por su ancho).
+
+La migración 0007 reconstruye el histograma del historial existente, y
+reconstruir_tiempos() hace lo mismo tras cargas que escriben el historial
+directamente.
+
+TRANSICIONES es el grafo del workflow: lo validan los endpoints de cada paso
+(enviar, aprobar revisión, cerrar evaluación) y el cambio manual de estado,
+individual o por lotes (el administrador puede saltarlo).
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import engine
+from ..models.iniciativa import (
+    Iniciativa, EstadoIniciativa, HistorialEstadoIniciativa, MetricaTiempoWorkflow
+)
+
+# Límites superiores de las cubetas, en horas (la última cubeta queda abierta);
+# deben coincidir con los de la migración 0007
+CUBETAS_HORAS = (
+    1, 4, 8, 24, 48, 72, 120, 168, 240, 336, 504, 720,
+    1080, 1440, 2160, 2880, 4320, 8760
+)
+TRAMO_APROBACION = "aprobacion"
+
+# Estados a los que se puede pasar desde cada estado
+TRANSICIONES: Dict[EstadoIniciativa, FrozenSet[EstadoIniciativa]] = {
+    EstadoIniciativa.BORRADOR: frozenset({EstadoIniciativa.ENVIADA}),
+    EstadoIniciativa.ENVIADA: frozenset({EstadoIniciativa.EN_REVISION, EstadoIniciativa.RECHAZADA}),
+    EstadoIniciativa.EN_REVISION: frozenset({EstadoIniciativa.EN_EVALUACION, EstadoIniciativa.RECHAZADA}),
+    EstadoIniciativa.EN_EVALUACION: frozenset({EstadoIniciativa.APROBADA, EstadoIniciativa.RECHAZADA}),
+    EstadoIniciativa.APROBADA: frozenset({EstadoIniciativa.EN_BANCO_RESERVA}),
+    EstadoIniciativa.EN_BANCO_RESERVA: frozenset({EstadoIniciativa.EN_PLAN_ANUAL}),
+    EstadoIniciativa.EN_PLAN_ANUAL: frozenset({EstadoIniciativa.ACTIVADA}),
+    EstadoIniciativa.ACTIVADA: frozenset(),
+    EstadoIniciativa.RECHAZADA: frozenset({EstadoIniciativa.BORRADOR}),  # Permitir reabrir
+}
+
+# (año, tramo, horas)
+Duracion = Tuple[int, str, float]
+
+
+def cubeta(horas: float) -> int:
+    return bisect_right(CUBETAS_HORAS, horas)
+
+
+def percentil(cubetas: Dict[int, Tuple[int, float]], porcentaje: float) -> Optional[float]:
+    """
+    Percentil en horas de un histograma {cubeta: (cantidad, suma_horas)}.
+    Dentro de la cubeta se interpola suponiendo valores uniformes desde su
+    límite inferior con el promedio observado (tope: el límite superior), lo
+    que también resuelve la última cubeta, abierta.
+    """
+    total = sum(cantidad for cantidad, _ in cubetas.values())
+    if not total:
+        return None
+    objetivo = total * porcentaje / 100
+    acumulado = 0
+    for indice in sorted(cubetas):
+        cantidad, suma = cubetas[indice]
+        if cantidad and acumulado + cantidad >= objetivo:
+            inferior = CUBETAS_HORAS[indice - 1] if indice else 0.0
+            superior = CUBETAS_HORAS[indice] if indice < len(CUBETAS_HORAS) else float("inf")
+            ancho = max(min(superior, 2 * suma / cantidad - inferior) - inferior, 0.0)
+            return inferior + ancho * (objetivo - acumulado) / cantidad
+        acumulado += cantidad
+    return None
+
+
+def transicion_permitida(desde: Optional[EstadoIniciativa], hacia: EstadoIniciativa) -> bool:
+    return hacia in TRANSICIONES.get(desde, frozenset())
+
+
+def error_cambio_estado(
+    desde: EstadoIniciativa, hacia: EstadoIniciativa, libre: bool = False
+) -> Optional[str]:
+    """
+    Motivo por el que no se puede cambiar manualmente de estado (None si se
+    puede). Con libre=True (administrador) no se valida el grafo, pero el
+    estado tiene que cambiar: un registro X -> X es el marcador de las
+    reclasificaciones y reiniciaría los días en estado.
+    """
+    if hacia == desde:
+        return f"La iniciativa ya está en {desde.value}"
+    if not libre and not transicion_permitida(desde, hacia):
+        return f"No se puede cambiar de {desde.value} a {hacia.value}"
+    return None
+
+
+def _horas(desde: datetime, hasta: datetime) -> float:
+    return max((hasta - desde).total_seconds() / 3600, 0.0)
+
+
+def _filas_histograma(duraciones: Iterable[Duracion]) -> List[dict]:
+    """Duraciones agrupadas por (año, tramo, cubeta), como filas de metricas_tiempos_workflow"""
+    agrupadas: Dict[Tuple[int, str, int], List[float]] = defaultdict(lambda: [0, 0.0])
+    for año, tramo, horas in duraciones:
+        acumulado = agrupadas[(año, tramo, cubeta(horas))]
+        acumulado[0] += 1
+        acumulado[1] += horas
+    return [
+        {"año": año, "tramo": tramo, "cubeta": indice, "cantidad": cantidad, "suma_horas": suma}
+        for (año, tramo, indice), (cantidad, suma) in agrupadas.items()
+    ]
+
+
+def _duraciones_historial(conexion) -> Iterable[Duracion]:
+    """
+    Estadías y tiempos de aprobación de todo el historial (LEAD() por
+    iniciativa). La migración 0007 repite esta reconstrucción: deben
+    mantenerse iguales.
+    """
+    historial = HistorialEstadoIniciativa
+    año = func.coalesce(Iniciativa.fecha_solicitud, Iniciativa.created_at)
+    orden = {"partition_by": historial.iniciativa_id, "order_by": (historial.fecha, historial.id)}
+    estadias = select(
+        historial.iniciativa_id,
+        historial.fecha,
+        func.lead(historial.estado_anterior, type_=historial.estado_anterior.type).over(**orden).label("estado"),
+        func.lead(historial.fecha, type_=historial.fecha.type).over(**orden).label("fin")
+    ).where(
+        historial.fecha.is_not(None),
+        # Registros sin cambio de estado (reclasificaciones) no cortan la estadía
+        or_(historial.estado_anterior.is_(None), historial.estado_anterior != historial.estado_nuevo)
+    ).subquery("estadias")
+    for fecha_año, estado, inicio, fin in conexion.execute(
+        select(año, estadias.c.estado, estadias.c.fecha, estadias.c.fin)
+        .join_from(estadias, Iniciativa, Iniciativa.id == estadias.c.iniciativa_id)
+        .where(estadias.c.fin.is_not(None), estadias.c.estado.is_not(None))
+    ):
+        if fecha_año is not None:
+            yield fecha_año.year, estado.value, _horas(inicio, fin)
+
+    envios = select(
+        historial.iniciativa_id, func.min(historial.fecha).label("envio")
+    ).where(historial.estado_nuevo == EstadoIniciativa.ENVIADA).group_by(historial.iniciativa_id).subquery("envios")
+    for fecha_año, envio, aprobacion in conexion.execute(
+        select(año, envios.c.envio, func.min(historial.fecha))
+        .join_from(envios, historial, historial.iniciativa_id == envios.c.iniciativa_id)
+        .join(Iniciativa, Iniciativa.id == envios.c.iniciativa_id)
+        .where(historial.estado_nuevo == EstadoIniciativa.APROBADA, historial.fecha >= envios.c.envio)
+        .group_by(envios.c.iniciativa_id, año, envios.c.envio)
+    ):
+        if fecha_año is not None:
+            yield fecha_año.year, TRAMO_APROBACION, _horas(envio, aprobacion)
+
+
+def reconstruir_tiempos(conexion) -> int:
+    """
+    Recalcula metricas_tiempos_workflow desde el historial completo, en la
+    transacción de la conexión (síncrona). Devuelve las filas escritas.
+    """
+    filas = _filas_histograma(_duraciones_historial(conexion))
+    conexion.execute(delete(MetricaTiempoWorkflow))
+    if filas:
+        conexion.execute(insert(MetricaTiempoWorkflow), filas)
+    return len(filas)
+
+
+class WorkflowService:
+    """Historial de estados de iniciativas y métricas de tiempos precalculadas"""
+
+    @staticmethod
+    async def registrar_cambio_estado(
+        db: AsyncSession,
+        iniciativa: Iniciativa,
+        estado_anterior: Optional[EstadoIniciativa],
+        estado_nuevo: EstadoIniciativa,
+        usuario_id: int,
+        comentario: str = None
+    ) -> HistorialEstadoIniciativa:
+        """Registra un cambio de estado en el historial y acumula sus tiempos"""
+        ahora = datetime.utcnow()
+        # Antes de agregar el registro: esta transición no cuenta como aprobación previa
+        duraciones = await WorkflowService.duraciones_transicion(db, iniciativa, estado_anterior, estado_nuevo, ahora)
+        await WorkflowService.acumular(db, duraciones)
+
+        historial = HistorialEstadoIniciativa(
+            iniciativa_id=iniciativa.id,
+            estado_anterior=estado_anterior,
+            estado_nuevo=estado_nuevo,
+            usuario_id=usuario_id,
+            comentario=comentario,
+            fecha=ahora
+        )
+        db.add(historial)
+        # Copia desnormalizada para el pipeline (días en el estado actual)
+        iniciativa.fecha_ultimo_cambio_estado = ahora
+        return historial
+
+    @staticmethod
+    async def duraciones_transicion(
+        db: AsyncSession,
+        iniciativa: Iniciativa,
+        estado_anterior: Optional[EstadoIniciativa],
+        estado_nuevo: EstadoIniciativa,
+        ahora: datetime
+    ) -> List[Duracion]:
+        """Duraciones que cierra una transición (estadía anterior y tiempo de aprobación)"""
+        return await WorkflowService.duraciones_transiciones(db, [(iniciativa, estado_anterior, estado_nuevo)], ahora)
+
+    @staticmethod
+    async def duraciones_transiciones(
+        db: AsyncSession,
+        transiciones: Iterable[Tuple[Iniciativa, Optional[EstadoIniciativa], EstadoIniciativa]],
+        ahora: datetime
+    ) -> List[Duracion]:
+        """
+        Duraciones que cierran varias transiciones (iniciativa, anterior,
+        nuevo): la estadía en el estado anterior y, con una consulta agrupada
+        para todas las que pasan a APROBADA, el tiempo de aprobación
+        """
+        duraciones = []
+        años_aprobadas: Dict[int, int] = {}
+        for iniciativa, estado_anterior, estado_nuevo in transiciones:
+            if estado_anterior is None:
+                continue
+            año = (iniciativa.fecha_solicitud or ahora).year
+            if iniciativa.fecha_ultimo_cambio_estado is not None:
+                duraciones.append((año, estado_anterior.value, _horas(iniciativa.fecha_ultimo_cambio_estado, ahora)))
+            if estado_nuevo == EstadoIniciativa.APROBADA:
+                años_aprobadas[iniciativa.id] = año
+
+        if años_aprobadas:
+            # Solo la primera aprobación, medida desde el primer envío
+            historial = HistorialEstadoIniciativa
+            for iniciativa_id, primer_envio, aprobaciones in (await db.execute(
+                select(
+                    historial.iniciativa_id,
+                    func.min(case((historial.estado_nuevo == EstadoIniciativa.ENVIADA, historial.fecha))),
+                    func.count(case((historial.estado_nuevo == EstadoIniciativa.APROBADA, historial.id)))
+                ).where(historial.iniciativa_id.in_(años_aprobadas)).group_by(historial.iniciativa_id)
+            )).all():
+                if primer_envio is not None and not aprobaciones:
+                    duraciones.append((años_aprobadas[iniciativa_id], TRAMO_APROBACION, _horas(primer_envio, ahora)))
+        return duraciones
+
+    @staticmethod
+    async def acumular(db: AsyncSession, duraciones: Iterable[Duracion]) -> None:
+        """
+        Suma las duraciones al histograma con un upsert por (año, tramo,
+        cubeta): INSERT ... ON CONFLICT DO UPDATE cantidad = cantidad + n, sin
+        leer las filas (transiciones concurrentes no se pisan).
+        """
+        filas = _filas_histograma(duraciones)
+        if not filas:
+            return
+
+        tabla = MetricaTiempoWorkflow.__table__
+        insertar = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+        sentencia = insertar(tabla)
+        sentencia = sentencia.on_conflict_do_update(
+            index_elements=[tabla.c.año, tabla.c.tramo, tabla.c.cubeta],
+            set_={
+                "cantidad": tabla.c.cantidad + sentencia.excluded.cantidad,
+                "suma_horas": tabla.c.suma_horas + sentencia.excluded.suma_horas,
+            }
+        )
+        await db.execute(sentencia, filas)
+
+    @staticmethod
+    async def obtener_tiempos(db: AsyncSession, año: Optional[int] = None) -> Dict[str, dict]:
+        """
+        Por tramo: {tramo, cantidad, promedio_dias, p50_dias, p90_dias}, en
+        una consulta sobre el histograma (todas las cohortes o las de un año)
+        """
+        consulta = select(
+            MetricaTiempoWorkflow.tramo,
+            MetricaTiempoWorkflow.cubeta,
+            func.sum(MetricaTiempoWorkflow.cantidad),
+            func.sum(MetricaTiempoWorkflow.suma_horas)
+        ).group_by(MetricaTiempoWorkflow.tramo, MetricaTiempoWorkflow.cubeta)
+        if año:
+            consulta = consulta.where(MetricaTiempoWorkflow.año == año)
+
+        histogramas: Dict[str, Dict[int, Tuple[int, float]]] = defaultdict(dict)
+        for tramo, indice, cantidad, suma in (await db.execute(consulta)).all():
+            histogramas[tramo][indice] = (int(cantidad), float(suma))
+
+        tiempos = {}
+        for tramo, cubetas in histogramas.items():
+            cantidad = sum(c for c, _ in cubetas.values())
+            if not cantidad:
+                continue
+            suma = sum(s for _, s in cubetas.values())
+            tiempos[tramo] = {
+                "tramo": tramo,
+                "cantidad": cantidad,
+                "promedio_dias": round(suma / cantidad / 24, 2),
+                "p50_dias": round(percentil(cubetas, 50) / 24, 2),
+                "p90_dias": round(percentil(cubetas, 90) / 24, 2),
+            }
+        return tiempos
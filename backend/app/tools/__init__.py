@@ -0,0 +1 @@
+# Herramientas de línea de comandos (python -m app.tools.<herramienta>)
@@ -0,0 +1,468 @@
+"""
+Carga masiva de áreas, usuarios, iniciativas, scoring, proyectos y ejecuciones
+desde archivos CSV (con encabezado) o JSON lines (.jsonl / .ndjson).
+
+    python -m app.tools.bulkload --areas areas.csv --usuarios usuarios.jsonl \\
+        --iniciativas iniciativas.csv --scoring scoring.csv \\
+        --proyectos proyectos.csv --ejecuciones ejecuciones.csv
+
+Las referencias pueden venir por id (area_id, created_by, iniciativa_id,
+proyecto_id) o por clave natural (area_codigo, creador_email,
+iniciativa_codigo, proyecto_codigo). Cuando faltan, se derivan el código de
+iniciativa y de proyecto, la clasificación de inversión, el tipo de informe y
+la prioridad, con las mismas reglas que la API.
+
+Todo se carga en una transacción, por lotes (executemany de Core, o COPY en
+PostgreSQL), con los índices secundarios de las tablas cargadas eliminados
+durante la carga y recreados al final. Ante un error no queda nada a medias.
+"""
+import argparse
+import csv
+import enum
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import (
+    Boolean, DateTime, Enum, Integer, Numeric,
+    bindparam, func, insert, literal, null, select, text, update
+)
+from sqlalchemy.exc import IntegrityError
+
+from ..database import engine
+from ..models.usuario import Area, Usuario
+from ..models.iniciativa import Iniciativa, ScoringIniciativa, HistorialEstadoIniciativa
+from ..models.proyecto import Proyecto, EjecucionMensual
+from ..services.scoring import ScoringService
+from ..services.secuencias import (
+    PATRON_CODIGO, PREFIJO_INICIATIVA, PREFIJO_PROYECTO,
+    formatear_codigo, nombre_secuencia, reservar_rango, sentencia_ajuste
+)
+from ..utils.security import get_password_hash
+
+_VERDADERO = {"1", "true", "t", "si", "sí", "s", "yes", "y", "x"}
+_DIMENSIONES_SCORING = tuple(ScoringService.TOPES_DIMENSIONES)
+
+
+class ErrorCarga(Exception):
+    """Fila inválida o referencia inexistente (se informa con archivo y línea)"""
+
+
+def leer_filas(ruta: str) -> Iterator[dict]:
+    """Filas del archivo como diccionarios, según la extensión"""
+    if ruta.lower().endswith((".jsonl", ".ndjson", ".json")):
+        with open(ruta, encoding="utf-8") as archivo:
+            for linea in archivo:
+                if linea.strip():
+                    yield json.loads(linea)
+    else:
+        with open(ruta, encoding="utf-8-sig", newline="") as archivo:
+            yield from csv.DictReader(archivo)
+
+
+def en_lotes(filas: Iterable, tamano: int) -> Iterator[List]:
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def convertir_valor(columna, valor):
+    """Convierte un valor de texto (CSV) o JSON al tipo de la columna"""
+    if valor is None or (isinstance(valor, str) and valor.strip() == ""):
+        return None
+    tipo = columna.type
+    if isinstance(tipo, Enum) and tipo.enum_class is not None:
+        if isinstance(valor, tipo.enum_class):
+            return valor
+        try:
+            return tipo.enum_class(valor)
+        except ValueError:
+            return tipo.enum_class[str(valor).upper()]
+    if isinstance(tipo, Boolean):
+        return valor if isinstance(valor, bool) else str(valor).strip().lower() in _VERDADERO
+    if isinstance(tipo, Integer):
+        return int(Decimal(str(valor)))
+    if isinstance(tipo, Numeric):
+        return Decimal(str(valor))
+    if isinstance(tipo, DateTime):
+        return valor if isinstance(valor, datetime) else datetime.fromisoformat(str(valor).strip())
+    return valor
+
+
+class CargaMasiva:
+    """Estado de una carga: conexión, mapas de claves naturales y contadores"""
+
+    def __init__(self, conexion, tamano_lote: int = 10000, log=print):
+        self.conexion = conexion
+        self.tamano_lote = tamano_lote
+        self.log = log
+        self.usa_copy = conexion.dialect.name == "postgresql"
+        self.resumen: Dict[str, int] = {}
+        self._mapas: Dict[str, dict] = {}
+
+    # ---------- infraestructura ----------
+
+    def _mapa(self, nombre: str, consulta) -> dict:
+        """Clave natural -> id, cargado una vez y descartado al cargar esa tabla"""
+        if nombre not in self._mapas:
+            self._mapas[nombre] = dict(self.conexion.execute(consulta).all())
+        return self._mapas[nombre]
+
+    def _resolver(self, fila: dict, campo_id: str, campo_natural: str, mapa: dict,
+                  descripcion: str, numero: int, obligatorio: bool = True):
+        valor_id = fila.pop(campo_id, None)
+        valor_natural = fila.pop(campo_natural, None)
+        if valor_id not in (None, ""):
+            fila[campo_id] = int(valor_id)
+        elif valor_natural not in (None, ""):
+            if valor_natural not in mapa:
+                raise ErrorCarga(f"fila {numero}: {descripcion} '{valor_natural}' no existe")
+            fila[campo_id] = mapa[valor_natural]
+        elif obligatorio:
+            raise ErrorCarga(f"fila {numero}: falta {campo_id} o {campo_natural}")
+
+    def _preparar(self, tabla, filas: List[dict], inicio: int) -> List[dict]:
+        """Tipos de columna y valores por defecto del modelo, fila a fila"""
+        columnas = tabla.columns
+        preparadas = []
+        for numero, fila in enumerate(filas, start=inicio):
+            desconocidas = set(fila) - set(columnas.keys())
+            if desconocidas:
+                raise ErrorCarga(f"fila {numero}: columnas desconocidas en {tabla.name}: {sorted(desconocidas)}")
+            try:
+                nueva = {nombre: convertir_valor(columnas[nombre], valor) for nombre, valor in fila.items()}
+            except (ValueError, KeyError, ArithmeticError) as error:
+                raise ErrorCarga(f"fila {numero}: valor inválido ({error})") from error
+            # Celdas vacías y columnas ausentes toman el valor por defecto del modelo
+            for columna in columnas:
+                if nueva.get(columna.key) is not None or columna.primary_key or columna.default is None:
+                    continue
+                defecto = columna.default
+                nueva[columna.key] = defecto.arg(None) if defecto.is_callable else defecto.arg
+            preparadas.append(nueva)
+        return preparadas
+
+    def _insertar(self, tabla, filas: List[dict]) -> None:
+        if not filas:
+            return
+        # executemany requiere las mismas claves en todas las filas
+        claves = list(dict.fromkeys(clave for fila in filas for clave in fila))
+        filas = [{clave: fila.get(clave) for clave in claves} for fila in filas]
+        if self.usa_copy:
+            self._copiar(tabla, claves, filas)
+        else:
+            self.conexion.execute(insert(tabla), filas)
+        self.resumen[tabla.name] = self.resumen.get(tabla.name, 0) + len(filas)
+
+    def _copiar(self, tabla, claves: List[str], filas: List[dict]) -> None:
+        """COPY FROM STDIN con psycopg 3 (los Enum se guardan por nombre, como en el ORM)"""
+        preparador = self.conexion.dialect.identifier_preparer
+        columnas = ", ".join(preparador.quote(tabla.columns[clave].name) for clave in claves)
+        cursor = self.conexion.connection.driver_connection.cursor()
+        with cursor.copy(f"COPY {preparador.format_table(tabla)} ({columnas}) FROM STDIN") as copia:
+            for fila in filas:
+                copia.write_row([
+                    valor.name if isinstance(valor, enum.Enum) else valor
+                    for valor in (fila[clave] for clave in claves)
+                ])
+
+    def _cargar(self, ruta: str, tabla, resolver=None, derivar=None) -> None:
+        """
+        Lee por lotes e inserta. resolver(lote, inicio) traduce las claves
+        naturales antes de convertir tipos; derivar(filas) completa columnas
+        calculadas sobre el lote ya convertido.
+        """
+        inicio_carga = time.perf_counter()
+        numero = 2 if not ruta.lower().endswith((".jsonl", ".ndjson", ".json")) else 1
+        for lote in en_lotes(leer_filas(ruta), self.tamano_lote):
+            try:
+                if resolver:
+                    resolver(lote, numero)
+                filas = self._preparar(tabla, lote, numero)
+                if derivar:
+                    derivar(filas)
+            except ErrorCarga as error:
+                raise ErrorCarga(f"{ruta}: {error}") from error
+            self._insertar(tabla, filas)
+            numero += len(lote)
+        self.log(f"  {tabla.name}: {self.resumen.get(tabla.name, 0)} filas "
+                 f"({time.perf_counter() - inicio_carga:.1f}s)")
+
+    # ---------- mapas de claves naturales ----------
+
+    def areas_por_codigo(self) -> dict:
+        return self._mapa("areas", select(Area.codigo, Area.id))
+
+    def usuarios_por_email(self) -> dict:
+        return self._mapa("usuarios", select(Usuario.email, Usuario.id))
+
+    def iniciativas_por_codigo(self) -> dict:
+        return self._mapa("iniciativas", select(Iniciativa.codigo, Iniciativa.id))
+
+    def proyectos_por_codigo(self) -> dict:
+        return self._mapa("proyectos", select(Proyecto.codigo_proyecto, Proyecto.id))
+
+    def _olvidar(self, *nombres: str) -> None:
+        for nombre in nombres:
+            self._mapas.pop(nombre, None)
+
+    def _asignar_codigos(self, filas: List[dict], columna: str, prefijo: str, fechas: List[datetime]) -> None:
+        """
+        Completa los códigos faltantes (PREFIJO-AAAA-NNNN) con un rango de la
+        secuencia de cada año, en una sentencia por año y lote. Los códigos
+        explícitos del lote avanzan antes la secuencia para no repetirlos.
+        """
+        explicitos: Dict[str, int] = {}
+        pendientes: Dict[int, List[dict]] = {}
+        for fila, fecha in zip(filas, fechas):
+            coincidencia = PATRON_CODIGO.match(fila.get(columna) or "")
+            if coincidencia and coincidencia.group(1) == prefijo:
+                nombre = nombre_secuencia(prefijo, int(coincidencia.group(2)))
+                explicitos[nombre] = max(explicitos.get(nombre, 0), int(coincidencia.group(3)))
+            elif not fila.get(columna):
+                pendientes.setdefault(fecha.year, []).append(fila)
+        if explicitos:
+            self.conexion.execute(sentencia_ajuste(self.conexion.dialect.name), [
+                {"nombre": nombre, "valor": valor} for nombre, valor in explicitos.items()
+            ])
+        for año, sin_codigo in pendientes.items():
+            for fila, numero in zip(sin_codigo, reservar_rango(self.conexion, prefijo, año, len(sin_codigo))):
+                fila[columna] = formatear_codigo(prefijo, año, numero)
+
+    # ---------- tablas ----------
+
+    def cargar_areas(self, ruta: str) -> None:
+        self._cargar(ruta, Area.__table__)
+        self._olvidar("areas")
+
+    def cargar_usuarios(self, ruta: str, password_inicial: Optional[str] = None) -> None:
+        def resolver(lote, inicio):
+            areas = self.areas_por_codigo()
+            pendientes = []
+            for numero, fila in enumerate(lote, start=inicio):
+                self._resolver(fila, "area_id", "area_codigo", areas, "área", numero, obligatorio=False)
+                if not fila.get("hashed_password"):
+                    password = fila.pop("password", None) or password_inicial
+                    if not password:
+                        raise ErrorCarga(f"fila {numero}: falta hashed_password o password")
+                    pendientes.append((fila, password))
+                else:
+                    fila.pop("password", None)
+            # bcrypt libera el GIL: los hashes del lote se calculan en paralelo
+            with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as ejecutor:
+                for (fila, _), hash_ in zip(pendientes, ejecutor.map(get_password_hash, [p for _, p in pendientes])):
+                    fila["hashed_password"] = hash_
+
+        self._cargar(ruta, Usuario.__table__, resolver)
+        self._olvidar("usuarios")
+
+    def cargar_iniciativas(self, ruta: str) -> None:
+        tabla = Iniciativa.__table__
+        id_previo = self.conexion.scalar(select(func.coalesce(func.max(Iniciativa.id), 0)))
+
+        def resolver(lote, inicio):
+            areas, usuarios = self.areas_por_codigo(), self.usuarios_por_email()
+            for numero, fila in enumerate(lote, start=inicio):
+                self._resolver(fila, "area_demandante_id", "area_codigo", areas, "área", numero)
+                self._resolver(fila, "created_by", "creador_email", usuarios, "usuario", numero)
+
+        def derivar(filas):
+            # Derivaciones por columna sobre el lote completo
+            ahora = datetime.utcnow()
+            fechas = [fila.get("fecha_solicitud") or ahora for fila in filas]
+            for fila, fecha in zip(filas, fechas):
+                fila["fecha_solicitud"] = fecha
+                # Coincide con la fecha del registro inicial del historial
+                fila["fecha_ultimo_cambio_estado"] = fecha
+            self._asignar_codigos(filas, "codigo", PREFIJO_INICIATIVA, fechas)
+
+            clasificaciones = [
+                ScoringService.calcular_clasificacion_inversion(
+                    fila.get("monto_estimado") or Decimal(0), fila.get("porcentaje_transformacion") or 0
+                ) for fila in filas
+            ]
+            for fila, (clasificacion, tipo_informe) in zip(filas, clasificaciones):
+                fila["clasificacion_inversion"] = fila.get("clasificacion_inversion") or clasificacion
+                fila["tipo_informe"] = fila.get("tipo_informe") or tipo_informe
+
+            for fila in filas:
+                if fila.get("prioridad") is None and fila.get("puntaje_total"):
+                    fila["prioridad"] = ScoringService.calcular_prioridad(fila["puntaje_total"])
+
+        self._cargar(ruta, tabla, resolver, derivar)
+
+        # Estado inicial en el historial, en una sola sentencia
+        historial = HistorialEstadoIniciativa.__table__
+        resultado = self.conexion.execute(
+            insert(historial).from_select(
+                ["iniciativa_id", "estado_anterior", "estado_nuevo", "usuario_id", "comentario", "fecha"],
+                select(
+                    Iniciativa.id, null(), Iniciativa.estado, Iniciativa.created_by,
+                    literal("Carga masiva"), Iniciativa.fecha_solicitud
+                ).where(Iniciativa.id > id_previo)
+            )
+        )
+        self.resumen[historial.name] = self.resumen.get(historial.name, 0) + max(resultado.rowcount, 0)
+        self._olvidar("iniciativas")
+
+    def cargar_scoring(self, ruta: str) -> None:
+        tabla = ScoringIniciativa.__table__
+        actualizaciones = []
+
+        def resolver(lote, inicio):
+            iniciativas, usuarios = self.iniciativas_por_codigo(), self.usuarios_por_email()
+            for numero, fila in enumerate(lote, start=inicio):
+                self._resolver(fila, "iniciativa_id", "iniciativa_codigo", iniciativas, "iniciativa", numero)
+                self._resolver(fila, "calculado_por", "calculado_por_email", usuarios, "usuario", numero,
+                               obligatorio=False)
+
+        def derivar(filas):
+            puntajes = [
+                ScoringService.calcular_scoring(SimpleNamespace(**{d: fila.get(d) or 0 for d in _DIMENSIONES_SCORING}))
+                for fila in filas
+            ]
+            for fila, puntaje in zip(filas, puntajes):
+                fila["puntaje_total"] = puntaje
+                fila["prioridad_calculada"] = ScoringService.calcular_prioridad(puntaje)
+                actualizaciones.append({
+                    "b_id": fila["iniciativa_id"], "b_puntaje": puntaje, "b_prioridad": fila["prioridad_calculada"]
+                })
+
+        self._cargar(ruta, tabla, resolver, derivar)
+
+        # Puntaje y prioridad de la iniciativa, como hace ScoringService.procesar_iniciativa
+        sentencia = update(Iniciativa.__table__).where(Iniciativa.__table__.c.id == bindparam("b_id")).values(
+            puntaje_total=bindparam("b_puntaje"), prioridad=bindparam("b_prioridad")
+        )
+        for lote in en_lotes(actualizaciones, self.tamano_lote):
+            self.conexion.execute(sentencia, lote)
+
+    def cargar_proyectos(self, ruta: str) -> None:
+        def resolver(lote, inicio):
+            iniciativas, usuarios = self.iniciativas_por_codigo(), self.usuarios_por_email()
+            for numero, fila in enumerate(lote, start=inicio):
+                self._resolver(fila, "iniciativa_id", "iniciativa_codigo", iniciativas, "iniciativa", numero)
+                self._resolver(fila, "responsable_id", "responsable_email", usuarios, "usuario", numero,
+                               obligatorio=False)
+
+        def derivar(filas):
+            # Como al aprobar en comité: secuencia PRY del año de alta
+            ahora = datetime.utcnow()
+            fechas = [fila.get("created_at") or ahora for fila in filas]
+            self._asignar_codigos(filas, "codigo_proyecto", PREFIJO_PROYECTO, fechas)
+
+        self._cargar(ruta, Proyecto.__table__, resolver, derivar)
+        self._olvidar("proyectos")
+
+    def cargar_ejecuciones(self, ruta: str) -> None:
+        def resolver(lote, inicio):
+            proyectos = self.proyectos_por_codigo()
+            for numero, fila in enumerate(lote, start=inicio):
+                self._resolver(fila, "proyecto_id", "proyecto_codigo", proyectos, "proyecto", numero)
+
+        self._cargar(ruta, EjecucionMensual.__table__, resolver)
+
+
+def indices_secundarios(tablas) -> list:
+    """Índices no únicos de las tablas (los únicos se mantienen: validan la carga)"""
+    return [indice for tabla in tablas for indice in tabla.indexes if not indice.unique]
+
+
+def ejecutar_carga(archivos: Dict[str, str], tamano_lote: int = 10000, mantener_indices: bool = False,
+                   password_inicial: Optional[str] = None, log=print) -> Dict[str, int]:
+    """Carga los archivos en orden de dependencias dentro de una transacción"""
+    pasos = [
+        ("areas", Area, lambda carga, ruta: carga.cargar_areas(ruta)),
+        ("usuarios", Usuario, lambda carga, ruta: carga.cargar_usuarios(ruta, password_inicial)),
+        ("iniciativas", Iniciativa, lambda carga, ruta: carga.cargar_iniciativas(ruta)),
+        ("scoring", ScoringIniciativa, lambda carga, ruta: carga.cargar_scoring(ruta)),
+        ("proyectos", Proyecto, lambda carga, ruta: carga.cargar_proyectos(ruta)),
+        ("ejecuciones", EjecucionMensual, lambda carga, ruta: carga.cargar_ejecuciones(ruta)),
+    ]
+    pasos = [paso for paso in pasos if archivos.get(paso[0])]
+    tablas = [modelo.__table__ for _, modelo, _ in pasos]
+    if any(nombre == "iniciativas" for nombre, _, _ in pasos):
+        tablas.append(HistorialEstadoIniciativa.__table__)
+
+    indices = [] if mantener_indices else indices_secundarios(tablas)
+    try:
+        with engine.begin() as conexion:
+            for indice in indices:
+                indice.drop(conexion, checkfirst=True)
+            if indices:
+                log(f"  {len(indices)} índices secundarios desactivados")
+
+            carga = CargaMasiva(conexion, tamano_lote, log)
+            for nombre, _, cargar in pasos:
+                cargar(carga, archivos[nombre])
+
+            if conexion.dialect.name == "postgresql":
+                # Los archivos pueden traer ids explícitos: avanzar las secuencias
+                for tabla in tablas:
+                    conexion.execute(text(
+                        f"SELECT setval(pg_get_serial_sequence('{tabla.name}', 'id'), "
+                        f"COALESCE((SELECT MAX(id) FROM {tabla.name}), 1))"
+                    ))
+    finally:
+        # Fuera de la transacción de carga: con pysqlite el DROP INDEX no se
+        # revierte junto con los datos, así que los índices se recrean siempre
+        if indices:
+            inicio = time.perf_counter()
+            with engine.begin() as conexion:
+                for indice in indices:
+                    indice.create(conexion, checkfirst=True)
+            log(f"  índices recreados ({time.perf_counter() - inicio:.1f}s)")
+
+    # Estadísticas del planificador al día tras la carga
+    with engine.begin() as conexion:
+        conexion.execute(text("ANALYZE"))
+
+    return carga.resumen
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.tools.bulkload",
+        description="Carga masiva de datos desde CSV o JSON lines"
+    )
+    for nombre in ("areas", "usuarios", "iniciativas", "scoring", "proyectos", "ejecuciones"):
+        parser.add_argument(f"--{nombre}", metavar="ARCHIVO", help=f"Archivo de {nombre}")
+    parser.add_argument("--lote", type=int, default=10000, help="Filas por inserción (por defecto 10000)")
+    parser.add_argument("--mantener-indices", action="store_true",
+                        help="No desactivar los índices secundarios durante la carga")
+    parser.add_argument("--password-inicial",
+                        help="Contraseña para los usuarios sin hashed_password ni password")
+    args = parser.parse_args(argv)
+
+    archivos = {nombre: getattr(args, nombre) for nombre in
+                ("areas", "usuarios", "iniciativas", "scoring", "proyectos", "ejecuciones")}
+    if not any(archivos.values()):
+        parser.error("indique al menos un archivo")
+
+    inicio = time.perf_counter()
+    try:
+        resumen = ejecutar_carga(archivos, args.lote, args.mantener_indices, args.password_inicial)
+    except ErrorCarga as error:
+        print(f"ERROR: {error}. No se cargó ningún dato.", file=sys.stderr)
+        return 1
+    except IntegrityError as error:
+        print(f"ERROR de integridad: {error.orig}. No se cargó ningún dato.", file=sys.stderr)
+        return 1
+    print(json.dumps(resumen, indent=2, ensure_ascii=False))
+    print(f"Carga completada en {time.perf_counter() - inicio:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
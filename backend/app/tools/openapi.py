@@ -0,0 +1,36 @@
+"""
+Genera el documento OpenAPI de la API en tiempo de build.
+
+Uso (desde backend/):
+    python -m app.tools.openapi --salida openapi.json
+
+Con OPENAPI_ARCHIVO=openapi.json los workers sirven /openapi.json y /docs
+desde el archivo sin recorrer los routers para construir el esquema.
+"""
+import argparse
+import json
+import os
+import sys
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.openapi",
+                                     description="Exportar el documento OpenAPI de SGIP")
+    parser.add_argument("--salida", default="openapi.json", help="Archivo JSON de salida")
+    args = parser.parse_args(argv)
+
+    # El esquema se construye con todos los routers incluidos y sin leer el archivo anterior
+    os.environ["ARRANQUE_RAPIDO"] = "False"
+    os.environ["OPENAPI_ARCHIVO"] = ""
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from ..main import app
+
+    esquema = app.openapi()
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(esquema, archivo, ensure_ascii=False, separators=(",", ":"))
+    print(f"OpenAPI {esquema['info']['version']} ({len(esquema.get('paths', {}))} rutas) guardado en {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
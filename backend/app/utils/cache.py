@@ -0,0 +1,50 @@
+"""
+Caché en memoria del proceso con capacidad acotada (LRU) y expiración (TTL).
+Cada worker tiene la suya: las invalidaciones solo alcanzan al proceso que
+las ejecuta y el TTL acota el desfase en los demás.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class CacheTTL:
+    """LRU con expiración por entrada, segura entre hilos"""
+
+    def __init__(self, capacidad: int, ttl_seg: float):
+        self.capacidad = capacidad
+        self.ttl_seg = ttl_seg
+        self._entradas: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: Hashable) -> Optional[Any]:
+        """Valor vigente o None (la entrada vencida se descarta)"""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            valor, vence = entrada
+            if vence < time.monotonic():
+                del self._entradas[clave]
+                return None
+            self._entradas.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave: Hashable, valor: Any) -> None:
+        with self._lock:
+            self._entradas[clave] = (valor, time.monotonic() + self.ttl_seg)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, clave: Hashable) -> None:
+        with self._lock:
+            self._entradas.pop(clave, None)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
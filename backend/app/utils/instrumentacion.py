@@ -0,0 +1,107 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+
+logger = logging.getLogger("sgip.sql")
+
+
+class EstadisticasSQL:
+    """Consultas ejecutadas durante una petición"""
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_db = 0.0  # segundos
+        self.huellas = Counter()
+
+    def registrar(self, sentencia: str, duracion: float) -> None:
+        self.consultas += 1
+        self.tiempo_db += duracion
+        self.huellas[huella_sentencia(sentencia)] += 1
+
+    def repetidas(self, umbral: int) -> list:
+        """Formas de sentencia ejecutadas más de `umbral` veces (posible N+1)"""
+        return [(huella, n) for huella, n in self.huellas.most_common() if n > umbral]
+
+
+# Objeto mutable por petición: las tareas hijas (call_next, greenlets de
+# SQLAlchemy async, threadpool) heredan la referencia y suman sobre él
+_estadisticas: ContextVar[Optional[EstadisticasSQL]] = ContextVar("estadisticas_sql", default=None)
+
+_RE_ESPACIOS = re.compile(r"\s+")
+_RE_LISTA_PARAMETROS = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)")
+
+
+def huella_sentencia(sentencia: str) -> str:
+    """Normaliza la sentencia para agrupar las que solo difieren en parámetros"""
+    sentencia = _RE_ESPACIOS.sub(" ", sentencia).strip()
+    # IN (?, ?, ?) con distinta cantidad de elementos cuenta como la misma forma
+    return _RE_LISTA_PARAMETROS.sub("(?)", sentencia)
+
+
+def iniciar_medicion() -> EstadisticasSQL:
+    estadisticas = EstadisticasSQL()
+    _estadisticas.set(estadisticas)
+    return estadisticas
+
+
+def estadisticas_actuales() -> Optional[EstadisticasSQL]:
+    return _estadisticas.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if _estadisticas.get() is not None:
+        conn.info.setdefault("inicio_consulta", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    estadisticas = _estadisticas.get()
+    inicios = conn.info.get("inicio_consulta")
+    if estadisticas is None or not inicios:
+        return
+    estadisticas.registrar(statement, time.perf_counter() - inicios.pop())
+
+
+def cabecera_server_timing(estadisticas: EstadisticasSQL, duracion_total: float) -> str:
+    """db = tiempo en la base, consultas = cantidad, app = tiempo total de la petición"""
+    return (
+        f"db;dur={estadisticas.tiempo_db * 1000:.2f}, "
+        f'consultas;desc="{estadisticas.consultas}", '
+        f"app;dur={duracion_total * 1000:.2f}"
+    )
+
+
+def registrar_peticion(
+    metodo: str,
+    ruta: str,
+    estado: int,
+    estadisticas: EstadisticasSQL,
+    duracion_total: float
+) -> None:
+    """Emite la línea de log estructurada y la advertencia de N+1"""
+    repetidas = estadisticas.repetidas(settings.SQL_UMBRAL_REPETICIONES)
+    logger.info(json.dumps({
+        "metodo": metodo,
+        "ruta": ruta,
+        "estado": estado,
+        "consultas": estadisticas.consultas,
+        "db_ms": round(estadisticas.tiempo_db * 1000, 2),
+        "total_ms": round(duracion_total * 1000, 2),
+        "repetidas": len(repetidas)
+    }, ensure_ascii=False))
+
+    for huella, veces in repetidas:
+        logger.warning(
+            "Posible N+1 en %s %s: sentencia repetida %d veces: %s",
+            metodo, ruta, veces, huella[:300]
+        )
@@ -0,0 +1,242 @@
+"""
+Limitación de intentos de login y registro antes de llegar a bcrypt.
+
+- Token bucket por IP y por email: cada intento consume una ficha y las
+  fichas se reponen a ritmo constante hasta la capacidad.
+- Bloqueo exponencial por email (y por IP) tras fallos acumulados:
+  base * 2^(fallos - umbral) segundos, hasta un máximo. Los fallos se
+  olvidan a ritmo constante (uno cada LIMITE_FALLOS_OLVIDO_SEG); un login
+  exitoso reinicia los del email y descuenta uno de los de la IP, que puede
+  ser compartida (NAT, proxy) por muchos usuarios.
+- La IP es la del socket, salvo que la conexión venga de un proxy en
+  PROXIES_CONFIABLES: entonces se toma de X-Forwarded-For.
+
+El estado vive en memoria del worker (BackendMemoria). Para compartirlo entre
+workers o instancias se implementa BackendLimitador (p. ej. sobre Redis) y se
+configura LIMITADOR_BACKEND="paquete.modulo:Clase".
+"""
+import importlib
+import ipaddress
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, Optional
+
+from fastapi import HTTPException, Request, status
+
+from ..config import settings
+from .metricas import LIMITADOR_RECHAZOS
+
+
+class BackendLimitador(ABC):
+    """Interfaz del estado del limitador (async para admitir backends remotos)"""
+
+    @abstractmethod
+    async def consumir(self, clave: str, capacidad: float, por_segundo: float) -> float:
+        """Consume una ficha; 0 si la había, si no los segundos hasta la siguiente"""
+
+    @abstractmethod
+    async def bloqueo(self, clave: str) -> float:
+        """Segundos de bloqueo restantes (0 = sin bloqueo)"""
+
+    @abstractmethod
+    async def registrar_fallo(self, clave: str, umbral: int, base: float, maximo: float, olvido: float) -> float:
+        """
+        Cuenta un fallo y devuelve el bloqueo resultante en segundos. Los
+        fallos anteriores se olvidan a razón de uno cada `olvido` segundos.
+        """
+
+    @abstractmethod
+    async def descontar_fallo(self, clave: str) -> None:
+        """Resta un fallo (sin bajar de cero); el bloqueo vigente se mantiene"""
+
+    @abstractmethod
+    async def reiniciar(self, clave: str) -> None:
+        """Olvida fallos y bloqueo"""
+
+    def estadisticas(self) -> dict:
+        """Estado para /metrics: {"claves": n, "bloqueadas": n}"""
+        return {}
+
+
+class BackendMemoria(BackendLimitador):
+    """Estado en un dict acotado (LRU) del proceso"""
+
+    def __init__(self, max_claves: int = 100000):
+        self.max_claves = max_claves
+        # clave -> [fichas, última reposición, fallos, bloqueado hasta, último fallo]
+        self._estado: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entrada(self, clave: str, capacidad: float, ahora: float) -> list:
+        entrada = self._estado.get(clave)
+        if entrada is None:
+            entrada = [capacidad, ahora, 0, 0.0, ahora]
+            self._estado[clave] = entrada
+            if len(self._estado) > self.max_claves:
+                self._estado.popitem(last=False)
+        else:
+            self._estado.move_to_end(clave)
+        return entrada
+
+    async def consumir(self, clave: str, capacidad: float, por_segundo: float) -> float:
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entrada(clave, capacidad, ahora)
+            entrada[0] = min(capacidad, entrada[0] + (ahora - entrada[1]) * por_segundo)
+            entrada[1] = ahora
+            if entrada[0] >= 1:
+                entrada[0] -= 1
+                return 0.0
+            return (1 - entrada[0]) / por_segundo
+
+    async def bloqueo(self, clave: str) -> float:
+        with self._lock:
+            entrada = self._estado.get(clave)
+            return max(0.0, entrada[3] - time.monotonic()) if entrada else 0.0
+
+    async def registrar_fallo(self, clave: str, umbral: int, base: float, maximo: float, olvido: float) -> float:
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entrada(clave, 0, ahora)
+            # Olvidar fallos enteros; el resto del intervalo sigue contando
+            if olvido > 0 and entrada[2]:
+                olvidados = min(entrada[2], int((ahora - entrada[4]) // olvido))
+                entrada[2] -= olvidados
+                entrada[4] += olvidados * olvido
+            if not entrada[2]:
+                entrada[4] = ahora
+            entrada[2] += 1
+            if entrada[2] < umbral:
+                return 0.0
+            espera = min(maximo, base * 2 ** (entrada[2] - umbral))
+            entrada[3] = ahora + espera
+            return espera
+
+    async def descontar_fallo(self, clave: str) -> None:
+        with self._lock:
+            entrada = self._estado.get(clave)
+            if entrada:
+                entrada[2] = max(0, entrada[2] - 1)
+
+    async def reiniciar(self, clave: str) -> None:
+        with self._lock:
+            entrada = self._estado.get(clave)
+            if entrada:
+                entrada[2], entrada[3] = 0, 0.0
+
+    def estadisticas(self) -> dict:
+        ahora = time.monotonic()
+        with self._lock:
+            bloqueadas = sum(1 for entrada in self._estado.values() if entrada[3] > ahora)
+            return {"claves": len(self._estado), "bloqueadas": bloqueadas}
+
+
+def crear_backend() -> BackendLimitador:
+    if not settings.LIMITADOR_BACKEND:
+        return BackendMemoria()
+    modulo, clase = settings.LIMITADOR_BACKEND.split(":")
+    return getattr(importlib.import_module(modulo), clase)()
+
+
+backend = crear_backend()
+
+
+def _redes(valores: List[str]) -> list:
+    return [ipaddress.ip_network(valor.strip(), strict=False) for valor in valores if valor.strip()]
+
+
+proxies_confiables = _redes(settings.PROXIES_CONFIABLES)
+
+
+def _es_proxy(ip: str) -> bool:
+    try:
+        direccion = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(direccion in red for red in proxies_confiables)
+
+
+def ip_cliente(request: Request) -> str:
+    """
+    IP del socket; si es un proxy confiable, la última de X-Forwarded-For que
+    no sea otro proxy confiable (las anteriores las pudo escribir el cliente)
+    """
+    ip = request.client.host if request.client else "desconocida"
+    if not proxies_confiables or not _es_proxy(ip):
+        return ip
+    reenviadas = [
+        valor.strip()
+        for cabecera in request.headers.getlist("x-forwarded-for")
+        for valor in cabecera.split(",") if valor.strip()
+    ]
+    for reenviada in reversed(reenviadas):
+        if not _es_proxy(reenviada):
+            return reenviada
+    return reenviadas[0] if reenviadas else ip
+
+
+def _rechazar(ruta: str, motivo: str, espera: float):
+    LIMITADOR_RECHAZOS.inc(ruta=ruta, motivo=motivo)
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Demasiados intentos. Intente nuevamente más tarde",
+        headers={"Retry-After": str(max(1, round(espera)))}
+    )
+
+
+async def comprobar_login(request: Request, email: str) -> None:
+    """Antes de buscar al usuario y verificar la contraseña: 429 si excede los límites"""
+    if not settings.LIMITADOR_HABILITADO:
+        return
+    ip, email = ip_cliente(request), email.strip().lower()
+    for clave, motivo in ((f"login:email:{email}", "bloqueo_email"), (f"login:ip:{ip}", "bloqueo_ip")):
+        espera = await backend.bloqueo(clave)
+        if espera > 0:
+            _rechazar("login", motivo, espera)
+
+    espera = await backend.consumir(
+        f"login:ip:{ip}", settings.LIMITE_LOGIN_IP_RAFAGA, settings.LIMITE_LOGIN_IP_POR_MINUTO / 60
+    )
+    if espera > 0:
+        _rechazar("login", "ip", espera)
+    espera = await backend.consumir(
+        f"login:email:{email}", settings.LIMITE_LOGIN_EMAIL_RAFAGA, settings.LIMITE_LOGIN_EMAIL_POR_MINUTO / 60
+    )
+    if espera > 0:
+        _rechazar("login", "email", espera)
+
+
+async def registrar_resultado_login(request: Request, email: str, exitoso: bool) -> None:
+    """
+    Tras verificar: los fallos alargan el bloqueo; un acierto lo reinicia
+    para el email y descuenta un fallo de la IP
+    """
+    if not settings.LIMITADOR_HABILITADO:
+        return
+    ip, email = ip_cliente(request), email.strip().lower()
+    if exitoso:
+        await backend.reiniciar(f"login:email:{email}")
+        await backend.descontar_fallo(f"login:ip:{ip}")
+        return
+    base, maximo = settings.LIMITE_BLOQUEO_BASE_SEG, settings.LIMITE_BLOQUEO_MAX_SEG
+    olvido = settings.LIMITE_FALLOS_OLVIDO_SEG
+    await backend.registrar_fallo(f"login:email:{email}", settings.LIMITE_FALLOS_EMAIL, base, maximo, olvido)
+    await backend.registrar_fallo(f"login:ip:{ip}", settings.LIMITE_FALLOS_IP, base, maximo, olvido)
+
+
+async def comprobar_registro(request: Request) -> None:
+    """Antes de hashear la contraseña de un registro nuevo"""
+    if not settings.LIMITADOR_HABILITADO:
+        return
+    espera = await backend.consumir(
+        f"registro:ip:{ip_cliente(request)}", settings.LIMITE_REGISTRO_IP_RAFAGA,
+        settings.LIMITE_REGISTRO_IP_POR_MINUTO / 60
+    )
+    if espera > 0:
+        _rechazar("registro", "ip", espera)
+
+
+def estadisticas() -> Optional[dict]:
+    return backend.estadisticas() if settings.LIMITADOR_HABILITADO else None
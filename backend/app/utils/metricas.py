@@ -0,0 +1,202 @@
+"""
+Registro de métricas en proceso con salida en formato de texto de Prometheus.
+Cada worker expone sus propios valores en /metrics.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Tuple
+
+# Buckets de latencia en segundos
+BUCKETS_PETICION = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_BCRYPT = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0)
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(nombres: Tuple[str, ...], valores: Tuple[str, ...], extra: str = "") -> str:
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor: float) -> str:
+    return repr(float(valor)) if valor != int(valor) else str(int(valor))
+
+
+class Metrica:
+    """Base: nombre, ayuda y etiquetas; los valores se guardan por tupla de etiquetas"""
+    tipo = "untyped"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _clave(self, etiquetas: dict) -> tuple:
+        return tuple(str(etiquetas.get(n, "")) for n in self.etiquetas)
+
+    def lineas(self) -> Iterable[str]:
+        yield f"# HELP {self.nombre} {self.ayuda}"
+        yield f"# TYPE {self.nombre} {self.tipo}"
+        with self._lock:
+            lineas = [
+                linea for clave, valor in self._valores.items()
+                for linea in self._lineas_valor(clave, valor)
+            ]
+        yield from lineas
+
+    def _lineas_valor(self, clave: tuple, valor) -> Iterable[str]:
+        yield f"{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}"
+
+
+class Contador(Metrica):
+    tipo = "counter"
+
+    def inc(self, cantidad: float = 1, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+
+class Medidor(Metrica):
+    tipo = "gauge"
+
+    def inc(self, cantidad: float = 1, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+    def dec(self, cantidad: float = 1, **etiquetas) -> None:
+        self.inc(-cantidad, **etiquetas)
+
+    def set(self, valor: float, **etiquetas) -> None:
+        with self._lock:
+            self._valores[self._clave(etiquetas)] = valor
+
+
+class Histograma(Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = (), buckets=BUCKETS_PETICION):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets))
+
+    def observar(self, valor: float, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            datos = self._valores.get(clave)
+            if datos is None:
+                # [conteos por bucket y +Inf (sin acumular), suma]
+                datos = self._valores[clave] = [[0] * (len(self.buckets) + 1), 0.0]
+            indice = len(self.buckets)
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    indice = i
+                    break
+            datos[0][indice] += 1
+            datos[1] += valor
+
+    @contextmanager
+    def medir(self, **etiquetas):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **etiquetas)
+
+    def _lineas_valor(self, clave: tuple, valor) -> Iterable[str]:
+        conteos, suma = valor
+        acumulado = 0
+        for limite, conteo in zip(self.buckets + (float("inf"),), conteos):
+            acumulado += conteo
+            le = "+Inf" if limite == float("inf") else _numero(limite)
+            etiquetas = _etiquetas(self.etiquetas, clave, 'le="%s"' % le)
+            yield f"{self.nombre}_bucket{etiquetas} {acumulado}"
+        yield f"{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {_numero(suma)}"
+        yield f"{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {acumulado}"
+
+
+PETICIONES = Contador(
+    "sgip_peticiones_total", "Peticiones HTTP atendidas",
+    ("metodo", "ruta", "estado")
+)
+DURACION_PETICION = Histograma(
+    "sgip_peticion_duracion_segundos", "Latencia de las peticiones HTTP por ruta",
+    ("metodo", "ruta")
+)
+PETICIONES_EN_CURSO = Medidor(
+    "sgip_peticiones_en_curso", "Peticiones HTTP en proceso"
+)
+PETICIONES_EN_CURSO.set(0)
+VERIFICACION_BCRYPT = Histograma(
+    "sgip_bcrypt_verificacion_segundos", "Tiempo de verificación de contraseñas con bcrypt",
+    buckets=BUCKETS_BCRYPT
+)
+CACHE_USUARIOS = Contador(
+    "sgip_cache_usuarios_total", "Resolución del usuario autenticado según la caché de principales",
+    ("resultado",)
+)
+LIMITADOR_RECHAZOS = Contador(
+    "sgip_limitador_rechazos_total", "Intentos rechazados con 429 por el limitador de login/registro",
+    ("ruta", "motivo")
+)
+ARRANQUE = Medidor(
+    "sgip_arranque_segundos", "Duración de las fases de arranque del worker", ("fase",)
+)
+
+_REGISTRO = (
+    PETICIONES, DURACION_PETICION, PETICIONES_EN_CURSO, VERIFICACION_BCRYPT, CACHE_USUARIOS,
+    LIMITADOR_RECHAZOS, ARRANQUE
+)
+
+# Estado del pool: (nombre de la métrica, ayuda, método del pool)
+_METRICAS_POOL = (
+    ("sgip_pool_tamano", "Tamaño configurado del pool de conexiones", "size"),
+    ("sgip_pool_en_uso", "Conexiones prestadas (checked out)", "checkedout"),
+    ("sgip_pool_disponibles", "Conexiones libres en el pool (checked in)", "checkedin"),
+    ("sgip_pool_desborde", "Conexiones de desborde sobre pool_size (negativo = sin abrir)", "overflow"),
+)
+
+
+def _lineas_pool() -> Iterable[str]:
+    from ..database import motores_activos
+
+    pools = {
+        nombre: motor.pool for nombre, motor in motores_activos().items()
+        if hasattr(motor.pool, "checkedout")
+    }
+    for nombre_metrica, ayuda, metodo in _METRICAS_POOL:
+        yield f"# HELP {nombre_metrica} {ayuda}"
+        yield f"# TYPE {nombre_metrica} gauge"
+        for motor, pool in pools.items():
+            yield f'{nombre_metrica}{{motor="{motor}"}} {getattr(pool, metodo)()}'
+
+
+def _lineas_limitador() -> Iterable[str]:
+    from .limitador import estadisticas
+
+    estado = estadisticas()
+    if not estado:
+        return
+    yield "# HELP sgip_limitador_claves Claves (IP/email) con estado en el limitador"
+    yield "# TYPE sgip_limitador_claves gauge"
+    yield f"sgip_limitador_claves {estado.get('claves', 0)}"
+    yield "# HELP sgip_limitador_bloqueadas Claves con bloqueo exponencial vigente"
+    yield "# TYPE sgip_limitador_bloqueadas gauge"
+    yield f"sgip_limitador_bloqueadas {estado.get('bloqueadas', 0)}"
+
+
+def exportar() -> str:
+    """Todas las métricas en formato de texto de Prometheus (version 0.0.4)"""
+    lineas = []
+    for metrica in _REGISTRO:
+        lineas.extend(metrica.lineas())
+    lineas.extend(_lineas_pool())
+    lineas.extend(_lineas_limitador())
+    return "\n".join(lineas) + "\n"
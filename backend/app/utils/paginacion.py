@@ -0,0 +1,94 @@
+"""
+Paginación por cursor (keyset) para los listados.
+
+El orden es descendente por una columna de fecha y el id como desempate; el
+cursor es opaco (base64 de los valores de la última fila) y la página
+siguiente se pide con WHERE (fecha, id) < (valores del cursor), que usa el
+índice (fecha, id) sin recorrer las filas anteriores como hace OFFSET. Las
+columnas de orden deben ser NOT NULL (migración 0009): (NULL, id) < (...)
+nunca es verdadero y un cursor con NULL se rechaza.
+
+Los listados siguen devolviendo una lista: el cursor viaja en la cabecera
+X-Next-Cursor (ausente en la última página) y, con contar=true, el total
+en X-Total-Count (acotado por PAGINACION_CONTEO_MAX).
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import DateTime, func, literal, select, tuple_
+
+from ..config import settings
+
+CABECERA_CURSOR = "X-Next-Cursor"
+CABECERA_TOTAL = "X-Total-Count"
+CABECERA_TOTAL_EXACTO = "X-Total-Count-Exact"
+
+
+def codificar_cursor(valores: Sequence) -> str:
+    datos = [valor.isoformat() if isinstance(valor, datetime) else valor for valor in valores]
+    return base64.urlsafe_b64encode(json.dumps(datos, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, columnas: Sequence) -> list:
+    """Valores del cursor con el tipo de cada columna; 400 si no corresponde"""
+    try:
+        datos = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(datos, list) or len(datos) != len(columnas) or None in datos:
+            raise ValueError
+        return [
+            datetime.fromisoformat(valor) if isinstance(columna.type, DateTime) else int(valor)
+            for columna, valor in zip(columnas, datos)
+        ]
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+
+def paginar(query, columnas: Sequence, limit: Optional[int], cursor: Optional[str] = None, skip: int = 0):
+    """
+    Ordena por columnas (descendente; la última es el id) y aplica el cursor,
+    o el offset clásico si no hay cursor. Pide limit + 1 filas para saber si
+    hay página siguiente (ver siguiente_pagina); limit None = sin límite.
+    """
+    if cursor:
+        valores = decodificar_cursor(cursor, columnas)
+        query = query.where(tuple_(*columnas) < tuple_(*(
+            literal(valor, columna.type) for columna, valor in zip(columnas, valores)
+        )))
+    elif skip:
+        query = query.offset(skip)
+    query = query.order_by(*(columna.desc() for columna in columnas))
+    return query if limit is None else query.limit(limit + 1)
+
+
+def siguiente_pagina(filas: List, limit: Optional[int], clave: Callable[[object], Tuple]) -> Tuple[List, Optional[str]]:
+    """Recorta la fila extra y devuelve el cursor de la página siguiente (None si no hay)"""
+    if limit is None or len(filas) <= limit:
+        return filas, None
+    filas = filas[:limit]
+    return filas, codificar_cursor(clave(filas[-1]))
+
+
+async def contar(db, query) -> Tuple[int, bool]:
+    """Total de filas del listado filtrado, contando como máximo PAGINACION_CONTEO_MAX (total, exacto)"""
+    tope = settings.PAGINACION_CONTEO_MAX
+    subconsulta = query.order_by(None).with_only_columns(literal(1), maintain_column_froms=True)
+    if tope:
+        subconsulta = subconsulta.limit(tope + 1)
+    total = await db.scalar(select(func.count()).select_from(subconsulta.subquery()))
+    if tope and total > tope:
+        return tope, False
+    return total, True
+
+
+async def escribir_cabeceras(response: Response, siguiente: Optional[str], db=None, query=None) -> None:
+    """X-Next-Cursor y, si se pasa la consulta (contar=true), X-Total-Count"""
+    if siguiente:
+        response.headers[CABECERA_CURSOR] = siguiente
+    if query is not None:
+        total, exacto = await contar(db, query)
+        response.headers[CABECERA_TOTAL] = str(total)
+        response.headers[CABECERA_TOTAL_EXACTO] = "true" if exacto else "false"
@@ -0,0 +1,94 @@
+"""
+Lista de revocación de tokens para la autorización por claims.
+
+Guarda por usuario la versión vigente de sus tokens (token_version) y los
+usuarios inactivos; solo los que tienen versión > 0 o están inactivos, el
+resto vale con la versión 0. La consulta por petición es O(1) en memoria.
+Los cambios hechos en este proceso se aplican al instante y los de otros
+workers llegan con el refresco periódico (REVOCACION_REFRESCO_SEG).
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import or_, select
+
+from ..database import engine, engine_lectura
+from ..models.usuario import Usuario
+
+logger = logging.getLogger(__name__)
+
+# Solapamiento entre refrescos: cubre filas con updated_at anterior a la
+# consulta pero confirmadas después
+MARGEN_REFRESCO = timedelta(seconds=5)
+
+
+class ListaRevocacion:
+    def __init__(self):
+        self._versiones: dict = {}
+        self._inactivos: set = set()
+        self._desde: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    @property
+    def cargada(self) -> bool:
+        return self._desde is not None
+
+    def inactivo(self, usuario_id: int) -> bool:
+        return usuario_id in self._inactivos
+
+    def vigente(self, usuario_id: int, version: int) -> bool:
+        """True si un token con esa versión sigue valiendo para el usuario"""
+        return usuario_id not in self._inactivos and self._versiones.get(usuario_id, 0) == version
+
+    def actualizar(self, usuario_id: int, version: int, activo: bool) -> None:
+        with self._lock:
+            if version:
+                self._versiones[usuario_id] = version
+            else:
+                self._versiones.pop(usuario_id, None)
+            if activo:
+                self._inactivos.discard(usuario_id)
+            else:
+                self._inactivos.add(usuario_id)
+
+    def refrescar(self, conexion) -> int:
+        """Carga completa la primera vez; después, solo los usuarios modificados"""
+        inicio = datetime.utcnow()
+        consulta = select(Usuario.id, Usuario.token_version, Usuario.activo)
+        if self._desde is None:
+            consulta = consulta.where(or_(Usuario.token_version > 0, Usuario.activo.is_(False)))
+        else:
+            consulta = consulta.where(Usuario.updated_at >= self._desde)
+
+        filas = conexion.execute(consulta).all()
+        for usuario_id, version, activo in filas:
+            self.actualizar(usuario_id, version, activo is not False)
+        self._desde = inicio - MARGEN_REFRESCO
+        return len(filas)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._versiones.clear()
+            self._inactivos.clear()
+            self._desde = None
+
+
+revocaciones = ListaRevocacion()
+
+
+def refrescar_revocaciones() -> int:
+    with (engine_lectura or engine).connect() as conexion:
+        return revocaciones.refrescar(conexion)
+
+
+async def refrescar_periodicamente(intervalo: float) -> None:
+    """Tarea de fondo del worker (lifespan)"""
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            await asyncio.to_thread(refrescar_revocaciones)
+        except Exception:
+            logger.exception("No se pudo refrescar la lista de revocación de tokens")
@@ -1,33 +1,176 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional
-from jose import JWTError, jwt
-import bcrypt
+from typing import List, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from ..config import settings
-from ..database import get_db
-from ..models.usuario import Usuario
+from ..database import get_async_db
+from ..models.usuario import Usuario, RolUsuario
+from .cache import CacheTTL
+from .metricas import VERIFICACION_BCRYPT, CACHE_USUARIOS
+from .revocacion import revocaciones
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 
+# Claims con los que el token basta para construir el Principal
+CLAIMS_PRINCIPAL = {"sub", "rol", "area_id", "nombre", "ver"}
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Usuario autenticado: los datos que usan los routers, sin sesión ORM"""
+    id: int
+    rol: RolUsuario
+    activo: bool
+    area_id: Optional[int]
+    nombre_completo: str
+    token_version: int = 0
+
+    @classmethod
+    def desde_usuario(cls, usuario: Usuario) -> "Principal":
+        return cls(
+            id=usuario.id,
+            rol=usuario.rol,
+            activo=usuario.activo,
+            area_id=usuario.area_id,
+            nombre_completo=usuario.nombre_completo,
+            token_version=usuario.token_version or 0
+        )
+
+    @classmethod
+    def desde_claims(cls, payload: dict) -> Optional["Principal"]:
+        """Principal firmado en el token; None si el token no trae los claims"""
+        if not CLAIMS_PRINCIPAL <= payload.keys():
+            return None
+        return cls(
+            id=int(payload["sub"]),
+            rol=RolUsuario(payload["rol"]),
+            activo=True,
+            area_id=payload["area_id"],
+            nombre_completo=payload["nombre"],
+            token_version=payload["ver"]
+        )
+
+
+def claims_usuario(usuario: Usuario) -> dict:
+    """Claims del token de acceso (ver Principal.desde_claims)"""
+    return {
+        "sub": str(usuario.id),
+        "email": usuario.email,
+        "rol": usuario.rol.value,
+        "area_id": usuario.area_id,
+        "nombre": usuario.nombre_completo,
+        "ver": usuario.token_version or 0,
+    }
+
+
+# Principales por id de usuario (subject del token). usuarios.py invalida la
+# entrada al modificar, desactivar o eliminar al usuario
+cache_principales = CacheTTL(settings.CACHE_USUARIOS_MAX, settings.CACHE_USUARIOS_TTL_SEG)
+
+
+def revocar_tokens(usuario: Usuario) -> None:
+    """Invalida los tokens emitidos hasta ahora (cambio en sus claims o desactivación)"""
+    usuario.token_version = (usuario.token_version or 0) + 1
+
+
+def invalidar_usuario(usuario: Usuario) -> None:
+    """Tras confirmar cambios en el usuario: caché y lista de revocación del proceso"""
+    cache_principales.invalidar(usuario.id)
+    revocaciones.actualizar(usuario.id, usuario.token_version or 0, usuario.activo is not False)
+
+
+# jose y bcrypt se importan al primer uso (arranque rápido de los workers)
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(
-        plain_password.encode('utf-8'),
-        hashed_password.encode('utf-8')
-    )
+    import bcrypt
+
+    with VERIFICACION_BCRYPT.medir():
+        return bcrypt.checkpw(
+            plain_password.encode('utf-8'),
+            hashed_password.encode('utf-8')
+        )
 
 
 def get_password_hash(password: str) -> str:
+    import bcrypt
+
     return bcrypt.hashpw(
         password.encode('utf-8'),
-        bcrypt.gensalt()
+        bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     ).decode('utf-8')
 
 
+def necesita_rehash(hashed_password: str) -> bool:
+    """True si el hash se generó con un costo distinto de BCRYPT_ROUNDS ($2b$<costo>$...)"""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+# bcrypt libera el GIL: verificar y generar hashes en un pool de hilos acotado
+# deja libre el event loop; el tamaño del pool limita los hashes simultáneos.
+# Se crea al primer uso para que cada worker (tras el fork) tenga el suyo.
+_pool_bcrypt: Optional[ThreadPoolExecutor] = None
+_lock_pool = threading.Lock()
+
+
+def pool_bcrypt() -> Optional[ThreadPoolExecutor]:
+    """Pool de hilos para bcrypt; None con BCRYPT_HILOS=0 (en el event loop)"""
+    global _pool_bcrypt
+    if settings.BCRYPT_HILOS <= 0:
+        return None
+    if _pool_bcrypt is None:
+        with _lock_pool:
+            if _pool_bcrypt is None:
+                _pool_bcrypt = ThreadPoolExecutor(settings.BCRYPT_HILOS, thread_name_prefix="bcrypt")
+    return _pool_bcrypt
+
+
+async def _en_pool_bcrypt(funcion, *args):
+    pool = pool_bcrypt()
+    if pool is None:
+        return funcion(*args)
+    return await asyncio.get_running_loop().run_in_executor(pool, funcion, *args)
+
+
+async def verificar_password(plain_password: str, hashed_password: str) -> bool:
+    """verify_password sin bloquear el event loop"""
+    return await _en_pool_bcrypt(verify_password, plain_password, hashed_password)
+
+
+async def generar_hash_password(password: str) -> str:
+    """get_password_hash sin bloquear el event loop"""
+    return await _en_pool_bcrypt(get_password_hash, password)
+
+
+async def generar_hashes_password(passwords: List[str], hilos: int = 0) -> List[str]:
+    """
+    Hashes de un lote (altas masivas) en un pool propio de `hilos` (0 = núcleos
+    disponibles): bcrypt libera el GIL, así que escala con los núcleos sin
+    ocupar el pool de los logins.
+    """
+    if not passwords:
+        return []
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(hilos or os.cpu_count() or 1, thread_name_prefix="bcrypt-lote") as pool:
+        return list(await asyncio.gather(
+            *(loop.run_in_executor(pool, get_password_hash, password) for password in passwords)
+        ))
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
@@ -39,6 +182,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_token(token: str) -> Optional[dict]:
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
@@ -48,8 +193,8 @@ def decode_token(token: str) -> Optional[dict]:
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> Usuario:
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudieron validar las credenciales",
@@ -64,22 +209,62 @@ async def get_current_user(
     if user_id is None:
         raise credentials_exception
 
-    user = db.query(Usuario).filter(Usuario.id == int(user_id)).first()
-    if user is None:
-        raise credentials_exception
+    # Autorización por claims: el token firmado basta si su versión sigue vigente
+    if settings.AUTORIZACION_POR_CLAIMS and revocaciones.cargada:
+        principal = Principal.desde_claims(payload)
+        if principal is not None:
+            if revocaciones.inactivo(principal.id):
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Usuario inactivo")
+            if not revocaciones.vigente(principal.id, principal.token_version):
+                raise credentials_exception
+            return principal
+
+    usar_cache = settings.CACHE_USUARIOS_TTL_SEG > 0
+    principal = cache_principales.obtener(int(user_id)) if usar_cache else None
+    if principal is None:
+        user = await db.scalar(select(Usuario).where(Usuario.id == int(user_id)))
+        if user is None:
+            raise credentials_exception
+        principal = Principal.desde_usuario(user)
+        if usar_cache:
+            CACHE_USUARIOS.inc(resultado="fallo")
+            cache_principales.guardar(principal.id, principal)
+    else:
+        CACHE_USUARIOS.inc(resultado="acierto")
 
-    if not user.activo:
+    if not principal.activo:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Usuario inactivo"
         )
 
+    # Tokens emitidos antes de un cambio de rol o desactivación
+    if payload.get("ver", 0) != principal.token_version:
+        raise credentials_exception
+
+    return principal
+
+
+async def get_current_usuario(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> Usuario:
+    """Fila completa del usuario autenticado (perfil, cambio de contraseña)"""
+    user = await db.scalar(
+        select(Usuario).options(selectinload(Usuario.area)).where(Usuario.id == current_user.id)
+    )
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No se pudieron validar las credenciales",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
 async def get_current_active_user(
-    current_user: Usuario = Depends(get_current_user)
-) -> Usuario:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     if not current_user.activo:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -89,7 +274,7 @@ async def get_current_active_user(
 
 
 def check_role(allowed_roles: list):
-    async def role_checker(current_user: Usuario = Depends(get_current_user)):
+    async def role_checker(current_user: Principal = Depends(get_current_user)):
         if current_user.rol not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,19 @@
+"""
+Worker de gunicorn para la app (ver gunicorn.conf.py).
+
+Extiende el worker de uvicorn con dos ajustes que el original no traslada
+desde la configuración de gunicorn:
+- worker_connections -> limit_concurrency: por encima del límite uvicorn
+  responde 503 en lugar de encolar peticiones que esperarían una conexión
+  del pool (en modo síncrono esa espera bloquea el event loop del worker).
+- graceful_timeout -> timeout_graceful_shutdown: tras SIGTERM las peticiones
+  en curso terminan y luego corre el shutdown de la app (cierre de engines).
+"""
+from uvicorn_worker import UvicornWorker
+
+
+class WorkerSGIP(UvicornWorker):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.limit_concurrency = self.cfg.worker_connections
+        self.config.timeout_graceful_shutdown = self.cfg.graceful_timeout
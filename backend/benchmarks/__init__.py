@@ -0,0 +1,24 @@
+"""
+Benchmarks de extremo a extremo de la API.
+
+Uso (desde backend/):
+    python -m benchmarks generar --db bench.db --escala grande
+    python -m benchmarks ejecutar --db bench.db --salida resultados.json
+    python -m benchmarks comparar base.json resultados.json --tolerancia 0.15
+    python -m benchmarks escalado --db bench.db --workers 1,2,4 --salida escalado.json
+    python -m benchmarks login --db bench.db --hilos 0,4 --salida login.json
+    python -m benchmarks concurrencia --db bench.db --altas 300
+
+`generar` crea un portfolio sintético con los modelos reales (esquema vía
+alembic), `ejecutar` recorre los endpoints de todos los routers con
+httpx.AsyncClient contra la app en proceso (código 1 si alguno responde fuera
+de 2xx) y `comparar` termina con código 1 si alguna métrica empeora respecto
+de la línea base. Los escenarios de
+escritura agregan filas: para comparar, regenerar la base con la misma
+semilla antes de cada ejecución. `escalado` levanta el servidor real con 1, 2,
+4... workers (gunicorn.conf.py) y mide peticiones por segundo y el drenado
+de las peticiones en curso al apagarlo. `login` mide una ráfaga de logins y
+la latencia de /health durante ella, con bcrypt dentro y fuera del event loop.
+`concurrencia` lanza cientos de altas simultáneas y termina con código 1 si
+algún código de iniciativa o número de secuencia se repite.
+"""
@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+# Campos de portfolio.Escala (sin importar la app antes de fijar el entorno)
+CAMPOS_ESCALA = ("areas", "usuarios", "iniciativas", "proyectos", "ejecuciones", "bitacora")
+
+
+def _configurar_entorno(db: str) -> None:
+    """La configuración de la app se lee al importarla: fijar el entorno antes"""
+    if db:
+        os.environ["DATABASE_URL"] = db if "://" in db else f"sqlite:///{os.path.abspath(db)}"
+    os.environ.setdefault("DEBUG", "False")
+    # Server-Timing es la fuente de las consultas por petición
+    os.environ["INSTRUMENTACION_SQL"] = "True"
+    # Sin la línea de log por petición (y las advertencias de N+1) en la salida
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    # Los escenarios repiten el login: se mide la app, no el limitador
+    os.environ["LIMITADOR_HABILITADO"] = "False"
+
+
+def _generar(args) -> int:
+    from alembic import command
+    from alembic.config import Config
+
+    from .portfolio import ESCALAS, Escala, generar_portfolio
+
+    escala = Escala(**vars(ESCALAS[args.escala]))
+    for campo in CAMPOS_ESCALA:
+        if getattr(args, campo) is not None:
+            setattr(escala, campo, getattr(args, campo))
+
+    directorio = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command.upgrade(Config(os.path.join(directorio, "alembic.ini")), "head")
+
+    print(f"Generando portfolio {escala}")
+    resumen = generar_portfolio(escala, semilla=args.semilla)
+    print(json.dumps(resumen, indent=2, ensure_ascii=False))
+    return 0
+
+
+def _ejecutar(args) -> int:
+    from .ejecutor import ejecutar
+    from .escenarios import ESCENARIOS
+
+    escenarios = [e for e in ESCENARIOS if not args.filtro or any(f in e.nombre for f in args.filtro)]
+    informe = asyncio.run(ejecutar(
+        escenarios, iteraciones=args.iteraciones, concurrencia=args.concurrencia,
+        calentamiento=args.calentamiento, semilla=args.semilla
+    ))
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto)
+        print(f"Informe guardado en {args.salida}")
+    else:
+        print(texto)
+    invalidos = informe["meta"]["invalidos"]
+    for nombre in invalidos:
+        print(f"INVÁLIDO  {nombre}: {informe['endpoints'][nombre]['estados']}", file=sys.stderr)
+    if invalidos:
+        print(f"{len(invalidos)} endpoints con respuestas fuera de 2xx", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _escalado(args) -> int:
+    from .escalado import escalar
+
+    informe = asyncio.run(escalar(
+        args.workers, args.servidor, duracion=args.duracion, concurrencia=args.concurrencia,
+        puerto=args.puerto, semilla=args.semilla
+    ))
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto)
+        print(f"Informe guardado en {args.salida}")
+    else:
+        print(texto)
+    return 0
+
+
+def _login(args) -> int:
+    from .login import medir_login
+
+    informe = asyncio.run(medir_login(args.hilos, logins=args.logins, concurrencia=args.concurrencia))
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto)
+        print(f"Informe guardado en {args.salida}")
+    else:
+        print(texto)
+    return 0
+
+
+def _concurrencia(args) -> int:
+    # Antes de importar la app: con el engine async las altas compiten de verdad
+    os.environ["DATABASE_ASYNC"] = "True" if args.modo == "async" else "False"
+    from .concurrencia import probar_concurrencia
+
+    informe = probar_concurrencia(altas=args.altas, reservas=args.reservas, hilos=args.hilos)
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto)
+        print(f"Informe guardado en {args.salida}")
+    else:
+        print(texto)
+    return 0 if informe["ok"] else 1
+
+
+def _comparar(args) -> int:
+    from .comparar import comparar_informes
+
+    with open(args.base, encoding="utf-8") as archivo:
+        base = json.load(archivo)
+    with open(args.actual, encoding="utf-8") as archivo:
+        actual = json.load(archivo)
+
+    regresiones, avisos = comparar_informes(base, actual, args.tolerancia)
+    for aviso in avisos:
+        print(f"AVISO     {aviso}")
+    for regresion in regresiones:
+        print(f"REGRESIÓN {regresion}")
+    if regresiones:
+        print(f"{len(regresiones)} regresiones respecto de {args.base}")
+        return 1
+    print("Sin regresiones")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks de la API SGIP")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    generar = subparsers.add_parser("generar", help="Crear el esquema y el portfolio sintético")
+    generar.add_argument("--db", help="Archivo SQLite o URL (por defecto DATABASE_URL)")
+    generar.add_argument("--escala", choices=["pequena", "media", "grande"], default="pequena")
+    generar.add_argument("--semilla", type=int, default=42)
+    for campo in CAMPOS_ESCALA:
+        generar.add_argument(f"--{campo}", type=int, help=f"Sobrescribe la cantidad de {campo}")
+    generar.set_defaults(funcion=_generar)
+
+    ejecutar = subparsers.add_parser("ejecutar", help="Medir los endpoints y emitir el informe JSON")
+    ejecutar.add_argument("--db", help="Archivo SQLite o URL (por defecto DATABASE_URL)")
+    ejecutar.add_argument("--iteraciones", type=int, default=50)
+    ejecutar.add_argument("--concurrencia", type=int, default=4)
+    ejecutar.add_argument("--calentamiento", type=int, default=3)
+    ejecutar.add_argument("--semilla", type=int, default=42)
+    ejecutar.add_argument("--filtro", action="append", help="Solo endpoints que contengan el texto (repetible)")
+    ejecutar.add_argument("--salida", help="Archivo JSON de salida (por defecto stdout)")
+    ejecutar.set_defaults(funcion=_ejecutar)
+
+    escalado = subparsers.add_parser("escalado", help="Rendimiento según la cantidad de workers (servidor real)")
+    escalado.add_argument("--db", help="Archivo SQLite o URL (por defecto DATABASE_URL)")
+    escalado.add_argument("--workers", type=lambda valor: [int(n) for n in valor.split(",")], default=[1, 2, 4],
+                          help="Cantidades de workers separadas por coma (por defecto 1,2,4)")
+    escalado.add_argument("--servidor", choices=["gunicorn", "uvicorn"],
+                          default="uvicorn" if sys.platform == "win32" else "gunicorn")
+    escalado.add_argument("--duracion", type=float, default=10.0, help="Segundos de carga por cantidad")
+    escalado.add_argument("--concurrencia", type=int, default=16,
+                          help="Clientes simultáneos (no superar pool + desborde por worker)")
+    escalado.add_argument("--puerto", type=int, default=8765)
+    escalado.add_argument("--semilla", type=int, default=42)
+    escalado.add_argument("--salida", help="Archivo JSON de salida (por defecto stdout)")
+    escalado.set_defaults(funcion=_escalado)
+
+    login = subparsers.add_parser("login", help="Ráfaga de logins: bcrypt en el event loop frente al pool de hilos")
+    login.add_argument("--db", help="Archivo SQLite o URL (por defecto DATABASE_URL)")
+    login.add_argument("--hilos", type=lambda valor: [int(n) for n in valor.split(",")], default=[0, 4],
+                       help="Tamaños de pool separados por coma; 0 = en el event loop (por defecto 0,4)")
+    login.add_argument("--logins", type=int, default=40)
+    login.add_argument("--concurrencia", type=int, default=8)
+    login.add_argument("--salida", help="Archivo JSON de salida (por defecto stdout)")
+    login.set_defaults(funcion=_login)
+
+    concurrencia = subparsers.add_parser("concurrencia", help="Altas simultáneas: códigos correlativos sin repetir")
+    concurrencia.add_argument("--db", help="Archivo SQLite o URL (por defecto DATABASE_URL)")
+    concurrencia.add_argument("--altas", type=int, default=300, help="POST /api/iniciativas/ simultáneos")
+    concurrencia.add_argument("--reservas", type=int, default=300, help="Reservas de secuencia desde hilos")
+    concurrencia.add_argument("--hilos", type=int, default=16)
+    concurrencia.add_argument("--modo", choices=["async", "sync"], default="async",
+                              help="Sesiones de la app (DATABASE_ASYNC); en sync las altas no deben superar "
+                                   "pool + desborde (bloquean el event loop esperando conexión)")
+    concurrencia.add_argument("--salida", help="Archivo JSON de salida (por defecto stdout)")
+    concurrencia.set_defaults(funcion=_concurrencia)
+
+    comparar = subparsers.add_parser("comparar", help="Comparar un informe con una línea base")
+    comparar.add_argument("base")
+    comparar.add_argument("actual")
+    comparar.add_argument("--tolerancia", type=float,
+                          help="Tolerancia relativa de latencia (por defecto la de cada percentil)")
+    comparar.set_defaults(funcion=_comparar)
+
+    args = parser.parse_args(argv)
+    if args.comando != "comparar":
+        _configurar_entorno(args.db)
+    return args.funcion(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
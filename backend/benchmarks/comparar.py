@@ -0,0 +1,42 @@
+"""
+Comparación de un informe contra una línea base. Una métrica regresa si
+supera a la base en más de la tolerancia relativa y, para latencias, además
+en más de un mínimo absoluto (evita falsos positivos en endpoints de < 1 ms).
+"""
+from typing import List, Tuple
+
+# métrica -> (tolerancia relativa por defecto, mínimo absoluto)
+METRICAS = {
+    "p50_ms": (0.20, 2.0),
+    "p95_ms": (0.25, 5.0),
+    "p99_ms": (0.35, 10.0),
+    "consultas_por_peticion": (0.0, 0.5),
+    "errores": (0.0, 0.0),
+}
+
+
+def comparar_informes(base: dict, actual: dict, tolerancia: float = None) -> Tuple[List[str], List[str]]:
+    """Devuelve (regresiones, avisos) como líneas de texto"""
+    regresiones, avisos = [], []
+    endpoints_base = base.get("endpoints", {})
+    endpoints_actual = actual.get("endpoints", {})
+
+    for nombre, medicion_base in endpoints_base.items():
+        medicion = endpoints_actual.get(nombre)
+        if medicion is None:
+            avisos.append(f"{nombre}: no está en el informe actual")
+            continue
+        for metrica, (tolerancia_defecto, minimo) in METRICAS.items():
+            valor_base = medicion_base.get(metrica)
+            valor = medicion.get(metrica)
+            if valor_base is None or valor is None:
+                continue
+            relativa = tolerancia_defecto if tolerancia is None or metrica in ("consultas_por_peticion", "errores") \
+                else tolerancia
+            if valor > valor_base * (1 + relativa) and valor - valor_base > minimo:
+                regresiones.append(f"{nombre}: {metrica} {valor_base} -> {valor}")
+
+    for nombre in endpoints_actual.keys() - endpoints_base.keys():
+        avisos.append(f"{nombre}: sin línea base")
+
+    return regresiones, avisos
@@ -0,0 +1,135 @@
+"""
+Altas simultáneas contra la app en proceso: verifica que los códigos
+correlativos (app/services/secuencias.py) no se repitan bajo concurrencia.
+
+- Cientos de POST /api/iniciativas/ lanzados a la vez (todas las peticiones
+  en vuelo; el pool de conexiones las atiende como en producción).
+- Cientos de reservas de una secuencia de prueba desde hilos con su propia
+  conexión del engine síncrono (la ruta de la carga masiva y del modo sync).
+
+El informe cuenta errores y códigos repetidos; cualquiera de los dos es un
+fallo (código de salida 1).
+"""
+import asyncio
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import httpx
+from sqlalchemy import delete, select
+
+from app.config import settings
+from app.database import engine, SessionLocal
+from app.main import app
+from app.models.secuencia import Secuencia
+from app.models.usuario import Area
+from app.services.secuencias import sentencia_reserva
+
+from .ejecutor import percentil
+from .portfolio import EMAIL_BENCHMARK, PASSWORD_BENCHMARK
+
+SECUENCIA_PRUEBA = "PRUEBA-CONCURRENCIA"
+
+
+def _repetidos(valores: List) -> int:
+    return sum(cantidad - 1 for cantidad in Counter(valores).values() if cantidad > 1)
+
+
+async def _altas_api(altas: int, log=print) -> dict:
+    with SessionLocal() as db:
+        area_id = db.scalar(select(Area.id).order_by(Area.id).limit(1))
+    if area_id is None:
+        raise RuntimeError("La base no tiene áreas: generar el portfolio antes")
+
+    async with app.router.lifespan_context(app):
+        transporte = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://benchmark", timeout=None) as cliente:
+            respuesta = await cliente.post(
+                "/api/auth/login", data={"username": EMAIL_BENCHMARK, "password": PASSWORD_BENCHMARK}
+            )
+            respuesta.raise_for_status()
+            cliente.headers["Authorization"] = f"Bearer {respuesta.json()['access_token']}"
+
+            async def alta(numero: int):
+                inicio = time.perf_counter()
+                respuesta = await cliente.post("/api/iniciativas/", json={
+                    "titulo": f"Alta concurrente {numero}", "descripcion": "Prueba de concurrencia",
+                    "area_demandante_id": area_id, "monto_estimado": 1000000
+                })
+                return respuesta, time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            resultados = await asyncio.gather(*(alta(numero) for numero in range(altas)))
+            transcurrido = time.perf_counter() - inicio
+
+    codigos = [r.json()["codigo"] for r, _ in resultados if r.status_code == 200]
+    errores = Counter(r.status_code for r, _ in resultados if r.status_code != 200)
+    latencias = sorted(latencia for _, latencia in resultados)
+    resultado = {
+        "altas": altas,
+        "exitosas": len(codigos),
+        "errores": dict(errores),
+        "codigos_repetidos": _repetidos(codigos),
+        "altas_por_segundo": round(altas / transcurrido, 2),
+        "p50_ms": round(percentil(latencias, 50) * 1000, 2),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 2),
+        "primer_codigo": min(codigos, default=None),
+        "ultimo_codigo": max(codigos, default=None),
+    }
+    log(f"  API:   {resultado['exitosas']}/{altas} altas, {resultado['codigos_repetidos']} repetidos, "
+        f"errores={resultado['errores']} ({resultado['altas_por_segundo']} altas/s, p95={resultado['p95_ms']}ms)")
+    return resultado
+
+
+def _reservas_hilos(reservas: int, hilos: int, log=print) -> dict:
+    def reservar(_):
+        with engine.begin() as conexion:
+            return conexion.execute(sentencia_reserva(conexion.dialect.name, SECUENCIA_PRUEBA)).scalar_one()
+
+    with engine.begin() as conexion:
+        conexion.execute(delete(Secuencia).where(Secuencia.nombre == SECUENCIA_PRUEBA))
+    errores = 0
+    numeros = []
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        for futuro in [ejecutor.submit(reservar, n) for n in range(reservas)]:
+            try:
+                numeros.append(futuro.result())
+            except Exception:
+                errores += 1
+    transcurrido = time.perf_counter() - inicio
+    with engine.begin() as conexion:
+        conexion.execute(delete(Secuencia).where(Secuencia.nombre == SECUENCIA_PRUEBA))
+
+    resultado = {
+        "reservas": reservas,
+        "hilos": hilos,
+        "errores": errores,
+        "numeros_repetidos": _repetidos(numeros),
+        # Sin huecos: se entregaron exactamente 1..n
+        "correlativos": sorted(numeros) == list(range(1, len(numeros) + 1)),
+        "reservas_por_segundo": round(reservas / transcurrido, 2),
+    }
+    log(f"  hilos: {len(numeros)}/{reservas} reservas, {resultado['numeros_repetidos']} repetidos, "
+        f"correlativos={resultado['correlativos']}, errores={errores} ({resultado['reservas_por_segundo']}/s)")
+    return resultado
+
+
+def probar_concurrencia(altas: int = 300, reservas: int = 300, hilos: int = 16, log=print) -> dict:
+    """Ejecuta ambas pruebas; informe['ok'] es False si hubo errores o repetidos"""
+    api = asyncio.run(_altas_api(altas, log))
+    sincronico = _reservas_hilos(reservas, hilos, log)
+    return {
+        "meta": {
+            "cpus": os.cpu_count(),
+            "dialecto": engine.dialect.name,
+            "database_async": settings.DATABASE_ASYNC,
+            "pool": settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+        },
+        "api": api,
+        "hilos": sincronico,
+        "ok": not (api["errores"] or api["codigos_repetidos"] or sincronico["errores"]
+                   or sincronico["numeros_repetidos"] or not sincronico["correlativos"]),
+    }
@@ -0,0 +1,175 @@
+"""
+Ejecución de los escenarios contra la app en proceso (httpx.AsyncClient +
+ASGITransport) y cálculo de latencias, consultas por petición y memoria.
+"""
+import asyncio
+import platform
+import random
+import re
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional
+
+import httpx
+import sqlalchemy
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import engine
+from app.main import app
+from app.models.usuario import Area, Usuario
+from app.models.iniciativa import Iniciativa
+from app.models.proyecto import Proyecto, EstadoProyecto
+from app.models.planificacion import PlanAnual
+
+from .escenarios import Escenario
+from .portfolio import EMAIL_BENCHMARK, PASSWORD_BENCHMARK
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_RE_CONSULTAS = re.compile(r'consultas;desc="(\d+)"')
+
+
+def rss_pico_mb() -> Optional[float]:
+    """Máximo de memoria residente del proceso hasta ahora (None si no se puede medir)"""
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa KB, macOS bytes
+        return round(pico / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+    except (ImportError, AttributeError):
+        return None
+
+
+def percentil(ordenados: List[float], p: float) -> float:
+    """Percentil con interpolación lineal sobre una lista ordenada"""
+    if not ordenados:
+        return 0.0
+    posicion = (len(ordenados) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+
+def cargar_contexto() -> dict:
+    """Ids existentes del portfolio para completar los parámetros de ruta"""
+    with engine.connect() as conexion:
+        def ids(consulta):
+            return list(conexion.scalars(consulta)) or [0]
+
+        return {
+            "usuarios": ids(select(Usuario.id)),
+            "areas": ids(select(Area.id)),
+            "iniciativas": ids(select(Iniciativa.id)),
+            "proyectos": ids(select(Proyecto.id)),
+            "proyectos_en_ejecucion": ids(
+                select(Proyecto.id).where(Proyecto.estado == EstadoProyecto.EN_EJECUCION)
+            ),
+            "años": ids(select(PlanAnual.año)),
+        }
+
+
+def resumir(latencias: List[float], consultas: List[int], estados: Counter) -> dict:
+    ordenadas = sorted(latencias)
+    return {
+        "peticiones": len(latencias),
+        "p50_ms": round(percentil(ordenadas, 50) * 1000, 2),
+        "p95_ms": round(percentil(ordenadas, 95) * 1000, 2),
+        "p99_ms": round(percentil(ordenadas, 99) * 1000, 2),
+        "media_ms": round(sum(ordenadas) / len(ordenadas) * 1000, 2) if ordenadas else 0,
+        "max_ms": round(ordenadas[-1] * 1000, 2) if ordenadas else 0,
+        "consultas_por_peticion": round(sum(consultas) / len(consultas), 2) if consultas else None,
+        "consultas_max": max(consultas) if consultas else None,
+        "errores": sum(n for estado, n in estados.items() if estado >= 400),
+        # Una ruta que no responde 2xx no mide lo que dice medir
+        "valido": all(200 <= estado < 300 for estado in estados),
+        "estados": {str(estado): n for estado, n in sorted(estados.items())},
+    }
+
+
+async def _medir_escenario(cliente, escenario: Escenario, contexto: dict, azar: random.Random,
+                           iteraciones: int, concurrencia: int, calentamiento: int) -> dict:
+    latencias, consultas, estados = [], [], Counter()
+    semaforo = asyncio.Semaphore(concurrencia)
+
+    async def una(registrar: bool):
+        argumentos = escenario.peticion(contexto, azar)
+        async with semaforo:
+            inicio = time.perf_counter()
+            respuesta = await cliente.request(**argumentos)
+            duracion = time.perf_counter() - inicio
+        if registrar:
+            latencias.append(duracion)
+            estados[respuesta.status_code] += 1
+            coincidencia = _RE_CONSULTAS.search(respuesta.headers.get("server-timing", ""))
+            if coincidencia:
+                consultas.append(int(coincidencia.group(1)))
+
+    for _ in range(calentamiento):
+        await una(registrar=False)
+
+    rss_antes = rss_pico_mb()
+    await asyncio.gather(*(una(registrar=True) for _ in range(iteraciones)))
+    rss_despues = rss_pico_mb()
+
+    resultado = resumir(latencias, consultas, estados)
+    resultado["rss_pico_mb"] = rss_despues
+    resultado["rss_incremento_mb"] = (
+        round(rss_despues - rss_antes, 1) if rss_antes is not None and rss_despues is not None else None
+    )
+    return resultado
+
+
+async def ejecutar(escenarios: List[Escenario], iteraciones: int = 50, concurrencia: int = 4,
+                   calentamiento: int = 3, semilla: int = 42, log=print) -> dict:
+    """Recorre los escenarios y devuelve el informe completo (serializable a JSON)"""
+    azar = random.Random(semilla)
+    contexto = cargar_contexto()
+    # Las escrituras al final, para que no alteren los datos de las lecturas
+    escenarios = sorted(escenarios, key=lambda escenario: escenario.metodo != "GET")
+    resultados = {}
+
+    async with app.router.lifespan_context(app):
+        transporte = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://benchmark", timeout=None) as cliente:
+            respuesta = await cliente.post(
+                "/api/auth/login", data={"username": EMAIL_BENCHMARK, "password": PASSWORD_BENCHMARK}
+            )
+            if respuesta.status_code != 200:
+                raise RuntimeError(f"No se pudo autenticar el usuario del benchmark: {respuesta.text}")
+            cliente.headers["Authorization"] = f"Bearer {respuesta.json()['access_token']}"
+
+            for escenario in escenarios:
+                resultado = await _medir_escenario(
+                    cliente, escenario, contexto, azar, iteraciones, concurrencia, calentamiento
+                )
+                resultados[escenario.nombre] = resultado
+                log(f"  {escenario.nombre:<62} p50={resultado['p50_ms']:>9.2f}ms "
+                    f"p95={resultado['p95_ms']:>9.2f}ms consultas={resultado['consultas_por_peticion']} "
+                    f"errores={resultado['errores']}{'' if resultado['valido'] else ' INVÁLIDO'}")
+
+    return {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "motor": engine.dialect.name,
+            "database_async": settings.DATABASE_ASYNC,
+            "sqlite_produccion": settings.SQLITE_PRODUCCION,
+            "iteraciones": iteraciones,
+            "concurrencia": concurrencia,
+            "calentamiento": calentamiento,
+            "semilla": semilla,
+            "portfolio": {nombre: len(valores) for nombre, valores in contexto.items()},
+            "rss_pico_mb": rss_pico_mb(),
+            "invalidos": [nombre for nombre, resultado in resultados.items() if not resultado["valido"]],
+        },
+        "endpoints": resultados,
+    }
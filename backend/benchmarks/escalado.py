@@ -0,0 +1,160 @@
+"""
+Rendimiento según la cantidad de workers, contra el servidor real.
+
+Para cada cantidad levanta `gunicorn -c gunicorn.conf.py` (o `uvicorn
+--workers` donde no hay fork), espera /health, reparte los GET de ESCENARIOS
+entre `concurrencia` clientes durante `duracion` segundos y lo detiene con
+SIGTERM con peticiones en curso, para verificar que se drenan.
+"""
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import List
+
+import httpx
+
+from app.config import settings
+
+from .ejecutor import _RE_CONSULTAS, cargar_contexto, resumir
+from .escenarios import ESCENARIOS
+from .portfolio import EMAIL_BENCHMARK, PASSWORD_BENCHMARK
+
+DIRECTORIO_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def comando_servidor(servidor: str, workers: int, puerto: int) -> List[str]:
+    if servidor == "gunicorn":
+        return [sys.executable, "-m", "gunicorn", "app.main:app", "-c", "gunicorn.conf.py",
+                "--workers", str(workers), "--bind", f"127.0.0.1:{puerto}"]
+    return [sys.executable, "-m", "uvicorn", "app.main:app", "--workers", str(workers),
+            "--host", "127.0.0.1", "--port", str(puerto), "--timeout-graceful-shutdown", "30",
+            "--limit-concurrency", str(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW),
+            "--log-level", "warning"]
+
+
+async def _esperar_salud(cliente: httpx.AsyncClient, proceso: subprocess.Popen, limite: float = 60.0) -> float:
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"El servidor terminó con código {proceso.returncode}")
+        try:
+            if (await cliente.get("/health")).status_code == 200:
+                return time.perf_counter() - inicio
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.05)
+    raise RuntimeError(f"El servidor no respondió /health en {limite:.0f} s")
+
+
+async def _carga(cliente: httpx.AsyncClient, escenarios, contexto: dict, duracion: float,
+                 concurrencia: int, semilla: int) -> dict:
+    """Clientes en bucle cerrado durante `duracion` segundos"""
+    latencias, consultas, estados = [], [], Counter()
+    errores_conexion = 0
+    fin = time.perf_counter() + duracion
+
+    async def cliente_virtual(numero: int):
+        nonlocal errores_conexion
+        azar = random.Random(semilla + numero)
+        while time.perf_counter() < fin:
+            argumentos = azar.choice(escenarios).peticion(contexto, azar)
+            inicio = time.perf_counter()
+            try:
+                respuesta = await cliente.request(**argumentos)
+            except httpx.TransportError:
+                # El servidor cierra la conexión tras un error no controlado
+                errores_conexion += 1
+                continue
+            latencias.append(time.perf_counter() - inicio)
+            estados[respuesta.status_code] += 1
+            coincidencia = _RE_CONSULTAS.search(respuesta.headers.get("server-timing", ""))
+            if coincidencia:
+                consultas.append(int(coincidencia.group(1)))
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente_virtual(numero) for numero in range(concurrencia)))
+    transcurrido = time.perf_counter() - inicio
+    return {"peticiones_por_segundo": round(len(latencias) / transcurrido, 1),
+            "errores_conexion": errores_conexion, **resumir(latencias, consultas, estados)}
+
+
+async def _drenado(cliente: httpx.AsyncClient, proceso: subprocess.Popen, escenarios, contexto: dict,
+                   concurrencia: int, semilla: int) -> dict:
+    """SIGTERM con `concurrencia` peticiones en curso: deben terminar todas"""
+    azar = random.Random(semilla)
+    peticiones = [
+        asyncio.ensure_future(cliente.request(**azar.choice(escenarios).peticion(contexto, azar)))
+        for _ in range(concurrencia)
+    ]
+    await asyncio.sleep(0.2)
+    inicio = time.perf_counter()
+    proceso.terminate()
+    respuestas = await asyncio.gather(*peticiones, return_exceptions=True)
+    codigo = await asyncio.get_running_loop().run_in_executor(None, proceso.wait)
+    completadas = sum(1 for r in respuestas if isinstance(r, httpx.Response) and r.status_code < 500)
+    return {
+        "en_curso": len(peticiones),
+        "completadas": completadas,
+        "fallidas": len(peticiones) - completadas,
+        "apagado_s": round(time.perf_counter() - inicio, 2),
+        "codigo_salida": codigo,
+    }
+
+
+async def medir_workers(cantidad: int, servidor: str, escenarios, contexto: dict, duracion: float,
+                        concurrencia: int, puerto: int, semilla: int) -> dict:
+    proceso = subprocess.Popen(comando_servidor(servidor, cantidad, puerto), cwd=DIRECTORIO_BACKEND)
+    try:
+        limites = httpx.Limits(max_connections=concurrencia, max_keepalive_connections=concurrencia)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{puerto}", timeout=60, limits=limites) as cliente:
+            arranque = await _esperar_salud(cliente, proceso)
+            respuesta = await cliente.post(
+                "/api/auth/login", data={"username": EMAIL_BENCHMARK, "password": PASSWORD_BENCHMARK}
+            )
+            if respuesta.status_code != 200:
+                raise RuntimeError(f"No se pudo autenticar el usuario del benchmark: {respuesta.text}")
+            cliente.headers["Authorization"] = f"Bearer {respuesta.json()['access_token']}"
+
+            # Calentamiento: cada worker recibe peticiones antes de medir
+            await _carga(cliente, escenarios, contexto, min(2.0, duracion), concurrencia, semilla)
+            resultado = await _carga(cliente, escenarios, contexto, duracion, concurrencia, semilla)
+            resultado["drenado"] = await _drenado(cliente, proceso, escenarios, contexto, concurrencia, semilla)
+        return {"workers": cantidad, "arranque_s": round(arranque, 2), **resultado}
+    finally:
+        if proceso.poll() is None:
+            proceso.kill()
+            proceso.wait()
+
+
+async def escalar(workers: List[int], servidor: str, duracion: float = 10.0, concurrencia: int = 16,
+                  puerto: int = 8765, semilla: int = 42, log=print) -> dict:
+    """Mide cada cantidad de workers y devuelve el informe (serializable a JSON)"""
+    contexto = cargar_contexto()
+    escenarios = [escenario for escenario in ESCENARIOS if escenario.metodo == "GET"]
+    resultados = []
+    for cantidad in workers:
+        resultado = await medir_workers(
+            cantidad, servidor, escenarios, contexto, duracion, concurrencia, puerto, semilla
+        )
+        resultados.append(resultado)
+        drenado = resultado["drenado"]
+        log(f"  workers={cantidad:<3} {resultado['peticiones_por_segundo']:>8.1f} req/s "
+            f"p50={resultado['p50_ms']:>8.2f}ms p95={resultado['p95_ms']:>8.2f}ms "
+            f"errores={resultado['errores']} drenado={drenado['completadas']}/{drenado['en_curso']} "
+            f"en {drenado['apagado_s']}s")
+
+    return {
+        "meta": {
+            "servidor": servidor,
+            "cpus": os.cpu_count(),
+            "duracion_s": duracion,
+            "concurrencia": concurrencia,
+            "semilla": semilla,
+            "endpoints": len(escenarios),
+        },
+        "resultados": resultados,
+    }
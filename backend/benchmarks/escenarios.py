@@ -0,0 +1,167 @@
+"""
+Endpoints que recorre el benchmark, agrupados por router.
+La ruta es la plantilla de FastAPI (la misma etiqueta que usa /metrics); los
+parámetros de ruta se completan con ids existentes del portfolio. Toda
+respuesta fuera de 2xx invalida el endpoint en el informe.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from app.models.iniciativa import EstadoIniciativa
+from app.services.scoring import ScoringService
+
+from .portfolio import EMAIL_BENCHMARK, PASSWORD_BENCHMARK
+
+ESTADOS = list(EstadoIniciativa)
+
+
+@dataclass
+class Escenario:
+    metodo: str
+    ruta: str
+    # parámetro de ruta -> conjunto de ids del contexto ("proyectos", "iniciativas", ...)
+    ids: Dict[str, str] = field(default_factory=dict)
+    # valor del cuerpo -> (conjunto de ids, tamaño): ids distintos para los lotes
+    muestras: Dict[str, Tuple[str, int]] = field(default_factory=dict)
+    query: Optional[dict] = None
+    cuerpo: Optional[Callable[[dict, random.Random], dict]] = None
+    formulario: Optional[dict] = None
+
+    @property
+    def nombre(self) -> str:
+        return f"{self.metodo} {self.ruta}"
+
+    def peticion(self, contexto: dict, azar: random.Random) -> dict:
+        """Argumentos de httpx para una ejecución del escenario"""
+        valores = {parametro: azar.choice(contexto[conjunto]) for parametro, conjunto in self.ids.items()}
+        argumentos = {"method": self.metodo, "url": self.ruta.format(**valores)}
+        for nombre, (conjunto, tamaño) in self.muestras.items():
+            valores[nombre] = azar.sample(contexto[conjunto], min(tamaño, len(contexto[conjunto])))
+        if self.query:
+            argumentos["params"] = self.query
+        if self.cuerpo:
+            argumentos["json"] = self.cuerpo(valores, azar)
+        if self.formulario:
+            argumentos["data"] = self.formulario
+        return argumentos
+
+
+def _nueva_iniciativa(valores: dict, azar: random.Random) -> dict:
+    return {
+        "titulo": "Iniciativa benchmark",
+        "descripcion": "Creada por el benchmark",
+        "area_demandante_id": 1,
+        "monto_estimado": azar.choice((80, 400, 2000)) * 1_000_000,
+        "porcentaje_transformacion": azar.randint(0, 100)
+    }
+
+
+def _entrada_bitacora(valores: dict, azar: random.Random) -> dict:
+    return {"proyecto_id": valores["proyecto_id"], "tipo": "nota", "descripcion": "Entrada benchmark"}
+
+
+def _ejecucion_mensual(valores: dict, azar: random.Random) -> dict:
+    return {
+        "proyecto_id": valores["proyecto_id"], "año": datetime.now().year, "mes": azar.randint(1, 12),
+        "capex_planificado": 1000, "capex_ejecutado": azar.randint(500, 1500),
+        "avance_planificado": 50, "avance_real": azar.randint(30, 70)
+    }
+
+
+def _simulacion_scoring(valores: dict, azar: random.Random) -> dict:
+    return {"pesos": {"dim_c_urgencia": azar.choice((1.5, 2.0))}}
+
+
+def _lote_scoring(valores: dict, azar: random.Random) -> dict:
+    return {"scorings": [
+        {
+            "iniciativa_id": iniciativa_id,
+            **{dimension: azar.randint(0, tope) for dimension, tope in ScoringService.TOPES_DIMENSIONES.items()}
+        }
+        for iniciativa_id in valores["iniciativa_ids"]
+    ]}
+
+
+def _lote_cambio_estado(valores: dict, azar: random.Random) -> dict:
+    # El usuario del benchmark es administrador: cualquier transición salvo
+    # al mismo estado, que con ?parcial=true solo queda como error del ítem
+    return {
+        "cambios": [
+            {"iniciativa_id": iniciativa_id, "nuevo_estado": azar.choice(ESTADOS)}
+            for iniciativa_id in valores["iniciativa_ids"]
+        ],
+        "comentario": "Cambio benchmark",
+    }
+
+
+PROYECTO = {"proyecto_id": "proyectos"}
+INICIATIVA = {"iniciativa_id": "iniciativas"}
+
+ESCENARIOS = [
+    # auth
+    Escenario("POST", "/api/auth/login",
+              formulario={"username": EMAIL_BENCHMARK, "password": PASSWORD_BENCHMARK}),
+    Escenario("GET", "/api/auth/me"),
+    # usuarios
+    Escenario("GET", "/api/usuarios/"),
+    Escenario("GET", "/api/usuarios/{usuario_id}", ids={"usuario_id": "usuarios"}),
+    Escenario("GET", "/api/usuarios/areas/"),
+    Escenario("GET", "/api/usuarios/areas/{area_id}", ids={"area_id": "areas"}),
+    # iniciativas
+    Escenario("GET", "/api/iniciativas/"),
+    Escenario("GET", "/api/iniciativas/workflow/pipeline"),
+    Escenario("GET", "/api/iniciativas/workflow/metrics"),
+    Escenario("GET", "/api/iniciativas/{iniciativa_id}", ids=INICIATIVA),
+    Escenario("GET", "/api/iniciativas/{iniciativa_id}/historial", ids=INICIATIVA),
+    Escenario("POST", "/api/iniciativas/", cuerpo=_nueva_iniciativa),
+    Escenario("POST", "/api/iniciativas/reclasificar"),
+    Escenario("POST", "/api/iniciativas/scoring/simulacion", cuerpo=_simulacion_scoring),
+    Escenario("POST", "/api/iniciativas/scoring/batch", muestras={"iniciativa_ids": ("iniciativas", 50)},
+              cuerpo=_lote_scoring),
+    Escenario("POST", "/api/iniciativas/cambiar-estado/bulk", query={"parcial": "true"},
+              muestras={"iniciativa_ids": ("iniciativas", 50)}, cuerpo=_lote_cambio_estado),
+    # busqueda
+    Escenario("GET", "/api/busqueda/", query={"q": "iniciativa"}),
+    # proyectos
+    Escenario("GET", "/api/proyectos/"),
+    Escenario("GET", "/api/proyectos/banco-reserva"),
+    Escenario("GET", "/api/proyectos/{proyecto_id}", ids=PROYECTO),
+    Escenario("GET", "/api/proyectos/{proyecto_id}/fases", ids=PROYECTO),
+    Escenario("GET", "/api/proyectos/{proyecto_id}/riesgos", ids=PROYECTO),
+    Escenario("GET", "/api/proyectos/{proyecto_id}/issues", ids=PROYECTO),
+    Escenario("GET", "/api/proyectos/{proyecto_id}/bitacora", ids=PROYECTO),
+    Escenario("POST", "/api/proyectos/{proyecto_id}/bitacora", ids=PROYECTO, cuerpo=_entrada_bitacora),
+    # evaluaciones
+    Escenario("GET", "/api/evaluaciones/pendientes"),
+    Escenario("GET", "/api/evaluaciones/iniciativa/{iniciativa_id}", ids=INICIATIVA),
+    # planificacion
+    Escenario("GET", "/api/planificacion/planes"),
+    Escenario("GET", "/api/planificacion/planes/{anio}", ids={"anio": "años"}),
+    Escenario("GET", "/api/planificacion/simulacion/{anio}", ids={"anio": "años"}),
+    # presupuesto
+    Escenario("GET", "/api/presupuesto/proyecto/{proyecto_id}", ids=PROYECTO),
+    Escenario("GET", "/api/presupuesto/proyecto/{proyecto_id}/detalle", ids=PROYECTO),
+    Escenario("GET", "/api/presupuesto/cambios/pendientes"),
+    Escenario("GET", "/api/presupuesto/cambios/proyecto/{proyecto_id}", ids=PROYECTO),
+    Escenario("GET", "/api/presupuesto/clasificacion/proyecto/{proyecto_id}", ids=PROYECTO),
+    Escenario("GET", "/api/presupuesto/alertas/proyecto/{proyecto_id}", ids=PROYECTO),
+    Escenario("GET", "/api/presupuesto/curva-s/proyecto/{proyecto_id}", ids=PROYECTO),
+    # seguimiento
+    Escenario("GET", "/api/seguimiento/ejecucion/proyecto/{proyecto_id}", ids=PROYECTO),
+    Escenario("GET", "/api/seguimiento/resumen-portfolio"),
+    Escenario("POST", "/api/seguimiento/ejecucion", ids={"proyecto_id": "proyectos_en_ejecucion"},
+              cuerpo=_ejecucion_mensual),
+    Escenario("PUT", "/api/seguimiento/proyecto/{proyecto_id}/avance",
+              ids={"proyecto_id": "proyectos_en_ejecucion"}, query={"avance_porcentaje": 50}),
+    # dashboard
+    Escenario("GET", "/api/dashboard/ejecutivo"),
+    Escenario("GET", "/api/dashboard/kpis"),
+    Escenario("GET", "/api/dashboard/funnel"),
+    Escenario("GET", "/api/dashboard/salud"),
+    Escenario("GET", "/api/dashboard/financiero"),
+    Escenario("GET", "/api/dashboard/banco-reserva"),
+    Escenario("GET", "/api/dashboard/clasificacion"),
+    Escenario("GET", "/api/dashboard/por-rol"),
+]
@@ -0,0 +1,98 @@
+"""
+Ráfaga de logins contra la app en proceso. Mide logins por segundo y la
+latencia de /health mientras dura la ráfaga (cuánto se bloquea el event
+loop), con bcrypt en el event loop (BCRYPT_HILOS=0) y en pools de hilos.
+"""
+import asyncio
+import os
+import time
+from typing import List
+
+import httpx
+
+from app.config import settings
+from app.main import app
+from app.utils import security
+
+from .ejecutor import percentil
+from .portfolio import EMAIL_BENCHMARK, PASSWORD_BENCHMARK
+
+
+def _ms(ordenadas: List[float], p: float) -> float:
+    return round(percentil(ordenadas, p) * 1000, 2)
+
+
+async def _rafaga(cliente: httpx.AsyncClient, logins: int, concurrencia: int) -> dict:
+    latencias_login, latencias_salud = [], []
+    errores = 0
+    pendientes = iter(range(logins))
+    en_curso = True
+
+    async def cliente_login():
+        nonlocal errores
+        for _ in pendientes:
+            inicio = time.perf_counter()
+            respuesta = await cliente.post(
+                "/api/auth/login", data={"username": EMAIL_BENCHMARK, "password": PASSWORD_BENCHMARK}
+            )
+            latencias_login.append(time.perf_counter() - inicio)
+            if respuesta.status_code != 200:
+                errores += 1
+
+    async def sondear_salud():
+        while en_curso:
+            inicio = time.perf_counter()
+            await cliente.get("/health")
+            latencias_salud.append(time.perf_counter() - inicio)
+            await asyncio.sleep(0.01)
+
+    sonda = asyncio.create_task(sondear_salud())
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente_login() for _ in range(concurrencia)))
+    transcurrido = time.perf_counter() - inicio
+    en_curso = False
+    await sonda
+
+    latencias_login.sort()
+    latencias_salud.sort()
+    return {
+        "logins": len(latencias_login),
+        "logins_por_segundo": round(len(latencias_login) / transcurrido, 2),
+        "login_p50_ms": _ms(latencias_login, 50),
+        "login_p95_ms": _ms(latencias_login, 95),
+        "health_peticiones": len(latencias_salud),
+        "health_p50_ms": _ms(latencias_salud, 50),
+        "health_p95_ms": _ms(latencias_salud, 95),
+        "health_max_ms": round(latencias_salud[-1] * 1000, 2) if latencias_salud else 0,
+        "errores": errores,
+    }
+
+
+async def medir_login(hilos: List[int], logins: int = 40, concurrencia: int = 8, log=print) -> dict:
+    """Una ráfaga por tamaño de pool; devuelve el informe (serializable a JSON)"""
+    resultados = []
+    async with app.router.lifespan_context(app):
+        transporte = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://benchmark", timeout=None) as cliente:
+            for cantidad in hilos:
+                settings.BCRYPT_HILOS = cantidad
+                if security._pool_bcrypt is not None:
+                    security._pool_bcrypt.shutdown()
+                    security._pool_bcrypt = None
+
+                resultado = {"hilos": cantidad, **await _rafaga(cliente, logins, concurrencia)}
+                resultados.append(resultado)
+                log(f"  hilos={cantidad:<3} {resultado['logins_por_segundo']:>7.2f} logins/s "
+                    f"login p95={resultado['login_p95_ms']:>8.1f}ms "
+                    f"/health p95={resultado['health_p95_ms']:>8.1f}ms max={resultado['health_max_ms']:>8.1f}ms "
+                    f"errores={resultado['errores']}")
+
+    return {
+        "meta": {
+            "cpus": os.cpu_count(),
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            "logins": logins,
+            "concurrencia": concurrencia,
+        },
+        "resultados": resultados,
+    }
@@ -0,0 +1,359 @@
+"""
+Generación de un portfolio sintético a escala con los modelos reales.
+Las filas se insertan por lotes (executemany de Core) con ids asignados en
+memoria, para no consultar claves generadas en cada inserción.
+"""
+import random
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+
+from app.database import engine
+from app.models.usuario import Area, Usuario, RolUsuario
+from app.models.iniciativa import (
+    Iniciativa, HistorialEstadoIniciativa, ScoringIniciativa,
+    EstadoIniciativa, ClasificacionInversion, TipoInforme, Prioridad
+)
+from app.models.evaluacion import EvaluacionComite
+from app.models.proyecto import (
+    Proyecto, FaseProyecto, HitoProyecto, RiesgoProyecto, IssueProyecto,
+    BitacoraProyecto, EjecucionMensual, EstadoProyecto, EstadoFase,
+    SemaforoSalud, NivelRiesgo, SeveridadIssue, TipoBitacora
+)
+from app.models.presupuesto import PresupuestoProyecto, CambioPresupuesto, TipoCambioPresupuesto, EstadoCambio
+from app.models.planificacion import PlanAnual, PlanAnualProyecto, EstadoPlan
+from app.services.secuencias import sincronizar
+from app.services.workflow import reconstruir_tiempos
+from app.utils.security import get_password_hash
+
+# Usuario con el que se autentica el ejecutor
+EMAIL_BENCHMARK = "benchmark@benchmark.sgip.cl"
+PASSWORD_BENCHMARK = "benchmark"
+
+TAMANO_LOTE = 5000
+
+
+@dataclass
+class Escala:
+    areas: int = 20
+    usuarios: int = 200
+    iniciativas: int = 1000
+    proyectos: int = 200
+    ejecuciones: int = 5000
+    bitacora: int = 10000
+
+
+ESCALAS = {
+    "pequena": Escala(),
+    "media": Escala(areas=40, usuarios=1000, iniciativas=10000, proyectos=2000, ejecuciones=50000, bitacora=100000),
+    "grande": Escala(areas=80, usuarios=5000, iniciativas=100000, proyectos=20000, ejecuciones=500000, bitacora=1000000),
+}
+
+# Estados de iniciativa que pueden tener proyecto, y el estado del proyecto asociado
+_ESTADOS_CON_PROYECTO = [
+    (EstadoIniciativa.EN_BANCO_RESERVA, EstadoProyecto.BANCO_RESERVA),
+    (EstadoIniciativa.EN_PLAN_ANUAL, EstadoProyecto.PLAN_ANUAL),
+    (EstadoIniciativa.ACTIVADA, EstadoProyecto.EN_EJECUCION),
+    (EstadoIniciativa.ACTIVADA, EstadoProyecto.EN_EJECUCION),
+    (EstadoIniciativa.ACTIVADA, EstadoProyecto.EN_EJECUCION),
+    (EstadoIniciativa.ACTIVADA, EstadoProyecto.COMPLETADO),
+    (EstadoIniciativa.ACTIVADA, EstadoProyecto.PAUSADO),
+    (EstadoIniciativa.ACTIVADA, EstadoProyecto.CANCELADO),
+]
+_ESTADOS_SIN_PROYECTO = [
+    EstadoIniciativa.BORRADOR, EstadoIniciativa.ENVIADA, EstadoIniciativa.EN_REVISION,
+    EstadoIniciativa.EN_EVALUACION, EstadoIniciativa.EN_EVALUACION,
+    EstadoIniciativa.APROBADA, EstadoIniciativa.RECHAZADA
+]
+# Estado previo de cada estado en el flujo (para el historial)
+_ESTADO_ANTERIOR = {
+    EstadoIniciativa.ENVIADA: EstadoIniciativa.BORRADOR,
+    EstadoIniciativa.EN_REVISION: EstadoIniciativa.ENVIADA,
+    EstadoIniciativa.EN_EVALUACION: EstadoIniciativa.EN_REVISION,
+    EstadoIniciativa.APROBADA: EstadoIniciativa.EN_EVALUACION,
+    EstadoIniciativa.RECHAZADA: EstadoIniciativa.EN_EVALUACION,
+    EstadoIniciativa.EN_BANCO_RESERVA: EstadoIniciativa.APROBADA,
+    EstadoIniciativa.EN_PLAN_ANUAL: EstadoIniciativa.EN_BANCO_RESERVA,
+    EstadoIniciativa.ACTIVADA: EstadoIniciativa.EN_PLAN_ANUAL,
+}
+_ESTADOS_EVALUADOS = {
+    EstadoIniciativa.EN_EVALUACION, EstadoIniciativa.APROBADA, EstadoIniciativa.RECHAZADA,
+    EstadoIniciativa.EN_BANCO_RESERVA, EstadoIniciativa.EN_PLAN_ANUAL, EstadoIniciativa.ACTIVADA
+}
+
+
+def _insertar(conexion, modelo, filas) -> int:
+    for i in range(0, len(filas), TAMANO_LOTE):
+        conexion.execute(insert(modelo.__table__), filas[i:i + TAMANO_LOTE])
+    return len(filas)
+
+
+def _ajustar_secuencias(conexion, modelos) -> None:
+    """En PostgreSQL, avanza las secuencias de las tablas cargadas con ids explícitos"""
+    if conexion.dialect.name != "postgresql":
+        return
+    for modelo in modelos:
+        tabla = modelo.__tablename__
+        conexion.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{tabla}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {tabla}), 1))"
+        ))
+
+
+def _fecha(azar: random.Random, hoy: datetime, dias_max: int) -> datetime:
+    return hoy - timedelta(days=azar.randint(0, dias_max), minutes=azar.randint(0, 1439))
+
+
+def _clasificacion(monto: int, transformacion: int):
+    if monto > 1_500_000_000:
+        return ClasificacionInversion.ESTRATEGICA, TipoInforme.V3
+    if monto > 300_000_000:
+        if transformacion < 25:
+            return ClasificacionInversion.ALTA_A, TipoInforme.V2
+        return (ClasificacionInversion.ALTA_B if transformacion <= 75 else ClasificacionInversion.ALTA_C), TipoInforme.V2
+    return (ClasificacionInversion.ESTANDAR_A if transformacion < 50 else ClasificacionInversion.ESTANDAR_B), TipoInforme.V1
+
+
+def _prioridad(puntaje: int) -> Prioridad:
+    for minimo, prioridad in ((32, Prioridad.P1), (25, Prioridad.P2), (18, Prioridad.P3), (11, Prioridad.P4)):
+        if puntaje >= minimo:
+            return prioridad
+    return Prioridad.P5
+
+
+def generar_portfolio(escala: Escala, semilla: int = 42, log=print) -> dict:
+    """Inserta el portfolio en la base configurada (vacía y migrada) y devuelve los conteos"""
+    if escala.proyectos > escala.iniciativas:
+        raise ValueError("La escala requiere al menos tantas iniciativas como proyectos")
+
+    azar = random.Random(semilla)
+    hoy = datetime.utcnow().replace(microsecond=0)
+    año_actual = hoy.year
+    conteos = {}
+    inicio = time.perf_counter()
+
+    with engine.begin() as conexion:
+        # Áreas y usuarios (el primero es el usuario del benchmark)
+        conteos["areas"] = _insertar(conexion, Area, [
+            {"id": i, "nombre": f"Área {i}", "codigo": f"AR{i:04d}", "activa": True, "created_at": hoy}
+            for i in range(1, escala.areas + 1)
+        ])
+        hash_comun = get_password_hash(PASSWORD_BENCHMARK)
+        roles = list(RolUsuario)
+        usuarios = [{
+            "id": 1, "email": EMAIL_BENCHMARK, "hashed_password": hash_comun,
+            "nombre": "Benchmark", "apellido": "SGIP", "rol": RolUsuario.ADMINISTRADOR,
+            "area_id": 1, "activo": True, "created_at": hoy
+        }]
+        for i in range(2, escala.usuarios + 1):
+            usuarios.append({
+                "id": i, "email": f"usuario{i}@benchmark.sgip.cl", "hashed_password": hash_comun,
+                "nombre": f"Nombre{i}", "apellido": f"Apellido{i}", "rol": roles[i % len(roles)],
+                "area_id": azar.randint(1, escala.areas), "activo": True, "created_at": hoy
+            })
+        conteos["usuarios"] = _insertar(conexion, Usuario, usuarios)
+        comite = [u["id"] for u in usuarios if u["rol"] == RolUsuario.COMITE_EXPERTOS] or [1]
+        del usuarios
+        log(f"  áreas y usuarios ({time.perf_counter() - inicio:.1f}s)")
+
+        # Iniciativas: las primeras `proyectos` quedan en estados con proyecto
+        iniciativas, historial, scoring, evaluaciones = [], [], [], []
+        estado_proyecto = {}
+        for i in range(1, escala.iniciativas + 1):
+            if i <= escala.proyectos:
+                estado, estado_proyecto[i] = azar.choice(_ESTADOS_CON_PROYECTO)
+            else:
+                estado = azar.choice(_ESTADOS_SIN_PROYECTO)
+            monto = azar.choice((50, 120, 250, 450, 900, 1400, 2500)) * 1_000_000
+            transformacion = azar.randint(0, 100)
+            clasificacion, tipo = _clasificacion(monto, transformacion)
+            fecha = _fecha(azar, hoy, 3 * 365)
+            puntaje = azar.randint(0, 38) if estado != EstadoIniciativa.BORRADOR else 0
+            creador = azar.randint(1, escala.usuarios)
+            iniciativas.append({
+                "id": i, "codigo": f"INI-{fecha.year}-{i:06d}", "titulo": f"Iniciativa {i}",
+                "descripcion": f"Descripción de la iniciativa sintética {i}",
+                "area_demandante_id": azar.randint(1, escala.areas),
+                "monto_estimado": monto, "porcentaje_transformacion": transformacion,
+                "clasificacion_inversion": clasificacion, "tipo_informe": tipo,
+                "prioridad": _prioridad(puntaje) if puntaje else None, "puntaje_total": puntaje,
+                "estado": estado, "fecha_solicitud": fecha,
+                "fecha_aprobacion": fecha + timedelta(days=30) if estado in (
+                    EstadoIniciativa.APROBADA, EstadoIniciativa.EN_BANCO_RESERVA,
+                    EstadoIniciativa.EN_PLAN_ANUAL, EstadoIniciativa.ACTIVADA) else None,
+                "urgencia": azar.choice(("baja", "normal", "normal", "alta", "critica")),
+                "created_by": creador, "created_at": fecha, "updated_at": fecha
+            })
+
+            # Historial: creación y último cambio de estado
+            historial.append({
+                "iniciativa_id": i, "estado_anterior": None, "estado_nuevo": EstadoIniciativa.BORRADOR,
+                "usuario_id": creador, "fecha": fecha
+            })
+            if estado in _ESTADO_ANTERIOR:
+                historial.append({
+                    "iniciativa_id": i, "estado_anterior": _ESTADO_ANTERIOR[estado], "estado_nuevo": estado,
+                    "usuario_id": creador, "fecha": fecha + timedelta(days=7)
+                })
+
+            if puntaje:
+                scoring.append({
+                    "iniciativa_id": i, "dim_a_focos": min(puntaje, 4), "dim_a_profundidad": min(max(puntaje - 4, 0), 8),
+                    "dim_b_beneficio": min(max(puntaje - 12, 0), 6), "dim_b_alcance": min(max(puntaje - 18, 0), 4),
+                    "dim_c_urgencia": min(max(puntaje - 22, 0), 8), "dim_c_viabilidad": min(max(puntaje - 30, 0), 8),
+                    "puntaje_total": puntaje, "prioridad_calculada": _prioridad(puntaje),
+                    "calculado_por": creador, "fecha_calculo": fecha
+                })
+
+            if estado in _ESTADOS_EVALUADOS:
+                for evaluador in azar.sample(comite, min(2, len(comite))):
+                    d1, d2, d3 = azar.randint(15, 35), azar.randint(20, 40), azar.randint(10, 25)
+                    evaluaciones.append({
+                        "iniciativa_id": i, "evaluador_id": evaluador,
+                        "dim1_subtotal": d1, "dim2_subtotal": d2, "dim3_subtotal": d3,
+                        "puntaje_total": d1 + d2 + d3, "aprobado": d1 + d2 + d3 >= 80,
+                        "veto": False, "fecha_evaluacion": fecha + timedelta(days=14)
+                    })
+
+        conteos["iniciativas"] = _insertar(conexion, Iniciativa, iniciativas)
+        conteos["historial_estado_iniciativas"] = _insertar(conexion, HistorialEstadoIniciativa, historial)
+        conteos["scoring_iniciativas"] = _insertar(conexion, ScoringIniciativa, scoring)
+        conteos["evaluaciones_comite"] = _insertar(conexion, EvaluacionComite, evaluaciones)
+        iniciativas_por_id = {ini["id"]: ini for ini in iniciativas[:escala.proyectos]}
+        del iniciativas, historial, scoring, evaluaciones
+        log(f"  iniciativas ({time.perf_counter() - inicio:.1f}s)")
+
+        # Proyectos con presupuesto, fases, hitos, riesgos, issues y cambios
+        proyectos, presupuestos, fases, hitos, riesgos, issues, cambios = [], [], [], [], [], [], []
+        con_ejecucion = []
+        id_fase = 0
+        for i in range(1, escala.proyectos + 1):
+            ini = iniciativas_por_id[i]
+            estado = estado_proyecto[i]
+            inicio_plan = ini["fecha_aprobacion"] + timedelta(days=azar.randint(30, 120))
+            fin_plan = inicio_plan + timedelta(days=azar.randint(180, 720))
+            avance = {
+                EstadoProyecto.BANCO_RESERVA: 0, EstadoProyecto.PLAN_ANUAL: 0,
+                EstadoProyecto.COMPLETADO: 100
+            }.get(estado, azar.randint(5, 95))
+            monto = ini["monto_estimado"]
+            proyectos.append({
+                "id": i, "iniciativa_id": i, "codigo_proyecto": f"PRY-{i:06d}",
+                "nombre": ini["titulo"], "descripcion": ini["descripcion"], "estado": estado,
+                "año_plan": año_actual + azar.randint(-2, 1) if estado != EstadoProyecto.BANCO_RESERVA else None,
+                "semaforo_salud": azar.choice((SemaforoSalud.VERDE, SemaforoSalud.VERDE, SemaforoSalud.AMARILLO, SemaforoSalud.ROJO)),
+                "presupuesto_asignado": monto,
+                "fecha_inicio_planificada": inicio_plan, "fecha_fin_planificada": fin_plan,
+                "fecha_inicio_real": inicio_plan if avance else None,
+                "avance_porcentaje": avance, "responsable_id": azar.randint(1, escala.usuarios),
+                "created_at": ini["fecha_aprobacion"], "updated_at": ini["fecha_aprobacion"]
+            })
+            ejecutado = monto * avance // 100
+            presupuestos.append({
+                "proyecto_id": i, "capex_aprobado": monto, "capex_comprometido": min(monto, ejecutado * 11 // 10),
+                "capex_ejecutado": ejecutado, "opex_proyectado_anual": monto // 10, "created_at": inicio_plan
+            })
+            duracion = (fin_plan - inicio_plan) / 4
+            for orden, nombre in enumerate(("Análisis", "Diseño", "Construcción", "Implantación"), start=1):
+                id_fase += 1
+                fases.append({
+                    "id": id_fase, "proyecto_id": i, "nombre": nombre, "orden": orden,
+                    "fecha_inicio_planificada": inicio_plan + duracion * (orden - 1),
+                    "fecha_fin_planificada": inicio_plan + duracion * orden,
+                    "avance_porcentaje": min(100, max(0, avance * 4 - (orden - 1) * 100)),
+                    "estado": EstadoFase.COMPLETADA if avance >= orden * 25 else EstadoFase.PENDIENTE
+                })
+                if orden % 2 == 0:
+                    hitos.append({
+                        "proyecto_id": i, "fase_id": id_fase, "nombre": f"Hito {nombre}",
+                        "fecha_planificada": inicio_plan + duracion * orden, "completado": avance >= orden * 25
+                    })
+            for _ in range(2):
+                riesgos.append({
+                    "proyecto_id": i, "descripcion": "Riesgo sintético",
+                    "probabilidad": azar.choice(list(NivelRiesgo)), "impacto": azar.choice(list(NivelRiesgo)),
+                    "estado": azar.choice(("abierto", "mitigado", "cerrado")), "fecha_identificacion": inicio_plan
+                })
+            issues.append({
+                "proyecto_id": i, "titulo": "Issue sintético", "descripcion": "Issue sintético",
+                "severidad": azar.choice(list(SeveridadIssue)), "estado": azar.choice(("abierto", "en_progreso", "resuelto")),
+                "fecha_creacion": inicio_plan
+            })
+            if i % 4 == 0:
+                cambios.append({
+                    "proyecto_id": i, "tipo": azar.choice(list(TipoCambioPresupuesto)),
+                    "monto_solicitado": monto // 10, "justificacion": "Cambio sintético",
+                    "estado": azar.choice(list(EstadoCambio)), "solicitado_por": azar.randint(1, escala.usuarios),
+                    "fecha_solicitud": inicio_plan + timedelta(days=60)
+                })
+            if estado in (EstadoProyecto.EN_EJECUCION, EstadoProyecto.COMPLETADO, EstadoProyecto.PAUSADO):
+                con_ejecucion.append((i, inicio_plan, monto))
+
+        conteos["proyectos"] = _insertar(conexion, Proyecto, proyectos)
+        conteos["presupuesto_proyecto"] = _insertar(conexion, PresupuestoProyecto, presupuestos)
+        conteos["fases_proyecto"] = _insertar(conexion, FaseProyecto, fases)
+        conteos["hitos_proyecto"] = _insertar(conexion, HitoProyecto, hitos)
+        conteos["riesgos_proyecto"] = _insertar(conexion, RiesgoProyecto, riesgos)
+        conteos["issues_proyecto"] = _insertar(conexion, IssueProyecto, issues)
+        conteos["cambios_presupuesto"] = _insertar(conexion, CambioPresupuesto, cambios)
+
+        # Planes anuales de los años con proyectos asignados
+        años = sorted({p["año_plan"] for p in proyectos if p["año_plan"]})
+        planes = {año: indice for indice, año in enumerate(años, start=1)}
+        conteos["plan_anual"] = _insertar(conexion, PlanAnual, [{
+            "id": indice, "año": año, "nombre": f"Plan {año}",
+            "presupuesto_total": sum(p["presupuesto_asignado"] for p in proyectos if p["año_plan"] == año),
+            "estado": EstadoPlan.APROBADO if año < año_actual else EstadoPlan.BORRADOR, "created_at": hoy
+        } for año, indice in planes.items()])
+        conteos["plan_anual_proyectos"] = _insertar(conexion, PlanAnualProyecto, [{
+            "plan_id": planes[p["año_plan"]], "proyecto_id": p["id"], "monto_asignado": p["presupuesto_asignado"],
+            "orden_prioridad": orden, "fecha_inclusion": hoy
+        } for orden, p in enumerate((p for p in proyectos if p["año_plan"]), start=1)])
+        del proyectos, presupuestos, fases, hitos, riesgos, issues, cambios
+        log(f"  proyectos ({time.perf_counter() - inicio:.1f}s)")
+
+        # Ejecución mensual: meses consecutivos por proyecto (único por período)
+        ejecuciones = []
+        if con_ejecucion:
+            meses_por_proyecto = -(-escala.ejecuciones // len(con_ejecucion))
+            for proyecto_id, inicio_plan, monto in con_ejecucion:
+                cuota = monto // max(meses_por_proyecto, 1)
+                for k in range(meses_por_proyecto):
+                    if len(ejecuciones) >= escala.ejecuciones:
+                        break
+                    indice_mes = inicio_plan.year * 12 + inicio_plan.month - 1 + k
+                    ejecuciones.append({
+                        "proyecto_id": proyecto_id, "año": indice_mes // 12, "mes": indice_mes % 12 + 1,
+                        "capex_planificado": cuota, "capex_ejecutado": cuota * azar.randint(70, 120) // 100,
+                        "avance_planificado": min(100, (k + 1) * 100 // meses_por_proyecto),
+                        "avance_real": min(100, (k + 1) * azar.randint(80, 110) // meses_por_proyecto)
+                    })
+        conteos["ejecucion_mensual"] = _insertar(conexion, EjecucionMensual, ejecuciones)
+        del ejecuciones
+        log(f"  ejecución mensual ({time.perf_counter() - inicio:.1f}s)")
+
+        # Bitácora, por lotes para no mantener el millón de filas en memoria
+        tipos = list(TipoBitacora)
+        insertadas = 0
+        while escala.proyectos and insertadas < escala.bitacora:
+            lote = min(TAMANO_LOTE, escala.bitacora - insertadas)
+            conexion.execute(insert(BitacoraProyecto.__table__), [{
+                "proyecto_id": azar.randint(1, escala.proyectos), "usuario_id": azar.randint(1, escala.usuarios),
+                "tipo": tipos[azar.randrange(len(tipos))], "descripcion": "Entrada de bitácora sintética",
+                "fecha": _fecha(azar, hoy, 2 * 365)
+            } for _ in range(lote)])
+            insertadas += lote
+        conteos["bitacora_proyecto"] = insertadas
+        log(f"  bitácora ({time.perf_counter() - inicio:.1f}s)")
+
+        _ajustar_secuencias(conexion, (Area, Usuario, Iniciativa, Proyecto, FaseProyecto, PlanAnual))
+
+        # El historial se insertó directamente: histograma de tiempos del workflow
+        conteos["metricas_tiempos_workflow"] = reconstruir_tiempos(conexion)
+        # Códigos explícitos: las altas por la API continúan la numeración
+        conteos["secuencias"] = sincronizar(conexion)
+
+    return {"escala": asdict(escala), "semilla": semilla, "filas": conteos,
+            "segundos": round(time.perf_counter() - inicio, 1)}
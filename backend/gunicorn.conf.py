@@ -0,0 +1,52 @@
+"""
+Perfil de despliegue multiproceso (Linux): gunicorn con workers de uvicorn.
+
+Uso (desde backend/, tras `alembic upgrade head`):
+    gunicorn app.main:app -c gunicorn.conf.py
+
+La app se importa una vez en el proceso maestro (preload_app) y los workers
+comparten esas páginas de memoria por copy-on-write. Cada worker crea sus
+propias conexiones tras el fork (database.reiniciar_tras_fork); cachés,
+ventanas de lectura y /metrics son por worker. Ante SIGTERM cada worker deja
+de aceptar conexiones, termina las peticiones en curso durante a lo sumo
+graceful_timeout segundos y luego cierra los engines en el shutdown de la app.
+
+En Windows (sin fork) usar `uvicorn app.main:app --workers N`: cada proceso
+importa la app por su cuenta.
+"""
+import multiprocessing
+import os
+
+# Importar app.main antes del fork. Con ARRANQUE_RAPIDO los routers se
+# cargarían en cada worker y no se compartirían: desactivado por defecto.
+os.environ.setdefault("ARRANQUE_RAPIDO", "False")
+preload_app = True
+
+from app.config import settings  # noqa: E402
+
+bind = os.getenv("SGIP_BIND", "0.0.0.0:8000")
+# Un worker async por núcleo; WEB_CONCURRENCY lo sobrescribe
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "app.worker.WorkerSGIP"
+# Peticiones simultáneas por worker (más allá: 503). Cada petición en curso
+# retiene una conexión: no superar pool + desborde
+worker_connections = int(os.getenv(
+    "SGIP_WORKER_CONNECTIONS", settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+))
+
+# Drenado: tiempo para terminar las peticiones en curso tras SIGTERM
+graceful_timeout = int(os.getenv("SGIP_GRACEFUL_TIMEOUT", 30))
+# Worker sin responder al maestro durante más de `timeout` se reinicia
+timeout = int(os.getenv("SGIP_TIMEOUT", 60))
+keepalive = 5
+
+# Reciclar workers periódicamente (con desfase para no reiniciarlos a la vez)
+max_requests = int(os.getenv("SGIP_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv("SGIP_ACCESS_LOG")
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+
+def post_fork(server, worker):
+    server.log.info("Worker %s listo (pid %s)", worker.age, worker.pid)
@@ -25,8 +25,20 @@ if errorlevel 1 (
 )
 
 echo.
-echo Creando base de datos y usuario administrador...
-python -c "from app.database import SessionLocal, engine, Base; from app.models.usuario import Usuario, RolUsuario, Area; from app.utils.security import get_password_hash; Base.metadata.create_all(bind=engine); db = SessionLocal(); area = db.query(Area).filter(Area.codigo == 'TD').first(); area = area if area else (db.add(Area(nombre='Transformacion Digital', codigo='TD', descripcion='Area de Transformacion Digital')), db.commit(), db.query(Area).filter(Area.codigo == 'TD').first())[-1]; admin = db.query(Usuario).filter(Usuario.email == 'admin@sgip.cl').first(); admin = admin if admin else (db.add(Usuario(email='admin@sgip.cl', hashed_password=get_password_hash('admin123'), nombre='Administrador', apellido='Sistema', rol=RolUsuario.ADMINISTRADOR, area_id=area.id)), db.commit(), print('Usuario administrador creado.'))[-1]; db.close(); print('Base de datos configurada correctamente.')"
+echo Aplicando migraciones de base de datos...
+python -m alembic upgrade head
+if errorlevel 1 (
+    echo ERROR: No se pudieron aplicar las migraciones.
+    echo Si la base fue creada antes de las migraciones, ejecute:
+    echo     python -m alembic stamp 0001_esquema_base
+    echo y vuelva a ejecutar este script.
+    pause
+    exit /b 1
+)
+
+echo.
+echo Creando usuario administrador...
+python -c "from app.database import SessionLocal; from app.models.usuario import Usuario, RolUsuario, Area; from app.utils.security import get_password_hash; db = SessionLocal(); area = db.query(Area).filter(Area.codigo == 'TD').first(); area = area if area else (db.add(Area(nombre='Transformacion Digital', codigo='TD', descripcion='Area de Transformacion Digital')), db.commit(), db.query(Area).filter(Area.codigo == 'TD').first())[-1]; admin = db.query(Usuario).filter(Usuario.email == 'admin@sgip.cl').first(); admin = admin if admin else (db.add(Usuario(email='admin@sgip.cl', hashed_password=get_password_hash('admin123'), nombre='Administrador', apellido='Sistema', rol=RolUsuario.ADMINISTRADOR, area_id=area.id)), db.commit(), print('Usuario administrador creado.'))[-1]; db.close(); print('Base de datos configurada correctamente.')"
 
 echo.
 echo ============================================================
@@ -10,6 +10,7 @@ import {
   User,
   ArrowRight,
   FileText,
+  Building2,
 } from 'lucide-react';
 import clsx from 'clsx';
 import { useGlobalSearch, SearchResultType, SearchResult } from '../../hooks/useGlobalSearch';
@@ -19,6 +20,7 @@ const typeIcons: Record<SearchResultType, typeof Search> = {
   iniciativa: Lightbulb,
   proyecto: FolderKanban,
   usuario: User,
+  area: Building2,
 };
 
 const typeLabels: Record<SearchResultType, string> = {
@@ -26,6 +28,7 @@ const typeLabels: Record<SearchResultType, string> = {
   iniciativa: 'Iniciativa',
   proyecto: 'Proyecto',
   usuario: 'Usuario',
+  area: 'Área',
 };
 
 const typeColors: Record<SearchResultType, string> = {
@@ -33,6 +36,7 @@ const typeColors: Record<SearchResultType, string> = {
   iniciativa: 'bg-amber-100 text-amber-700',
   proyecto: 'bg-blue-100 text-blue-700',
   usuario: 'bg-purple-100 text-purple-700',
+  area: 'bg-emerald-100 text-emerald-700',
 };
 
 interface GlobalSearchProps {
@@ -119,7 +123,7 @@ export default function GlobalSearch({ isOpen, onClose }: GlobalSearchProps) {
     return acc;
   }, {} as Record<SearchResultType, SearchResult[]>);
 
-  const orderedTypes: SearchResultType[] = ['page', 'iniciativa', 'proyecto', 'usuario'];
+  const orderedTypes: SearchResultType[] = ['page', 'iniciativa', 'proyecto', 'usuario', 'area'];
   let flatIndex = 0;
 
   return (
@@ -1,7 +1,8 @@
 import { useState, useCallback, useEffect } from 'react';
-import { iniciativasService, proyectosService, usuariosService } from '../services/api';
+import { busquedaService } from '../services/api';
+import { RespuestaBusqueda, TipoResultadoBusqueda } from '../types';
 
-export type SearchResultType = 'iniciativa' | 'proyecto' | 'usuario' | 'page';
+export type SearchResultType = TipoResultadoBusqueda | 'page';
 
 export interface SearchResult {
   id: string;
@@ -40,6 +41,13 @@ const staticPages: SearchResult[] = [
   { id: 'page-config', type: 'page', title: 'Configuración', subtitle: 'Ajustes del sistema', link: '/configuracion' },
 ];
 
+const resultLinks: Record<TipoResultadoBusqueda, (id: number) => string> = {
+  iniciativa: (id) => `/iniciativas/${id}`,
+  proyecto: (id) => `/proyectos/${id}`,
+  usuario: () => '/configuracion',
+  area: () => '/configuracion',
+};
+
 export function useGlobalSearch(): UseGlobalSearchReturn {
   const [query, setQuery] = useState('');
   const [results, setResults] = useState<SearchResult[]>([]);
@@ -71,53 +79,16 @@ export function useGlobalSearch(): UseGlobalSearchReturn {
       // Set page results immediately
       setResults(pageResults);
 
-      // Search API in parallel
-      const [iniciativas, proyectos, usuarios] = await Promise.allSettled([
-        iniciativasService.getAll({ search: searchQuery, limit: 5 }),
-        proyectosService.getAll({ search: searchQuery, limit: 5 }),
-        usuariosService.getAll({ search: searchQuery, limit: 5 }),
-      ]);
-
-      const apiResults: SearchResult[] = [];
-
-      // Process iniciativas
-      if (iniciativas.status === 'fulfilled' && Array.isArray(iniciativas.value)) {
-        iniciativas.value.forEach((item: any) => {
-          apiResults.push({
-            id: `iniciativa-${item.id}`,
-            type: 'iniciativa',
-            title: item.titulo || item.nombre,
-            subtitle: `${item.codigo} · ${item.estado}`,
-            link: `/iniciativas/${item.id}`,
-          });
-        });
-      }
-
-      // Process proyectos
-      if (proyectos.status === 'fulfilled' && Array.isArray(proyectos.value)) {
-        proyectos.value.forEach((item: any) => {
-          apiResults.push({
-            id: `proyecto-${item.id}`,
-            type: 'proyecto',
-            title: item.nombre || item.titulo,
-            subtitle: `${item.codigo_proyecto} · ${item.estado}`,
-            link: `/proyectos/${item.id}`,
-          });
-        });
-      }
-
-      // Process usuarios
-      if (usuarios.status === 'fulfilled' && Array.isArray(usuarios.value)) {
-        usuarios.value.forEach((item: any) => {
-          apiResults.push({
-            id: `usuario-${item.id}`,
-            type: 'usuario',
-            title: `${item.nombre} ${item.apellido}`,
-            subtitle: `${item.email} · ${item.rol}`,
-            link: `/configuracion`,
-          });
-        });
-      }
+      // One request: the backend returns the top results of each type
+      const respuesta: RespuestaBusqueda = await busquedaService.buscar(searchQuery, { limite: 5 });
+
+      const apiResults: SearchResult[] = respuesta.resultados.map((item) => ({
+        id: `${item.tipo}-${item.id}`,
+        type: item.tipo,
+        title: item.titulo,
+        subtitle: item.subtitulo ?? undefined,
+        link: resultLinks[item.tipo](item.id),
+      }));
 
       // Combine and sort results
       setResults([...pageResults, ...apiResults]);
@@ -49,6 +49,7 @@ export default function WorkflowPipeline() {
   const [isLoading, setIsLoading] = useState(true);
   const [filterArea, setFilterArea] = useState<number | ''>('');
   const [showRejected, setShowRejected] = useState(false);
+  const [loadingMore, setLoadingMore] = useState<EstadoIniciativa | null>(null);
 
   useEffect(() => {
     loadData();
@@ -58,7 +59,7 @@ export default function WorkflowPipeline() {
     setIsLoading(true);
     try {
       const [pipelineData, metricsData, areasData] = await Promise.all([
-        iniciativasService.getPipeline(filterArea ? { area_id: filterArea } : {}),
+        iniciativasService.getPipeline(getFiltros()),
         iniciativasService.getWorkflowMetrics(),
         usuariosService.getAreas()
       ]);
@@ -72,10 +73,50 @@ export default function WorkflowPipeline() {
     }
   };
 
+  const getFiltros = () => (filterArea ? { area_id: filterArea } : {});
+
   const getInitiativasByEstado = (estado: EstadoIniciativa) => {
     return pipeline.filter(ini => ini.estado === estado);
   };
 
+  // El endpoint pagina por columna: cada tarjeta trae el total de la suya
+  const getTotalEnEstado = (estado: EstadoIniciativa) => {
+    return pipeline.find(ini => ini.estado === estado)?.total_en_estado ?? 0;
+  };
+
+  const loadMore = async (estado: EstadoIniciativa) => {
+    setLoadingMore(estado);
+    try {
+      const masData: IniciativaPipeline[] = await iniciativasService.getPipeline({
+        ...getFiltros(),
+        estado,
+        offset_por_estado: getInitiativasByEstado(estado).length
+      });
+      setPipeline(actual => {
+        const cargadas = new Set(actual.map(ini => ini.id));
+        return [...actual, ...masData.filter(ini => !cargadas.has(ini.id))];
+      });
+    } catch (error) {
+      console.error('Error loading pipeline:', error);
+    } finally {
+      setLoadingMore(null);
+    }
+  };
+
+  const renderVerMas = (estado: EstadoIniciativa, className: string) => {
+    const restantes = getTotalEnEstado(estado) - getInitiativasByEstado(estado).length;
+    if (restantes <= 0) return null;
+    return (
+      <button
+        onClick={() => loadMore(estado)}
+        disabled={loadingMore === estado}
+        className={`w-full py-2 text-xs font-medium rounded-lg hover:bg-white/60 disabled:opacity-50 ${className}`}
+      >
+        {loadingMore === estado ? 'Cargando...' : `Ver más (${restantes})`}
+      </button>
+    );
+  };
+
   const getEstadoStats = (estado: string) => {
     return metrics?.por_estado.find(s => s.estado === estado);
   };
@@ -165,10 +206,9 @@ export default function WorkflowPipeline() {
               <div>
                 <p className="text-purple-100 text-sm">En Pipeline Activo</p>
                 <p className="text-3xl font-bold">
-                  {pipeline.filter(p =>
-                    p.estado !== EstadoIniciativa.RECHAZADA &&
-                    p.estado !== EstadoIniciativa.ACTIVADA
-                  ).length}
+                  {WORKFLOW_STAGES
+                    .filter(stage => stage.key !== EstadoIniciativa.ACTIVADA)
+                    .reduce((total, stage) => total + getTotalEnEstado(stage.key), 0)}
                 </p>
               </div>
               <Hourglass className="h-10 w-10 text-purple-200" />
@@ -197,7 +237,7 @@ export default function WorkflowPipeline() {
                         <span className={`font-semibold ${stage.textColor}`}>{stage.label}</span>
                       </div>
                       <span className={`px-2 py-0.5 rounded-full text-xs font-medium ${stage.textColor} bg-white/50`}>
-                        {iniciativas.length}
+                        {getTotalEnEstado(stage.key)}
                       </span>
                     </div>
                     {stats && stats.monto_total > 0 && (
@@ -243,6 +283,7 @@ export default function WorkflowPipeline() {
                         </div>
                       ))
                     )}
+                    {renderVerMas(stage.key, stage.textColor)}
                   </div>
                 </div>
 
@@ -265,7 +306,7 @@ export default function WorkflowPipeline() {
             <XCircle className="h-5 w-5 text-red-500" />
             <h3 className="font-semibold text-gray-900">Iniciativas Rechazadas</h3>
             <span className="px-2 py-0.5 rounded-full text-xs font-medium bg-red-100 text-red-700">
-              {getInitiativasByEstado(EstadoIniciativa.RECHAZADA).length}
+              {getTotalEnEstado(EstadoIniciativa.RECHAZADA)}
             </span>
           </div>
           <div className="grid grid-cols-4 gap-3">
@@ -288,6 +329,9 @@ export default function WorkflowPipeline() {
               </p>
             )}
           </div>
+          <div className="mt-3">
+            {renderVerMas(EstadoIniciativa.RECHAZADA, 'text-red-700')}
+          </div>
         </Card>
       )}
 
@@ -138,6 +138,24 @@ export const iniciativasService = {
     });
     return response.data;
   },
+  cambiarEstadoLote: async (cambios: any[], comentario?: string, parcial = false) => {
+    const response = await api.post('/iniciativas/cambiar-estado/bulk', { cambios, comentario }, {
+      params: { parcial }
+    });
+    return response.data;
+  },
+  reclasificar: async (aplicar = false) => {
+    const response = await api.post('/iniciativas/reclasificar', null, { params: { aplicar } });
+    return response.data;
+  },
+  simularScoring: async (parametros: any = {}) => {
+    const response = await api.post('/iniciativas/scoring/simulacion', parametros);
+    return response.data;
+  },
+  calcularScoringLote: async (scorings: any[]) => {
+    const response = await api.post('/iniciativas/scoring/batch', { scorings });
+    return response.data;
+  },
   delete: async (id: number) => {
     const response = await api.delete(`/iniciativas/${id}`);
     return response.data;
@@ -400,4 +418,15 @@ export const seguimientoService = {
   },
 };
 
+// Búsqueda global
+export const busquedaService = {
+  buscar: async (q: string, params?: { limite?: number; tipos?: string[] }) => {
+    const response = await api.get('/busqueda/', {
+      params: { q, ...params },
+      paramsSerializer: { indexes: null },
+    });
+    return response.data;
+  },
+};
+
 export default api;
@@ -280,6 +280,7 @@ export interface IniciativaPipeline {
   fecha_solicitud: string;
   dias_en_estado: number;
   urgencia: string;
+  total_en_estado: number;
 }
 
 export interface PipelineStats {
@@ -289,10 +290,135 @@ export interface PipelineStats {
   porcentaje: number;
 }
 
+export interface TiempoTramo {
+  tramo: string;
+  cantidad: number;
+  promedio_dias: number;
+  p50_dias: number;
+  p90_dias: number;
+}
+
 export interface WorkflowMetrics {
   total_iniciativas: number;
   por_estado: PipelineStats[];
   tiempo_promedio_aprobacion?: number;
+  tiempo_aprobacion?: TiempoTramo | null;
+  tiempos_por_estado: TiempoTramo[];
   tasa_aprobacion: number;
   tasa_rechazo: number;
 }
+
+export interface MovimientoClasificacion {
+  desde?: ClasificacionInversion | null;
+  hacia: ClasificacionInversion;
+  tipo_informe_desde?: string | null;
+  tipo_informe_hacia: string;
+  cantidad: number;
+}
+
+export interface ResultadoReclasificacion {
+  aplicado: boolean;
+  umbral_estandar: number;
+  umbral_alta: number;
+  total_iniciativas: number;
+  reclasificadas: number;
+  antes: Record<string, number>;
+  despues: Record<string, number>;
+  movimientos: MovimientoClasificacion[];
+}
+
+export interface ParametrosSimulacionScoring {
+  topes?: Record<string, number>;
+  pesos?: Record<string, number>;
+  cortes?: number[];
+  limite?: number;
+}
+
+export interface CambioPrioridad {
+  iniciativa_id: number;
+  codigo?: string;
+  titulo?: string;
+  puntaje_actual: number;
+  puntaje_simulado: number;
+  prioridad_actual: Prioridad;
+  prioridad_simulada: Prioridad;
+}
+
+export interface CambioRankingBanco extends CambioPrioridad {
+  proyecto_id: number;
+  codigo_proyecto?: string;
+  posicion_actual: number;
+  posicion_simulada: number;
+}
+
+export interface ResultadoSimulacionScoring {
+  parametros: ParametrosSimulacionScoring;
+  total_iniciativas: number;
+  distribucion_actual: Record<string, number>;
+  distribucion_simulada: Record<string, number>;
+  cambian_prioridad: number;
+  transiciones: { desde: Prioridad; hacia: Prioridad; cantidad: number }[];
+  iniciativas: CambioPrioridad[];
+  banco_reserva: {
+    total: number;
+    cambian_prioridad: number;
+    suben: number;
+    bajan: number;
+    distribucion_actual: Record<string, number>;
+    distribucion_simulada: Record<string, number>;
+    proyectos: CambioRankingBanco[];
+  };
+}
+
+export interface ResultadoScoringItem {
+  iniciativa_id: number;
+  procesado: boolean;
+  puntaje_total?: number;
+  prioridad_calculada?: Prioridad;
+  estado?: EstadoIniciativa;
+  en_revision: boolean;
+  error?: string;
+}
+
+export interface ResultadoScoringLote {
+  recibidos: number;
+  procesados: number;
+  en_revision: number;
+  resultados: ResultadoScoringItem[];
+}
+
+export interface CambioEstadoItem {
+  iniciativa_id: number;
+  nuevo_estado: EstadoIniciativa;
+  comentario?: string;
+}
+
+export interface ResultadoCambioEstadoItem {
+  iniciativa_id: number;
+  aplicado: boolean;
+  estado_anterior?: EstadoIniciativa;
+  estado_nuevo?: EstadoIniciativa;
+  error?: string;
+}
+
+export interface ResultadoCambioEstadoLote {
+  recibidos: number;
+  aplicados: number;
+  resultados: ResultadoCambioEstadoItem[];
+}
+
+// Búsqueda global
+export type TipoResultadoBusqueda = 'iniciativa' | 'proyecto' | 'usuario' | 'area';
+
+export interface ResultadoBusqueda {
+  tipo: TipoResultadoBusqueda;
+  id: number;
+  titulo: string;
+  subtitulo?: string | null;
+  puntaje: number;
+}
+
+export interface RespuestaBusqueda {
+  consulta: string;
+  resultados: ResultadoBusqueda[];
+}
@@ -35,6 +35,10 @@ echo.
 echo Instalando/actualizando dependencias...
 python -m pip install -r requirements.txt
 
+echo.
+echo Aplicando migraciones de base de datos...
+python -m alembic upgrade head
+
 echo.
 echo ============================================================
 echo    Iniciando servidor en http://localhost:8000
@@ -0,0 +1,56 @@
+@echo off
+title SGIP - Backend (FastAPI, multiproceso)
+color 0B
+
+REM Configurar Python en el PATH
+set "PATH=C:\Users\ltolorzar\AppData\Local\Programs\Python\Python314;C:\Users\ltolorzar\AppData\Local\Programs\Python\Python314\Scripts;%PATH%"
+
+REM Cambiar al directorio del backend (usando %~dp0 para obtener la ruta del .bat)
+cd /d "%~dp0backend"
+
+echo ============================================================
+echo    SGIP - Backend (FastAPI, multiproceso)
+echo ============================================================
+echo.
+echo Directorio actual: %CD%
+echo.
+
+echo Verificando Python...
+python --version
+if errorlevel 1 (
+    echo ERROR: Python no encontrado
+    pause
+    exit /b 1
+)
+
+echo.
+echo Verificando que existe requirements.txt...
+if not exist requirements.txt (
+    echo ERROR: No se encuentra requirements.txt en %CD%
+    pause
+    exit /b 1
+)
+
+echo.
+echo Instalando/actualizando dependencias...
+python -m pip install -r requirements.txt
+
+echo.
+echo Aplicando migraciones de base de datos...
+python -m alembic upgrade head
+
+echo.
+REM Un worker por nucleo (WEB_CONCURRENCY lo sobrescribe). En Linux usar
+REM gunicorn app.main:app -c gunicorn.conf.py (app precargada antes del fork)
+if not defined WEB_CONCURRENCY set "WEB_CONCURRENCY=%NUMBER_OF_PROCESSORS%"
+
+echo ============================================================
+echo    Iniciando servidor en http://localhost:8000 con %WEB_CONCURRENCY% workers
+echo    Documentacion API: http://localhost:8000/docs
+echo ============================================================
+echo.
+
+REM --limit-concurrency = DB_POOL_SIZE + DB_MAX_OVERFLOW; drenado de 30 s al cerrar
+python -m uvicorn app.main:app --workers %WEB_CONCURRENCY% --host 0.0.0.0 --port 8000 --limit-concurrency 30 --timeout-graceful-shutdown 30
+
+pause